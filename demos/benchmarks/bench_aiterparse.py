@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times Objects.aiterparse against Objects.iterparse called from a coroutine, and reports how long each kept the event loop from running other tasks:  the longest delay of a task that wakes every millisecond.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import sys
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+async def _ticker(delays: typing.List[float], stop: asyncio.Event) -> None:
+    """Records the delays of waking every millisecond, past the millisecond."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        delays.append(time.perf_counter() - start - 0.001)
+
+
+async def _run(
+    path: str, mode: str, executor: concurrent.futures.Executor
+) -> typing.Tuple[float, float, int]:
+    """Returns the elapsed time, the longest delay of the ticker, and the number of FileObjects parsed."""
+    delays: typing.List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(delays, stop))
+    await asyncio.sleep(0.01)
+    tally = 0
+    start = time.perf_counter()
+    if mode == "iterparse":
+        for event, obj in Objects.iterparse(path):
+            tally += isinstance(obj, Objects.FileObject)
+    else:
+        async for event, obj in Objects.aiterparse(
+            path, executor=executor if mode == "aiterparse, executor" else None
+        ):
+            tally += isinstance(obj, Objects.FileObject)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return (elapsed, max(delays), tally)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument(
+        "--input", help="DFXML file to parse.  Default: a synthetic file."
+    )
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        for mode in ["iterparse", "aiterparse", "aiterparse, executor"]:
+            (elapsed, stall, tally) = asyncio.run(_run(path, mode, executor))
+            print(
+                "%-22s %8.3fs  %8.0f files/s  longest stall %8.1fms"
+                % (mode, elapsed, tally / elapsed, 1e3 * stall)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script compares a DFXML file with its binary DFXML conversion:  file size, and the time Objects.iterparse takes to read each.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def _time_iterparse(path: str, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for event, obj in Objects.iterparse(path):
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    assert best is not None
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input", help="DFXML file to convert.  Default: a synthetic file."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        binary_path = os.path.join(tmpdir, "manifest.dfxmlb")
+        start = time.perf_counter()
+        Objects.dfxml_to_binary(path, binary_path)
+        print("converted in %.3fs" % (time.perf_counter() - start))
+
+        xml_size = os.path.getsize(path)
+        binary_size = os.path.getsize(binary_path)
+        xml_time = _time_iterparse(path, args.repeat)
+        binary_time = _time_iterparse(binary_path, args.repeat)
+        print("%-8s %12d bytes  iterparse %8.3fs" % ("XML", xml_size, xml_time))
+        print(
+            "%-8s %12d bytes  iterparse %8.3fs  (%.2fx the size, %.2fx as fast)"
+            % (
+                "binary",
+                binary_size,
+                binary_time,
+                binary_size / xml_size,
+                xml_time / binary_time,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times image reads with and without dfxml's shared BlockCache:  repeated reads of 1 KiB records from an MFT-like region of a raw image, through dfxml.fileobject.content_for_run and Objects.RawImageReader.pread, where the cache serves repeats; and ByteRuns.iter_contents over fragmented files, whose streamed contents bypass the cache.  It reports the cache's hits, misses and evictions; each miss is a read of the image, where the uncached reads read the image every time.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import dfxml
+import dfxml.objects as Objects
+
+
+def _record_reads(
+    count: int, region_size: int, record_size: int
+) -> typing.List[typing.Tuple[int, int]]:
+    """Returns (offset, length) of count record reads, favoring low records, as lookups of parent directories do."""
+    rng = random.Random(23)
+    records = region_size // record_size
+    return [
+        (int(records * rng.random() ** 3) * record_size, record_size)
+        for _ in range(count)
+    ]
+
+
+def _fragmented_runs(image_size: int, files: int) -> typing.List[Objects.ByteRuns]:
+    rng = random.Random(23)
+    corpus = []
+    for _ in range(files):
+        brs = Objects.ByteRuns()
+        for _ in range(8):
+            length = rng.randint(1, 8) * 4096
+            brs.append(
+                Objects.ByteRun(
+                    img_offset=rng.randrange((image_size - length) // 4096) * 4096,
+                    len=length,
+                )
+            )
+        corpus.append(brs)
+    return corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image-size", type=int, default=256 * 1024 * 1024)
+    parser.add_argument("--reads", type=int, default=200000)
+    parser.add_argument("--mft-size", type=int, default=32 * 1024 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        image_path = os.path.join(tmpdir, "image.raw")
+        with open(image_path, "wb") as fh:
+            for _ in range(args.image_size // (1024 * 1024)):
+                fh.write(os.urandom(1024 * 1024))
+        reads = _record_reads(args.reads, args.mft_size, 1024)
+        runs = [dfxml.byte_run(offset, length) for (offset, length) in reads]
+        corpus = _fragmented_runs(args.image_size, 2000)
+
+        for name, cache in [
+            ("no cache", None),
+            ("BlockCache", dfxml.BlockCache()),
+        ]:
+            dfxml.set_block_cache(cache)
+            print(name)
+
+            with open(image_path, "rb") as fh:
+                fi = dfxml.fileobject(imagefile=fh)
+                start = time.perf_counter()
+                for run in runs:
+                    fi.content_for_run(run)
+                elapsed = time.perf_counter() - start
+            print(
+                "  %-36s %8.3fs  %8.1fus/read"
+                % ("fileobject.content_for_run", elapsed, 1e6 * elapsed / len(runs))
+            )
+
+            with Objects.RawImageReader(image_path) as reader:
+                start = time.perf_counter()
+                for offset, length in reads:
+                    reader.pread(offset, length)
+                elapsed = time.perf_counter() - start
+            print(
+                "  %-36s %8.3fs  %8.1fus/read"
+                % ("RawImageReader.pread", elapsed, 1e6 * elapsed / len(reads))
+            )
+
+            start = time.perf_counter()
+            tally = 0
+            for brs in corpus:
+                for chunk in brs.iter_contents(image_path, buffer_size=512):
+                    tally += len(chunk)
+            elapsed = time.perf_counter() - start
+            print(
+                "  %-36s %8.3fs  %8.1f MiB/s"
+                % (
+                    "ByteRuns.iter_contents, fragmented",
+                    elapsed,
+                    tally / elapsed / 2**20,
+                )
+            )
+            if not cache is None:
+                print(
+                    "  %d hits, %d misses, %d evictions"
+                    % (cache.hits, cache.misses, cache.evictions)
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times finding the files holding disk image sectors, as iblkfind.py does:  by testing every sector against every file with dfxml.fileobject.has_sector while reading the DFXML file, and with an Objects.ByteRunIndex of the file.  It reports the time to build and reopen the index, and checks that both find the same files.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml
+import dfxml.objects as Objects
+
+
+def _scan(path: str, sectors: typing.List[int]) -> typing.Set[typing.Tuple[int, str]]:
+    """Returns the (sector, filename) pairs found by iblkfind's former scan."""
+    found = set()
+
+    def process(fi):
+        for s in sectors:
+            if fi.has_sector(s):
+                found.add((s, fi.filename()))
+
+    with open(path, "rb") as fh:
+        dfxml.read_dfxml(xmlfile=fh, callback=process)
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument(
+        "--input",
+        help="DFXML file to read FileObjects from.  Default: a synthetic file.",
+    )
+    parser.add_argument("--sectors", type=int, default=100)
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        index_path = os.path.join(tmpdir, "files.xml.runs")
+        start = time.perf_counter()
+        Objects.ByteRunIndex.build(path, index_path).close()
+        print("%-32s %10.3fs" % ("ByteRunIndex.build", time.perf_counter() - start))
+        print("%-32s %10d bytes" % ("index file", os.path.getsize(index_path)))
+
+        start = time.perf_counter()
+        index = Objects.ByteRunIndex(path, index_path)
+        print(
+            "%-32s %10.3fms"
+            % ("ByteRunIndex open", 1e3 * (time.perf_counter() - start))
+        )
+        print("%d FileObjects, %d byte runs" % (index.record_count, len(index)))
+
+        rng = random.Random(24)
+        runs = list(index.runs("data"))
+        sectors = []
+        for _ in range(args.sectors):
+            (_, _, img_offset, length, _) = rng.choice(runs)
+            sectors.append((img_offset + rng.randrange(length)) // 512)
+
+        start = time.perf_counter()
+        scanned = _scan(path, sectors)
+        scan_time = time.perf_counter() - start
+        print(
+            "%-32s %10.3fs  (%d sectors)" % ("has_sector scan", scan_time, len(sectors))
+        )
+
+        start = time.perf_counter()
+        found = set()
+        for s in sectors:
+            for record, _, _, _, _ in index.sector(s, facets="data"):
+                found.add((s, index.filename(record)))
+        index_time = time.perf_counter() - start
+        print(
+            "%-32s %10.3fs  (%d sectors, %.0fx)"
+            % ("ByteRunIndex.sector", index_time, len(sectors), scan_time / index_time)
+        )
+        assert found == scanned
+
+        image_end = runs[-1][2] + runs[-1][3]
+        offsets = [rng.randrange(image_end) for _ in range(args.lookups)]
+        start = time.perf_counter()
+        hits = 0
+        for offset in offsets:
+            hits += len(index.at(offset))
+        elapsed = time.perf_counter() - start
+        print(
+            "%-32s %10.2fus/lookup  (%d hits)"
+            % ("ByteRunIndex.at", 1e6 * elapsed / len(offsets), hits)
+        )
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
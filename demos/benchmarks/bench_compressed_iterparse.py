@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times Objects.iterparse on gzip, bzip2 and xz compressed copies of a DFXML file, against parsing the uncompressed file, and against decompressing to a temporary file before parsing.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+OPENERS: typing.Dict[str, typing.Callable[..., typing.IO[bytes]]] = {
+    "gz": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+
+
+def _time_iterparse(path: str, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for event, obj in Objects.iterparse(path):
+            pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    assert best is not None
+    return best
+
+
+def _time_temp_file(path: str, suffix: str, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            temp_path = os.path.join(tmpdir, "manifest.xml")
+            with OPENERS[suffix](path, "rb") as in_fh, open(temp_path, "wb") as out_fh:
+                shutil.copyfileobj(in_fh, out_fh, 1024 * 1024)
+            for event, obj in Objects.iterparse(temp_path):
+                pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    assert best is not None
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input", help="DFXML file to parse.  Default: a synthetic file."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    baseline = _time_iterparse(path, args.repeat)
+    print("%-22s %8.3fs" % ("uncompressed", baseline))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for suffix, opener in OPENERS.items():
+            compressed_path = os.path.join(tmpdir, "manifest.xml." + suffix)
+            with open(path, "rb") as in_fh, opener(compressed_path, "wb") as out_fh:
+                shutil.copyfileobj(in_fh, out_fh, 1024 * 1024)
+            streamed = _time_iterparse(compressed_path, args.repeat)
+            via_temp_file = _time_temp_file(compressed_path, suffix, args.repeat)
+            print(
+                "%-22s %8.3fs  decompressed to a temporary file first: %8.3fs"
+                % (suffix + " streamed", streamed, via_temp_file)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times the bulk conversion of the timestamps of a DFXML file to nanoseconds since the Unix epoch with dfxml.dftimes_to_epoch_ns, with and without NumPy, against converting each timestamp through dfxml.dftime.  It checks that the two dftimes_to_epoch_ns modes agree.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import datetime
+import os
+import sys
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml
+import dfxml.objects as Objects
+
+
+def _dftime_epoch_ns(texts: typing.List[str]) -> typing.List[int]:
+    results = []
+    for text in texts:
+        dt = dfxml.dftime(text).datetime()
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=datetime.timezone.utc)
+        results.append(int(dt.timestamp() * 1e6) * 1000)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input",
+        help="DFXML file to read timestamps from.  Default: a synthetic file.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    texts = [
+        str(tobj.time)
+        for (event, obj) in Objects.iterparse(path)
+        if isinstance(obj, Objects.FileObject)
+        for name in Objects.TimestampObject.timestamp_name_list
+        for tobj in [getattr(obj, name)]
+        if not tobj is None and not tobj.time is None
+    ]
+    print("%d timestamps, %d distinct" % (len(texts), len(set(texts))))
+
+    try:
+        import numpy  # type: ignore
+    except ImportError:
+        numpy = None
+        print("NumPy: unavailable")
+
+    # (name, function) pairs.  The first is the baseline.
+    modes: typing.List[typing.Tuple[str, typing.Callable[[], typing.Any]]] = [
+        (
+            "dftime",
+            lambda: dfxml._iso8601Tdatetime_cached.cache_clear()
+            or _dftime_epoch_ns(texts),
+        ),
+        (
+            "pure Python",
+            lambda: dfxml.dftimes_to_epoch_ns(texts, use_numpy=False),
+        ),
+    ]
+    if not numpy is None:
+        modes.append(
+            ("NumPy", lambda: dfxml.dftimes_to_epoch_ns(texts, use_numpy=True))
+        )
+        assert (
+            dfxml.dftimes_to_epoch_ns(texts, use_numpy=True)[0].tolist()
+            == dfxml.dftimes_to_epoch_ns(texts, use_numpy=False)[0].tolist()
+        )
+
+    # Alternating the modes evens out drift in the machine's speed.
+    times: typing.Dict[str, float] = dict()
+    for _ in range(args.repeat):
+        for name, run in modes:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            times[name] = min(times.get(name, elapsed), elapsed)
+    baseline = modes[0][0]
+    for name, _ in modes:
+        print(
+            "%-12s %8.3fs  %8.3fus/timestamp  (%.1fx as fast as %s)"
+            % (
+                name,
+                times[name],
+                1e6 * times[name] / len(texts),
+                times[baseline] / times[name],
+                baseline,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
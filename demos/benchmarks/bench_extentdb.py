@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times dfxml.extentdb, as icarvingtruth.py uses it:  adding disjoint extents in random order, testing extents for intersection, and listing the sectors of runs not in the database.  It times the former implementation, which scanned a list of the extents, at a smaller number of extents, where it still finishes.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import random
+import sys
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import dfxml
+
+
+class _ListExtentDB(dfxml.extentdb):
+    """The former extentdb, scanning the list of its extents."""
+
+    def intersects(self, extent):
+        if extent.len == 0:
+            return True
+        start = extent.img_offset
+        stop = extent.img_offset + extent.len
+        for d in self.db:
+            if d.img_offset <= start < d.img_offset + d.len:
+                return d
+            if d.img_offset < stop < d.img_offset + d.len:
+                return d
+            if start < d.img_offset and d.img_offset + d.len <= stop:
+                return d
+        return None
+
+    def add(self, extent):
+        v = self.intersects(extent)
+        if v:
+            raise ValueError("Cannot add " + str(extent) + ": it intersects " + str(v))
+        self.db.append(extent)
+
+    def sectors_not_in_db(self, run):
+        return [x for x in self.sectors_for_run(run) if not self.intersects_sector(x)]
+
+
+def _extents(
+    count: int, rng: random.Random, adjacent: bool
+) -> typing.List[dfxml.byte_run]:
+    """Returns count disjoint extents of 1 to 16 4 KiB clusters, one per 64 KiB slot, in random order.  If adjacent, each extent fills its slot, so the extents tile the image, as the sectors of allocated files do."""
+    slots = list(range(count))
+    rng.shuffle(slots)
+    return [
+        dfxml.byte_run(
+            img_offset=slot * 65536,
+            len=65536 if adjacent else rng.randint(1, 16) * 4096,
+        )
+        for slot in slots
+    ]
+
+
+def _time(
+    db: dfxml.extentdb, count: int, queries: int, adjacent: bool = False
+) -> typing.List[float]:
+    """Returns the times per operation of adding count extents, intersecting queries runs, and listing the sectors not in the database of queries runs."""
+    rng = random.Random(25)
+    extents = _extents(count, rng, adjacent)
+    runs = [
+        dfxml.byte_run(img_offset=rng.randrange(count * 65536), len=65536)
+        for _ in range(queries)
+    ]
+
+    start = time.perf_counter()
+    db.add_runs(extents)
+    add_time = (time.perf_counter() - start) / count
+
+    start = time.perf_counter()
+    hits = sum(1 for run in runs if db.intersects(run))
+    intersect_time = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    sectors = sum(len(db.sectors_not_in_db(run)) for run in runs)
+    subtract_time = (time.perf_counter() - start) / queries
+    return [add_time, intersect_time, subtract_time, hits, sectors]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--extents", type=int, default=1000000)
+    parser.add_argument("--baseline-extents", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    print("%-34s %12s %12s %14s" % ("", "add", "intersects", "sectors_not_in_db"))
+    results = dict()
+    for name, db_class, count in [
+        ("former extentdb", _ListExtentDB, args.baseline_extents),
+        ("extentdb", dfxml.extentdb, args.baseline_extents),
+        ("extentdb", dfxml.extentdb, args.extents),
+    ]:
+        (add_time, intersect_time, subtract_time, hits, sectors) = _time(
+            db_class(), count, args.queries
+        )
+        results.setdefault(count, []).append((hits, sectors))
+        print(
+            "%-34s %10.2fus %10.2fus %12.2fus"
+            % (
+                "%s, %d extents" % (name, count),
+                1e6 * add_time,
+                1e6 * intersect_time,
+                1e6 * subtract_time,
+            )
+        )
+    # Both implementations find the same intersections and sectors.
+    assert len(set(results[args.baseline_extents])) == 1
+
+    # Adjacent extents are coalesced into the ranges they cover.
+    (add_time, intersect_time, subtract_time, hits, sectors) = _time(
+        dfxml.extentdb(), args.extents, args.queries, adjacent=True
+    )
+    print(
+        "%-34s %10.2fus %10.2fus %12.2fus"
+        % (
+            "extentdb, %d adjacent extents" % args.extents,
+            1e6 * add_time,
+            1e6 * intersect_time,
+            1e6 * subtract_time,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
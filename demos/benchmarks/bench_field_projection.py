@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script compares the files-per-second rate of Objects.iterparse with and without a field projection, for a timeline consumer that reads the four file system timestamps and the file name.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+TIMELINE_FIELDS = ["atime", "crtime", "ctime", "filename", "mtime"]
+
+
+def run(
+    path: str, fields: typing.Optional[typing.List[str]]
+) -> typing.Tuple[int, float]:
+    tally = 0
+    start = time.perf_counter()
+    for event, obj in Objects.iterparse(path, fields=fields):
+        if isinstance(obj, Objects.FileObject):
+            for field in TIMELINE_FIELDS:
+                getattr(obj, field)
+            tally += 1
+    return (tally, time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument(
+        "--input", help="DFXML file to parse.  Default: a synthetic file."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+
+    for label, fields in (("all", None), ("timeline", TIMELINE_FIELDS)):
+        best = None
+        tally = 0
+        for _ in range(args.repeat):
+            (tally, elapsed) = run(path, fields)
+            best = elapsed if best is None else min(best, elapsed)
+        assert best is not None
+        print(
+            "fields=%-8s  %8d files  %8.3fs  %10.0f files/s"
+            % (label, tally, best, tally / best)
+        )
+
+
+if __name__ == "__main__":
+    main()
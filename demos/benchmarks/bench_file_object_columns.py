@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times exporting a DFXML file to memory-mappable column files with Objects.dfxml_to_columns, and reloading them with Objects.FileObjectColumns, against building an Objects.FileObjectTable from the DFXML file.  It reports the time to open the columns and sum the filesize column.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def _sum_filesizes(column) -> int:
+    null = Objects.FileObjectTable.NULL_INT
+    if hasattr(column, "dtype"):
+        return int(column[column != null].sum())
+    return sum(value for value in column if value != null)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input",
+        help="DFXML file to read FileObjects from.  Default: a synthetic file.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+
+    start = time.perf_counter()
+    table = Objects.FileObjectTable.from_iterparse(path)
+    parse_time = time.perf_counter() - start
+    expected = _sum_filesizes(table["filesize"])
+    print("%d FileObjects" % len(table))
+    print("%-24s %10.3fs" % ("FileObjectTable (parse)", parse_time))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        directory = os.path.join(tmpdir, "columns")
+        start = time.perf_counter()
+        Objects.dfxml_to_columns(path, directory)
+        print("%-24s %10.3fs" % ("dfxml_to_columns", time.perf_counter() - start))
+        size = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory)
+        )
+        print("%-24s %10.1f bytes/file" % ("column files", size / len(table)))
+
+        open_times = []
+        sum_times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            columns = Objects.FileObjectColumns(directory)
+            filesizes = columns["filesize"]
+            open_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            assert _sum_filesizes(filesizes) == expected
+            sum_times.append(time.perf_counter() - start)
+            del filesizes
+            columns.close()
+        print(
+            "%-24s %10.3fms  (use_numpy=%s)"
+            % ("open + map filesize", 1000 * min(open_times), columns.use_numpy)
+        )
+        print("%-24s %10.3fms" % ("sum filesize", 1000 * min(sum_times)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times Objects.FileObjectStore:  inserting parsed FileObjects, building a store from a DFXML file (parsing included), indexed lookups, and exporting the store to DFXML.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def _insert(fobjs: typing.List[Objects.FileObject], store_path: str) -> float:
+    """Returns the seconds taken to insert fobjs into a new store, and commit them."""
+    if os.path.exists(store_path):
+        os.unlink(store_path)
+    start = time.perf_counter()
+    with Objects.FileObjectStore(store_path) as store:
+        store.extend(fobjs)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input",
+        help="DFXML file to read FileObjects from.  Default: a synthetic file.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    fobjs = [
+        obj
+        for (event, obj) in Objects.iterparse(path, keep_raw=True)
+        if isinstance(obj, Objects.FileObject)
+    ]
+    print("%d FileObjects" % len(fobjs))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store_path = os.path.join(tmpdir, "store.sqlite")
+        insert_time = min(_insert(fobjs, store_path) for _ in range(args.repeat))
+        print(
+            "%-10s %8.3fs  %10.0f files/s  (parsed FileObjects, indexes maintained)"
+            % ("insert", insert_time, len(fobjs) / insert_time)
+        )
+
+        start = time.perf_counter()
+        store = Objects.FileObjectStore.build(path, store_path)
+        build_time = time.perf_counter() - start
+        print(
+            "%-10s %8.3fs  %10.0f files/s  (parsing included)"
+            % ("build", build_time, len(fobjs) / build_time)
+        )
+        print(
+            "%-10s %8.1f bytes/file"
+            % ("size", os.path.getsize(store_path) / len(fobjs))
+        )
+
+        # Lookups of values taken from across the document.
+        samples = fobjs[:: max(1, len(fobjs) // 100)]
+        lookups: typing.List[typing.Tuple[str, typing.Callable[[], typing.Any]]] = []
+        for fobj in samples:
+            lookups.append(("by_inode", lambda fobj=fobj: store.by_inode(fobj.inode)))
+            lookups.append(
+                ("by_filename", lambda fobj=fobj: store.by_filename(fobj.filename))
+            )
+            if not fobj.sha1 is None:
+                lookups.append(("by_hash", lambda fobj=fobj: store.by_hash(fobj.sha1)))
+        for name in ["by_inode", "by_filename", "by_hash"]:
+            calls = [call for (kind, call) in lookups if kind == name]
+            if not calls:
+                continue
+            start = time.perf_counter()
+            for call in calls:
+                call()
+            elapsed = time.perf_counter() - start
+            print("%-12s %8.3fms/lookup" % (name, 1000 * elapsed / len(calls)))
+
+        start = time.perf_counter()
+        store.export(os.path.join(tmpdir, "out.xml"))
+        export_time = time.perf_counter() - start
+        print(
+            "%-10s %8.3fs  %10.0f files/s"
+            % ("export", export_time, len(fobjs) / export_time)
+        )
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
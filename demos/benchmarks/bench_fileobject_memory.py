@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script reports the memory retained per FileObject by a DFXMLObject built with Objects.parse, and by an empty FileObject.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument(
+        "--input", help="DFXML file to parse.  Default: a synthetic file."
+    )
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+
+    # Warm caches (e.g. imports and interned values) outside of the measurement.
+    Objects.parse(path)
+
+    gc.collect()
+    tracemalloc.start()
+    dobj = Objects.parse(path)
+    gc.collect()
+    (retained, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tally = sum(1 for obj in dobj if isinstance(obj, Objects.FileObject))
+    print(
+        "parse           %8d files  %8.0f bytes/FileObject  peak %8.1f MiB"
+        % (tally, retained / tally, peak / 1048576)
+    )
+
+    count = 10000
+    tracemalloc.start()
+    empties = [Objects.FileObject() for _ in range(count)]
+    (retained, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        "empty           %8d files  %8.0f bytes/FileObject" % (count, retained / count)
+    )
+    del empties
+
+
+if __name__ == "__main__":
+    main()
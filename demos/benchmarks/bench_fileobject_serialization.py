@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times serializing FileObjects to DFXML text, with FileObject.to_dfxml's direct serializer and with ElementTree (_ET_tostring(FileObject.to_Element())), and reports records per second.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def _time_serializer(
+    fobjs: typing.List[Objects.FileObject],
+    serializer: typing.Callable[[Objects.FileObject], str],
+    repeat: int,
+) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for fobj in fobjs:
+            serializer(fobj)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    assert best is not None
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input",
+        help="DFXML file to read FileObjects from.  Default: a synthetic file.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    fobjs = [
+        obj
+        for (event, obj) in Objects.iterparse(path)
+        if isinstance(obj, Objects.FileObject)
+    ]
+
+    def _element_tree(fobj: Objects.FileObject) -> str:
+        return Objects._ET_tostring(fobj.to_Element())
+
+    mismatches = sum(1 for fobj in fobjs if fobj.to_dfxml() != _element_tree(fobj))
+    print("%d FileObjects, %d serialization mismatches" % (len(fobjs), mismatches))
+
+    et_time = _time_serializer(fobjs, _element_tree, args.repeat)
+    direct_time = _time_serializer(fobjs, Objects.FileObject.to_dfxml, args.repeat)
+    print(
+        "%-12s %8.3fs  %10.0f records/s"
+        % ("ElementTree", et_time, len(fobjs) / et_time)
+    )
+    print(
+        "%-12s %8.3fs  %10.0f records/s  (%.2fx as fast)"
+        % ("direct", direct_time, len(fobjs) / direct_time, et_time / direct_time)
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script hashes the contents of fragmented files in a raw image, file after file with ByteRuns.iter_contents, and in image order with Objects.ImageReadScheduler.  Besides the time, it reports the number of reads of the image and the total distance the reads seek, which is what costs time on spinning disks and network storage; the image is likely in the page cache, where seeking is free, unless --cold is given.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import dfxml.objects as Objects
+
+
+class _CountingReader(Objects.RawImageReader):
+    """A RawImageReader counting its reads and the distance they seek."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.reads = 0
+        self.seek_distance = 0
+        self._position = 0
+
+    def _pread(self, offset: int, length: int) -> memoryview:
+        self.reads += 1
+        self.seek_distance += abs(offset - self._position)
+        data = super()._pread(offset, length)
+        self._position = offset + len(data)
+        return data
+
+
+def _evict(path: str) -> None:
+    """Asks the kernel to drop the file path from the page cache."""
+    with open(path, "rb") as fh:
+        os.fsync(fh.fileno())
+        os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _fragmented_files(
+    image_size: int, files: int, fragments: int, cluster_size: int
+) -> typing.List[Objects.ByteRuns]:
+    """Returns the data byte runs of files files of fragments runs each, of 1 to 8 clusters at random cluster offsets."""
+    rng = random.Random(22)
+    clusters = image_size // cluster_size
+    corpus = []
+    for _ in range(files):
+        brs = Objects.ByteRuns()
+        for _ in range(fragments):
+            length = rng.randint(1, 8)
+            brs.append(
+                Objects.ByteRun(
+                    img_offset=rng.randrange(clusters - length) * cluster_size,
+                    len=length * cluster_size,
+                )
+            )
+        corpus.append(brs)
+    return corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--fragments", type=int, default=8)
+    parser.add_argument("--image-size", type=int, default=512 * 1024 * 1024)
+    parser.add_argument("--cluster-size", type=int, default=4096)
+    parser.add_argument("--buffer-size", type=int, default=512)
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="Evict the image from the page cache before each pass, where supported.",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        image_path = os.path.join(tmpdir, "image.raw")
+        with open(image_path, "wb") as fh:
+            for _ in range(args.image_size // (1024 * 1024)):
+                fh.write(os.urandom(1024 * 1024))
+        corpus = _fragmented_files(
+            args.image_size, args.files, args.fragments, args.cluster_size
+        )
+        print(
+            "%d files, %d byte runs each, in a %d MiB raw image, %d-byte chunks"
+            % (
+                args.files,
+                args.fragments,
+                args.image_size // (1024 * 1024),
+                args.buffer_size,
+            )
+        )
+
+        digests: typing.Dict[str, typing.List[str]] = dict()
+        for mode in ["file after file", "ImageReadScheduler"]:
+            reader = _CountingReader(image_path)
+            if args.cold:
+                _evict(image_path)
+            hashers = [hashlib.sha1() for _ in corpus]
+            start = time.perf_counter()
+            if mode == "file after file":
+                for brs, hasher in zip(corpus, hashers):
+                    for chunk in brs.iter_contents(reader, args.buffer_size):
+                        hasher.update(chunk)
+            else:
+                scheduler = Objects.ImageReadScheduler(
+                    reader, buffer_size=args.buffer_size
+                )
+                for _ in scheduler.run(
+                    (index, brs, hashers[index].update)
+                    for (index, brs) in enumerate(corpus)
+                ):
+                    pass
+            elapsed = time.perf_counter() - start
+            digests[mode] = [hasher.hexdigest() for hasher in hashers]
+            print(
+                "%-20s %8.3fs  %8d reads  %10.1f MiB seeked"
+                % (mode, elapsed, reader.reads, reader.seek_distance / 2**20)
+            )
+            reader.close()
+        assert digests["file after file"] == digests["ImageReadScheduler"]
+
+
+if __name__ == "__main__":
+    main()
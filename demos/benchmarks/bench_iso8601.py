@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times the conversion of the timestamps of a DFXML file from ISO 8601 text:  the regular expression conversion, the fixed-width parser, and dfxml.iso8601Tdatetime with its memoization, cold and warm.  It also times the conversion to a local Unix timestamp (dfxml.dftime.timestamp, against the regular expression and time.mktime), and setting TimestampObject.time and reading TimestampObject.timestamp, with cold caches.  It checks that every conversion gives the regular expression conversion's result.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml
+import dfxml.objects as Objects
+
+
+def _time(
+    function: typing.Callable[[str], typing.Any], texts: typing.List[str]
+) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        function(text)
+    return time.perf_counter() - start
+
+
+def _set_and_read(texts: typing.List[str]) -> None:
+    tobj = Objects.TimestampObject(name="mtime")
+    for text in texts:
+        tobj.time = text
+        tobj.timestamp
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input",
+        help="DFXML file to read timestamps from.  Default: a synthetic file.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    texts = [
+        str(tobj.time)
+        for (event, obj) in Objects.iterparse(path)
+        if isinstance(obj, Objects.FileObject)
+        for name in Objects.TimestampObject.timestamp_name_list
+        for tobj in [getattr(obj, name)]
+        if not tobj is None and not tobj.time is None
+    ]
+    print("%d timestamps, %d distinct" % (len(texts), len(set(texts))))
+
+    for text in set(texts):
+        expected = dfxml._iso8601Tdatetime_regex(text)
+        converted = dfxml.iso8601Tdatetime(text)
+        assert (converted, converted.utcoffset()) == (expected, expected.utcoffset())
+        assert dfxml.dftime(text).timestamp() == time.mktime(expected.timetuple())
+
+    # (name, baseline name, function) triples.
+    modes: typing.List[typing.Tuple[str, str, typing.Callable[[], float]]] = [
+        ("regex", "regex", lambda: _time(dfxml._iso8601Tdatetime_regex, texts)),
+        ("fixed-width", "regex", lambda: _time(dfxml._iso8601Tdatetime_fixed, texts)),
+        (
+            "memoized, cold",
+            "regex",
+            lambda: dfxml._iso8601Tdatetime_cached.cache_clear()
+            or _time(dfxml.iso8601Tdatetime, texts),
+        ),
+        ("memoized, warm", "regex", lambda: _time(dfxml.iso8601Tdatetime, texts)),
+        (
+            "regex + mktime",
+            "regex + mktime",
+            lambda: _time(
+                lambda text: time.mktime(
+                    dfxml._iso8601Tdatetime_regex(text).timetuple()
+                ),
+                texts,
+            ),
+        ),
+        (
+            "dftime.timestamp",
+            "regex + mktime",
+            lambda: dfxml._iso8601_local_timestamp.cache_clear()
+            or dfxml._iso8601Tdatetime_cached.cache_clear()
+            or _time(lambda text: dfxml.dftime(text).timestamp(), texts),
+        ),
+        (
+            "TimestampObject",
+            "regex + mktime",
+            lambda: dfxml._iso8601_local_timestamp.cache_clear()
+            or dfxml._iso8601Tdatetime_cached.cache_clear()
+            or _time(lambda _: _set_and_read(texts), [""]),
+        ),
+    ]
+    # Alternating the modes evens out drift in the machine's speed.
+    times: typing.Dict[str, float] = dict()
+    for _ in range(args.repeat):
+        for name, _, run in modes:
+            elapsed = run()
+            times[name] = min(times.get(name, elapsed), elapsed)
+    for name, baseline, _ in modes:
+        print(
+            "%-16s %8.3fs  %8.3fus/timestamp  (%.1fx as fast as %s)"
+            % (
+                name,
+                times[name],
+                1e6 * times[name] / len(texts),
+                times[baseline] / times[name],
+                baseline,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
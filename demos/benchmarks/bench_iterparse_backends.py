@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script reports the objects-per-second rate of Objects.iterparse with each XML parser backend.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument(
+        "--input", help="DFXML file to parse.  Default: a synthetic file."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+
+    for backend in ("etree", "lxml"):
+        resolved = Objects.get_parser_backend(backend).name
+        if resolved != backend:
+            print("%-6s  (unavailable)" % backend)
+            continue
+        best = None
+        tally = 0
+        for _ in range(args.repeat):
+            tally = 0
+            start = time.perf_counter()
+            for event, obj in Objects.iterparse(path, backend=backend):
+                tally += 1
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        assert best is not None
+        print(
+            "%-6s  %8d objects  %8.3fs  %10.0f objects/s"
+            % (backend, tally, best, tally / best)
+        )
+
+
+if __name__ == "__main__":
+    main()
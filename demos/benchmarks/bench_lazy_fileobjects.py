@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script compares eager and lazy FileObject materialization in Objects.iterparse, for a consumer that only reads allocation status and file names (like demos/allocation_counter.py), and for one that reads every property.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def read_few(fobj: Objects.FileObject) -> None:
+    fobj.alloc
+    fobj.filename
+
+
+def read_all(fobj: Objects.FileObject) -> None:
+    fobj.to_Element()
+
+
+def run(
+    path: str, lazy: bool, consumer: typing.Callable[[Objects.FileObject], None]
+) -> typing.Tuple[int, float]:
+    tally = 0
+    start = time.perf_counter()
+    for event, obj in Objects.iterparse(path, lazy=lazy):
+        if isinstance(obj, Objects.FileObject):
+            consumer(obj)
+            tally += 1
+    return (tally, time.perf_counter() - start)
+
+
+def peak_memory(path: str, lazy: bool, retain: bool) -> int:
+    """Returns the peak traced memory, in bytes, of parsing while reading each FileObject's allocation status and file name, and optionally retaining every FileObject."""
+    retained = []
+    tracemalloc.start()
+    for event, obj in Objects.iterparse(path, lazy=lazy):
+        if isinstance(obj, Objects.FileObject):
+            read_few(obj)
+            if retain:
+                retained.append(obj)
+    (_, peak) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument(
+        "--input", help="DFXML file to parse.  Default: a synthetic file."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+
+    for consumer_name, consumer in (("few", read_few), ("all", read_all)):
+        for lazy in (False, True):
+            best = None
+            tally = 0
+            for _ in range(args.repeat):
+                (tally, elapsed) = run(path, lazy, consumer)
+                best = elapsed if best is None else min(best, elapsed)
+            assert best is not None
+            print(
+                "read=%-3s  lazy=%-5s  %8d files  %8.3fs  %10.0f files/s"
+                % (consumer_name, lazy, tally, best, tally / best)
+            )
+
+    for retain in (False, True):
+        for lazy in (False, True):
+            peak = peak_memory(path, lazy, retain)
+            print(
+                "retain=%-5s  lazy=%-5s  peak %8.1f MiB"
+                % (retain, lazy, peak / 1048576)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script reports the scaling of Objects.iterparse with the number of worker processes.  One worker is the serial parser.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input", help="DFXML file to parse.  Default: a synthetic file."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument(
+        "--backend", default="etree", help="XML parser backend.  Default: etree."
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Let FileObjects be yielded out of document order.",
+    )
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    print("%d CPUs available." % (os.cpu_count() or 1))
+
+    baseline = None
+    for workers in args.workers:
+        best = None
+        tally = 0
+        for _ in range(args.repeat):
+            tally = 0
+            start = time.perf_counter()
+            for event, obj in Objects.iterparse(
+                path,
+                backend=args.backend,
+                workers=workers,
+                ordered=not args.unordered,
+            ):
+                if isinstance(obj, Objects.FileObject):
+                    tally += 1
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        assert best is not None
+        if baseline is None:
+            baseline = best
+        print(
+            "workers %-3d  %8d files  %8.3fs  %10.0f files/s  speedup %5.2fx"
+            % (workers, tally, best, tally / best, baseline / best)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script reports the scaling of DFXMLObject.print_dfxml with the number of serializing worker processes, in elapsed time and in CPU time of the printing process.  One worker is the serial printer.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input", help="DFXML file to parse.  Default: a synthetic file."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    print("%d CPUs available." % (os.cpu_count() or 1))
+    dobj = Objects.parse(path)
+    tally = sum(1 for obj in dobj if isinstance(obj, Objects.FileObject))
+
+    baseline = None
+    expected = None
+    for workers in args.workers:
+        best = None
+        best_cpu = None
+        for _ in range(args.repeat):
+            output_fh = io.StringIO()
+            start = time.perf_counter()
+            start_cpu = time.process_time()
+            dobj.print_dfxml(output_fh, workers=workers)
+            elapsed_cpu = time.process_time() - start_cpu
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            best_cpu = elapsed_cpu if best_cpu is None else min(best_cpu, elapsed_cpu)
+            if expected is None:
+                expected = output_fh.getvalue()
+            elif output_fh.getvalue() != expected:
+                raise ValueError("Output differs with %d workers." % workers)
+        assert not best is None and not best_cpu is None
+        if baseline is None:
+            baseline = best
+        print(
+            "workers %-3d  %8d files  %8.3fs  %10.0f files/s  speedup %5.2fx  printing process CPU %8.3fs"
+            % (workers, tally, best, tally / best, baseline / best, best_cpu)
+        )
+
+
+if __name__ == "__main__":
+    main()
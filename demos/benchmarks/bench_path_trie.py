@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script reports the memory retained by FileObjects' filenames, stored as strings and interned in an Objects.PathTrie, for the filenames of a DFXML file and for deeper, Windows-like paths, and the memory retained per FileObject by Objects.parse with and without a PathTrie.  It also times reading interned filenames back as strs.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def _retained(build: typing.Callable[[], typing.Any]) -> typing.Tuple[int, typing.Any]:
+    """Returns the bytes retained by the value build returns, and the value."""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    (retained, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (retained, value)
+
+
+def _deep_windows_paths(count: int) -> typing.List[str]:
+    """Returns count paths shaped like those of a Windows system volume's component store and user profiles, many directories deep."""
+    rng = random.Random(19)
+    roots = [
+        "Windows/WinSxS/amd64_microsoft-windows-%s_31bf3856ad364e35_10.0.19041.%d_none_%016x"
+        % (component, build, rng.getrandbits(64))
+        for component in [
+            "servicingstack",
+            "shell32",
+            "ie-htmlrendering",
+            "wmi-core",
+        ]
+        for build in range(1, 200, 7)
+    ] + [
+        "Users/Administrator/AppData/Local/Packages/Microsoft.Windows.%s_cw5n1h2txyewy/LocalState/%s/%d"
+        % (package, state, number)
+        for package in [
+            "ContentDeliveryManager",
+            "Search",
+            "Photos",
+            "StartMenuExperienceHost",
+        ]
+        for state in [
+            "TargetedContentCache/v3",
+            "DeviceSearchCache",
+            "Indexed/Files",
+        ]
+        for number in range(20)
+    ]
+    return [
+        "%s/%s/file%07d.%s"
+        % (
+            rng.choice(roots),
+            rng.choice(["f", "r", "n", "Assets/Images", "Cache/Data"]),
+            i,
+            rng.choice(["dll", "mui", "png", "dat"]),
+        )
+        for i in range(count)
+    ]
+
+
+def _filename_bytes(
+    texts: typing.List[str], intern: bool
+) -> typing.Tuple[int, typing.Optional[Objects.PathTrie]]:
+    """Returns the bytes retained by assigning texts as the filenames of FileObjects, as copied strings or interned in a new PathTrie, and the PathTrie."""
+    fobjs = [Objects.FileObject() for _ in texts]
+    gc.collect()
+    tracemalloc.start()
+    trie = None
+    if intern:
+        trie = Objects.PathTrie()
+        for fobj, text in zip(fobjs, texts):
+            fobj.filename = trie.intern(text)
+    else:
+        for fobj, text in zip(fobjs, texts):
+            fobj.filename = text.encode().decode()
+    gc.collect()
+    (retained, _) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert [fobj.filename for fobj in fobjs] == texts
+    return (retained, trie)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument(
+        "--input", help="DFXML file to parse.  Default: a synthetic file."
+    )
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    file_texts = [
+        obj.filename
+        for (event, obj) in Objects.iterparse(path, fields=["filename"])
+        if isinstance(obj, Objects.FileObject) and not obj.filename is None
+    ]
+    for name, texts in [
+        ("DFXML file", file_texts),
+        ("deep Windows paths", _deep_windows_paths(len(file_texts))),
+    ]:
+        (str_bytes, _) = _filename_bytes(texts, False)
+        (trie_bytes, trie) = _filename_bytes(texts, True)
+        assert not trie is None
+        print(
+            "%s:  %d filenames, %.1f characters on average, %d directories"
+            % (name, len(texts), sum(map(len, texts)) / len(texts), len(trie))
+        )
+        print("  str       %8.1f bytes/filename" % (str_bytes / len(texts)))
+        print(
+            "  PathTrie  %8.1f bytes/filename  (%.2fx the memory of str)"
+            % (trie_bytes / len(texts), trie_bytes / str_bytes)
+        )
+
+        fobjs = [Objects.FileObject(filename=trie.intern(text)) for text in texts]
+        start = time.perf_counter()
+        for fobj in fobjs:
+            fobj.filename
+        print(
+            "  reading FileObject.filename  %.3fus/filename"
+            % (1e6 * (time.perf_counter() - start) / len(fobjs))
+        )
+        del fobjs
+
+    # Warm caches (e.g. imports and interned values) outside of the measurements.
+    Objects.parse(path)
+    for name, make_trie in [
+        ("parse", lambda: None),
+        ("parse, PathTrie", Objects.PathTrie),
+    ]:
+        (retained, dobj) = _retained(lambda: Objects.parse(path, path_trie=make_trie()))
+        tally = sum(1 for obj in dobj if isinstance(obj, Objects.FileObject))
+        print("%-16s %8.0f bytes/FileObject" % (name, retained / tally))
+        del dobj
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times ByteRuns.iter_contents over a corpus of fragmented files in a raw image, reading the image in-process with Objects.RawImageReader and with one img_cat subprocess per byte run.  It reads with hash_sectors.py's 512-byte buffers and with the default 1 MiB buffers.  If The SleuthKit's img_cat is not installed, a stand-in script running dd with the same arguments is used, so the subprocess costs are comparable.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import dfxml.objects as Objects
+
+_IMG_CAT_STAND_IN = """#!/bin/sh
+# img_cat [-b sector_size] [-s start_sector] [-e end_sector] image
+while getopts b:s:e: option; do
+  case $option in
+    b) b=$OPTARG ;;
+    s) s=$OPTARG ;;
+    e) e=$OPTARG ;;
+  esac
+done
+shift $((OPTIND - 1))
+exec dd if="$1" bs="$b" skip="$s" count=$((e - s + 1)) status=none
+"""
+
+
+def _fragmented_files(
+    image_size: int, files: int, fragments: int, cluster_size: int
+) -> typing.List[Objects.ByteRuns]:
+    """Returns the data byte runs of files files of fragments runs each, of 1 to 8 clusters at random cluster offsets."""
+    rng = random.Random(21)
+    clusters = image_size // cluster_size
+    corpus = []
+    for _ in range(files):
+        brs = Objects.ByteRuns()
+        for _ in range(fragments):
+            length = rng.randint(1, 8)
+            brs.append(
+                Objects.ByteRun(
+                    img_offset=rng.randrange(clusters - length) * cluster_size,
+                    len=length * cluster_size,
+                )
+            )
+        corpus.append(brs)
+    return corpus
+
+
+def _read(
+    corpus: typing.List[Objects.ByteRuns],
+    image_path: str,
+    buffer_size: int,
+    use_img_cat: bool,
+) -> int:
+    """Reads the contents of the corpus.  Returns the number of bytes read."""
+    tally = 0
+    for brs in corpus:
+        for chunk in brs.iter_contents(
+            image_path, buffer_size=buffer_size, use_img_cat=use_img_cat
+        ):
+            tally += len(chunk)
+    return tally
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--fragments", type=int, default=16)
+    parser.add_argument("--image-size", type=int, default=256 * 1024 * 1024)
+    parser.add_argument("--cluster-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        image_path = os.path.join(tmpdir, "image.raw")
+        with open(image_path, "wb") as fh:
+            for _ in range(args.image_size // (1024 * 1024)):
+                fh.write(os.urandom(1024 * 1024))
+
+        img_cat_name = "img_cat"
+        if shutil.which("img_cat") is None:
+            img_cat_name = "img_cat (dd stand-in)"
+            stand_in = os.path.join(tmpdir, "img_cat")
+            with open(stand_in, "w") as fh:
+                fh.write(_IMG_CAT_STAND_IN)
+            os.chmod(stand_in, 0o755)
+            os.environ["PATH"] = tmpdir + os.pathsep + os.environ["PATH"]
+
+        corpus = _fragmented_files(
+            args.image_size, args.files, args.fragments, args.cluster_size
+        )
+        print(
+            "%d files, %d byte runs each, in a %d MiB raw image"
+            % (args.files, args.fragments, args.image_size // (1024 * 1024))
+        )
+        for buffer_size in [512, 1048576]:
+            times: typing.Dict[bool, float] = dict()
+            for use_img_cat in [True, False]:
+                start = time.perf_counter()
+                tally = _read(corpus, image_path, buffer_size, use_img_cat)
+                times[use_img_cat] = time.perf_counter() - start
+            print("buffer_size=%d" % buffer_size)
+            print(
+                "  %-22s %8.3fs  %8.1f MiB/s"
+                % (img_cat_name, times[True], tally / times[True] / 2**20)
+            )
+            print(
+                "  %-22s %8.3fs  %8.1f MiB/s  (%.1fx as fast)"
+                % (
+                    "RawImageReader",
+                    times[False],
+                    tally / times[False] / 2**20,
+                    times[True] / times[False],
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
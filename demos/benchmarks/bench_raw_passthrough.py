@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+"""
+This script times a filter-and-rewrite pass over a DFXML file (parse, select FileObjects, write them out with a DFXMLStreamWriter), with and without Objects.iterparse's keep_raw, which copies unmodified FileObjects' source text instead of serializing them.  It reports records per second.
+"""
+
+__version__ = "0.1.0"
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+from synthetic_dfxml import synthetic_dfxml_path
+
+import dfxml.objects as Objects
+
+
+def _rewrite(path: str, out_path: str, keep_raw: bool) -> int:
+    """Writes the allocated FileObjects of path to out_path.  Returns the number of FileObjects read."""
+    tally = 0
+    with Objects.DFXMLStreamWriter(out_path) as writer:
+        for event, obj in Objects.iterparse(path, keep_raw=keep_raw):
+            if isinstance(obj, Objects.DFXMLObject):
+                for prefix, url in obj.iter_namespaces():
+                    writer.dfxmlobject.add_namespace(prefix, url)
+            elif isinstance(obj, Objects.FileObject):
+                tally += 1
+                if obj.is_allocated():
+                    writer.write(obj)
+    return tally
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument(
+        "--input",
+        help="DFXML file to read FileObjects from.  Default: a synthetic file.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.input or synthetic_dfxml_path(args.files)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        out_path = os.path.join(tmpdir, "out.xml")
+        # Alternating the modes evens out drift in the machine's speed.
+        times: typing.Dict[bool, float] = dict()
+        for _ in range(args.repeat):
+            for keep_raw in [False, True]:
+                start = time.perf_counter()
+                tally = _rewrite(path, out_path, keep_raw)
+                elapsed = time.perf_counter() - start
+                times[keep_raw] = min(times.get(keep_raw, elapsed), elapsed)
+
+    print("%d FileObjects" % tally)
+    print(
+        "%-12s %8.3fs  %10.0f records/s"
+        % ("serialized", times[False], tally / times[False])
+    )
+    print(
+        "%-12s %8.3fs  %10.0f records/s  (%.2fx as fast)"
+        % (
+            "keep_raw",
+            times[True],
+            tally / times[True],
+            times[False] / times[True],
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
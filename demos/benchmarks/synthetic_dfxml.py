@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This script writes a synthetic, Fiwalk-shaped DFXML file, for the benchmark scripts in this directory.  Files have deep Windows-style paths, four timestamps, one or more data byte runs, and MD5 and SHA-1 hashes.
+"""
+
+__version__ = "0.1.0"
+
+import os
+import sys
+import tempfile
+import typing
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+import dfxml
+
+_HEADER = """<?xml version='1.0' encoding='UTF-8'?>
+<dfxml xmlns='%s' xmlns:dc='%s' version='%s'>
+  <metadata>
+    <dc:type>Disk Image</dc:type>
+  </metadata>
+  <creator>
+    <program>synthetic_dfxml.py</program>
+    <version>%s</version>
+  </creator>
+  <source>
+    <image_filename>synthetic.raw</image_filename>
+  </source>
+  <volume offset='32256'>
+    <partition_offset>32256</partition_offset>
+    <sector_size>512</sector_size>
+    <block_size>4096</block_size>
+    <ftype_str>ntfs</ftype_str>
+"""
+
+_FOOTER = """  </volume>
+</dfxml>
+"""
+
+_DIRECTORIES = [
+    "Windows/System32",
+    "Windows/System32/drivers/etc",
+    "Windows/WinSxS/amd64_microsoft-windows-servicingstack_31bf3856ad364e35_10.0.19041.1",
+    "Program Files/Common Files/Microsoft Shared/ClickToRun",
+    "Users/Administrator/AppData/Local/Microsoft/Windows/INetCache/IE",
+    "Users/Administrator/Documents",
+]
+
+
+def fileobject_xml(i: int) -> str:
+    """Returns the XML of the i'th synthetic file object."""
+    directory = _DIRECTORIES[i % len(_DIRECTORIES)]
+    filesize = (i * 7919) % 1048576
+    name_type = "d" if i % 10 == 0 else "r"
+    allocated = 0 if i % 17 == 0 else 1
+    parts = [
+        "    <fileobject>\n",
+        "      <filename>%s/file%07d.dll</filename>\n" % (directory, i),
+        "      <partition>1</partition>\n",
+        "      <id>%d</id>\n" % (i + 1),
+        "      <name_type>%s</name_type>\n" % name_type,
+        "      <filesize>%d</filesize>\n" % filesize,
+        "      <alloc>%d</alloc>\n" % allocated,
+        "      <used>1</used>\n",
+        "      <inode>%d</inode>\n" % (i + 64),
+        "      <meta_type>%d</meta_type>\n" % (2 if name_type == "d" else 1),
+        "      <mode>511</mode>\n",
+        "      <nlink>1</nlink>\n",
+        "      <uid>0</uid>\n",
+        "      <gid>0</gid>\n",
+        "      <mtime>2012-%02d-%02dT%02d:%02d:%02dZ</mtime>\n"
+        % (1 + i % 12, 1 + i % 28, i % 24, i % 60, (i * 7) % 60),
+        "      <ctime>2012-02-22T03:53:05Z</ctime>\n",
+        "      <atime>2012-02-23T16:%02d:27Z</atime>\n" % (i % 60),
+        "      <crtime>2011-11-02T08:15:00Z</crtime>\n",
+        "      <byte_runs>\n",
+    ]
+    file_offset = 0
+    runs = 1 + i % 3
+    for run_index in range(runs):
+        run_len = filesize // runs
+        if run_index == runs - 1:
+            run_len = filesize - file_offset
+        fs_offset = ((i * 13 + run_index * 104729) % 10000000) * 4096
+        parts.append(
+            "        <byte_run file_offset='%d' fs_offset='%d' img_offset='%d' len='%d'/>\n"
+            % (file_offset, fs_offset, fs_offset + 32256, run_len)
+        )
+        file_offset += run_len
+    parts += [
+        "      </byte_runs>\n",
+        "      <hashdigest type='md5'>%032x</hashdigest>\n" % (i * 2654435761),
+        "      <hashdigest type='sha1'>%040x</hashdigest>\n" % (i * 40503),
+        "    </fileobject>\n",
+    ]
+    return "".join(parts)
+
+
+def write_synthetic_dfxml(output_fh: typing.IO[str], file_count: int) -> None:
+    output_fh.write(
+        _HEADER % (dfxml.XMLNS_DFXML, dfxml.XMLNS_DC, dfxml.DFXML_VERSION, __version__)
+    )
+    for i in range(file_count):
+        output_fh.write(fileobject_xml(i))
+    output_fh.write(_FOOTER)
+
+
+def synthetic_dfxml_path(file_count: int) -> str:
+    """Returns the path to a synthetic DFXML file with file_count files, creating it in the temporary directory if it does not already exist."""
+    path = os.path.join(
+        tempfile.gettempdir(), "synthetic_dfxml_%s_%d.xml" % (__version__, file_count)
+    )
+    if not os.path.exists(path):
+        with open(path + ".tmp", "w") as output_fh:
+            write_synthetic_dfxml(output_fh, file_count)
+        os.rename(path + ".tmp", path)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("file_count", type=int)
+    parser.add_argument("out_dfxml")
+    args = parser.parse_args()
+
+    with open(args.out_dfxml, "w") as output_fh:
+        write_synthetic_dfxml(output_fh, args.file_count)
@@ -46,11 +46,17 @@ where encoding, if present, is 0 for raw, 1 for NTFS compressed.
 __version__ = "1.0.2"
 
 import base64
+import bisect
+import collections
 import datetime
+import functools
 import hashlib
+import io
 import os
 import re
 import sys
+import threading
+import time
 from subprocess import PIPE, Popen
 from sys import stderr
 
@@ -105,6 +111,10 @@ class GMTMIN(tzinfo):
     def __init__(self, minoffset):  # DST starts last Sunday in March
         self.minoffset = minoffset
 
+    def __getinitargs__(self):
+        # Lets tzinfo.__reduce__ pickle instances, e.g. for FileObjects returned from parallel parsing workers.
+        return (self.minoffset,)
+
     def utcoffset(self, dt):
         return timedelta(minutes=self.minoffset)
 
@@ -127,7 +137,7 @@ rx_iso8601 = re.compile(
 )
 
 
-def iso8601Tdatetime(s):
+def _iso8601Tdatetime_regex(s):
     """SLG's conversion of ISO8601 to datetime"""
     m = rx_iso8601.search(s)
     if not m:
@@ -183,6 +193,70 @@ def iso8601Tdatetime(s):
         )
 
 
+# Number of distinct strings whose conversions are memoized by iso8601Tdatetime and dftime.timestamp.
+ISO8601_CACHE_SIZE = 65536
+
+
+# The fraction and time zone following "YYYY-MM-DDTHH:MM:SS" in rx_iso8601, to the end of the string.
+rx_iso8601_tail = re.compile(r"(\.\d+)?(Z|[-+]\d\d:?\d\d)?")
+
+
+def _iso8601Tdatetime_fixed(s):
+    """Converts the common fixed-width forms of ISO8601, "YYYY-MM-DDTHH:MM:SS", optionally followed by a fraction of a second and "Z" or a numeric offset, returning the datetime _iso8601Tdatetime_regex returns.  Returns None for other strings, which _iso8601Tdatetime_regex handles."""
+    n = len(s)
+    # Hour 24 is rejected by the datetime constructor, but accepted by some versions of fromisoformat.
+    if (
+        n < 19
+        or s[4] != "-"
+        or s[7] != "-"
+        or (s[10] != "T" and s[10] != " ")
+        or s[13] != ":"
+        or s[16] != ":"
+        or s[11:13] == "24"
+        or not s.isascii()
+    ):
+        return None
+    try:
+        dt = datetime.datetime.fromisoformat(s[:19])
+    except ValueError:
+        return None
+    if n == 19 or (n == 20 and s[19] == "Z"):
+        return dt
+    m = rx_iso8601_tail.fullmatch(s, 19)
+    if m is None:
+        return None
+    (fraction, zone) = m.groups()
+    microseconds = int(float(fraction) * 1000000) if fraction else 0
+    minoffset = None
+    if zone and zone != "Z":
+        minoffset = int(zone[0:3]) * 60 + int(zone[-2:])
+    # As in _iso8601Tdatetime_regex, "Z" and zero offsets produce datetimes without a time zone.
+    if minoffset:
+        return dt.replace(microsecond=microseconds, tzinfo=GMTMIN(minoffset))
+    if microseconds:
+        return dt.replace(microsecond=microseconds)
+    return dt
+
+
+@functools.lru_cache(maxsize=ISO8601_CACHE_SIZE)
+def _iso8601Tdatetime_cached(s):
+    dt = _iso8601Tdatetime_fixed(s)
+    if dt is None:
+        dt = _iso8601Tdatetime_regex(s)
+    return dt
+
+
+def iso8601Tdatetime(s):
+    """SLG's conversion of ISO8601 to datetime.  Common fixed-width forms are parsed without the regular expression, and results are memoized (see ISO8601_CACHE_SIZE); both give the datetime the regular expression conversion gives."""
+    return _iso8601Tdatetime_cached(s)
+
+
+@functools.lru_cache(maxsize=ISO8601_CACHE_SIZE)
+def _iso8601_local_timestamp(s, tzname):
+    """Returns time.mktime of the datetime of the ISO8601 string s.  tzname is time.tzname, so memoized results are not reused after the local time zone changes (see time.tzset)."""
+    return time.mktime(iso8601Tdatetime(s).timetuple())
+
+
 # This format is as specified in RFC 822, section 5.1, and matches the adjustments in RFC 1123, section 5.2.14.  It appears in email and HTTP headers.
 rx_rfc822datetime = re.compile(
     r"(?P<day>\d{1,2}) (?P<month>Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) (?P<year>\d{4}) (?P<hours>\d\d):(?P<minutes>\d\d):(?P<seconds>\d\d) (?P<timezone>Z|[-+]\d\d:?\d\d)"
@@ -362,6 +436,8 @@ class ComparableMixin(object):
     http://stackoverflow.com/questions/6907323/comparable-classes-in-python-3/6913420#6913420
     """
 
+    __slots__ = ()
+
     def _compare(self, other, method):
         try:
             return method(self._cmpkey(), other._cmpkey())
@@ -393,6 +469,9 @@ class dftime(ComparableMixin):
     """Represents a DFXML time. Automatically converts between representations and caches the
     results as necessary.."""
 
+    # Each FileObject carries several of these, so instances are kept compact.  Unset slots raise AttributeError, which the representation caches below rely on.
+    __slots__ = ("datetime_", "iso8601_", "timestamp_")
+
     UTC = GMTMIN(0)
 
     def ts2datetime(self, ts):
@@ -482,8 +561,6 @@ class dftime(ComparableMixin):
             return self.iso8601_
 
     def timestamp(self):
-        import time
-
         # Do we have a cached representation?
         try:
             return self.timestamp_
@@ -492,12 +569,22 @@ class dftime(ComparableMixin):
 
         # Do we have a datetime_ object?
         try:
-            self.timestamp_ = time.mktime(self.datetime_.timetuple())
-            return self.timestamp_
+            dt = self.datetime_
         except AttributeError:
-            self.datetime_ = iso8601Tdatetime(self.iso8601_)
-            self.timestamp_ = time.mktime(self.datetime_.timetuple())
+            # The datetime is not kept; datetime() derives it when requested.
+            self.timestamp_ = _iso8601_local_timestamp(self.iso8601_, time.tzname)
             return self.timestamp_
+        self.timestamp_ = time.mktime(dt.timetuple())
+        return self.timestamp_
+
+    def validate(self):
+        """Raises ValueError if the time is ISO8601 text that cannot be converted.  Conversion is otherwise deferred until a representation is requested."""
+        try:
+            text = self.iso8601_
+        except AttributeError:
+            return
+        if not text is None:
+            iso8601Tdatetime(text)
 
     def datetime(self):
         import datetime
@@ -512,6 +599,294 @@ class dftime(ComparableMixin):
             return self.datetime_
 
 
+# The null value of dftimes_to_epoch_ns's nanoseconds.  Equal to objects.FileObjectTable.NULL_INT.
+EPOCH_NS_NULL = -(2**63)
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+# Rows of strings converted together by _iso8601_epoch_ns_numpy, to bound the memory of its intermediate arrays.
+_EPOCH_NS_CHUNK_SIZE = 65536
+
+# Seconds since the epoch whose nanoseconds, plus any fraction, fit in int64 without reaching EPOCH_NS_NULL.
+_EPOCH_NS_MIN_SECONDS = -9223372036
+_EPOCH_NS_MAX_SECONDS = 9223372035
+
+
+def _datetime_epoch_ns(dt):
+    """Returns the nanoseconds since the Unix epoch of a datetime, treating datetimes without a time zone as UTC."""
+    seconds = (
+        (dt.toordinal() - _EPOCH_ORDINAL) * 86400
+        + dt.hour * 3600
+        + dt.minute * 60
+        + dt.second
+    )
+    ns = seconds * 1000000000 + dt.microsecond * 1000
+    offset = dt.utcoffset()
+    if offset:
+        ns -= (offset // datetime.timedelta(microseconds=1)) * 1000
+    return ns
+
+
+def _decimal_epoch_ns(text):
+    """Returns (nanoseconds, precision) of a decimal number of seconds since the Unix epoch.  Digits below a nanosecond are truncated toward negative infinity."""
+    import decimal
+
+    # Accepts what float() accepts, as dftime does.
+    float(text)
+    d = decimal.Decimal(text.strip())
+    if not d.is_finite():
+        raise ValueError("Cannot convert %r to nanoseconds since the epoch." % text)
+    ns = int(d.scaleb(9).to_integral_value(rounding=decimal.ROUND_FLOOR))
+    precision = 10 ** min(18, max(0, 9 + d.as_tuple().exponent))
+    return (ns, precision)
+
+
+def _dftime_epoch_ns(value):
+    """Returns (nanoseconds, precision) of a value dftime accepts.  See dftimes_to_epoch_ns."""
+    if value is None:
+        return (EPOCH_NS_NULL, 0)
+    if isinstance(value, dftime):
+        # The representation the dftime was created with.
+        for name in ("iso8601_", "datetime_", "timestamp_"):
+            try:
+                value = getattr(value, name)
+                break
+            except AttributeError:
+                pass
+        if value is None:
+            return (EPOCH_NS_NULL, 0)
+    if isinstance(value, str):
+        # The forms are distinguished as in dftime.__init__.
+        if len(value) > 5 and value[4] == "-":
+            m = rx_iso8601.search(value)
+            if not m:
+                raise ValueError("Cannot parse: " + value)
+            # Validates the fields as the datetime constructor does.
+            dt = datetime.datetime(
+                int(m.group(1)),
+                int(m.group(2)),
+                int(m.group(3)),
+                int(m.group(4)),
+                int(m.group(5)),
+                int(m.group(6)),
+            )
+            ns = _datetime_epoch_ns(dt)
+            zone = m.group(8)
+            if zone and zone != "Z":
+                minutes = int(zone[1:3]) * 60 + int(zone[-2:])
+                if zone[0] == "-":
+                    minutes = -minutes
+                ns -= minutes * 60000000000
+            fraction = m.group(7)
+            if fraction:
+                digits = fraction[1:10]
+                ns += int(digits.ljust(9, "0"))
+                precision = 10 ** (9 - len(digits))
+            else:
+                precision = 1000000000
+        elif len(value) > 15 and ":" in value[13:15]:
+            ns = _datetime_epoch_ns(rfc822Tdatetime(value))
+            precision = 1000000000
+        else:
+            (ns, precision) = _decimal_epoch_ns(value)
+    elif type(value) == int:
+        (ns, precision) = (value * 1000000000, 1000000000)
+    elif type(value) == float:
+        (ns, precision) = _decimal_epoch_ns(repr(value))
+    elif isinstance(value, datetime.datetime):
+        (ns, precision) = (_datetime_epoch_ns(value), 1000)
+    else:
+        raise ValueError("Unknown type '%s' for DFXML time value" % (str(type(value))))
+    if ns <= EPOCH_NS_NULL or ns >= 2**63:
+        raise ValueError(
+            "%r is outside the range of int64 nanoseconds since the epoch." % (value,)
+        )
+    return (ns, precision)
+
+
+def _iso8601_epoch_ns_numpy(np, texts):
+    """
+    Converts a NumPy unicode array of the fixed-width ISO8601 forms _iso8601Tdatetime_fixed handles, returning (nanoseconds, precision, converted) arrays.  Rows of other forms, or with out-of-range fields, are not converted (converted is False), and are left to _dftime_epoch_ns.
+    """
+    n = len(texts)
+    width = texts.dtype.itemsize // 4
+    ns = np.full(n, EPOCH_NS_NULL, dtype=np.int64)
+    precision = np.zeros(n, dtype=np.int64)
+    if width < 19:
+        return (ns, precision, np.zeros(n, dtype=bool))
+    # Padding keeps the fraction and time zone lookups below within the rows.
+    codes = np.zeros((n, width + 16), dtype=np.uint32)
+    codes[:, :width] = texts.view(np.uint32).reshape(n, width)
+    lengths = np.char.str_len(texts)
+    is_digit = (codes >= 48) & (codes <= 57)
+
+    def _digits(start, stop):
+        value = np.zeros(n, dtype=np.int64)
+        for k in range(start, stop):
+            value = value * 10 + codes[:, k] - 48
+        return value
+
+    ok = (
+        (lengths >= 19)
+        & (codes[:, 4] == 45)
+        & (codes[:, 7] == 45)
+        & ((codes[:, 10] == 84) | (codes[:, 10] == 32))
+        & (codes[:, 13] == 58)
+        & (codes[:, 16] == 58)
+        & is_digit[:, [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]].all(axis=1)
+    )
+    year = _digits(0, 4)
+    month = _digits(5, 7)
+    day = _digits(8, 10)
+    hour = _digits(11, 13)
+    minute = _digits(14, 16)
+    second = _digits(17, 19)
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    month_days = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[
+        np.clip(month, 0, 12)
+    ] + ((month == 2) & leap)
+    ok &= (
+        (year >= 1)
+        & (month >= 1)
+        & (month <= 12)
+        & (day >= 1)
+        & (day <= month_days)
+        & (hour <= 23)
+        & (minute <= 59)
+        & (second <= 59)
+    )
+
+    # The fraction is the digits following a "." at 19.
+    has_fraction = (lengths > 19) & (codes[:, 19] == 46)
+    fraction_length = np.argmin(is_digit[:, 20:], axis=1)
+    ok &= ~has_fraction | (fraction_length > 0)
+    fraction = np.zeros(n, dtype=np.int64)
+    for k in range(9):
+        fraction = fraction * 10 + np.where(
+            has_fraction & (k < fraction_length), codes[:, 20 + k] - 48, 0
+        )
+    precision[:] = np.where(
+        has_fraction, 10 ** (9 - np.minimum(fraction_length, 9)), 1000000000
+    )
+
+    # The time zone, if any, follows, and ends the string.
+    zone_start = 19 + np.where(has_fraction, 1 + fraction_length, 0)
+    zone = np.take_along_axis(codes, zone_start[:, None] + np.arange(6), axis=1)
+    zone_digit = (zone >= 48) & (zone <= 57)
+    signed = ((zone[:, 0] == 43) | (zone[:, 0] == 45)) & zone_digit[:, 1:3].all(axis=1)
+    colon_offset = (
+        signed
+        & (zone[:, 3] == 58)
+        & zone_digit[:, 4:6].all(axis=1)
+        & (lengths == zone_start + 6)
+    )
+    compact_offset = (
+        signed & zone_digit[:, 3:5].all(axis=1) & (lengths == zone_start + 5)
+    )
+    ok &= (
+        (lengths == zone_start)
+        | ((zone[:, 0] == 90) & (lengths == zone_start + 1))
+        | colon_offset
+        | compact_offset
+    )
+    zone_values = zone.astype(np.int64) - 48
+    offset_minutes = np.where(
+        colon_offset,
+        (zone_values[:, 1] * 10 + zone_values[:, 2]) * 60
+        + zone_values[:, 4] * 10
+        + zone_values[:, 5],
+        0,
+    ) + np.where(
+        compact_offset,
+        (zone_values[:, 1] * 10 + zone_values[:, 2]) * 60
+        + zone_values[:, 3] * 10
+        + zone_values[:, 4],
+        0,
+    )
+    offset_minutes = np.where(zone[:, 0] == 45, -offset_minutes, offset_minutes)
+
+    # Days since the epoch of the proleptic Gregorian calendar date.
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    days = era * 146097 + doe - 719468
+    seconds = days * 86400 + hour * 3600 + minute * 60 + second - offset_minutes * 60
+    ok &= (seconds >= _EPOCH_NS_MIN_SECONDS) & (seconds <= _EPOCH_NS_MAX_SECONDS)
+
+    ns[ok] = seconds[ok] * 1000000000 + fraction[ok]
+    precision[~ok] = 0
+    return (ns, precision, ok)
+
+
+def dftimes_to_epoch_ns(values, *, use_numpy=None, errors="raise"):
+    """
+    Converts a sequence of DFXML times to nanoseconds since the Unix epoch, returning a pair of int64 arrays:  the nanoseconds, and the precision of each time in nanoseconds (e.g. 1000000000 for whole seconds, 1000000 for milliseconds).  Times without a time zone are treated as UTC.
+
+    The values are those dftime accepts:  ISO8601 and RFC 822 strings, strings and numbers of seconds since the epoch, datetimes, dftimes, and None.  Fractions of a second are exact to the nanosecond, and truncated below it; datetimes have microsecond precision.  Nulls are EPOCH_NS_NULL, with precision 0.  Unlike dftime, which keeps SLG's conversion of offsets with minutes west of UTC (e.g. "-03:30"), offsets are applied as the whole negated offset.
+
+    The common fixed-width ISO8601 strings are converted with NumPy array operations when NumPy is used; other values are converted one at a time.
+
+    @param use_numpy: Optional.  Whether to use NumPy, returning NumPy arrays rather than array.array objects.  Default: True if NumPy is installed.
+    @param errors: Optional.  "raise" (the default) raises ValueError for values that cannot be converted, or that are outside the range of int64 nanoseconds; "null" converts them to nulls.
+    """
+    import array
+
+    if not errors in ("raise", "null"):
+        raise ValueError("Unexpected errors value: %r." % errors)
+    values = list(values)
+    n = len(values)
+
+    np = None
+    if use_numpy is None or use_numpy:
+        try:
+            import numpy as np  # type: ignore
+        except ImportError:
+            if use_numpy:
+                raise
+
+    def _convert(value):
+        if errors == "raise":
+            return _dftime_epoch_ns(value)
+        try:
+            return _dftime_epoch_ns(value)
+        except (ValueError, OverflowError):
+            return (EPOCH_NS_NULL, 0)
+
+    if np is None:
+        pairs = [_convert(value) for value in values]
+        return (
+            array.array("q", [pair[0] for pair in pairs]),
+            array.array("q", [pair[1] for pair in pairs]),
+        )
+
+    ns = np.full(n, EPOCH_NS_NULL, dtype=np.int64)
+    precision = np.zeros(n, dtype=np.int64)
+    remaining = []
+    indices = []
+    texts = []
+    for index, value in enumerate(values):
+        if type(value) == str:
+            indices.append(index)
+            texts.append(value)
+        elif not value is None:
+            remaining.append(index)
+    for start in range(0, len(texts), _EPOCH_NS_CHUNK_SIZE):
+        chunk_indices = np.array(
+            indices[start : start + _EPOCH_NS_CHUNK_SIZE], dtype=np.int64
+        )
+        (chunk_ns, chunk_precision, converted) = _iso8601_epoch_ns_numpy(
+            np, np.array(texts[start : start + _EPOCH_NS_CHUNK_SIZE], dtype=str)
+        )
+        ns[chunk_indices[converted]] = chunk_ns[converted]
+        precision[chunk_indices[converted]] = chunk_precision[converted]
+        remaining.extend(chunk_indices[~converted].tolist())
+    for index in remaining:
+        (ns[index], precision[index]) = _convert(values[index])
+    return (ns, precision)
+
+
 class registry_object:
     def __init__(self):
         self.object_index = {}
@@ -681,6 +1056,190 @@ class registry_value_object(registry_cell_object):
         return self._hash(hashlib.md5)
 
 
+# Defaults of BlockCache's parameters.
+_BLOCK_CACHE_BLOCK_SIZE = 64 * 1024
+_BLOCK_CACHE_CAPACITY = 64 * 1024 * 1024
+_BLOCK_CACHE_MAX_READ = 256 * 1024
+
+
+class BlockCache:
+    """
+    A bounded, thread-safe, least-recently-used cache of blocks of disk images, keyed by (image path, block offset).  Blocks are block_size bytes at multiples of block_size, except for the last block of an image.  Reads are served from cached blocks; missing blocks are read from the image and cached, evicting the least recently used blocks beyond capacity bytes.
+
+    Reads longer than max_read bypass the cache, so streaming large files does not evict the blocks of small, repeated reads, e.g. of directory blocks and MFT records.
+
+    The cache does not see writes to images:  programs writing to an image call invalidate for the ranges they write.
+
+    @param block_size Optional.  The size of the cached blocks, in bytes.  Default 64KiB.
+    @param capacity Optional.  The maximum number of bytes of blocks held.  Default 64MiB.
+    @param max_read Optional.  The longest read served through the cache, in bytes.  Default 256KiB.
+    """
+
+    def __init__(
+        self,
+        block_size=_BLOCK_CACHE_BLOCK_SIZE,
+        capacity=_BLOCK_CACHE_CAPACITY,
+        max_read=_BLOCK_CACHE_MAX_READ,
+    ):
+        if block_size < 1:
+            raise ValueError("block_size must be positive.  Received: %r." % block_size)
+        if capacity < 0:
+            raise ValueError("capacity cannot be negative.  Received: %r." % capacity)
+        self.block_size = block_size
+        self.capacity = capacity
+        self.max_read = max_read
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._blocks = collections.OrderedDict()
+        self._size = 0
+        # Incremented by invalidations, so blocks read before an invalidation are not cached after it.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """The number of cached blocks."""
+        return len(self._blocks)
+
+    @property
+    def size(self):
+        """The number of bytes of cached blocks."""
+        return self._size
+
+    def read(self, path, read_at, offset, length):
+        """
+        Returns length bytes of an image at offset offset, fewer only at the end of the image.
+
+        @param path The key of the image, normally its path from os.path.realpath.
+        @param read_at Reads the image:  read_at(offset, length) returns up to length bytes at offset, fewer only at the end of the image.
+        """
+        if length <= 0:
+            return b""
+        if length > self.max_read or self.capacity == 0:
+            return bytes(read_at(offset, length))
+        block_size = self.block_size
+        first = offset - offset % block_size
+        start = offset - first
+        span = start + length
+        if span <= block_size:
+            key = (path, first)
+            with self._lock:
+                block = self._blocks.get(key)
+                if not block is None:
+                    self._blocks.move_to_end(key)
+                    self.hits += 1
+                    return block[start:span]
+        span += -span % block_size
+        return self._blocks_at(path, read_at, first, span)[start : start + length]
+
+    def _blocks_at(self, path, read_at, first, span):
+        """Returns the bytes of the blocks in span bytes at the block offset first.  If any of the blocks is not cached, all of them are read, with one read."""
+        block_size = self.block_size
+        keys = [
+            (path, block_offset)
+            for block_offset in range(first, first + span, block_size)
+        ]
+        with self._lock:
+            blocks = []
+            for key in keys:
+                block = self._blocks.get(key)
+                if block is None:
+                    break
+                blocks.append(block)
+                if len(block) < block_size:
+                    # The end of the image.
+                    keys = keys[: len(blocks)]
+                    break
+            if len(blocks) == len(keys):
+                for key in keys:
+                    self._blocks.move_to_end(key)
+                self.hits += len(keys)
+                return blocks[0] if len(blocks) == 1 else b"".join(blocks)
+            missing = sum(1 for key in keys if not key in self._blocks)
+            self.hits += len(keys) - missing
+            self.misses += missing
+            generation = self._generation
+        data = bytes(read_at(first, span))
+        with self._lock:
+            if generation == self._generation:
+                for index, key in enumerate(keys):
+                    block = data[index * block_size : (index + 1) * block_size]
+                    if len(block) == 0:
+                        break
+                    if key in self._blocks:
+                        self._blocks.move_to_end(key)
+                    else:
+                        self._blocks[key] = block
+                        self._size += len(block)
+                while self._size > self.capacity:
+                    (_, evicted) = self._blocks.popitem(last=False)
+                    self._size -= len(evicted)
+                    self.evictions += 1
+        return data
+
+    def invalidate(self, path, offset=None, length=None):
+        """Drops the cached blocks of the image path overlapping length bytes at offset offset, or all of its blocks if offset is None."""
+        with self._lock:
+            self._generation += 1
+            if offset is None:
+                keys = [key for key in self._blocks if key[0] == path]
+            else:
+                first = offset - offset % self.block_size
+                keys = [
+                    (path, block_offset)
+                    for block_offset in range(first, offset + length, self.block_size)
+                ]
+            for key in keys:
+                block = self._blocks.pop(key, None)
+                if not block is None:
+                    self._size -= len(block)
+
+    def clear(self):
+        """Drops all cached blocks.  The counters are kept."""
+        with self._lock:
+            self._generation += 1
+            self._blocks.clear()
+            self._size = 0
+
+
+_block_cache = BlockCache()
+
+
+def get_block_cache():
+    """Returns the BlockCache under the disk image reads of dfxml and dfxml.objects, or None if caching is disabled."""
+    return _block_cache
+
+
+def set_block_cache(cache):
+    """Replaces the BlockCache under the disk image reads of dfxml and dfxml.objects.  None disables caching.  Returns the previous cache."""
+    global _block_cache
+    previous = _block_cache
+    _block_cache = cache
+    return previous
+
+
+def read_image_range(imagefile, offset, length):
+    """Returns length bytes at offset offset of imagefile, a binary file object of a disk image, fewer only at the end of the image.  Reads through the shared BlockCache (see get_block_cache), keyed by the file's path.  The file's position afterward is unspecified."""
+
+    def _read_at(read_offset, read_length):
+        imagefile.seek(read_offset)
+        return imagefile.read(read_length)
+
+    cache = _block_cache
+    name = getattr(imagefile, "name", None)
+    if (
+        cache is None
+        or not isinstance(name, str)
+        or isinstance(imagefile, io.TextIOBase)
+    ):
+        return _read_at(offset, length)
+    return cache.read(_realpath(name), _read_at, offset, length)
+
+
+# Image paths are resolved once, rather than with every read.
+_realpath = functools.lru_cache(maxsize=256)(os.path.realpath)
+
+
 class fileobject:
     """The base class for file objects created either through XML DOM or EXPAT"""
 
@@ -902,8 +1461,7 @@ class fileobject:
         elif hasattr(run, "fill"):
             return chr(run.fill) * run.len
         else:
-            imagefile.seek(run.img_offset)
-            return imagefile.read(run.len)
+            return read_image_range(imagefile, run.img_offset, run.len)
 
     def contents(self, imagefile=None, icat_fallback=True):
         """Returns the contents of all the runs concatenated together. For allocated files
@@ -981,13 +1539,13 @@ class fileobject:
         if calcSHA256:
             tf.sha256 = hashlib.sha256()
         for run in self.byte_runs():
-            self.imagefile.seek(run.img_offset)
+            offset = run.img_offset
             count = run.len
             while count > 0:
                 xfer_len = min(
                     count, 1024 * 1024
                 )  # transfer up to a megabyte at a time
-                buf = self.imagefile.read(xfer_len)
+                buf = read_image_range(self.imagefile, offset, xfer_len)
                 if len(buf) == 0:
                     break
                 tf.write(buf)
@@ -997,6 +1555,7 @@ class fileobject:
                     tf.sha1.update(buf)
                 if calcSHA256:
                     tf.sha256.update(buf)
+                offset += xfer_len
                 count -= xfer_len
         tf.flush()
         return tf
@@ -1005,16 +1564,17 @@ class fileobject:
         """Saves the file."""
         with open(filename, "wb") as f:
             for run in self.byte_runs():
-                self.imagefile.seek(run.img_offset)
+                offset = run.img_offset
                 count = run.len
                 while count > 0:
                     xfer_len = min(
                         count, 1024 * 1024
                     )  # transfer up to a megabyte at a time
-                    buf = self.imagefile.read(xfer_len)
+                    buf = read_image_range(self.imagefile, offset, xfer_len)
                     if len(buf) == 0:
                         break
                     f.write(buf)
+                    offset += xfer_len
                     count -= xfer_len
 
     def frag_start_sector(self, fragment):
@@ -1571,24 +2131,120 @@ def combine_runs(runs):
     return ret
 
 
+# The number of items in each block of a _sorted_blocks.  Blocks are split at twice this size.
+_EXTENTDB_LOAD = 512
+
+
+class _sorted_blocks:
+    """A list of items sorted by key, kept in blocks of up to twice
+    _EXTENTDB_LOAD items, so that an insertion or removal moves the
+    items of one block rather than of the whole list.  Positions are
+    (block, index) pairs, valid until the next insertion or removal."""
+
+    def __init__(self):
+        self.blocks = []  # lists of items
+        self.keys = []  # lists of the keys of the items
+        self.firsts = []  # the first key of each block
+
+    def find(self, key):
+        """Returns the position of the last item with a key at or before KEY,
+        or of the first item if there is none."""
+        if not self.firsts:
+            return (0, 0)
+        b = max(bisect.bisect_right(self.firsts, key) - 1, 0)
+        i = max(bisect.bisect_right(self.keys[b], key) - 1, 0)
+        return (b, i)
+
+    def items_from(self, key):
+        """Generator.  Yields the items from the last item with a key at or
+        before KEY, in order of key."""
+        (b, i) = self.find(key)
+        while b < len(self.blocks):
+            block = self.blocks[b]
+            while i < len(block):
+                yield block[i]
+                i += 1
+            b += 1
+            i = 0
+
+    def positions_from(self, key):
+        """Generator.  As items_from, yielding (position, item) pairs."""
+        (b, i) = self.find(key)
+        while b < len(self.blocks):
+            block = self.blocks[b]
+            while i < len(block):
+                yield ((b, i), block[i])
+                i += 1
+            b += 1
+            i = 0
+
+    def insert(self, key, item):
+        """Inserts ITEM after the items with keys at or before KEY."""
+        if not self.firsts:
+            self.blocks.append([item])
+            self.keys.append([key])
+            self.firsts.append(key)
+            return
+        b = max(bisect.bisect_right(self.firsts, key) - 1, 0)
+        block = self.blocks[b]
+        keys = self.keys[b]
+        i = bisect.bisect_right(keys, key)
+        block.insert(i, item)
+        keys.insert(i, key)
+        self.firsts[b] = keys[0]
+        if len(block) > 2 * _EXTENTDB_LOAD:
+            self.blocks[b + 1 : b + 1] = [block[_EXTENTDB_LOAD:]]
+            self.keys[b + 1 : b + 1] = [keys[_EXTENTDB_LOAD:]]
+            self.firsts.insert(b + 1, keys[_EXTENTDB_LOAD])
+            del block[_EXTENTDB_LOAD:]
+            del keys[_EXTENTDB_LOAD:]
+
+    def remove(self, position):
+        """Removes the item at POSITION."""
+        (b, i) = position
+        del self.blocks[b][i]
+        del self.keys[b][i]
+        if self.blocks[b]:
+            self.firsts[b] = self.keys[b][0]
+        else:
+            del self.blocks[b]
+            del self.keys[b]
+            del self.firsts[b]
+
+    def rekey(self, position, key):
+        """Changes the key of the item at POSITION to KEY, which must not
+        move the item past its neighbors."""
+        (b, i) = position
+        self.keys[b][i] = key
+        if i == 0:
+            self.firsts[b] = key
+
+
 class extentdb:
     """A class to a database of extents and report if they collide.
-    Currently this is not an efficient implementation, but it could become
-    more efficient in the future. When it does, every program that uses
-    this implementation will get faster too!  Each extent is represented
-    as a byte_run object"""
+    Each extent is represented as a byte_run object.  Extents are kept
+    in insertion order in .db.  The byte ranges they cover are kept
+    sorted by image offset, with adjacent extents coalesced into one
+    range, so that intersection tests, additions and subtractions take
+    logarithmic time (plus the length of a block, and the number of
+    ranges involved), rather than scanning the database.  The extents
+    of a database never overlap, as add refuses intersecting extents;
+    .db is not to be changed directly."""
 
     def __init__(self, sectorsize=512):
         self.db = []  # the database of runs
-        self.sectorsize = 512
-        pass
+        self.sectorsize = sectorsize
+        # The extents, as (insertion number, extent) pairs, sorted by img_offset.
+        self._extents = _sorted_blocks()
+        # The [start, stop] byte ranges the extents cover, sorted by start.
+        self._ranges = _sorted_blocks()
 
     def report(self, f):
         """Print information about the database"""
         f.write("sectorsize: %d\n" % self.sectorsize)
         for run in sorted(self.db):
             f.write("   [@%8d ; %8d]\n" % (run.img_offset, run.len))
-        f.write("total entries in database: %d\n\n" % len(r))
+        f.write("total entries in database: %d\n\n" % len(self.db))
 
     def sectors_for_bytes(self, count):
         """Returns the number of sectors necessary to hold COUNT bytes"""
@@ -1596,7 +2252,7 @@ class extentdb:
 
     def sectors_for_run(self, run):
         """Returns an array of the sectors for a given run"""
-        start_sector = run.img_offset / self.sectorsize
+        start_sector = run.img_offset // self.sectorsize
         sector_count = self.sectors_for_bytes(run.len)
         return range(start_sector, start_sector + sector_count)
 
@@ -1606,22 +2262,38 @@ class extentdb:
             len=count * self.sectorsize, img_offset=sector_number * self.sectorsize
         )
 
+    def _ranges_from(self, offset):
+        """Generator.  Yields the covered [start, stop] ranges ending after byte
+        OFFSET, in order of image offset."""
+        for covered in self._ranges.items_from(offset):
+            if covered[1] > offset:
+                yield covered
+
     def intersects(self, extent):
-        """Returns the intersecting extent, or None if there is none"""
+        """Returns the intersecting extent, or None if there is none.
+        If several extents intersect, the first added is returned."""
         if extent.len == 0:
             return True  # 0 length intersects with everything
         if extent.len < 0:
             raise ValueError("Length cannot be negative:" + str(extent))
         start = extent.img_offset
         stop = extent.img_offset + extent.len
-        for d in self.db:
-            if d.img_offset <= start < d.img_offset + d.len:
-                return d
-            if d.img_offset < stop < d.img_offset + d.len:
-                return d
-            if start < d.img_offset and d.img_offset + d.len <= stop:
-                return d
-        return None
+        # The extents cover no byte of the extent unless the last range
+        # starting before it stops, or the next range starts, within it.
+        for covered in self._ranges.items_from(start):
+            if covered[1] > start:
+                if covered[0] >= stop:
+                    return None
+                break
+        else:
+            return None
+        first = None
+        for number, d in self._extents.items_from(start):
+            if d.img_offset >= stop:
+                break
+            if d.img_offset + d.len > start and (first is None or number < first[0]):
+                first = (number, d)
+        return first[1]
 
     def intersects_runs(self, runs):
         """Returns the intersecting extent for a set of runs, or None
@@ -1643,8 +2315,34 @@ class extentdb:
         v = self.intersects(extent)
         if v:
             raise ValueError("Cannot add " + str(extent) + ": it intersects " + str(v))
+        start = extent.img_offset
+        stop = extent.img_offset + extent.len
+        self._extents.insert(start, (len(self.db), extent))
         self.db.append(extent)
 
+        # Coalesce the extent with the ranges ending where it starts, and
+        # starting where it stops.  No range overlaps the extent.
+        before = None
+        after = None
+        for position, covered in self._ranges.positions_from(start):
+            if covered[0] < start:
+                if covered[1] == start:
+                    before = (position, covered)
+            else:
+                if covered[0] == stop:
+                    after = (position, covered)
+                break
+        if before is None and after is None:
+            self._ranges.insert(start, [start, stop])
+        elif after is None:
+            before[1][1] = stop
+        elif before is None:
+            after[1][0] = start
+            self._ranges.rekey(after[0], start)
+        else:
+            before[1][1] = after[1][1]
+            self._ranges.remove(after[0])
+
     def add_runs(self, runs):
         """Adds all of the runs to the extent database"""
         for r in runs:
@@ -1664,11 +2362,34 @@ class extentdb:
         """Adds the sectors in the list to the database."""
         self.add_runs(self.runs_for_sectors(sectors))
 
+    def runs_not_in_db(self, run):
+        """For a given run, return a list of the runs of its bytes not in the extent db"""
+        ret = []
+        start = run.img_offset
+        stop = run.img_offset + run.len
+        for covered in self._ranges_from(start):
+            if covered[0] >= stop:
+                break
+            if start < covered[0]:
+                ret.append(byte_run(img_offset=start, len=covered[0] - start))
+            start = covered[1]
+        if start < stop:
+            ret.append(byte_run(img_offset=start, len=stop - start))
+        return ret
+
     def sectors_not_in_db(self, run):
         """For a given run, return a list of sectors not in the extent db"""
-        return filter(
-            lambda x: not self.intersects_sector(x), self.sectors_for_run(run)
-        )
+        sectors = self.sectors_for_run(run)
+        ret = []
+        sector = sectors.start
+        for covered in self._ranges_from(sectors.start * self.sectorsize):
+            first_covered = covered[0] // self.sectorsize
+            if first_covered >= sectors.stop:
+                break
+            ret.extend(range(sector, first_covered))
+            sector = max(sector, (covered[1] + self.sectorsize - 1) // self.sectorsize)
+        ret.extend(range(sector, sectors.stop))
+        return ret
 
 
 def read_dfxml(
@@ -13,8 +13,9 @@
 #
 # We would appreciate acknowledgement if the software is used.
 
-__version__ = "0.6.0"
+__version__ = "0.8.0"
 
+import contextlib
 import copy
 import hashlib
 import logging
@@ -29,6 +30,35 @@ import dfxml.objects as Objects
 
 XMLNS_EXTRACTOR = "#Extractor.py"
 
+# Number of files extracted at once, each holding its output file open.  See Objects.ImageReadScheduler.
+_EXTRACTION_BATCH_SIZE = 256
+
+
+class _Extraction(object):
+    """A file being extracted:  its FileObject, its manifest entry, its output file, and the checksum and length of the contents written so far."""
+
+    def __init__(self, obj, extraction_entry, write_fh):
+        self.obj = obj
+        self.extraction_entry = extraction_entry
+        self.write_fh = write_fh
+        self.checker = None
+        if obj.sha1:
+            self.checker = hashlib.sha1()
+        self.checked_byte_tally = 0
+        # The first exception raised writing the contents.
+        self.error = None
+
+    def consume(self, chunk):
+        if not self.error is None:
+            return
+        try:
+            if self.checker:
+                self.checker.update(chunk)
+            self.checked_byte_tally += len(chunk)
+            self.write_fh.write(chunk)
+        except Exception as e:
+            self.error = e
+
 
 def is_alloc_and_uncompressed(obj):
     if obj.compressed:
@@ -77,6 +107,7 @@ def extract_files(
     keep_going=False,
 ):
     """
+    @param file_predicate Unary function, or an Objects.FileObjectFilter.  Takes a Objects.FileObject; returns True if the file should be extracted.  A FileObjectFilter is also evaluated by the DFXML parser, so non-matching files are never built.
     @param file_name Unary function.  Takes a Objects.FileObject; returns the file path to which this file will be extracted, relative to outdir.  So, if outdir="extraction" and the name_with_part_path function of this module is used, the file "/Users/Administrator/ntuser.dat" in partition 1 will be extracted to "extraction/partition_1/Users/Administrator/ntuser.dat".
     """
 
@@ -102,62 +133,100 @@ def extract_files(
     base_manifest.add_creator_library("Objects.py", Objects.__version__)
     base_manifest.add_creator_library("dfxml.py", Objects.dfxml.__version__)
 
-    # Clone base manifest to all-files' manifest and errors-only manifest
+    # Stream the all-files' manifest and errors-only manifest as files are extracted.  Both start from the base manifest.
+    exit_stack = contextlib.ExitStack()
     out_manifest = None
     if out_manifest_path:
-        out_manifest = copy.deepcopy(base_manifest)
+        out_manifest = exit_stack.enter_context(
+            Objects.DFXMLStreamWriter(out_manifest_path, copy.deepcopy(base_manifest))
+        )
     err_manifest = None
     if err_manifest_path:
-        err_manifest = copy.deepcopy(base_manifest)
-
-    for event, obj in Objects.iterparse(_path_for_iterparse):
-        # Absolute prerequisites:
-        if not isinstance(obj, Objects.FileObject):
-            continue
-
-        # Invoker prerequisites
-        if not file_predicate(obj):
-            continue
-
-        extraction_entry = Objects.FileObject()
-        extraction_entry.original_fileobject = obj
-
-        # Construct path where the file will be extracted
-        extraction_write_path = os.path.join(outdir, file_name(obj))
-
-        # Extract idempotently
-        if os.path.exists(extraction_write_path):
-            _logger.debug(
-                "Skipping already-extracted file: %r.  Extraction path already exists: %r."
-                % (obj.filename, extraction_write_path)
-            )
-            continue
+        err_manifest = exit_stack.enter_context(
+            Objects.DFXMLStreamWriter(err_manifest_path, copy.deepcopy(base_manifest))
+        )
+    error_tally = 0
 
-        extraction_entry.filename = extraction_write_path
+    _file_filter = None
+    if isinstance(file_predicate, Objects.FileObjectFilter):
+        _file_filter = file_predicate
 
-        # Set up checksum verifier
-        checker = None
-        checked_byte_tally = 0
-        if obj.sha1:
-            checker = hashlib.sha1()
+    # Files being extracted, each holding its output file open.
+    extractions = set()
 
-        extraction_byte_tally += obj.filesize
+    def _record(extraction_entry, any_error):
+        nonlocal error_tally
+        if out_manifest:
+            out_manifest.write(extraction_entry)
+        if any_error:
+            error_tally += 1
+            if err_manifest:
+                err_manifest.write(extraction_entry)
+
+    def _jobs():
+        """Generator.  Yields the ImageReadScheduler jobs of the files to extract.  Files of a dry run are recorded without reading them."""
+        nonlocal extraction_byte_tally
+        for event, obj in Objects.iterparse(
+            _path_for_iterparse, file_filter=_file_filter
+        ):
+            # Absolute prerequisites:
+            if not isinstance(obj, Objects.FileObject):
+                continue
+
+            # Invoker prerequisites
+            if not file_predicate(obj):
+                continue
+
+            extraction_entry = Objects.FileObject()
+            extraction_entry.original_fileobject = obj
+
+            # Construct path where the file will be extracted
+            extraction_write_path = os.path.join(outdir, file_name(obj))
+
+            # Extract idempotently
+            if os.path.exists(extraction_write_path):
+                _logger.debug(
+                    "Skipping already-extracted file: %r.  Extraction path already exists: %r."
+                    % (obj.filename, extraction_write_path)
+                )
+                continue
+
+            extraction_entry.filename = extraction_write_path
+
+            extraction_byte_tally += obj.filesize
+
+            if dry_run:
+                _record(extraction_entry, None)
+                continue
 
-        any_error = None
-        tsk_error = None
-        if not dry_run:
             extraction_write_dir = os.path.dirname(extraction_write_path)
             if not os.path.exists(extraction_write_dir):
                 os.makedirs(extraction_write_dir)
             _logger.debug("Extracting to: %r." % extraction_write_path)
-            with open(extraction_write_path, "wb") as extraction_write_fh:
-                try:
-                    for chunk in obj.extract_facet("content", image_path):
-                        if checker:
-                            checker.update(chunk)
-                        checked_byte_tally += len(chunk)
-                        extraction_write_fh.write(chunk)
-
+            extraction = _Extraction(
+                obj, extraction_entry, open(extraction_write_path, "wb")
+            )
+            extractions.add(extraction)
+            yield (extraction, obj.byte_runs, extraction.consume)
+
+    with exit_stack:
+        # Reads the files' contents in image order, rather than file after file.
+        scheduler = Objects.ImageReadScheduler(
+            image_path, batch_size=_EXTRACTION_BATCH_SIZE
+        )
+        try:
+            for extraction, read_error in scheduler.run(_jobs()):
+                extractions.remove(extraction)
+                extraction.write_fh.close()
+                obj = extraction.obj
+                extraction_entry = extraction.extraction_entry
+                checker = extraction.checker
+                checked_byte_tally = extraction.checked_byte_tally
+
+                any_error = None
+                tsk_error = None
+                error = read_error or extraction.error
+                if error is None:
                     if checked_byte_tally != obj.filesize:
                         any_error = True
                         extraction_entry.filesize = checked_byte_tally
@@ -173,35 +242,32 @@ def extract_files(
                         _logger.info("Recorded SHA-1 = %r" % obj.sha1)
                         _logger.info("Computed SHA-1 = %r" % checker.hexdigest())
                         # _logger.debug("File object: %r." % obj)
-                except Exception as e:
+                else:
                     any_error = True
                     tsk_error = True
-                    extraction_entry.error = "".join(traceback.format_stack())
-                    if e.args:
-                        extraction_entry.error += "\n" + str(e.args)
-        if out_manifest:
-            out_manifest.append(extraction_entry)
-        if err_manifest and any_error:
-            err_manifest.append(extraction_entry)
-        if tsk_error and not keep_going:
-            _logger.warning(
-                "Terminating extraction loop early, due to encountered error."
-            )
-            break
+                    extraction_entry.error = "".join(
+                        traceback.format_exception(
+                            type(error), error, error.__traceback__
+                        )
+                    )
+                    if error.args:
+                        extraction_entry.error += "\n" + str(error.args)
+                _record(extraction_entry, any_error)
+                if tsk_error and not keep_going:
+                    _logger.warning(
+                        "Terminating extraction loop early, due to encountered error."
+                    )
+                    break
+        finally:
+            # Files still being extracted are removed, so a later run extracts them.
+            for extraction in extractions:
+                extraction.write_fh.close()
+                os.remove(extraction.write_fh.name)
 
     # Report
     _logger.info("Estimated extraction: %d bytes." % extraction_byte_tally)
-    if not out_manifest is None:
-        with open(out_manifest_path, "w") as out_manifest_fh:
-            out_manifest.print_dfxml(out_manifest_fh)
     if not err_manifest is None:
-        tally = 0
-        for obj in err_manifest:
-            if isinstance(obj, Objects.FileObject):
-                tally += 1
-        _logger.info("Encountered errors extracting %d files." % tally)
-        with open(err_manifest_path, "w") as err_manifest_fh:
-            err_manifest.print_dfxml(err_manifest_fh)
+        _logger.info("Encountered errors extracting %d files." % error_tally)
 
 
 if __name__ == "__main__":
@@ -225,6 +291,10 @@ if __name__ == "__main__":
         action="store_true",
         help="If a SleuthKit process error is encountered in extracting any file (note: this excludes checksum mismatches), the extraction halts unless this flag is passed.",
     )
+    parser.add_argument(
+        "--filter",
+        help="Select files to extract with a filter expression, instead of extracting all allocated, uncompressed regular files.  E.g. 'name_type=r alloc=1 filename_glob=*.jpg'.  See dfxml.objects.FileObjectFilter.from_string for the syntax.",
+    )
     parser.add_argument(
         "--output-manifest",
         help="Path for recording DFXML manifest of all extracted files.",
@@ -243,11 +313,15 @@ if __name__ == "__main__":
 
     logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
 
+    file_predicate = is_file
+    if args.filter:
+        file_predicate = Objects.FileObjectFilter.from_string(args.filter)
+
     extract_files(
         args.image,
         args.output_directory,
         args.xml,
-        is_file,
+        file_predicate,
         name_with_part_path,
         args.dry_run,
         args.output_manifest,
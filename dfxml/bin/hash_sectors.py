@@ -11,19 +11,20 @@
 #
 # We would appreciate acknowledgement if the software is used.
 
-__version__ = "0.3.0"
+__version__ = "0.4.0"
 
 import hashlib
 import logging
 import os
 import sqlite3
+import typing
 
 import dfxml.objects as Objects
 
 _logger = logging.getLogger(os.path.basename(__file__))
 
 _nagged_ids = False
-_used_ids = set()
+_used_ids: typing.Set[int] = set()
 _last_id = 1
 
 
@@ -57,12 +58,59 @@ sql_schema_block_hashes = """CREATE TABLE block_hashes(
 );"""
 
 
+class _SectorHasher(object):
+    """Records the hashes of a file's sectors, handed over one sector-sized chunk at a time."""
+
+    def __init__(self, obj, cursor, pad_sectors):
+        self.obj = obj
+        self.cursor = cursor
+        self.pad_sectors = pad_sectors
+        self.file_offset = 0
+        self.found_incomplete_chunk = False
+
+    def consume(self, chunk):
+        if self.found_incomplete_chunk:
+            _logger.debug(
+                "File with unexpected mid-stream incomplete byte run: %r." % self.obj
+            )
+            raise ValueError("Found incomplete sector in middle of byte_runs list.")
+        md5obj = hashlib.md5()
+        sha1obj = hashlib.sha1()
+
+        md5obj.update(chunk)
+        sha1obj.update(chunk)
+
+        if self.pad_sectors and len(chunk) < 512:
+            self.found_incomplete_chunk = True
+            remainder = 512 - len(chunk)
+            nulls = remainder * b"0"
+            md5obj.update(nulls)
+            sha1obj.update(nulls)
+
+        # TODO No img_offset or fs_offset for now; could be done with a little byte_runs offset acrobatics, or a request to restore sector hash records in DFXML.
+        self.cursor.execute(
+            "INSERT INTO block_hashes(obj_id, img_offset, fs_offset, file_offset, len, md5, sha1) VALUES (?,?,?,?,?,?,?);",
+            (
+                self.obj.id,
+                None,
+                None,
+                self.file_offset,
+                len(chunk),
+                md5obj.hexdigest(),
+                sha1obj.hexdigest(),
+            ),
+        )
+
+        self.file_offset += len(chunk)
+
+
 def write_sector_hashes_to_db(
     raw_image, dfxml_doc, predicate, db_output_path, pad_sectors=False
 ):
     """
     Produces sector hashes of all files that fit a predicate.
-    Predicate function: Takes a FileObject as input; returns True if the FileObject should have its sectors hashed (if possible).
+    Predicate function: Takes a FileObject as input; returns True if the FileObject should have its sectors hashed (if possible).  An Objects.FileObjectFilter can be used as the predicate.
+    dfxml_doc: A DFXMLObject, or a path to a DFXML file or disk image that is then read with Objects.iterparse.  With a path and a FileObjectFilter predicate, the filter is evaluated by the DFXML parser, so non-matching files are never built.
     """
     global _used_ids
 
@@ -81,81 +129,67 @@ def write_sector_hashes_to_db(
     cursor.execute(sql_schema_block_hashes)
     conn.commit()
 
-    for obj_no, obj in enumerate(dfxml_doc):
-        if not isinstance(obj, Objects.FileObject):
-            continue
-        if not predicate(obj):
-            continue
-        brs = obj.data_brs
-        if brs is None:
-            continue
-        if obj.id is None:
-            if not _nagged_ids:
-                _logger.info(
-                    "At least one FileObject had a null .id property.  Generating IDs."
-                )
-                _nagged_ids = True
-            obj.id = _generate_id()
-        else:
-            if obj.id in _used_ids:
-                _logger.warning("ID reuse: %r." % obj.id)
-            _used_ids.add(obj.id)
-        try:
-            file_offset = 0
+    if isinstance(dfxml_doc, str):
+        file_filter = None
+        if isinstance(predicate, Objects.FileObjectFilter):
+            file_filter = predicate
+        objects = (
+            obj
+            for (event, obj) in Objects.iterparse(
+                dfxml_doc, ("end",), file_filter=file_filter
+            )
+        )
+    else:
+        objects = iter(dfxml_doc)
+
+    def _jobs():
+        """Generator.  Yields the ImageReadScheduler jobs hashing the sectors of the selected files."""
+        global _nagged_ids
+        for obj in objects:
+            if not isinstance(obj, Objects.FileObject):
+                continue
+            if not predicate(obj):
+                continue
+            brs = obj.data_brs
+            if brs is None:
+                continue
+            if obj.id is None:
+                if not _nagged_ids:
+                    _logger.info(
+                        "At least one FileObject had a null .id property.  Generating IDs."
+                    )
+                    _nagged_ids = True
+                obj.id = _generate_id()
+            else:
+                if obj.id in _used_ids:
+                    _logger.warning("ID reuse: %r." % obj.id)
+                _used_ids.add(obj.id)
             cursor.execute(
                 "INSERT INTO files(obj_id, partition, inode, filename, filesize) VALUES (?,?,?,?,?);",
                 (obj.id, obj.partition, obj.inode, obj.filename, obj.filesize),
             )
-            found_incomplete_chunk = False
-            for chunk in brs.iter_contents(raw_image, buffer_size=512):
-                if found_incomplete_chunk:
-                    _logger.debug(
-                        "File with unexpected mid-stream incomplete byte run: %r." % obj
-                    )
-                    raise ValueError(
-                        "Found incomplete sector in middle of byte_runs list."
-                    )
-                md5obj = hashlib.md5()
-                sha1obj = hashlib.sha1()
-
-                md5obj.update(chunk)
-                sha1obj.update(chunk)
-
-                if pad_sectors and len(chunk) < 512:
-                    found_incomplete_chunk = True
-                    remainder = 512 - len(chunk)
-                    nulls = remainder * b"0"
-                    md5obj.update(nulls)
-                    sha1obj.update(nulls)
-
-                # TODO No img_offset or fs_offset for now; could be done with a little byte_runs offset acrobatics, or a request to restore sector hash records in DFXML.
-                cursor.execute(
-                    "INSERT INTO block_hashes(obj_id, img_offset, fs_offset, file_offset, len, md5, sha1) VALUES (?,?,?,?,?,?,?);",
-                    (
-                        obj.id,
-                        None,
-                        None,
-                        file_offset,
-                        len(chunk),
-                        md5obj.hexdigest(),
-                        sha1obj.hexdigest(),
-                    ),
-                )
-
-                file_offset += len(chunk)
-            if not obj.filesize is None and file_offset != obj.filesize:
-                _logger.warning(
-                    "The hashed blocks' lengths do not sum to the filesize recorded: respectively, %d and %d.  File ID %r."
-                    % (file_offset, obj.filesize, obj.id)
-                )
-        except AttributeError as e:
+            hasher = _SectorHasher(obj, cursor, pad_sectors)
+            yield (hasher, brs, hasher.consume)
+
+    # Reads the files' sectors in image order, rather than file after file.
+    scheduler = Objects.ImageReadScheduler(raw_image, buffer_size=512)
+    for hashed_no, (hasher, error) in enumerate(scheduler.run(_jobs())):
+        obj = hasher.obj
+        if isinstance(error, AttributeError):
             # Some files' contents can't be accessed straightforwardly.  Note and skip.
-            _logger.error(e.args[0] + ("  File ID %r." % obj.id))
+            _logger.error(error.args[0] + ("  File ID %r." % obj.id))
             _logger.debug("The problem FileObject: %r." % obj)
+        elif not error is None:
+            raise error
+        elif not obj.filesize is None and hasher.file_offset != obj.filesize:
+            _logger.warning(
+                "The hashed blocks' lengths do not sum to the filesize recorded: respectively, %d and %d.  File ID %r."
+                % (hasher.file_offset, obj.filesize, obj.id)
+            )
 
         # Commit every thousand files
-        if obj_no % 1000 == 999:
-            _logger.debug("Committing hashes of object number %d." % obj_no)
+        if hashed_no % 1000 == 999:
+            _logger.debug("Committing hashes of object number %d." % hashed_no)
             conn.commit()
     conn.commit()
     conn.close()
@@ -193,6 +227,11 @@ def main():
         "mod": is_mod_file,
         "newormod": is_new_or_mod_file,
     }
+    if args.filter and not args.predicate is None:
+        raise ValueError(
+            "--filter selects files instead of --predicate; they cannot be used together.  Received: %r, %r."
+            % (args.filter, args.predicate)
+        )
     if args.predicate is None:
         args.predicate = "new"
     if args.predicate not in predicates:
@@ -201,13 +240,17 @@ def main():
             % (predicates.keys(), args.predicate)
         )
 
-    if args.xml:
-        d = Objects.parse(args.xml)
+    if args.filter:
+        predicate = Objects.FileObjectFilter.from_string(args.filter)
+        # Stream the DFXML, so the filter is evaluated by the parser.
+        d = args.xml or args.disk_image
     else:
-        d = Objects.parse(args.disk_image)
-    write_sector_hashes_to_db(
-        args.disk_image, d, is_allocated, args.db_output, args.pad
-    )
+        predicate = is_allocated
+        if args.xml:
+            d = Objects.parse(args.xml)
+        else:
+            d = Objects.parse(args.disk_image)
+    write_sector_hashes_to_db(args.disk_image, d, predicate, args.db_output, args.pad)
 
 
 if __name__ == "__main__":
@@ -222,6 +265,10 @@ if __name__ == "__main__":
         "--predicate",
         help="Condition for selecting files to sector hash.  One of 'new', 'allocated', 'all', 'mod'(ified), 'newormod'.  Default 'allocated'.",
     )
+    parser.add_argument(
+        "--filter",
+        help="Select files with a filter expression instead of --predicate.  E.g. 'alloc=1 annos=new,modified has_hash=sha1'.  See dfxml.objects.FileObjectFilter.from_string for the syntax.",
+    )
     parser.add_argument(
         "--pad", help="Pad non-full sectors with null bytes.", action="store_true"
     )
@@ -1,21 +1,28 @@
 #!/usr/bin/python
-"""Usage: iblkfind imagefile.iso s1 [s2 s3 ...] ...
+"""Usage: iblkfind xmlfile s1 [s2 s3 ...] ...
 
-Reports the files in which sectors s1, s2, s3... are located.
+Reports the files in which sectors s1, s2, s3... are located.  Sectors are looked up in a dfxml.objects.ByteRunIndex of the XML file, which is built beside it (xmlfile.runs) on first use.
 """
 import sys
 
-import dfxml
+import dfxml.objects as Objects
 
 if __name__ == "__main__":
     from optparse import OptionParser
 
     parser = OptionParser()
-    parser.usage = "%prog [options] imagefile-or-xmlfile s1 [s2 s3 s3 ...]"
+    parser.usage = "%prog [options] xmlfile s1 [s2 s3 s3 ...]"
     parser.add_option(
         "--offset", help="values are byte offsets, not sectors", action="store_true"
     )
-    parser.add_option("--blocksize", help="specify sector blockszie", default=512)
+    parser.add_option(
+        "--blocksize", help="specify sector blockszie", type="int", default=512
+    )
+    parser.add_option(
+        "--facet",
+        help="byte runs to search:  data (default), inode, name, or all",
+        default="data",
+    )
     (options, args) = parser.parse_args()
 
     if len(args) < 1:
@@ -31,14 +38,24 @@ if __name__ == "__main__":
     if options.offset:
         divisor = options.blocksize
 
-    sectors = set([int(s) / divisor for s in args[1:]])
+    sectors = sorted(set([int(s) // divisor for s in args[1:]]))
 
-    def process(fi):
-        for s in sectors:
-            if fi.has_sector(s):
-                print("%d\t%s" % (s, fi.filename()))
+    facets = None if options.facet == "all" else options.facet
 
     if not fn.endswith(".xml"):
         print("iblkfind requires an XML file")
         exit(1)
-    dfxml.read_dfxml(xmlfile=open(args[0], "rb"), callback=process)
+    with Objects.open_byte_run_index(fn) as index:
+        for s in sectors:
+            # A sector can hold the ends of several runs of a file.
+            reported = set()
+            for record, facet, img_offset, length, file_offset in index.sector(
+                s, options.blocksize, facets
+            ):
+                if (record, facet) in reported:
+                    continue
+                reported.add((record, facet))
+                if facet == "data":
+                    print("%d\t%s" % (s, index.filename(record)))
+                else:
+                    print("%d\t%s\t(%s)" % (s, index.filename(record), facet))
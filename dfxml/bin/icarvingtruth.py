@@ -126,8 +126,7 @@ def print_ground_truth_report(doc, out=sys.stdout):
 
 
 def sector_from_file(imagefile, sector_number, sectorsize=512):
-    imagefile.seek(sector_number * sectorsize)
-    return imagefile.read(sectorsize)
+    return dfxml.read_image_range(imagefile, sector_number * sectorsize, sectorsize)
 
 
 if __name__ == "__main__":
@@ -154,7 +153,7 @@ if __name__ == "__main__":
 
     masterfn = args[-1]
     refs = args[:-1]
-    master_imagefile = open(masterfn, "r")
+    master_imagefile = open(masterfn, "rb")
     db = dfxml.extentdb(sectorsize=512)
 
     (doc, fileobjects) = fiwalk.fileobjects_using_dom(
@@ -204,7 +203,7 @@ if __name__ == "__main__":
     for ref in refs:
         if options.debug:
             print("check residual data in ", ref)
-        ref_imagefile = open(ref, "r")
+        ref_imagefile = open(ref, "rb")
         (d2, fobj2) = fiwalk.fileobjects_using_dom(
             imagefile=ref_imagefile, flags=fiwalk.ALLOC_ONLY
         )
@@ -219,7 +218,7 @@ if __name__ == "__main__":
                         master_imagefile, n
                     )
 
-                sectors_that_match = filter(check_sector, sectors_to_check)
+                sectors_that_match = list(filter(check_sector, sectors_to_check))
                 if sectors_that_match:
                     if options.debug:
                         print(
@@ -22,6 +22,7 @@ __version__ = "2.0.0alpha2"
 import logging
 import os
 import sys
+import typing
 
 _logger = logging.getLogger(os.path.basename(__file__))
 
@@ -32,7 +33,7 @@ import dfxml.objects as Objects
 INCLUDE_DOTDIRS = False
 
 
-def ignorable_name(fn: str) -> bool:
+def ignorable_name(fn: typing.Optional[str]) -> bool:
     """Filter out recognized pseudo-file names, accommodating user request for including dotdirs."""
     if fn is None:
         return False
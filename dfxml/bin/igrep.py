@@ -2,18 +2,140 @@
 """Usage: igrep imagefile.iso string ...
 
 Reports the files in which files have the string.
+
+A raw image is searched once, in image order, and each match is mapped to the files holding it with a dfxml.objects.ByteRunIndex of the image's DFXML, so files are not read one by one.  Matches spanning two of a file's byte runs are found by searching the file's contents around the boundaries of its runs.  Other images are searched file by file, reading each file's contents.
 """
-import fiwalk
+import os
+import sys
+import tempfile
+
+import dfxml.fiwalk as fiwalk
+import dfxml.objects as Objects
+
+# Bytes of the image searched at a time.
+_SEARCH_SIZE = 1024 * 1024
+
+
+def image_matches(reader, data):
+    """Generator.  Yields the image offsets at which the bytes data occur in the image read by the RawImageReader reader."""
+    overlap = len(data) - 1
+    offset = 0
+    tail = b""
+    while offset < reader.size:
+        block = tail + bytes(reader.pread(offset, _SEARCH_SIZE))
+        block_offset = offset - len(tail)
+        position = block.find(data)
+        while position >= 0:
+            yield block_offset + position
+            position = block.find(data, position + 1)
+        offset += _SEARCH_SIZE
+        tail = block[len(block) - overlap :] if overlap else b""
+
+
+def _read_contents(brs, reader, start, stop):
+    """Returns the bytes at offsets [start, stop) of the contents of the ByteRuns brs, read with the RawImageReader reader."""
+    pieces = []
+    run_start = 0
+    for run in brs:
+        run_stop = run_start + run.len
+        piece_start = max(start, run_start)
+        piece_stop = min(stop, run_stop)
+        if piece_start < piece_stop:
+            if run.fill:
+                pieces.append(run.fill * (piece_stop - piece_start))
+            else:
+                pieces.append(
+                    bytes(
+                        reader.pread(
+                            run.img_offset + piece_start - run_start,
+                            piece_stop - piece_start,
+                        )
+                    )
+                )
+        run_start = run_stop
+        if run_start >= stop:
+            break
+    return b"".join(pieces)
+
+
+def boundary_match(brs, reader, data):
+    """Returns the offset within the contents of the ByteRuns brs of the first match spanning two of its runs, or None.  Only the bytes around the boundaries between runs are read."""
+    overlap = len(data) - 1
+    if overlap == 0:
+        return None
+    boundary = 0
+    for run in list(brs)[:-1]:
+        boundary += run.len
+        window_start = max(0, boundary - overlap)
+        window = _read_contents(brs, reader, window_start, boundary + overlap)
+        # A match within the window spans the boundary.
+        position = window.find(data)
+        if position >= 0:
+            return window_start + position
+    return None
+
+
+def file_matches(index, reader, data):
+    """Returns {record number: offset of the first match within the file's contents}, for the files of the ByteRunIndex index whose data byte runs hold a match."""
+    found = dict()
+    for match in image_matches(reader, data):
+        for record, facet, img_offset, length, file_offset in index.at(match, "data"):
+            if match + len(data) > img_offset + length:
+                # Matches spanning byte runs are found by boundary_match.
+                continue
+            offset = file_offset + match - img_offset
+            if offset < found.get(record, offset + 1):
+                found[record] = offset
+    # Records are numbered in document order.  See ByteRunIndex.
+    for record, fobj in enumerate(_file_objects(index.path)):
+        brs = fobj.data_brs
+        if brs is None or len(brs) < 2:
+            continue
+        offset = boundary_match(brs, reader, data)
+        if not offset is None and offset < found.get(record, offset + 1):
+            found[record] = offset
+    return found
+
+
+def contents_matches(xmlfn, imagefn, data):
+    """Returns a list of (filename, offset of the first match within the file's contents), in document order, reading the contents of each file of the DFXML file xmlfn from the image imagefn.  Images that are not raw are read with The SleuthKit's img_cat."""
+    found = []
+    overlap = len(data) - 1
+    for fobj in _file_objects(xmlfn):
+        brs = fobj.data_brs
+        if brs is None:
+            continue
+        offset = 0
+        tail = b""
+        for chunk in brs.iter_contents(imagefn, buffer_size=_SEARCH_SIZE):
+            block = tail + bytes(chunk)
+            position = block.find(data)
+            if position >= 0:
+                found.append((fobj.filename, offset - len(tail) + position))
+                break
+            offset += len(chunk)
+            tail = block[len(block) - overlap :] if overlap else b""
+    return found
+
+
+def _file_objects(xmlfn):
+    """Generator.  Yields the FileObjects of the DFXML file xmlfn, in document order."""
+    for event, obj in Objects.iterparse(
+        xmlfn, events=("end",), fields=["filename", "data_brs"]
+    ):
+        if isinstance(obj, Objects.FileObject):
+            yield obj
 
-import dfxml
 
 if __name__ == "__main__":
-    import sys
     from optparse import OptionParser
 
     parser = OptionParser()
     parser.usage = "%prog [options] image.iso  s1"
     parser.add_option("-d", "--debug", help="debug", action="store_true")
+    parser.add_option(
+        "-x", "--xml", help="DFXML file of the image.  Default: run fiwalk."
+    )
     (options, args) = parser.parse_args()
 
     if len(args) != 2:
@@ -22,9 +144,22 @@ if __name__ == "__main__":
 
     (imagefn, data) = args
 
-    def process(fi):
-        offset = fi.contents().find(data)
-        if offset > 0:
-            print("%s (offset=%d)" % (fi.filename(), offset))
-
-    fiwalk.fiwalk_using_sax(imagefile=open(imagefn), callback=process)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # The index of a given DFXML file is kept beside it, for later searches.
+        xmlfn = options.xml
+        if xmlfn is None:
+            xmlfn = os.path.join(tmpdir, "fiwalk.xml")
+            with open(imagefn, "rb") as imagefile, open(xmlfn, "wb") as fh:
+                fh.write(fiwalk.fiwalk_xml_stream(imagefile=imagefile).read())
+        if not Objects.RawImageReader.is_raw_image(imagefn):
+            for filename, offset in contents_matches(
+                xmlfn, imagefn, data.encode("utf-8")
+            ):
+                print("%s (offset=%d)" % (filename, offset))
+        else:
+            with Objects.open_byte_run_index(xmlfn) as index, Objects.RawImageReader(
+                imagefn
+            ) as reader:
+                found = file_matches(index, reader, data.encode("utf-8"))
+                for record in sorted(found):
+                    print("%s (offset=%d)" % (index.filename(record), found[record]))
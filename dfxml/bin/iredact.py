@@ -69,6 +69,7 @@ import os.path
 import re
 import xml.parsers.expat
 
+import dfxml
 import dfxml.fiwalk as fiwalk
 
 
@@ -220,6 +221,13 @@ class ignore_rule:
 
 
 ################################################################
+def _invalidate_cached_run(imagefile, run):
+    """Drops the blocks of a redacted run from dfxml's shared block cache, so later reads see the redaction."""
+    cache = dfxml.get_block_cache()
+    if not cache is None:
+        cache.invalidate(os.path.realpath(imagefile.name), run.img_offset, run.len)
+
+
 class redact_action:
     """Instances of this class are objects that specify how a redaction should be done."""
 
@@ -259,6 +267,7 @@ class redact_action_fill(redact_action):
             if rc.commit:
                 rc.imagefile.seek(run.img_offset)
                 rc.imagefile.write(chr(self.fillvalue) * run.len)
+                _invalidate_cached_run(rc.imagefile, run)
                 print("   >>COMMIT\n")
 
 
@@ -300,11 +309,11 @@ class redact_action_fuzz(redact_action):
                     "   Fuzzing at offset: %d, can fuzz up to %d bytes "
                     % (run.img_offset, run.len)
                 )
-                rc.imagefile.seek(run.img_offset)
-
                 # Previously redacted only first 10 bytes, now redacts entire sequence
                 # first_ten_bytes = rc.imagefile.read(10)
-                run_bytes = rc.imagefile.read(run.len)
+                run_bytes = dfxml.read_image_range(
+                    rc.imagefile, run.img_offset, run.len
+                )
 
                 print(
                     "\tFile info - \n\t\tname: %s  \n\t\tclosed: %s \n\t\tposition: %d \n\t\tmode: %s"
@@ -324,6 +333,7 @@ class redact_action_fuzz(redact_action):
                 if rc.commit:
                     rc.imagefile.seek(run.img_offset)
                     rc.imagefile.write(newbytes)
+                    _invalidate_cached_run(rc.imagefile, run)
                     print("\n   >>COMMIT")
             except AttributeError:
                 print("!AttributeError: no byte run?")
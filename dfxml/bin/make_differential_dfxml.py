@@ -22,7 +22,7 @@ Produces a differential DFXML file as output.
 This program's main purpose is matching files correctly.  It only performs enough analysis to determine that a fileobject has changed at all.  (This is half of the work done by idifference.py.)
 """
 
-__version__ = "0.13.0"
+__version__ = "0.14.0"
 
 import argparse
 import collections
@@ -51,7 +51,7 @@ def _lower_ftype_str(vo: Objects.VolumeObject) -> typing.Optional[str]:
     return f
 
 
-def ignorable_name(fn: str) -> bool:
+def ignorable_name(fn: typing.Optional[str]) -> bool:
     """Filter out recognized pseudo-file names."""
     if fn is None:
         return False
@@ -65,7 +65,9 @@ def make_differential_dfxml(
     annotate_matches: bool = False,
     diff_mode: str = "all",
     glom_byte_runs: bool = False,
-    ignore_filename_function: typing.Callable[[str], bool] = ignorable_name,
+    ignore_filename_function: typing.Callable[
+        [typing.Optional[str]], bool
+    ] = ignorable_name,
     rename_requires_hash: bool = False,
     retain_unchanged: bool = False,
     ignore_properties: typing.Set[str] = set()
@@ -583,6 +585,13 @@ def main() -> None:
         help="Join contiguous byte run elements together, if their attributes align.",
         default=False,
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes serializing the output's file objects.",
+    )
     parser.add_argument("infiles", nargs="+")
     args = parser.parse_args()
 
@@ -592,6 +601,9 @@ def main() -> None:
 
     logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
 
+    if args.jobs <= 0:
+        raise ValueError("Please request 1 or more serializing processes.")
+
     if len(args.infiles) != 2:
         raise ValueError("This script requires exactly two DFXML files as input.")
 
@@ -618,7 +630,7 @@ def main() -> None:
             rename_requires_hash=args.rename_with_hash,
         )
         # TODO - Some more thought needs to be put into whether this program should analyze more than two files.
-        dobj.print_dfxml()
+        dobj.print_dfxml(workers=args.jobs)
 
 
 if __name__ == "__main__":
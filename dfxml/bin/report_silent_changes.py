@@ -17,7 +17,7 @@
 This program takes a differentially-annotated DFXML file as input, and outputs a DFXML document that contains 'Silent' changes.  For instance, a changed checksum with no changed timestamps would be 'Silent.'
 """
 
-__version__ = "0.2.2"
+__version__ = "0.3.0"
 
 import logging
 import os
@@ -42,27 +42,26 @@ def main():
     d.add_creator_library("Objects.py", Objects.__version__)
     d.add_creator_library("dfxml.py", Objects.dfxml.__version__)
 
-    current_appender = d
     tally = 0
-    for event, obj in Objects.iterparse(args.infile):
-        if event == "start":
-            # Inherit namespaces
-            if isinstance(obj, Objects.DFXMLObject):
-                for prefix, url in obj.iter_namespaces():
-                    d.add_namespace(prefix, url)
-            # Group files by volume
-            elif isinstance(obj, Objects.VolumeObject):
-                d.append(obj)
-                current_appender = obj
-        elif event == "end":
-            if isinstance(obj, Objects.VolumeObject):
-                current_appender = d
-            elif isinstance(obj, Objects.FileObject):
-                if "_changed" not in obj.diffs:
-                    if "_modified" in obj.diffs or "_renamed" in obj.diffs:
-                        current_appender.append(obj)
-                        tally += 1
-    print(d.to_dfxml())
+    # Selected FileObjects are unmodified, so they are written by copying their source text.
+    with Objects.DFXMLStreamWriter(sys.stdout, d) as writer:
+        for event, obj in Objects.iterparse(args.infile, keep_raw=True):
+            if event == "start":
+                # Inherit namespaces
+                if isinstance(obj, Objects.DFXMLObject):
+                    for prefix, url in obj.iter_namespaces():
+                        d.add_namespace(prefix, url)
+                # Group files by volume
+                elif isinstance(obj, Objects.VolumeObject):
+                    writer.open_scope(obj)
+            elif event == "end":
+                if isinstance(obj, Objects.VolumeObject):
+                    writer.close_scope(obj)
+                elif isinstance(obj, Objects.FileObject):
+                    if "_changed" not in obj.diffs:
+                        if "_modified" in obj.diffs or "_renamed" in obj.diffs:
+                            writer.write(obj)
+                            tally += 1
     _logger.info("Found %d suspiciously-changed files." % tally)
 
 
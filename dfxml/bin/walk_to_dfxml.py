@@ -19,12 +19,13 @@ walk_to_dfxml
 Walk current directory, writing DFXML to stdout.
 """
 
-__version__ = "0.5.0"
+__version__ = "0.6.0"
 
 import argparse
 import collections
 import functools
 import hashlib
+import itertools
 import logging
 import os
 import stat
@@ -42,6 +43,9 @@ walk_default_hashes: typing.Set[str] = set(Objects.FileObject._hash_properties)
     "md6"
 }
 
+# Filepaths submitted to the worker threads and not yet written, per thread.
+_FILEPATHS_PER_JOB = 64
+
 
 def filepath_to_fileobject(
     filepath: str, *, ignore_properties: typing.Dict[str, typing.Set[str]] = dict()
@@ -227,14 +231,6 @@ def main() -> None:
                 "Threading support not available.  Running in single thread only."
             )
 
-        try:
-            import queue
-        except:
-            using_threading = False
-            _logger.warning(
-                "Python queue support not available.  (If running Ubuntu, this is in package python3-queuelib.)  Running in single thread only."
-            )
-
     dobj = Objects.DFXMLObject()
     dobj.program = sys.argv[0]
     dobj.program_version = __version__
@@ -275,18 +271,13 @@ def main() -> None:
             filepath = os.path.relpath(os.path.join(dirpath, dirent_name))
             filepaths.add(filepath)
 
-    fileobjects_by_filepath: typing.Dict[str, Objects.FileObject] = dict()
-
-    if using_threading:
-        # Threading syntax c/o: https://docs.python.org/3.5/library/queue.html
-        q: queue.Queue[typing.Optional[str]] = queue.Queue()
-        threads = []
+    # FileObjects are written as they are produced, in filepath order, so the manifest is never held in memory.
+    with Objects.DFXMLStreamWriter(sys.stdout, dobj) as writer:
+        if using_threading:
+            # A window of filepaths, in sorted order, is submitted to the threads.  Results are written from the head of the window as they complete, and each written filepath is replaced with the next, so the threads are kept busy while the FileObjects held for the writer stay bounded.
+            import concurrent.futures
 
-        def _worker() -> None:
-            while True:
-                filepath = q.get()
-                if filepath is None:
-                    break
+            def _worker(filepath: str) -> Objects.FileObject:
                 try:
                     fobj = filepath_to_fileobject(
                         filepath, ignore_properties=ignore_properties
@@ -297,34 +288,34 @@ def main() -> None:
                     fobj.error = "".join(traceback.format_stack())
                     if e.args:
                         fobj.error += "\n" + str(e.args)
-                fileobjects_by_filepath[filepath] = fobj
-                q.task_done()
-
-        for i in range(args.jobs):
-            t = threading.Thread(target=_worker)
-            t.start()
-            threads.append(t)
-
-        for filepath in filepaths:
-            q.put(filepath)
-
-        # block until all tasks are done
-        q.join()
-
-        # stop workers
-        for i in range(args.jobs):
-            q.put(None)
-        for t in threads:
-            t.join()
-    else:  # Not threading.
-        for filepath in sorted(filepaths):
-            fobj = filepath_to_fileobject(filepath, ignore_properties=ignore_properties)
-            fileobjects_by_filepath[filepath] = fobj
-
-    # Build output DFXML tree.
-    for filepath in sorted(fileobjects_by_filepath.keys()):
-        dobj.append(fileobjects_by_filepath[filepath])
-    dobj.print_dfxml()
+                return fobj
+
+            window_size = args.jobs * _FILEPATHS_PER_JOB
+            iter_filepaths = iter(sorted(filepaths))
+            pending: typing.Deque[concurrent.futures.Future] = collections.deque()
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=args.jobs
+            ) as executor:
+                while True:
+                    for filepath in itertools.islice(
+                        iter_filepaths, window_size - len(pending)
+                    ):
+                        pending.append(executor.submit(_worker, filepath))
+                    if not pending:
+                        break
+                    while pending and pending[0].done():
+                        writer.write(pending.popleft().result())
+                    if pending and not pending[0].done():
+                        concurrent.futures.wait(
+                            [future for future in pending if not future.done()],
+                            return_when=concurrent.futures.FIRST_COMPLETED,
+                        )
+        else:  # Not threading.
+            for filepath in sorted(filepaths):
+                fobj = filepath_to_fileobject(
+                    filepath, ignore_properties=ignore_properties
+                )
+                writer.write(fobj)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,867 @@
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This file stores FileObjects' properties in columns:  in memory with FileObjectTable, and on disk, memory-mapped, with dfxml_to_columns and FileObjectColumns.
+
+FileObjectTable, FileObjectColumns and dfxml_to_columns are re-exported by dfxml.objects.
+"""
+
+from __future__ import annotations
+
+import array
+import datetime
+import itertools
+import json
+import logging
+import math
+import mmap
+import os
+import sys
+import typing
+
+sys.path.append(os.path.dirname(__file__) + "/..")
+import dfxml  # type: ignore
+from dfxml.objects import (
+    AbstractParserBackend,
+    FileObject,
+    FileObjectFilter,
+    TimestampObject,
+    __version__,
+    _boolcast,
+    _epoch_seconds,
+    _typecheck,
+    iterparse,
+)
+
+_logger = logging.getLogger(os.path.basename(__file__))
+
+# Contains: Names of FileObjectTable columns that have had values stored as nulls.
+_warned_table_columns: typing.Set[str] = set()
+
+
+def _epoch_seconds_to_iso8601(seconds: float) -> str:
+    """Inverse of _epoch_seconds, rendering the time in UTC, with microseconds if any."""
+    dt = datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+    if dt.microsecond:
+        return dt.strftime("%Y-%m-%dT%H:%M:%S.%f").rstrip("0") + "Z"
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _epoch_ns_to_iso8601(ns: int) -> str:
+    """Renders nanoseconds since the Unix epoch as a time in UTC, with as many fractional digits as the nanoseconds need."""
+    (seconds, fraction) = divmod(ns, 1000000000)
+    dt = datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=seconds)
+    if fraction:
+        return "%s.%sZ" % (
+            dt.strftime("%Y-%m-%dT%H:%M:%S"),
+            ("%09d" % fraction).rstrip("0"),
+        )
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _flag_value(val: typing.Optional[bool]) -> int:
+    """Encodes an optional Boolean as 1, 0, or -1 for null, for FileObjectTable."""
+    if val is None:
+        return -1
+    return 1 if val else 0
+
+
+def _numpy():
+    """Returns the numpy module, or None if NumPy is not installed."""
+    try:
+        import numpy  # type: ignore
+    except ImportError:
+        return None
+    return numpy
+
+
+class _StringPool(object):
+    """
+    A column of optional strings, stored as UTF-8 bytes concatenated in one buffer, indexed by an array of end offsets.  Used by FileObjectTable.
+    """
+
+    __slots__ = ("_data", "_offsets", "_valid")
+
+    def __init__(self) -> None:
+        self._data = bytearray()
+        # Row i spans self._data[self._offsets[i]:self._offsets[i+1]].
+        self._offsets = array.array("q", [0])
+        # 0 for null rows, 1 otherwise.
+        self._valid = bytearray()
+
+    def __getitem__(self, index: int) -> typing.Optional[str]:
+        if not self._valid[index]:
+            return None
+        return self._data[self._offsets[index] : self._offsets[index + 1]].decode(
+            "utf-8"
+        )
+
+    def __len__(self) -> int:
+        return len(self._valid)
+
+    def append(self, value: typing.Optional[str]) -> None:
+        if value is None:
+            self._valid.append(0)
+        else:
+            self._data += value.encode("utf-8")
+            self._valid.append(1)
+        self._offsets.append(len(self._data))
+
+    def nbytes(self) -> int:
+        """Bytes held by the pool's buffers."""
+        return (
+            len(self._data)
+            + len(self._offsets) * self._offsets.itemsize
+            + len(self._valid)
+        )
+
+    def take(self, indices: typing.Iterable[int]) -> _StringPool:
+        """Returns a new pool of the rows at indices, in that order."""
+        pool = _StringPool()
+        data = self._data
+        offsets = self._offsets
+        valid = self._valid
+        for index in indices:
+            if valid[index]:
+                pool._data += data[offsets[index] : offsets[index + 1]]
+            pool._valid.append(valid[index])
+            pool._offsets.append(len(pool._data))
+        return pool
+
+    def values(self) -> typing.List[typing.Optional[str]]:
+        return [self[index] for index in range(len(self))]
+
+
+class FileObjectTable(object):
+    """
+    A columnar (struct-of-arrays) representation of the FileObjects of a DFXML document, for analytics over whole manifests without one Python object per file.
+
+    Fixed-width properties are stored in typed arrays, one value per row:  integer properties as 64-bit integers (int_columns), Boolean properties as 8-bit integers (flag_columns), and timestamps as floating-point seconds since the Unix epoch, UTC (time_columns), along with their text, from which save_columns() converts exact nanoseconds.  Filenames, name types and hashes are stored in offset-indexed string pools (string_columns).  Null values are stored as FileObjectTable.NULL_INT, -1, NaN and None, respectively.
+
+    Columns are returned by column() (or indexing by column name) as NumPy arrays when NumPy is installed, and otherwise as array.array objects (string columns as lists).  NumPy arrays of numeric columns are views of the table's buffers, so append() raises BufferError while any are alive.  filter(), take() and sort() return new tables.
+
+    Byte runs, externals, differential annotations and properties without a column are not stored.  to_FileObject() rebuilds a FileObject from a row's stored properties; timestamps are rebuilt in UTC, without precision.
+    """
+
+    NULL_INT = -(2**63)
+
+    # uid and gid are stored as strings by FileObject; values that are not decimal integers are stored as nulls, with a warning.
+    int_columns: typing.List[str] = [
+        "id",
+        "partition",
+        "inode",
+        "filesize",
+        "meta_type",
+        "mode",
+        "nlink",
+        "seq",
+        "uid",
+        "gid",
+    ]
+
+    # alloc is the allocation status from FileObject.is_allocated().  to_FileObject does not read it; unalloc, alloc_inode and alloc_name restore the allocation properties.
+    flag_columns: typing.List[str] = [
+        "alloc",
+        "alloc_inode",
+        "alloc_name",
+        "unalloc",
+        "used",
+    ]
+
+    time_columns: typing.List[str] = TimestampObject.timestamp_name_list
+
+    string_columns: typing.List[str] = [
+        "filename",
+        "name_type",
+        "md5",
+        "sha1",
+        "sha256",
+    ]
+
+    _typecodes = {"int": "q", "flag": "b", "time": "d"}
+    _numpy_dtypes = {"q": "int64", "b": "int8", "d": "float64"}
+
+    def __init__(
+        self,
+        fileobjects: typing.Optional[typing.Iterable[FileObject]] = None,
+        *,
+        use_numpy: typing.Optional[bool] = None,
+    ) -> None:
+        """
+        @param fileobjects: Optional.  FileObjects to append.
+        @param use_numpy: Optional.  Whether column() returns NumPy arrays and filter() and sort() use NumPy.  Default: True if NumPy is installed.
+        """
+        self._arrays: typing.Dict[str, array.array] = dict()
+        for kind, names in (
+            ("int", FileObjectTable.int_columns),
+            ("flag", FileObjectTable.flag_columns),
+            ("time", FileObjectTable.time_columns),
+        ):
+            for name in names:
+                self._arrays[name] = array.array(FileObjectTable._typecodes[kind])
+        self._pools: typing.Dict[str, _StringPool] = {
+            name: _StringPool() for name in FileObjectTable.string_columns
+        }
+        # The text of each timestamp, from which save_columns() converts exact nanoseconds.
+        self._time_texts: typing.Dict[str, _StringPool] = {
+            name: _StringPool() for name in FileObjectTable.time_columns
+        }
+        self._length = 0
+
+        self.use_numpy = not _numpy() is None if use_numpy is None else use_numpy
+
+        if not fileobjects is None:
+            self.extend(fileobjects)
+
+    def __getitem__(self, name: str):
+        return self.column(name)
+
+    def __iter__(self) -> typing.Iterator[FileObject]:
+        for index in range(self._length):
+            yield self.to_FileObject(index)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return "FileObjectTable(<%d rows>)" % self._length
+
+    @classmethod
+    def columns(cls) -> typing.List[str]:
+        """Names of all columns.  Each is the name of the FileObject property it stores."""
+        return (
+            cls.int_columns + cls.flag_columns + cls.time_columns + cls.string_columns
+        )
+
+    @classmethod
+    def from_iterparse(
+        cls,
+        filename: str,
+        *,
+        fiwalk: typing.Optional[str] = None,
+        backend: typing.Union[None, str, AbstractParserBackend] = None,
+        file_filter: typing.Optional[FileObjectFilter] = None,
+        use_numpy: typing.Optional[bool] = None,
+    ) -> FileObjectTable:
+        """
+        Builds a table from the FileObjects of a DFXML file (or disk image, via Fiwalk), streamed with iterparse.  Only the properties with columns are decoded (see iterparse's fields parameter), and FileObjects are discarded once appended.
+
+        @param fiwalk: Optional.  See iterparse().
+        @param backend: Optional.  See iterparse().
+        @param file_filter: Optional.  A FileObjectFilter.  Only FileObjects it accepts become rows.
+        @param use_numpy: Optional.  See __init__().
+        """
+        table = cls(use_numpy=use_numpy)
+        for event, obj in iterparse(
+            filename,
+            events=("end",),
+            fiwalk=fiwalk,
+            backend=backend,
+            fields=cls.columns(),
+            file_filter=file_filter,
+        ):
+            if isinstance(obj, FileObject):
+                table.append(obj)
+        return table
+
+    def append(self, fobj: FileObject) -> None:
+        _typecheck(fobj, FileObject)
+        arrays = self._arrays
+        for name in FileObjectTable.int_columns:
+            value = getattr(fobj, name)
+            if value is None:
+                value = FileObjectTable.NULL_INT
+            elif isinstance(value, str):
+                try:
+                    value = int(value)
+                except ValueError:
+                    if not name in _warned_table_columns:
+                        _logger.warning(
+                            "Storing non-integer %s values as nulls in FileObjectTable, starting with %r."
+                            % (name, value)
+                        )
+                        _warned_table_columns.add(name)
+                    value = FileObjectTable.NULL_INT
+            arrays[name].append(value)
+
+        arrays["alloc"].append(_flag_value(fobj.is_allocated()))
+        for name in FileObjectTable.flag_columns[1:]:
+            arrays[name].append(_flag_value(getattr(fobj, name)))
+
+        for name in FileObjectTable.time_columns:
+            tobj = getattr(fobj, name)
+            arrays[name].append(_epoch_seconds(tobj))
+            self._time_texts[name].append(
+                None if tobj is None or tobj.time is None else tobj.time.iso8601()
+            )
+
+        for name, pool in self._pools.items():
+            pool.append(getattr(fobj, name))
+
+        self._length += 1
+
+    def argsort(
+        self, by: typing.Union[str, typing.Sequence[str]], reverse: bool = False
+    ) -> typing.List[int]:
+        """
+        Returns the row indices that sort the table by the named column, or columns (the first being the primary key).  The sort is stable.  Integer nulls sort first, NaN timestamps last, and null strings before all strings.
+
+        @param reverse: Optional.  If True, returns the ascending order reversed.
+        """
+        names = [by] if isinstance(by, str) else list(by)
+        for name in names:
+            self._check_column_name(name)
+        np = _numpy() if self.use_numpy else None
+        if not np is None and not any(name in self._pools for name in names):
+            # numpy.lexsort takes its primary key last.
+            keys = [self.column(name) for name in reversed(names)]
+            indices = np.lexsort(keys).tolist()
+        else:
+            key_columns = [self._sort_keys(name) for name in names]
+            indices = sorted(
+                range(self._length),
+                key=lambda index: tuple(keys[index] for keys in key_columns),
+            )
+        if reverse:
+            indices.reverse()
+        return indices
+
+    def column(self, name: str):
+        """Returns the named column.  See the class documentation for the types returned."""
+        self._check_column_name(name)
+        if name in self._pools:
+            values = self._pools[name].values()
+            if self.use_numpy:
+                np = _numpy()
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+                return column
+            return values
+        if self.use_numpy:
+            np = _numpy()
+            arr = self._arrays[name]
+            return np.frombuffer(arr, dtype=FileObjectTable._numpy_dtypes[arr.typecode])
+        return self._arrays[name]
+
+    def extend(self, fileobjects: typing.Iterable[FileObject]) -> None:
+        for fobj in fileobjects:
+            self.append(fobj)
+
+    def filter(self, mask: typing.Iterable[typing.Any]) -> FileObjectTable:
+        """
+        Returns a new table of the rows where mask is true.  mask is typically a NumPy Boolean array computed from columns, e.g. table.filter(table["filesize"] > 4096); any iterable of truth values of the table's length is accepted.
+        """
+        np = _numpy() if self.use_numpy else None
+        if not np is None:
+            bools = np.asarray(mask, dtype=bool)
+            if bools.shape != (self._length,):
+                raise ValueError(
+                    "Expecting a mask of %d values, received shape %r."
+                    % (self._length, bools.shape)
+                )
+            return self.take(np.flatnonzero(bools))
+        flags = list(mask)
+        if len(flags) != self._length:
+            raise ValueError(
+                "Expecting a mask of %d values, received %d."
+                % (self._length, len(flags))
+            )
+        return self.take([index for index, flag in enumerate(flags) if flag])
+
+    def nbytes(self) -> int:
+        """Bytes held by the table's column buffers."""
+        return sum(len(arr) * arr.itemsize for arr in self._arrays.values()) + sum(
+            pool.nbytes()
+            for pool in itertools.chain(self._pools.values(), self._time_texts.values())
+        )
+
+    def save_columns(self, directory: str) -> None:
+        """Writes the table to directory as column files, which FileObjectColumns memory-maps.  See dfxml_to_columns() for the layout."""
+        writer = _ColumnFilesWriter(directory)
+        try:
+            writer.write(self)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.close()
+
+    def sort(
+        self, by: typing.Union[str, typing.Sequence[str]], reverse: bool = False
+    ) -> FileObjectTable:
+        """Returns a new table with the rows ordered as argsort() orders them."""
+        return self.take(self.argsort(by, reverse=reverse))
+
+    def take(self, indices: typing.Iterable[int]) -> FileObjectTable:
+        """Returns a new table of the rows at indices, in that order.  indices may be a NumPy integer array."""
+        table = FileObjectTable(use_numpy=self.use_numpy)
+        np = _numpy() if self.use_numpy else None
+        positions: typing.List[int]
+        if not np is None:
+            np_indices = np.asarray(indices, dtype="int64")
+            for name in self._arrays:
+                selected = self.column(name)[np_indices]
+                table._arrays[name].frombytes(selected.tobytes())
+            positions = np_indices.tolist()
+        else:
+            positions = list(indices)
+            for name, arr in self._arrays.items():
+                table._arrays[name].extend(arr[index] for index in positions)
+        for name, pool in self._pools.items():
+            table._pools[name] = pool.take(positions)
+        for name, pool in self._time_texts.items():
+            table._time_texts[name] = pool.take(positions)
+        table._length = len(positions)
+        return table
+
+    def to_FileObject(self, index: int) -> FileObject:
+        """Returns a new FileObject with the properties stored in the row at index.  Negative indices count from the end, as with lists."""
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError("FileObjectTable row index out of range: %r." % index)
+        arrays = self._arrays
+        fobj = FileObject()
+        for name in FileObjectTable.int_columns:
+            value = arrays[name][index]
+            if value != FileObjectTable.NULL_INT:
+                setattr(fobj, name, value)
+        for name in FileObjectTable.flag_columns[1:]:
+            value = arrays[name][index]
+            if value != -1:
+                setattr(fobj, name, value)
+        for name in FileObjectTable.time_columns:
+            value = arrays[name][index]
+            if not math.isnan(value):
+                setattr(
+                    fobj,
+                    name,
+                    TimestampObject(_epoch_seconds_to_iso8601(value), name=name),
+                )
+        for name, pool in self._pools.items():
+            value = pool[index]
+            if not value is None:
+                setattr(fobj, name, value)
+        return fobj
+
+    @property
+    def use_numpy(self) -> bool:
+        """Whether column() returns NumPy arrays, and filter(), sort() and take() use NumPy.  Setting True raises ImportError if NumPy is not installed."""
+        return self._use_numpy
+
+    @use_numpy.setter
+    def use_numpy(self, val) -> None:
+        val = _boolcast(val)
+        if val and _numpy() is None:
+            raise ImportError("FileObjectTable.use_numpy requires NumPy.")
+        self._use_numpy = val
+
+    def _check_column_name(self, name: str) -> None:
+        if not name in self._arrays and not name in self._pools:
+            raise KeyError("FileObjectTable has no column %r." % name)
+
+    def _sort_keys(self, name: str) -> typing.List[typing.Any]:
+        """Returns sort keys for the values of the named column, ordering nulls consistently with argsort's documentation."""
+        if name in self._pools:
+            return [
+                (0, "") if value is None else (1, value)
+                for value in self._pools[name].values()
+            ]
+        if name in FileObjectTable.time_columns:
+            return [(math.isnan(value), value) for value in self._arrays[name]]
+        return list(self._arrays[name])
+
+
+# Rows of FileObjectTable buffered by dfxml_to_columns() between writes.
+_COLUMNS_BATCH_SIZE = 65536
+
+
+class _ColumnFilesWriter(object):
+    """Appends FileObjectTables to the column files of a directory.  The schema file is written by close(), so a directory is only loadable once complete.  abort() removes the column files of an incomplete export instead."""
+
+    def __init__(self, directory: str) -> None:
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+        schema_path = os.path.join(directory, FileObjectColumns.SCHEMA_FILENAME)
+        if os.path.exists(schema_path):
+            os.unlink(schema_path)
+        self._rows = 0
+        self._schema_columns: typing.List[typing.Dict[str, typing.Any]] = []
+        self._fhs: typing.Dict[str, typing.BinaryIO] = dict()
+        for name in FileObjectTable.columns():
+            if name in FileObjectTable.string_columns:
+                files = {
+                    "data": "%s.data" % name,
+                    "offsets": "%s.offsets" % name,
+                    "valid": "%s.valid" % name,
+                }
+                self._schema_columns.append(
+                    {
+                        "name": name,
+                        "kind": "string",
+                        "encoding": "utf-8",
+                        "files": files,
+                        "offsets_dtype": "<i8",
+                        "valid_dtype": "|u1",
+                    }
+                )
+            else:
+                kind, dtype, null = (
+                    ("flag", "<i1", -1)
+                    if name in FileObjectTable.flag_columns
+                    else ("int", "<i8", FileObjectTable.NULL_INT)
+                )
+                files = {"values": "%s.values" % name}
+                column: typing.Dict[str, typing.Any] = {
+                    "name": name,
+                    "kind": kind,
+                    "dtype": dtype,
+                    "null": null,
+                    "files": files,
+                }
+                if name in FileObjectTable.time_columns:
+                    column["kind"] = "time"
+                    column["unit"] = "ns"
+                self._schema_columns.append(column)
+            for role, file_name in files.items():
+                try:
+                    self._fhs[name + "." + role] = open(
+                        os.path.join(directory, file_name), "wb"
+                    )
+                except BaseException:
+                    self.abort()
+                    raise
+        # Byte offsets of the end of each string column's data.  Offset arrays start with 0.
+        self._string_ends = {name: 0 for name in FileObjectTable.string_columns}
+        for name in FileObjectTable.string_columns:
+            self._write_array(name + ".offsets", array.array("q", [0]))
+
+    def abort(self) -> None:
+        """Closes and removes the column files written so far, without writing the schema file."""
+        for fh in self._fhs.values():
+            fh.close()
+            try:
+                os.unlink(fh.name)
+            except OSError:
+                pass
+        self._fhs.clear()
+
+    def _write_array(self, key: str, arr: array.array) -> None:
+        if sys.byteorder == "big" and arr.itemsize > 1:
+            arr = array.array(arr.typecode, arr)
+            arr.byteswap()
+        arr.tofile(self._fhs[key])
+
+    def close(self) -> None:
+        for fh in self._fhs.values():
+            fh.close()
+        schema = {
+            "format": FileObjectColumns.FORMAT,
+            "version": FileObjectColumns.VERSION,
+            "program": "dfxml.objects",
+            "program_version": __version__,
+            "byteorder": "little",
+            "rows": self._rows,
+            "columns": self._schema_columns,
+        }
+        with open(
+            os.path.join(self._directory, FileObjectColumns.SCHEMA_FILENAME), "w"
+        ) as schema_fh:
+            json.dump(schema, schema_fh, indent=2)
+            schema_fh.write("\n")
+
+    def write(self, table: FileObjectTable) -> None:
+        for name, arr in table._arrays.items():
+            if name in FileObjectTable.time_columns:
+                # Converted from the timestamps' text, as the seconds are only precise to microseconds.
+                ns = dfxml.dftimes_to_epoch_ns(
+                    table._time_texts[name].values(), errors="null"
+                )[0]
+                arr = (
+                    ns
+                    if isinstance(ns, array.array)
+                    else array.array("q", ns.tobytes())
+                )
+            self._write_array(name + ".values", arr)
+        for name, pool in table._pools.items():
+            end = self._string_ends[name]
+            self._fhs[name + ".data"].write(pool._data)
+            offsets = pool._offsets[1:]
+            if end:
+                offsets = array.array("q", [offset + end for offset in offsets])
+            self._write_array(name + ".offsets", offsets)
+            self._fhs[name + ".valid"].write(pool._valid)
+            self._string_ends[name] = end + len(pool._data)
+        self._rows += len(table)
+
+
+class _MappedStringColumn(object):
+    """A read-only sequence of the strings of a memory-mapped string column.  Values are decoded on access."""
+
+    __slots__ = ("_data", "_offsets", "_valid")
+
+    def __init__(
+        self, data: memoryview, offsets: memoryview, valid: memoryview
+    ) -> None:
+        self._data = data
+        self._offsets = offsets
+        self._valid = valid
+
+    def __getitem__(self, index: int) -> typing.Optional[str]:
+        if index < 0:
+            index += len(self._valid)
+        if not self._valid[index]:
+            return None
+        return str(self._data[self._offsets[index] : self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self) -> typing.Iterator[typing.Optional[str]]:
+        for index in range(len(self._valid)):
+            yield self[index]
+
+    def __len__(self) -> int:
+        return len(self._valid)
+
+
+class FileObjectColumns(object):
+    """
+    A read-only FileObjectTable memory-mapped from a directory of column files, as written by dfxml_to_columns() or FileObjectTable.save_columns().  Opening the directory reads only the schema file, so it takes the same time for any number of rows.
+
+    The directory holds a schema descriptor, schema.json, and one file per fixed-width column, of little-endian values:  int64 for integer properties, int8 for Boolean properties (-1 for null), and int64 nanoseconds since the Unix epoch, UTC, for timestamps (see dfxml.dftimes_to_epoch_ns; times outside its range are nulls).  Integer and timestamp nulls are FileObjectTable.NULL_INT.  Each string column is three files:  the concatenated UTF-8 values (data), int64 offsets into the data, one more than the number of rows (offsets; row i spans offsets[i] to offsets[i+1]), and a uint8 validity flag per row, 0 for null (valid).  The schema lists, for each column, its name, kind ("int", "flag", "time" or "string"), dtype, null value and files, along with the number of rows.
+
+    column() returns zero-copy views of the mapped files:  NumPy arrays when use_numpy is True, and otherwise memoryview objects.  String columns are returned as read-only sequences decoding values on access; string_buffers() returns their files as views.  Views remain valid after close(), the files being unmapped once the last view is released.
+    """
+
+    FORMAT = "dfxml-columns"
+    SCHEMA_FILENAME = "schema.json"
+    VERSION = 1
+
+    _typecodes: typing.Dict[str, typing.Any] = {"<i8": "q", "<i1": "b", "|u1": "B"}
+    _numpy_dtypes = {"<i8": "int64", "<i1": "int8", "|u1": "uint8"}
+
+    def __init__(
+        self, directory: str, *, use_numpy: typing.Optional[bool] = None
+    ) -> None:
+        """
+        @param use_numpy: Optional.  Whether column() and string_buffers() return NumPy arrays.  Default: True if NumPy is installed.
+        """
+        self._directory = directory
+        with open(os.path.join(directory, FileObjectColumns.SCHEMA_FILENAME)) as fh:
+            self._schema = json.load(fh)
+        if self._schema.get("format") != FileObjectColumns.FORMAT:
+            raise ValueError("%r is not a FileObjectColumns directory." % directory)
+        if self._schema.get("version") != FileObjectColumns.VERSION:
+            raise ValueError(
+                "Unsupported FileObjectColumns version %r in %r."
+                % (self._schema.get("version"), directory)
+            )
+        if sys.byteorder != "little":
+            raise ValueError(
+                "FileObjectColumns requires a little-endian machine, to map the column files without copying."
+            )
+        self._length: int = self._schema["rows"]
+        self._columns: typing.Dict[str, typing.Dict[str, typing.Any]] = {
+            column["name"]: column for column in self._schema["columns"]
+        }
+        self._mmaps: typing.Dict[str, typing.Any] = dict()
+        self.use_numpy = not _numpy() is None if use_numpy is None else use_numpy
+
+    def __enter__(self) -> FileObjectColumns:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __getitem__(self, name: str):
+        return self.column(name)
+
+    def __iter__(self) -> typing.Iterator[FileObject]:
+        for index in range(self._length):
+            yield self.to_FileObject(index)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return "FileObjectColumns(%r, <%d rows>)" % (self._directory, self._length)
+
+    def _buffer(
+        self, file_name: str, dtype: str, use_numpy: typing.Optional[bool] = None
+    ):
+        """Returns the mapped file file_name as a NumPy array or memoryview of dtype.  use_numpy defaults to the use_numpy property."""
+        if not file_name in self._mmaps:
+            with open(os.path.join(self._directory, file_name), "rb") as fh:
+                if os.fstat(fh.fileno()).st_size == 0:
+                    # Empty files cannot be mapped.
+                    self._mmaps[file_name] = b""
+                else:
+                    self._mmaps[file_name] = mmap.mmap(
+                        fh.fileno(), 0, access=mmap.ACCESS_READ
+                    )
+        buf = self._mmaps[file_name]
+        if self.use_numpy if use_numpy is None else use_numpy:
+            return _numpy().frombuffer(
+                buf, dtype=FileObjectColumns._numpy_dtypes[dtype]
+            )
+        return memoryview(buf).cast(FileObjectColumns._typecodes[dtype])
+
+    def _column_schema(self, name: str) -> typing.Dict[str, typing.Any]:
+        if not name in self._columns:
+            raise KeyError("FileObjectColumns has no column %r." % name)
+        return self._columns[name]
+
+    def close(self) -> None:
+        """Releases the mapped files.  Files with views still alive are unmapped when the last view is released."""
+        for buf in self._mmaps.values():
+            if isinstance(buf, mmap.mmap):
+                try:
+                    buf.close()
+                except BufferError:
+                    pass
+        self._mmaps.clear()
+
+    def column(self, name: str):
+        """Returns the named column.  See the class documentation for the types returned."""
+        column = self._column_schema(name)
+        if column["kind"] == "string":
+            return _MappedStringColumn(*self.string_buffers(name, use_numpy=False))
+        return self._buffer(column["files"]["values"], column["dtype"])
+
+    @classmethod
+    def columns(cls) -> typing.List[str]:
+        """Names of all columns.  See FileObjectTable.columns()."""
+        return FileObjectTable.columns()
+
+    @property
+    def schema(self) -> typing.Dict[str, typing.Any]:
+        """The parsed schema descriptor."""
+        return self._schema
+
+    def string_buffers(
+        self, name: str, *, use_numpy: typing.Optional[bool] = None
+    ) -> typing.Tuple[typing.Any, typing.Any, typing.Any]:
+        """
+        Returns the (data, offsets, valid) views of the named string column.  See the class documentation.
+
+        @param use_numpy: Optional.  Whether to return NumPy arrays rather than memoryview objects.  Default: the use_numpy property.
+        """
+        column = self._column_schema(name)
+        if column["kind"] != "string":
+            raise KeyError("FileObjectColumns column %r is not a string column." % name)
+        files = column["files"]
+        return (
+            self._buffer(files["data"], "|u1", use_numpy),
+            self._buffer(files["offsets"], column["offsets_dtype"], use_numpy),
+            self._buffer(files["valid"], column["valid_dtype"], use_numpy),
+        )
+
+    def to_FileObject(self, index: int) -> FileObject:
+        """Returns a new FileObject with the properties stored in the row at index.  See FileObjectTable.to_FileObject()."""
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError("FileObjectColumns row index out of range: %r." % index)
+        fobj = FileObject()
+        for name in FileObjectTable.int_columns:
+            value = int(self.column(name)[index])
+            if value != FileObjectTable.NULL_INT:
+                setattr(fobj, name, value)
+        for name in FileObjectTable.flag_columns[1:]:
+            value = int(self.column(name)[index])
+            if value != -1:
+                setattr(fobj, name, value)
+        for name in FileObjectTable.time_columns:
+            value = int(self.column(name)[index])
+            if value != FileObjectTable.NULL_INT:
+                setattr(
+                    fobj, name, TimestampObject(_epoch_ns_to_iso8601(value), name=name)
+                )
+        for name in FileObjectTable.string_columns:
+            value = self.column(name)[index]
+            if not value is None:
+                setattr(fobj, name, value)
+        return fobj
+
+    def to_table(self) -> FileObjectTable:
+        """Returns a FileObjectTable copy of the columns, e.g. for filter() and sort()."""
+        table = FileObjectTable(use_numpy=self.use_numpy)
+        for name, arr in table._arrays.items():
+            values = self.column(name)
+            if name in FileObjectTable.time_columns:
+                pool = table._time_texts[name]
+                for value in values:
+                    if value == FileObjectTable.NULL_INT:
+                        arr.append(math.nan)
+                        pool.append(None)
+                    else:
+                        arr.append(value / 1e9)
+                        pool.append(_epoch_ns_to_iso8601(int(value)))
+            else:
+                arr.frombytes(memoryview(values).cast("B"))
+        for name, pool in table._pools.items():
+            data, offsets, valid = self.string_buffers(name, use_numpy=False)
+            pool._data = bytearray(data)
+            pool._offsets = array.array("q", offsets.tobytes())
+            pool._valid = bytearray(valid)
+        table._length = self._length
+        return table
+
+    @property
+    def use_numpy(self) -> bool:
+        """Whether column() and string_buffers() return NumPy arrays.  Setting True raises ImportError if NumPy is not installed."""
+        return self._use_numpy
+
+    @use_numpy.setter
+    def use_numpy(self, val) -> None:
+        val = _boolcast(val)
+        if val and _numpy() is None:
+            raise ImportError("FileObjectColumns.use_numpy requires NumPy.")
+        self._use_numpy = val
+
+
+def dfxml_to_columns(
+    filename: str,
+    directory: str,
+    *,
+    fiwalk: typing.Optional[str] = None,
+    backend: typing.Union[None, str, AbstractParserBackend] = None,
+    file_filter: typing.Optional[FileObjectFilter] = None,
+) -> int:
+    """
+    Writes the FileObjects of the DFXML file filename (or disk image, via Fiwalk) to directory as column files, for FileObjectColumns to memory-map.  FileObjects are streamed with iterparse, and written in batches, so memory use does not grow with the number of FileObjects.  Returns the number of rows written.
+
+    @param fiwalk: Optional.  See iterparse().
+    @param backend: Optional.  See iterparse().
+    @param file_filter: Optional.  A FileObjectFilter.  Only FileObjects it accepts become rows.
+    """
+    writer = _ColumnFilesWriter(directory)
+    try:
+        table = FileObjectTable(use_numpy=False)
+        for event, obj in iterparse(
+            filename,
+            events=("end",),
+            fiwalk=fiwalk,
+            backend=backend,
+            fields=FileObjectTable.columns(),
+            file_filter=file_filter,
+        ):
+            if isinstance(obj, FileObject):
+                table.append(obj)
+                if len(table) >= _COLUMNS_BATCH_SIZE:
+                    writer.write(table)
+                    table = FileObjectTable(use_numpy=False)
+        writer.write(table)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return writer._rows
@@ -0,0 +1,574 @@
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This file reads the contents of disk images for the DFXML objects:  raw and split raw images in-process, other images with The SleuthKit's img_cat.
+
+RawImageReader and ImageReadScheduler are re-exported by dfxml.objects.
+"""
+
+from __future__ import annotations
+
+import bisect
+import itertools
+import os
+import subprocess
+import sys
+import threading
+import typing
+
+sys.path.append(os.path.dirname(__file__) + "/..")
+import dfxml  # type: ignore
+
+if typing.TYPE_CHECKING:
+    from dfxml.objects import ByteRun, ByteRuns
+
+
+# Leading bytes of disk image formats that are not raw images, and must be read with img_cat.  (Fixed-size VHDs are raw images followed by a footer, and read correctly as raw images.)
+_NON_RAW_IMAGE_MAGIC: typing.List[bytes] = [
+    b"EVF\x09\x0d\x0a\xff\x00",  # EWF (E01).
+    b"EVF2\x0d\x0a\x81\x00",  # EWF2 (Ex01).
+    b"LVF\x09\x0d\x0a\xff\x00",  # EWF logical evidence (L01).
+    b"AFF10\x0d\x0a\x00",  # AFF.
+    b"PK\x03\x04",  # AFF4.
+    b"KDMV",  # VMDK sparse extent.
+    b"# Disk DescriptorFile",  # VMDK descriptor.
+    b"conectix",  # Dynamic VHD.
+    b"vhdxfile",  # VHDX.
+    b"QFI\xfb",  # QCOW.
+    b"<<< Oracle VM VirtualBox Disk Image >>>",  # VDI.
+]
+
+# File name extensions of raw images, in lower case.  Split raw images are recognized by the extensions of their first segments (see _split_raw_segments).
+_RAW_IMAGE_EXTENSIONS: typing.Set[str] = {
+    "bin",
+    "dd",
+    "dsk",
+    "img",
+    "ima",
+    "iso",
+    "raw",
+}
+
+# Size of the reads RawImageReader.iter_range makes, when yielding smaller chunks.
+_RAW_IMAGE_READ_SIZE = 1024 * 1024
+
+_LOWERCASE_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+# Number of RawImageReaders ByteRuns.iter_contents keeps open, by image path.
+_RAW_IMAGE_READERS_MAX = 16
+
+_raw_image_readers: typing.Dict[typing.Tuple[typing.Any, ...], RawImageReader] = dict()
+_raw_image_readers_lock = threading.Lock()
+
+
+def _split_raw_segments(path: str) -> typing.List[str]:
+    """Returns the paths of the segments of a split raw image, given the path of its first segment:  numbered segments (image.000 or image.001, image.002, ...) or lettered segments (image.aa, image.ab, ...).  Any other path is returned as a single segment."""
+    (stem, dot, extension) = path.rpartition(".")
+    if not dot or not extension or "/" in extension or os.sep in extension:
+        return [path]
+    if extension.isdigit() and int(extension) <= 1:
+        next_names = (
+            "%s.%0*d" % (stem, len(extension), number)
+            for number in itertools.count(int(extension) + 1)
+        )
+    elif extension == "a" * len(extension):
+        next_names = (
+            "%s.%s" % (stem, "".join(letters))
+            for letters in itertools.islice(
+                itertools.product(_LOWERCASE_LETTERS, repeat=len(extension)), 1, None
+            )
+        )
+    else:
+        return [path]
+    segments = [path]
+    for name in next_names:
+        if not os.path.isfile(name):
+            break
+        segments.append(name)
+    return segments
+
+
+class RawImageReader(object):
+    """
+    Reads a raw (dd) disk image, or the segments of a split raw image, by image offset, without a subprocess.  Each segment is held open with one file descriptor, read with positioned reads, so a reader can be shared between threads and between the ByteRuns read from one image.  pread reads through the shared dfxml.BlockCache; readinto does not.
+
+    @param path The path of a raw image, or of the first segment of a split raw image (e.g. image.001 or image.aa), whose following segments are found by name.  Alternatively, the list of segment paths, in order.
+    """
+
+    def __init__(self, path: typing.Union[str, typing.Sequence[str]]) -> None:
+        if isinstance(path, str):
+            self._paths = tuple(_split_raw_segments(path))
+        else:
+            self._paths = tuple(path)
+            if len(self._paths) == 0:
+                raise ValueError("RawImageReader needs at least one image segment.")
+        # The key of the image in dfxml.BlockCache.
+        self._cache_path = os.path.realpath(self._paths[0])
+        self._fds: typing.List[int] = []
+        self._starts: typing.List[int] = []
+        self._size = 0
+        # Serializes seeking and reading, on platforms without os.pread.
+        self._lock = threading.Lock()
+        try:
+            for segment_path in self._paths:
+                fd = os.open(segment_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+                self._fds.append(fd)
+                self._starts.append(self._size)
+                self._size += os.fstat(fd).st_size
+        except BaseException:
+            self.close()
+            raise
+
+    def __del__(self) -> None:
+        self.close()
+
+    def __enter__(self) -> RawImageReader:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return "RawImageReader(%r)" % (list(self._paths),)
+
+    @staticmethod
+    def is_raw_image(path: str) -> bool:
+        """Returns True if path is a regular file named as a raw image (e.g. image.raw, image.dd, or the first segment of a split raw image, image.001 or image.aa), that does not start with the signature of a disk image format other than raw images, e.g. EWF, AFF or VMDK.  Raw images have no signature of their own, so images of other names are not recognized as raw images."""
+        (stem, dot, extension) = os.path.basename(path).rpartition(".")
+        if not dot or not stem:
+            return False
+        extension = extension.lower()
+        if not (
+            extension in _RAW_IMAGE_EXTENSIONS
+            or (extension.isdigit() and int(extension) <= 1)
+            or (extension != "" and extension == "a" * len(extension))
+        ):
+            return False
+        try:
+            with open(path, "rb") as fh:
+                leading_bytes = fh.read(64)
+        except OSError:
+            return False
+        return not any(
+            leading_bytes.startswith(magic) for magic in _NON_RAW_IMAGE_MAGIC
+        )
+
+    def close(self) -> None:
+        fds = getattr(self, "_fds", [])
+        while fds:
+            os.close(fds.pop())
+
+    def _read_segment(self, index: int, view: memoryview, offset: int) -> int:
+        """Reads into view from the segment index, at offset in that segment.  Returns the number of bytes read."""
+        fd = self._fds[index]
+        if hasattr(os, "preadv"):
+            return os.preadv(fd, [view], offset)
+        if hasattr(os, "pread"):
+            data = os.pread(fd, len(view), offset)
+        else:
+            with self._lock:
+                os.lseek(fd, offset, os.SEEK_SET)
+                data = os.read(fd, len(view))
+        view[: len(data)] = data
+        return len(data)
+
+    def readinto(self, offset: int, buffer) -> int:
+        """Reads len(buffer) bytes at image offset offset into buffer, a writable bytes-like object.  Returns the number of bytes read, fewer than len(buffer) only at the end of the image."""
+        if offset < 0:
+            raise ValueError(
+                "Image offsets cannot be negative.  Received: %r." % offset
+            )
+        view = memoryview(buffer).cast("B")
+        total = 0
+        index = bisect.bisect_right(self._starts, offset) - 1
+        while total < len(view) and index < len(self._fds):
+            n = self._read_segment(
+                index, view[total:], offset + total - self._starts[index]
+            )
+            if n == 0:
+                # The end of this segment.
+                index += 1
+                continue
+            total += n
+        return total
+
+    def pread(self, offset: int, length: int) -> memoryview:
+        """Returns length bytes at image offset offset, fewer only at the end of the image.  Reads through the shared dfxml.BlockCache (see dfxml.get_block_cache)."""
+        cache = dfxml.get_block_cache()
+        if not cache is None and length <= cache.max_read:
+            return memoryview(cache.read(self._cache_path, self._pread, offset, length))
+        return self._pread(offset, length)
+
+    def _pread(self, offset: int, length: int) -> memoryview:
+        if hasattr(os, "pread") and offset >= 0:
+            # Within one segment, os.pread skips zeroing a buffer to read into.
+            index = bisect.bisect_right(self._starts, offset) - 1
+            segment_end = (
+                self._starts[index + 1] if index + 1 < len(self._starts) else self._size
+            )
+            if offset + length <= segment_end:
+                data = os.pread(self._fds[index], length, offset - self._starts[index])
+                if len(data) == length:
+                    return memoryview(data)
+        buffer = bytearray(length)
+        n = self.readinto(offset, buffer)
+        return memoryview(buffer)[:n]
+
+    def iter_range(
+        self, offset: int, length: int, buffer_size: int = 1048576
+    ) -> typing.Iterator[memoryview]:
+        """
+        Generator.  Yields the length bytes at image offset offset, as memoryview slices of at most buffer_size bytes.  Bytes are read up to _RAW_IMAGE_READ_SIZE at a time, so small buffer sizes do not cost a read each.  Streamed contents bypass the shared dfxml.BlockCache, which would only evict the blocks of repeated reads for them.
+
+        @raises ValueError If the range extends past the end of the image, after yielding the bytes that could be read.
+        """
+        if buffer_size < 1:
+            raise ValueError(
+                "buffer_size must be positive.  Received: %r." % buffer_size
+            )
+        read_size = max(buffer_size, _RAW_IMAGE_READ_SIZE // buffer_size * buffer_size)
+        end = offset + length
+        while offset < end:
+            block = self._pread(offset, min(read_size, end - offset))
+            for start in range(0, len(block), buffer_size):
+                yield block[start : start + buffer_size]
+            offset += len(block)
+            if len(block) < read_size and offset < end:
+                raise ValueError(
+                    "Image range extends past the end of the image, %d bytes long:  %r."
+                    % (self._size, self)
+                )
+
+    @property
+    def paths(self) -> typing.Tuple[str, ...]:
+        """The paths of the image's segments."""
+        return self._paths
+
+    @property
+    def size(self) -> int:
+        """The size of the image, in bytes."""
+        return self._size
+
+
+def _iter_fill(fill: bytes, length: int, buffer_size: int) -> typing.Iterator[bytes]:
+    """Generator.  Yields length bytes of the fill character fill, at most buffer_size at a time."""
+    # This multiplication and slice should handle multi-byte fill characters, in case that ever comes up.
+    block = (fill * buffer_size)[:buffer_size]
+    while length > 0:
+        yield block[: min(length, buffer_size)]
+        length -= buffer_size
+
+
+def _shared_raw_image_reader(path: str) -> RawImageReader:
+    """Returns an open RawImageReader for the raw image path, shared with other callers.  Readers evicted after _RAW_IMAGE_READERS_MAX images are closed once no longer used.  A reader is not shared once its image file is replaced or changes size."""
+    st = os.stat(path)
+    key = (os.path.realpath(path), st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    with _raw_image_readers_lock:
+        reader = _raw_image_readers.pop(key, None)
+        if reader is None:
+            reader = RawImageReader(path)
+        _raw_image_readers[key] = reader
+        while len(_raw_image_readers) > _RAW_IMAGE_READERS_MAX:
+            del _raw_image_readers[next(iter(_raw_image_readers))]
+        return reader
+
+
+# Defaults of ImageReadScheduler's parameters.
+_READ_SCHEDULER_READ_SIZE = 4 * 1024 * 1024
+_READ_SCHEDULER_MAX_GAP = 64 * 1024
+_READ_SCHEDULER_BATCH_SIZE = 4096
+_READ_SCHEDULER_BATCH_BYTES = 256 * 1024 * 1024
+
+
+class _ScheduledJob(object):
+    """The delivery state of a job of ImageReadScheduler:  the index of the next byte run to hand to the consumer, the chunks of later runs read ahead of it, by run index, and the error that stopped reading the job, if any."""
+
+    __slots__ = (
+        "key",
+        "runs",
+        "consumer",
+        "reader",
+        "buffer_size",
+        "next_run",
+        "pending",
+        "error",
+    )
+
+    def __init__(
+        self,
+        key,
+        runs: typing.List[ByteRun],
+        consumer,
+        reader: RawImageReader,
+        buffer_size: int,
+    ) -> None:
+        self.key = key
+        self.runs = runs
+        self.consumer = consumer
+        self.reader = reader
+        self.buffer_size = buffer_size
+        self.next_run = 0
+        # None marks a run to read when it is handed over.
+        self.pending: typing.Dict[int, typing.Optional[memoryview]] = dict()
+        self.error: typing.Optional[ValueError] = None
+
+    def put(self, run_index: int, data: typing.Optional[memoryview]) -> bool:
+        """Hands the contents of the run run_index to the consumer, or holds them until the runs before it are handed over.  data is the run's bytes, or None to stream the run from the image when it is handed over, for runs too large to hold.  Returns True once all runs are handed over, or reading the image failed (see error)."""
+        self.pending[run_index] = data
+        return self.advance()
+
+    def _hand_over(self, data: memoryview) -> None:
+        consumer = self.consumer
+        buffer_size = self.buffer_size
+        for offset in range(0, len(data), buffer_size):
+            consumer(data[offset : offset + buffer_size])
+
+    def _stream(self, run: ByteRun) -> bool:
+        """Hands over the contents of run as they are read from the image.  Returns False if reading failed, setting error."""
+        assert not run.img_offset is None and not run.len is None
+        chunks = self.reader.iter_range(run.img_offset, run.len, self.buffer_size)
+        while True:
+            # Only the reads are guarded, so exceptions raised by the consumer propagate.
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return True
+            except ValueError as e:
+                self.error = e
+                return False
+            self.consumer(chunk)
+
+    def advance(self) -> bool:
+        """Hands over the runs that are next in order and need no reading, or have been read.  Returns True once all runs are handed over, or reading the image failed (see error)."""
+        while self.next_run < len(self.runs):
+            run = self.runs[self.next_run]
+            if not run.fill is None and len(run.fill) > 0:
+                # Fill runs are generated as they are handed over, as they may be large.
+                assert not run.len is None
+                for chunk in _iter_fill(run.fill, run.len, self.buffer_size):
+                    self.consumer(chunk)
+            elif self.next_run in self.pending:
+                data = self.pending.pop(self.next_run)
+                if data is None:
+                    if not self._stream(run):
+                        return True
+                else:
+                    self._hand_over(data)
+            elif run.len != 0:
+                return False
+            self.next_run += 1
+        return True
+
+
+class ImageReadScheduler(object):
+    """
+    Reads the contents of many ByteRuns from one image in image order, instead of one ByteRuns after another.  Jobs are taken from a stream in batches.  The byte runs of a batch are sorted by image offset, and runs at most max_gap bytes apart are coalesced into reads of up to read_size bytes, so the image is read close to sequentially.  The bytes read are handed to each job's consumer in the job's own order, in the chunks ByteRuns.iter_contents would yield.  A job's runs that are read before an earlier run of the same job are held in memory until that run is read, except runs larger than read_size, which are read when their turn comes.
+
+    Coalesced reads go through RawImageReader.pread, so reads small enough for the shared dfxml.BlockCache are served from it.  Runs larger than read_size are streamed with RawImageReader.iter_range, bypassing the cache.
+
+    Images that are not raw images (see RawImageReader.is_raw_image) are read with img_cat by ByteRuns.iter_contents, one job after another.
+
+    @param raw_image The path of the image, or a RawImageReader.
+    @param buffer_size The maximum size of the chunks handed to consumers.
+    @param sector_size The size of a disk sector in the image.  Required by img_cat.
+    @param read_size The maximum size of a coalesced read.  Runs larger than this are read on their own, in parts.
+    @param max_gap Runs at most this many bytes apart are read together, discarding the bytes between them.
+    @param batch_size, batch_bytes Jobs are scheduled in batches of at most batch_size jobs, and of jobs with at most batch_bytes of byte runs (beyond the job that reaches it).  These bound the memory held for runs read out of order, and the number of jobs in progress at once, e.g. of open output files.
+    """
+
+    def __init__(
+        self,
+        raw_image: typing.Union[str, RawImageReader],
+        buffer_size: int = 1048576,
+        sector_size: int = 512,
+        read_size: int = _READ_SCHEDULER_READ_SIZE,
+        max_gap: int = _READ_SCHEDULER_MAX_GAP,
+        batch_size: int = _READ_SCHEDULER_BATCH_SIZE,
+        batch_bytes: int = _READ_SCHEDULER_BATCH_BYTES,
+    ) -> None:
+        for name, value in [
+            ("buffer_size", buffer_size),
+            ("read_size", read_size),
+            ("batch_size", batch_size),
+        ]:
+            if value < 1:
+                raise ValueError("%s must be positive.  Received: %r." % (name, value))
+        if max_gap < 0:
+            raise ValueError("max_gap cannot be negative.  Received: %r." % max_gap)
+
+        self._raw_image = raw_image
+        self._reader: typing.Optional[RawImageReader]
+        if isinstance(raw_image, RawImageReader):
+            self._reader = raw_image
+        elif not isinstance(raw_image, str):
+            raise TypeError(
+                "ImageReadScheduler needs the string path to the image file.  Received: %r."
+                % raw_image
+            )
+        elif RawImageReader.is_raw_image(raw_image):
+            self._reader = _shared_raw_image_reader(raw_image)
+        else:
+            self._reader = None
+        self.buffer_size = buffer_size
+        self.sector_size = sector_size
+        self.read_size = read_size
+        self.max_gap = max_gap
+        self.batch_size = batch_size
+        self.batch_bytes = batch_bytes
+
+    def run(
+        self,
+        jobs: typing.Iterable[
+            typing.Tuple[
+                typing.Any,
+                typing.Optional[ByteRuns],
+                typing.Callable[[typing.Any], typing.Any],
+            ]
+        ],
+    ) -> typing.Iterator[typing.Tuple[typing.Any, typing.Optional[Exception]]]:
+        """
+        Generator.  Reads the contents of jobs.  Yields each job's key with None once its consumer has received all of its contents, or with the exception that kept the job from being read:  an AttributeError for byte runs without a length or a location, a ValueError for byte runs past the end of the image, or a subprocess.CalledProcessError from img_cat.  Jobs are yielded in the order they are completed, which roughly follows the image offsets of their last byte runs.  The consumer of a failed job may have received part of its contents.  Exceptions raised by consumers are not caught.
+
+        @param jobs An iterable of (key, byte_runs, consumer) triples.  key identifies the job, e.g. the FileObject byte_runs belongs to.  byte_runs is a ByteRuns, or None for no contents.  consumer is called with each chunk of the contents, in order, e.g. the update method of a hashlib hash or the write method of a file.  Chunks read in-process are memoryviews, valid after the call.
+        """
+        iter_jobs = iter(jobs)
+        while True:
+            batch = []
+            batch_bytes = 0
+            for job in iter_jobs:
+                batch.append(job)
+                if not job[1] is None:
+                    batch_bytes += sum(run.len or 0 for run in job[1])
+                if len(batch) >= self.batch_size or batch_bytes >= self.batch_bytes:
+                    break
+            if len(batch) == 0:
+                return
+            if self._reader is None:
+                yield from self._run_img_cat_batch(batch)
+            else:
+                yield from self._run_batch(self._reader, batch)
+
+    def _run_batch(
+        self, reader: RawImageReader, batch: typing.List[typing.Tuple[typing.Any, ...]]
+    ) -> typing.Iterator[typing.Tuple[typing.Any, typing.Optional[Exception]]]:
+        # The jobs in progress, by index in the batch.
+        scheduled: typing.Dict[int, _ScheduledJob] = dict()
+        # (img_offset, end offset, job index, run index) of the runs to read.
+        pieces: typing.List[typing.Tuple[int, int, int, int]] = []
+        for job_index, (key, byte_runs, consumer) in enumerate(batch):
+            runs = [] if byte_runs is None else list(byte_runs)
+            job_pieces = []
+            try:
+                for run_index, run in enumerate(runs):
+                    if run.len is None:
+                        raise AttributeError(
+                            "Byte runs can't be extracted if a run length is undefined."
+                        )
+                    if not run.fill is None and len(run.fill) > 0:
+                        continue
+                    if run.img_offset is None:
+                        raise AttributeError(
+                            "Byte runs can't be extracted if missing a fill character and image offset."
+                        )
+                    if run.len > 0:
+                        job_pieces.append(
+                            (
+                                run.img_offset,
+                                run.img_offset + run.len,
+                                job_index,
+                                run_index,
+                            )
+                        )
+            except AttributeError as e:
+                yield (key, e)
+                continue
+            job = _ScheduledJob(key, runs, consumer, reader, self.buffer_size)
+            if job.advance():
+                yield (key, None)
+                continue
+            scheduled[job_index] = job
+            pieces.extend(job_pieces)
+        pieces.sort()
+
+        index = 0
+        while index < len(pieces):
+            (start, end) = pieces[index][:2]
+            group_end = index + 1
+            while group_end < len(pieces):
+                (piece_start, piece_end) = pieces[group_end][:2]
+                if (
+                    piece_start > end + self.max_gap
+                    or max(end, piece_end) - start > self.read_size
+                ):
+                    break
+                end = max(end, piece_end)
+                group_end += 1
+            group = pieces[index:group_end]
+            index = group_end
+
+            if end - start > self.read_size:
+                # A single run larger than a read is streamed to its consumer.  If runs before it are still to be read, it is streamed when they have been handed over, rather than held in memory.
+                block = None
+            else:
+                block = reader.pread(start, end - start)
+            for piece_start, piece_end, job_index, run_index in group:
+                maybe_job = scheduled.get(job_index)
+                if maybe_job is None:
+                    continue
+                if block is None:
+                    done = maybe_job.put(run_index, None)
+                elif piece_end - start > len(block):
+                    del scheduled[job_index]
+                    yield (
+                        maybe_job.key,
+                        ValueError(
+                            "Image range extends past the end of the image, %d bytes long:  %r."
+                            % (reader.size, reader)
+                        ),
+                    )
+                    continue
+                else:
+                    done = maybe_job.put(
+                        run_index, block[piece_start - start : piece_end - start]
+                    )
+                if done:
+                    del scheduled[job_index]
+                    yield (maybe_job.key, maybe_job.error)
+
+    def _run_img_cat_batch(
+        self, batch: typing.List[typing.Tuple[typing.Any, ...]]
+    ) -> typing.Iterator[typing.Tuple[typing.Any, typing.Optional[Exception]]]:
+        for key, byte_runs, consumer in batch:
+            error = None
+            if not byte_runs is None:
+                chunks = byte_runs.iter_contents(
+                    self._raw_image,
+                    self.buffer_size,
+                    self.sector_size,
+                    use_img_cat=True,
+                )
+                while True:
+                    try:
+                        chunk = next(chunks)
+                    except StopIteration:
+                        break
+                    except (
+                        AttributeError,
+                        ValueError,
+                        subprocess.CalledProcessError,
+                    ) as e:
+                        error = e
+                        break
+                    consumer(chunk)
+            yield (key, error)
@@ -0,0 +1,990 @@
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This file indexes DFXML files on disk:  FileObjectIndex, for random access to their FileObjects, and ByteRunIndex, for finding the files holding bytes of a disk image.
+
+FileObjectIndex, ByteRunIndex, open_indexed and open_byte_run_index are re-exported by dfxml.objects.
+"""
+
+from __future__ import annotations
+
+import array
+import bisect
+import concurrent.futures
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+import typing
+
+sys.path.append(os.path.dirname(__file__) + "/..")
+import dfxml  # type: ignore
+from dfxml.columns import FileObjectTable
+from dfxml.objects import (
+    _MARKUP_EMPTY,
+    _MARKUP_END,
+    _MARKUP_FILE,
+    _MARKUP_START,
+    _PARALLEL_CHUNK_SIZE,
+    AbstractParserBackend,
+    FileObject,
+    Parser,
+    VolumeObject,
+    _iter_markup,
+    _markup_namespace,
+    _parse_file_object_chunk,
+    _root_tags,
+    _sniff_compression,
+    iterparse,
+)
+
+
+class FileObjectIndex(object):
+    """
+    A persistent sidecar index of the <fileobject> elements of a DFXML file, for random access to single FileObjects without parsing the whole file.
+
+    The index is built by one streaming pass over the DFXML file (see build()), and records for each <fileobject> its byte offset and length, its volume context, and its partition, inode, id and a hash of its filename.  Records are numbered in document order.  Indexing returns FileObjects by record number; by_inode(), by_filename() and by_id() look records up by property, by binary search.  Each lookup seeks to and parses only the matched <fileobject>s.
+
+    The index file (by default, the DFXML file's path with ".idx" appended) stores the DFXML file's size and modification time.  Opening an index raises ValueError if the DFXML file has changed since the index was built; open_indexed() rebuilds the index instead.
+
+    FileObjects whose parent element is a volume have volume_object set to a VolumeObject, shared by the volume's FileObjects, with the properties that precede the volume's first file.
+
+    Index files are memory-mapped, and store integers in the byte order of the machine that built them.  They are not portable between byte orders.
+    """
+
+    VERSION = 1
+
+    _magic = b"DFXMLIDX"
+    _header = struct.Struct("<8sHHIqqqq")
+    # Fixed-width (64-bit) columns, in file order.  The last three are permutations of the record numbers, sorted by (inode, partition), by name_hash and by id.
+    _columns = [
+        "offset",
+        "length",
+        "context",
+        "partition",
+        "inode",
+        "id",
+        "name_hash",
+        "by_inode",
+        "by_name_hash",
+        "by_id",
+    ]
+
+    def __init__(
+        self,
+        path: str,
+        index_path: typing.Optional[str] = None,
+        *,
+        backend: typing.Union[None, str, AbstractParserBackend] = None,
+    ) -> None:
+        """
+        Opens an existing index.  Raises ValueError if the index file is not an index of this version, or if the DFXML file has changed since the index was built.
+
+        @param path: Path to the DFXML file.
+        @param index_path: Optional.  Path to the index file.  Default: path + ".idx".
+        @param backend: Optional.  The XML parser backend used to parse <fileobject>s.  See iterparse().
+        """
+        self._path = path
+        self._index_path = index_path or FileObjectIndex.default_index_path(path)
+        self._backend = backend
+        self._volumes: typing.Dict[int, typing.Optional[VolumeObject]] = dict()
+        self._views: typing.Dict[str, memoryview] = dict()
+
+        with open(self._index_path, "rb") as fh:
+            header = fh.read(FileObjectIndex._header.size)
+            problem = FileObjectIndex._header_problem(path, header)
+            if not problem is None:
+                raise ValueError("%s: %r." % (problem, self._index_path))
+            self._index_mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        (_, _, _, _, _, _, self._length, trailer_length) = (
+            FileObjectIndex._header.unpack(header)
+        )
+
+        pos = FileObjectIndex._header.size
+        view = memoryview(self._index_mm)
+        for name in FileObjectIndex._columns:
+            self._views[name] = view[pos : pos + 8 * self._length].cast("q")
+            pos += 8 * self._length
+        view.release()
+        trailer = json.loads(self._index_mm[pos : pos + trailer_length])
+        self._contexts: typing.List[typing.Tuple[int, bytes, bytes]] = [
+            (volume, head.encode("utf-8"), tail.encode("utf-8"))
+            for (volume, head, tail) in trailer["contexts"]
+        ]
+        self._volume_spans: typing.List[typing.Tuple[int, int, bytes, bytes]] = [
+            (offset, length, head.encode("utf-8"), tail.encode("utf-8"))
+            for (offset, length, head, tail) in trailer["volumes"]
+        ]
+
+        with open(path, "rb") as fh:
+            # mmap cannot map empty files.
+            self._mm = (
+                mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                if self._length > 0
+                else None
+            )
+
+    def __enter__(self) -> FileObjectIndex:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __getitem__(self, n: int) -> FileObject:
+        """Returns the FileObject of record number n.  Negative record numbers count from the end.  Raises IndexError if there is no such record."""
+        if n < 0:
+            n += self._length
+        if n < 0 or n >= self._length:
+            raise IndexError("FileObjectIndex record number out of range: %r." % n)
+        return self._parse_record(n)
+
+    def __iter__(self) -> typing.Iterator[FileObject]:
+        for n in range(self._length):
+            yield self._parse_record(n)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @staticmethod
+    def _header_problem(path: str, header: bytes) -> typing.Optional[str]:
+        """Returns why an index file with header bytes header cannot be used for the DFXML file at path, or None if it can."""
+        if len(header) < FileObjectIndex._header.size:
+            return "Truncated FileObjectIndex file"
+        (
+            magic,
+            version,
+            big_endian,
+            column_count,
+            size,
+            mtime_ns,
+            _,
+            _,
+        ) = FileObjectIndex._header.unpack(header)
+        if magic != FileObjectIndex._magic:
+            return "Not a FileObjectIndex file"
+        if version != FileObjectIndex.VERSION or column_count != len(
+            FileObjectIndex._columns
+        ):
+            return "Unsupported FileObjectIndex version %r" % version
+        if bool(big_endian) != (sys.byteorder == "big"):
+            return "FileObjectIndex file built with a different byte order"
+        stat = os.stat(path)
+        if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+            return "Stale FileObjectIndex file; %r has changed" % path
+        return None
+
+    @staticmethod
+    def _name_hash(filename: typing.Optional[str]) -> int:
+        """Returns the 64-bit hash of a filename stored in an index.  Null filenames hash to FileObjectTable.NULL_INT."""
+        if filename is None:
+            return FileObjectTable.NULL_INT
+        digest = hashlib.blake2b(filename.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, sys.byteorder, signed=True)
+
+    def _find(
+        self, order: str, key: typing.Callable[[int], typing.Any], value
+    ) -> typing.List[int]:
+        """Returns the record numbers, in document order, whose key equals value, by binary search of the permutation column order, which is sorted by key."""
+        permutation = self._views[order]
+        lo = 0
+        hi = self._length
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key(permutation[mid]) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        retval = []
+        while lo < self._length and key(permutation[lo]) == value:
+            retval.append(permutation[lo])
+            lo += 1
+        return sorted(retval)
+
+    def _parse_record(self, n: int) -> FileObject:
+        assert not self._mm is None
+        offset = self._views["offset"][n]
+        length = self._views["length"][n]
+        (volume, head, tail) = self._contexts[self._views["context"][n]]
+        parser = Parser()
+        for event, obj in parser.iterparse(
+            io.BytesIO(head + self._mm[offset : offset + length] + tail),
+            ("end",),
+            backend=self._backend,
+        ):
+            if isinstance(obj, FileObject):
+                if volume >= 0:
+                    obj.volume_object = self.volume(volume)
+                return obj
+        raise ValueError(
+            "No <fileobject> found at byte offset %d of %r; the FileObjectIndex is inconsistent with the DFXML file."
+            % (offset, self._path)
+        )
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        index_path: typing.Optional[str] = None,
+        *,
+        backend: typing.Union[None, str, AbstractParserBackend] = None,
+        workers: typing.Optional[int] = None,
+    ) -> FileObjectIndex:
+        """
+        Builds the index of the DFXML file at path, overwriting any index file, and returns it opened.
+
+        The DFXML file is scanned once for the byte spans of its <fileobject>s, and the indexed properties are parsed from batches of consecutive <fileobject>s.  The index file is written to a temporary file and then renamed, so readers never see a partial index.
+
+        @param path: Path to the DFXML file.  Compressed files cannot be indexed, and raise ValueError.
+        @param index_path: Optional.  Path to the index file.  Default: path + ".idx".
+        @param backend: Optional.  The XML parser backend.  See iterparse().
+        @param workers: Optional.  If greater than 1, the number of worker processes that parse batches of <fileobject>s.
+        """
+        if not _sniff_compression(path) is None:
+            raise ValueError(
+                "Indexing requires an uncompressed DFXML file.  Received: %r." % path
+            )
+        index_path = index_path or FileObjectIndex.default_index_path(path)
+        stat = os.stat(path)
+
+        columns = {name: array.array("q") for name in FileObjectIndex._columns}
+        contexts: typing.Dict[typing.Tuple[int, bytes, bytes], int] = dict()
+        volumes: typing.List[typing.List[typing.Any]] = []
+        # Batches of consecutive records with one context:  (first record number, record count, offset, length, head, tail).
+        batches: typing.List[typing.Tuple[int, int, int, int, bytes, bytes]] = []
+
+        dfxml_ns = dfxml.XMLNS_DFXML.encode("utf-8")
+        # Stack of the open elements, as (is a DFXML volume, volume ordinal) pairs.
+        element_stack: typing.List[typing.Tuple[bool, int]] = []
+        # The volume whose prestream span is still open.
+        prestream_volume = -1
+        root = b""
+        context = -1
+        context_key = None
+        batch_open = False
+
+        with open(path, "rb") as fh:
+            m = (
+                mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                if stat.st_size > 0
+                else b""
+            )
+            try:
+                for kind, start, end, qname, ns_stack in _iter_markup(m):
+                    if kind == _MARKUP_FILE:
+                        if prestream_volume >= 0:
+                            volumes[prestream_volume][1] = (
+                                start - volumes[prestream_volume][0]
+                            )
+                            prestream_volume = -1
+                        if context_key is None:
+                            (head, tail) = _root_tags(root, ns_stack)
+                            volume = -1
+                            if element_stack and element_stack[-1][0]:
+                                volume = element_stack[-1][1]
+                            context_key = (volume, head, tail)
+                            context = contexts.setdefault(context_key, len(contexts))
+                        n = len(columns["offset"])
+                        columns["offset"].append(start)
+                        columns["length"].append(end - start)
+                        columns["context"].append(context)
+                        if batch_open and end - batches[-1][2] <= _PARALLEL_CHUNK_SIZE:
+                            batch = batches[-1]
+                            batches[-1] = (
+                                batch[0],
+                                batch[1] + 1,
+                                batch[2],
+                                end - batch[2],
+                                batch[4],
+                                batch[5],
+                            )
+                        else:
+                            batches.append(
+                                (
+                                    n,
+                                    1,
+                                    start,
+                                    end - start,
+                                    context_key[1],
+                                    context_key[2],
+                                )
+                            )
+                        batch_open = True
+                        continue
+
+                    # Other markup changes the context, and ends the current batch.
+                    context_key = None
+                    batch_open = False
+                    if not root:
+                        root = qname
+                    if kind == _MARKUP_END:
+                        if element_stack:
+                            (is_volume, volume) = element_stack.pop()
+                            if is_volume and volume == prestream_volume:
+                                volumes[volume][1] = start - volumes[volume][0]
+                                prestream_volume = -1
+                        continue
+
+                    (prefix, _, local_name) = qname.rpartition(b":")
+                    is_volume = (
+                        local_name == b"volume"
+                        and _markup_namespace(ns_stack, prefix) == dfxml_ns
+                    )
+                    if is_volume:
+                        (head, tail) = _root_tags(root, ns_stack)
+                        if kind == _MARKUP_EMPTY:
+                            volumes.append([start, end - start, head, tail])
+                        else:
+                            prestream_volume = len(volumes)
+                            volumes.append([start, -1, head, b"</%s>" % qname + tail])
+                    if kind == _MARKUP_START:
+                        element_stack.append((is_volume, len(volumes) - 1))
+            finally:
+                if isinstance(m, mmap.mmap):
+                    m.close()
+
+        length = len(columns["offset"])
+        fields = ["partition", "inode", "id", "filename"]
+        tasks = (
+            (path, offset, span, head, tail, backend, fields, None)
+            for (_, _, offset, span, head, tail) in batches
+        )
+        if not workers is None and workers > 1:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers
+            ) as executor:
+                results = executor.map(_parse_file_object_chunk, *zip(*tasks))
+                FileObjectIndex._fill_columns(columns, batches, results)
+        else:
+            results = (_parse_file_object_chunk(*task) for task in tasks)
+            FileObjectIndex._fill_columns(columns, batches, results)
+
+        partitions = columns["partition"]
+        inodes = columns["inode"]
+        name_hashes = columns["name_hash"]
+        ids = columns["id"]
+        columns["by_inode"].extend(
+            sorted(range(length), key=lambda n: (inodes[n], partitions[n]))
+        )
+        columns["by_name_hash"].extend(
+            sorted(range(length), key=name_hashes.__getitem__)
+        )
+        columns["by_id"].extend(sorted(range(length), key=ids.__getitem__))
+
+        trailer = json.dumps(
+            {
+                "contexts": [
+                    [volume, head.decode("utf-8"), tail.decode("utf-8")]
+                    for (volume, head, tail) in contexts
+                ],
+                "volumes": [
+                    [offset, span, head.decode("utf-8"), tail.decode("utf-8")]
+                    for (offset, span, head, tail) in volumes
+                ],
+            }
+        ).encode("utf-8")
+        header = FileObjectIndex._header.pack(
+            FileObjectIndex._magic,
+            FileObjectIndex.VERSION,
+            sys.byteorder == "big",
+            len(FileObjectIndex._columns),
+            stat.st_size,
+            stat.st_mtime_ns,
+            length,
+            len(trailer),
+        )
+
+        temp_path = "%s.%d.tmp" % (index_path, os.getpid())
+        try:
+            with open(temp_path, "wb") as fh:
+                fh.write(header)
+                for name in FileObjectIndex._columns:
+                    columns[name].tofile(fh)
+                fh.write(trailer)
+            os.replace(temp_path, index_path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+        return cls(path, index_path, backend=backend)
+
+    def by_filename(self, filename: str) -> typing.List[FileObject]:
+        """Returns the FileObjects with filename filename, in document order."""
+        name_hashes = self._views["name_hash"]
+        return [
+            fobj
+            for n in self._find(
+                "by_name_hash",
+                name_hashes.__getitem__,
+                FileObjectIndex._name_hash(filename),
+            )
+            for fobj in [self._parse_record(n)]
+            if fobj.filename == filename
+        ]
+
+    def by_id(self, id: int) -> typing.List[FileObject]:
+        """Returns the FileObjects with id id, in document order."""
+        return [
+            self._parse_record(n)
+            for n in self._find("by_id", self._views["id"].__getitem__, id)
+        ]
+
+    def by_inode(
+        self, inode: int, partition: typing.Optional[int] = None
+    ) -> typing.List[FileObject]:
+        """Returns the FileObjects with inode number inode, and with partition number partition if it is not None, in document order."""
+        inodes = self._views["inode"]
+        partitions = self._views["partition"]
+        if partition is None:
+            records = self._find("by_inode", inodes.__getitem__, inode)
+        else:
+            records = self._find(
+                "by_inode",
+                lambda n: (inodes[n], partitions[n]),
+                (inode, partition),
+            )
+        return [self._parse_record(n) for n in records]
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._index_mm.close()
+        if not self._mm is None:
+            self._mm.close()
+
+    @staticmethod
+    def default_index_path(path: str) -> str:
+        return path + ".idx"
+
+    @staticmethod
+    def _fill_columns(
+        columns: typing.Dict[str, array.array],
+        batches: typing.List[typing.Tuple[int, int, int, int, bytes, bytes]],
+        results: typing.Iterable[
+            typing.Tuple[typing.List[typing.Tuple[str, str]], typing.List[FileObject]]
+        ],
+    ) -> None:
+        """Appends the indexed properties of the FileObjects parsed from each batch to columns."""
+        null = FileObjectTable.NULL_INT
+        for batch, (_, fobjs) in zip(batches, results):
+            if len(fobjs) != batch[1]:
+                raise ValueError(
+                    "Expected %d FileObjects from byte offset %d, parsed %d."
+                    % (batch[1], batch[2], len(fobjs))
+                )
+            for fobj in fobjs:
+                columns["partition"].append(
+                    null if fobj.partition is None else fobj.partition
+                )
+                columns["inode"].append(null if fobj.inode is None else fobj.inode)
+                columns["id"].append(null if fobj.id is None else fobj.id)
+                columns["name_hash"].append(FileObjectIndex._name_hash(fobj.filename))
+
+    @staticmethod
+    def is_current(path: str, index_path: typing.Optional[str] = None) -> bool:
+        """Returns True if the index file of the DFXML file at path exists, and is usable and up to date."""
+        index_path = index_path or FileObjectIndex.default_index_path(path)
+        try:
+            with open(index_path, "rb") as fh:
+                header = fh.read(FileObjectIndex._header.size)
+        except FileNotFoundError:
+            return False
+        return FileObjectIndex._header_problem(path, header) is None
+
+    @property
+    def index_path(self) -> str:
+        """Path to the index file."""
+        return self._index_path
+
+    @property
+    def path(self) -> str:
+        """Path to the indexed DFXML file."""
+        return self._path
+
+    def volume(self, ordinal: int) -> typing.Optional[VolumeObject]:
+        """Returns a VolumeObject with the properties preceding the first file of the volume numbered ordinal (counting <volume> elements from 0, in document order).  The VolumeObject is parsed on first request and cached."""
+        if not ordinal in self._volumes:
+            assert not self._mm is None
+            (offset, length, head, tail) = self._volume_spans[ordinal]
+            vobj = None
+            for event, obj in Parser().iterparse(
+                io.BytesIO(head + self._mm[offset : offset + length] + tail),
+                ("end",),
+                backend=self._backend,
+            ):
+                if isinstance(obj, VolumeObject):
+                    vobj = obj
+            self._volumes[ordinal] = vobj
+        return self._volumes[ordinal]
+
+
+class ByteRunIndex(object):
+    """
+    A persistent sidecar index of the image byte runs of the FileObjects of a DFXML file, answering which files hold a byte, sector or range of the disk image.
+
+    The index is built by one pass of iterparse() over the DFXML file (see build()), and records each byte run with an image offset and a positive length:  its image byte range, its facet ("data", "inode" or "name"), the byte run's ordinal within its facet's ByteRuns, its offset within the facet's contents, and the record number of its FileObject.  Records are numbered in document order, as FileObjectIndex numbers them, so FileObjectIndex(path)[record] returns a hit's FileObject.  Fill runs, and runs without an image offset, are not indexed.
+
+    Byte runs are stored as a nested containment list:  a list of runs sorted by image offset, none of which contains another, in which each run refers to the sorted sublist of the runs it contains.  Within each list the runs' ends are sorted too, so the runs overlapping a range are found by binary search and a scan, and overlapping() returns the k runs overlapping a range of n indexed runs in O(log n + k) time when runs rarely nest, as for the runs of a file system.
+
+    The index file (by default, the DFXML file's path with ".runs" appended) stores the DFXML file's size and modification time.  Opening an index raises ValueError if the DFXML file has changed since the index was built; open_byte_run_index() rebuilds the index instead.  Like FileObjectIndex files, index files are memory-mapped, store integers in the byte order of the machine that built them, and are not portable between byte orders.
+
+    Query methods return hits, tuples of (record, facet, img_offset, len, file_offset), sorted by image offset.
+    """
+
+    VERSION = 1
+
+    FACETS = ("data", "inode", "name")
+
+    _magic = b"DFXMLBRI"
+    _header = struct.Struct("<8sHHIqqqqqq")
+    # Fixed-width (64-bit) columns of the byte runs, in nested containment list order.  sub_start and sub_count locate the sublist of the runs contained by a run.  by_start is a permutation of the runs, sorted by image offset.
+    _run_columns = [
+        "start",
+        "end",
+        "record",
+        "facet",
+        "run",
+        "file_offset",
+        "sub_start",
+        "sub_count",
+        "by_start",
+    ]
+    # Fixed-width (64-bit) columns of the records.  Filenames are UTF-8 in a block following the columns; null filenames have name_length -1.
+    _record_columns = ["name_offset", "name_length"]
+
+    def __init__(self, path: str, index_path: typing.Optional[str] = None) -> None:
+        """
+        Opens an existing index.  Raises ValueError if the index file is not an index of this version, or if the DFXML file has changed since the index was built.
+
+        @param path: Path to the DFXML file.
+        @param index_path: Optional.  Path to the index file.  Default: path + ".runs".
+        """
+        self._path = path
+        self._index_path = index_path or ByteRunIndex.default_index_path(path)
+        self._views: typing.Dict[str, memoryview] = dict()
+
+        with open(self._index_path, "rb") as fh:
+            header = fh.read(ByteRunIndex._header.size)
+            problem = ByteRunIndex._header_problem(path, header)
+            if not problem is None:
+                raise ValueError("%s: %r." % (problem, self._index_path))
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            _,
+            _,
+            _,
+            _,
+            _,
+            _,
+            self._length,
+            self._record_count,
+            self._top_count,
+            names_length,
+        ) = ByteRunIndex._header.unpack(header)
+
+        pos = ByteRunIndex._header.size
+        view = memoryview(self._mm)
+        for names, count in [
+            (ByteRunIndex._run_columns, self._length),
+            (ByteRunIndex._record_columns, self._record_count),
+        ]:
+            for name in names:
+                self._views[name] = view[pos : pos + 8 * count].cast("q")
+                pos += 8 * count
+        self._names = view[pos : pos + names_length]
+        view.release()
+
+    def __enter__(self) -> ByteRunIndex:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """The number of indexed byte runs."""
+        return self._length
+
+    @staticmethod
+    def _header_problem(path: str, header: bytes) -> typing.Optional[str]:
+        """Returns why an index file with header bytes header cannot be used for the DFXML file at path, or None if it can."""
+        if len(header) < ByteRunIndex._header.size:
+            return "Truncated ByteRunIndex file"
+        (
+            magic,
+            version,
+            big_endian,
+            column_count,
+            size,
+            mtime_ns,
+            _,
+            _,
+            _,
+            _,
+        ) = ByteRunIndex._header.unpack(header)
+        if magic != ByteRunIndex._magic:
+            return "Not a ByteRunIndex file"
+        if version != ByteRunIndex.VERSION or column_count != len(
+            ByteRunIndex._run_columns
+        ) + len(ByteRunIndex._record_columns):
+            return "Unsupported ByteRunIndex version %r" % version
+        if bool(big_endian) != (sys.byteorder == "big"):
+            return "ByteRunIndex file built with a different byte order"
+        stat = os.stat(path)
+        if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+            return "Stale ByteRunIndex file; %r has changed" % path
+        return None
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        index_path: typing.Optional[str] = None,
+        *,
+        backend: typing.Union[None, str, AbstractParserBackend] = None,
+    ) -> ByteRunIndex:
+        """
+        Builds the index of the DFXML file at path, overwriting any index file, and returns it opened.  The index file is written to a temporary file and then renamed, so readers never see a partial index.
+
+        @param path: Path to the DFXML file.
+        @param index_path: Optional.  Path to the index file.  Default: path + ".runs".
+        @param backend: Optional.  The XML parser backend.  See iterparse().
+        """
+        index_path = index_path or ByteRunIndex.default_index_path(path)
+        stat = os.stat(path)
+
+        starts = array.array("q")
+        ends = array.array("q")
+        records = array.array("q")
+        facets = array.array("q")
+        runs = array.array("q")
+        file_offsets = array.array("q")
+        name_offsets = array.array("q")
+        name_lengths = array.array("q")
+        names = bytearray()
+        facet_codes = {facet: code for (code, facet) in enumerate(ByteRunIndex.FACETS)}
+
+        record = 0
+        for event, obj in iterparse(
+            path,
+            ("end",),
+            backend=backend,
+            fields=["filename", "data_brs", "inode_brs", "name_brs"],
+        ):
+            if not isinstance(obj, FileObject):
+                continue
+            if obj.filename is None:
+                name_offsets.append(len(names))
+                name_lengths.append(-1)
+            else:
+                encoded = obj.filename.encode("utf-8")
+                name_offsets.append(len(names))
+                name_lengths.append(len(encoded))
+                names += encoded
+            for facet, code in facet_codes.items():
+                brs = getattr(obj, FileObject._br_facet_to_property[facet])
+                if brs is None:
+                    continue
+                file_offset = 0
+                for run_number, run in enumerate(brs):
+                    if not run.file_offset is None:
+                        file_offset = run.file_offset
+                    if not run.img_offset is None and run.len and run.fill is None:
+                        starts.append(run.img_offset)
+                        ends.append(run.img_offset + run.len)
+                        records.append(record)
+                        facets.append(code)
+                        runs.append(run_number)
+                        file_offsets.append(file_offset)
+                    file_offset += run.len or 0
+            record += 1
+
+        columns = ByteRunIndex._nest(starts, ends, records, facets, runs, file_offsets)
+        length = len(starts)
+        header = ByteRunIndex._header.pack(
+            ByteRunIndex._magic,
+            ByteRunIndex.VERSION,
+            sys.byteorder == "big",
+            len(ByteRunIndex._run_columns) + len(ByteRunIndex._record_columns),
+            stat.st_size,
+            stat.st_mtime_ns,
+            length,
+            record,
+            columns.pop("top_count"),
+            len(names),
+        )
+
+        temp_path = "%s.%d.tmp" % (index_path, os.getpid())
+        try:
+            with open(temp_path, "wb") as fh:
+                fh.write(header)
+                for name in ByteRunIndex._run_columns:
+                    columns[name].tofile(fh)
+                name_offsets.tofile(fh)
+                name_lengths.tofile(fh)
+                fh.write(names)
+            os.replace(temp_path, index_path)
+        except BaseException:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+        return cls(path, index_path)
+
+    @staticmethod
+    def _nest(
+        starts: array.array,
+        ends: array.array,
+        records: array.array,
+        facets: array.array,
+        runs: array.array,
+        file_offsets: array.array,
+    ) -> typing.Dict[str, typing.Any]:
+        """Returns the run columns of ByteRunIndex._run_columns, laid out as a nested containment list of the byte runs, and the length of its top-level list, as "top_count"."""
+        length = len(starts)
+        order = sorted(
+            range(length),
+            key=lambda n: (starts[n], -ends[n], records[n], facets[n], runs[n]),
+        )
+        # The runs directly contained by each run, found with the stack of the runs containing the current run.  Runs are visited in order of image offset, and for equal offsets longest first, so a run's container is on the stack.
+        top: typing.List[int] = []
+        children: typing.Dict[int, typing.List[int]] = dict()
+        stack: typing.List[int] = []
+        for n in order:
+            end = ends[n]
+            while stack and ends[stack[-1]] < end:
+                stack.pop()
+            if stack:
+                children.setdefault(stack[-1], []).append(n)
+            else:
+                top.append(n)
+            stack.append(n)
+
+        # Lists are laid out breadth first, so each list is contiguous.
+        layout = list(top)
+        sub_starts = array.array("q", bytes(8 * length))
+        sub_counts = array.array("q", bytes(8 * length))
+        position = 0
+        while position < len(layout):
+            contained = children.get(layout[position])
+            if not contained is None:
+                sub_starts[position] = len(layout)
+                sub_counts[position] = len(contained)
+                layout.extend(contained)
+            position += 1
+        positions = array.array("q", bytes(8 * length))
+        for position, n in enumerate(layout):
+            positions[n] = position
+
+        columns: typing.Dict[str, typing.Any] = {
+            name: array.array("q", [column[n] for n in layout])
+            for (name, column) in [
+                ("start", starts),
+                ("end", ends),
+                ("record", records),
+                ("facet", facets),
+                ("run", runs),
+                ("file_offset", file_offsets),
+            ]
+        }
+        columns["sub_start"] = sub_starts
+        columns["sub_count"] = sub_counts
+        columns["by_start"] = array.array("q", [positions[n] for n in order])
+        columns["top_count"] = len(top)
+        return columns
+
+    def _hit(self, position: int) -> typing.Tuple[int, str, int, int, int]:
+        views = self._views
+        start = views["start"][position]
+        return (
+            views["record"][position],
+            ByteRunIndex.FACETS[views["facet"][position]],
+            start,
+            views["end"][position] - start,
+            views["file_offset"][position],
+        )
+
+    def _facet_codes(
+        self, facets: typing.Optional[typing.Iterable[str]]
+    ) -> typing.Optional[typing.Set[int]]:
+        if facets is None:
+            return None
+        if isinstance(facets, str):
+            facets = [facets]
+        codes = set()
+        for facet in facets:
+            if not facet in ByteRunIndex.FACETS:
+                raise ValueError(
+                    "A ByteRunIndex facet must be one of these: %r.  Received: %r."
+                    % (ByteRunIndex.FACETS, facet)
+                )
+            codes.add(ByteRunIndex.FACETS.index(facet))
+        return codes
+
+    def at(
+        self, offset: int, facets: typing.Optional[typing.Iterable[str]] = None
+    ) -> typing.List[typing.Tuple[int, str, int, int, int]]:
+        """Returns the hits of the byte runs holding the image byte at offset offset."""
+        return self.overlapping(offset, 1, facets)
+
+    def close(self) -> None:
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._names.release()
+        self._mm.close()
+
+    @staticmethod
+    def default_index_path(path: str) -> str:
+        return path + ".runs"
+
+    def filename(self, record: int) -> typing.Optional[str]:
+        """Returns the filename of the FileObject of record number record."""
+        if record < 0 or record >= self._record_count:
+            raise IndexError("ByteRunIndex record number out of range: %r." % record)
+        length = self._views["name_length"][record]
+        if length < 0:
+            return None
+        offset = self._views["name_offset"][record]
+        return str(self._names[offset : offset + length], "utf-8")
+
+    @property
+    def index_path(self) -> str:
+        """Path to the index file."""
+        return self._index_path
+
+    @staticmethod
+    def is_current(path: str, index_path: typing.Optional[str] = None) -> bool:
+        """Returns True if the index file of the DFXML file at path exists, and is usable and up to date."""
+        index_path = index_path or ByteRunIndex.default_index_path(path)
+        try:
+            with open(index_path, "rb") as fh:
+                header = fh.read(ByteRunIndex._header.size)
+        except FileNotFoundError:
+            return False
+        return ByteRunIndex._header_problem(path, header) is None
+
+    def overlapping(
+        self,
+        offset: int,
+        length: int,
+        facets: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.List[typing.Tuple[int, str, int, int, int]]:
+        """
+        Returns the hits of the byte runs overlapping the length bytes of the image at offset offset.
+
+        @param facets: Optional.  A facet name, or names, of the byte runs to return.  Default: all facets.
+        """
+        codes = self._facet_codes(facets)
+        if length <= 0:
+            return []
+        end = offset + length
+        starts = self._views["start"]
+        ends = self._views["end"]
+        sub_starts = self._views["sub_start"]
+        sub_counts = self._views["sub_count"]
+        found = []
+        lists = [(0, self._top_count)]
+        while lists:
+            (lo, hi) = lists.pop()
+            # The first run of the list ending after offset.
+            position = bisect.bisect_right(ends, offset, lo, hi)
+            while position < hi and starts[position] < end:
+                found.append(position)
+                if sub_counts[position]:
+                    lists.append(
+                        (
+                            sub_starts[position],
+                            sub_starts[position] + sub_counts[position],
+                        )
+                    )
+                position += 1
+        if not codes is None:
+            facet_column = self._views["facet"]
+            found = [position for position in found if facet_column[position] in codes]
+        hits = [self._hit(position) for position in found]
+        hits.sort(key=lambda hit: (hit[2], hit[0], hit[1]))
+        return hits
+
+    @property
+    def path(self) -> str:
+        """Path to the indexed DFXML file."""
+        return self._path
+
+    @property
+    def record_count(self) -> int:
+        """The number of FileObjects of the DFXML file, including those without indexed byte runs."""
+        return self._record_count
+
+    def runs(
+        self, facets: typing.Optional[typing.Iterable[str]] = None
+    ) -> typing.Iterator[typing.Tuple[int, str, int, int, int]]:
+        """Generator.  Yields the hits of all indexed byte runs, in image order."""
+        codes = self._facet_codes(facets)
+        facet_column = self._views["facet"]
+        for position in self._views["by_start"]:
+            if codes is None or facet_column[position] in codes:
+                yield self._hit(position)
+
+    def sector(
+        self,
+        sector: int,
+        sector_size: int = 512,
+        facets: typing.Optional[typing.Iterable[str]] = None,
+    ) -> typing.List[typing.Tuple[int, str, int, int, int]]:
+        """Returns the hits of the byte runs overlapping image sector number sector."""
+        return self.overlapping(sector * sector_size, sector_size, facets)
+
+
+def open_indexed(
+    filename: str,
+    *,
+    index_path: typing.Optional[str] = None,
+    backend: typing.Union[None, str, AbstractParserBackend] = None,
+    workers: typing.Optional[int] = None,
+) -> FileObjectIndex:
+    """
+    Returns a FileObjectIndex of the DFXML file filename, for random access to its FileObjects.  The index file is built (see FileObjectIndex.build) if it does not exist, or if filename has changed since it was built.
+
+    @param index_path: Optional.  Path to the index file.  Default: filename + ".idx".
+    @param backend: Optional.  The XML parser backend.  See iterparse().
+    @param workers: Optional.  The number of worker processes used if the index is built.  See FileObjectIndex.build().
+    """
+    if FileObjectIndex.is_current(filename, index_path):
+        return FileObjectIndex(filename, index_path, backend=backend)
+    return FileObjectIndex.build(filename, index_path, backend=backend, workers=workers)
+
+
+def open_byte_run_index(
+    filename: str,
+    *,
+    index_path: typing.Optional[str] = None,
+    backend: typing.Union[None, str, AbstractParserBackend] = None,
+) -> ByteRunIndex:
+    """
+    Returns a ByteRunIndex of the DFXML file filename, for finding the files holding bytes of the disk image.  The index file is built (see ByteRunIndex.build) if it does not exist, or if filename has changed since it was built.
+
+    @param index_path: Optional.  Path to the index file.  Default: filename + ".runs".
+    @param backend: Optional.  The XML parser backend used if the index is built.  See iterparse().
+    """
+    if ByteRunIndex.is_current(filename, index_path):
+        return ByteRunIndex(filename, index_path)
+    return ByteRunIndex.build(filename, index_path, backend=backend)
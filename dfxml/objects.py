@@ -34,14 +34,29 @@ __version__ = "0.13.0"
 # * Compatibility with the DFXML schema, version >=2.0.0.
 
 import abc
+import asyncio
+import collections
+import concurrent.futures
+import contextlib
 import copy
+import datetime
+import fnmatch
+import functools
+import importlib
+import io
+import itertools
 import logging
+import math
+import mmap
 import os
 import platform
+import queue
 import re
+import shlex
 import struct
 import subprocess
 import sys
+import threading
 import typing
 import warnings
 import xml.etree.ElementTree as ET
@@ -50,6 +65,12 @@ import xml.etree.ElementTree as ET
 # There may be a cleaner way to do this.
 sys.path.append(os.path.dirname(__file__) + "/..")
 import dfxml  # type: ignore
+from dfxml.image_io import (
+    ImageReadScheduler,
+    RawImageReader,
+    _iter_fill,
+    _shared_raw_image_reader,
+)
 
 _logger = logging.getLogger(os.path.basename(__file__))
 
@@ -63,6 +84,19 @@ _warned_hashes = set([])
 # Contains: Unexpected 'facet' values on byte_runs elements.
 _warned_byterun_facets = set([])
 
+# Element classes accepted by the FileObject-family populate_from_Element methods:  ElementTree's, and lxml's if lxml is installed, as LXMLParserBackend passes <fileobject> elements through as lxml Elements.
+_element_classes: typing.Tuple[type, ...] = (ET.Element, ET.ElementTree)
+try:
+    import lxml.etree  # type: ignore
+except ImportError:
+    pass
+else:
+    _element_classes += (lxml.etree._Element,)
+
+# Shared instances of repeated small values, such as file modes, owner IDs and timestamp precisions.  See _intern.
+_interned_values: typing.Dict[typing.Tuple[type, typing.Any], typing.Any] = dict()
+_INTERNED_VALUES_MAX = 65536
+
 XMLNS_REGXML = "http://www.forensicswiki.org/wiki/RegXML"
 XMLNS_DFXML_EXT = dfxml.XMLNS_DFXML + "#extensions"
 
@@ -100,6 +134,72 @@ def _ET_tostring(e):
     return retval
 
 
+# ElementTree's escaping functions.  The direct serializers (see FileObject.to_dfxml) use them, so their text matches ET.tostring's.
+_ET_escape_attrib = ET._escape_attrib  # type: ignore
+_ET_escape_cdata = ET._escape_cdata  # type: ignore
+
+
+def _append_text_element(
+    parts: typing.List[str],
+    tag: str,
+    text: typing.Optional[str],
+    attributes: str = "",
+) -> None:
+    """Appends to parts the XML text of an element without child elements, as ET.tostring writes it.  attributes is the element's serialized attributes, each with a leading space."""
+    if text:
+        parts.append("<%s%s>%s</%s>" % (tag, attributes, _ET_escape_cdata(text), tag))
+    else:
+        parts.append("<%s%s />" % (tag, attributes))
+
+
+def _dfxml_text(obj) -> str:
+    """Returns the XML text of an object with an _append_dfxml method."""
+    parts: typing.List[str] = []
+    obj._append_dfxml(parts)
+    return "".join(parts)
+
+
+def _as_ET_Element(e) -> ET.Element:
+    """Returns e if it is an ElementTree Element.  Otherwise, returns an ElementTree copy of the element-like object e (e.g. an lxml Element), including its descendants.  This is used where Elements are retained past parsing, such as in .externals lists."""
+    if isinstance(e, ET.Element):
+        return e
+    retval = ET.Element(e.tag, dict(e.attrib))
+    retval.text = e.text
+    retval.tail = e.tail
+    for ce in e:
+        retval.append(_as_ET_Element(ce))
+    return retval
+
+
+def _intern(val):
+    """Returns a shared instance equal to val, so properties that repeat a few distinct immutable values across many objects do not each hold a copy.  Preserves nulls.  Once the cache is full, values are returned as-is."""
+    if val is None:
+        return None
+    key = (type(val), val)
+    shared = _interned_values.get(key)
+    if shared is None:
+        if len(_interned_values) < _INTERNED_VALUES_MAX:
+            _interned_values[key] = val
+        return val
+    return shared
+
+
+def _epoch_seconds(tobj: typing.Optional[TimestampObject]) -> float:
+    """Returns the seconds since the Unix epoch of a TimestampObject's time, treating times without a time zone as UTC.  Returns NaN for nulls.  Unlike TimestampObject.timestamp, this does not depend on the local time zone."""
+    if tobj is None or tobj.time is None:
+        return math.nan
+    return _iso8601_epoch_seconds(tobj.time.iso8601())
+
+
+@functools.lru_cache(maxsize=dfxml.ISO8601_CACHE_SIZE)
+def _iso8601_epoch_seconds(text: str) -> float:
+    """See _epoch_seconds."""
+    dt = dfxml.iso8601Tdatetime(text)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.timestamp()
+
+
 def _boolcast(val):
     """Takes Boolean values, and 0 or 1 in string or integer form, and casts them all to Boolean.  Preserves nulls.  Balks at everything else."""
     if val is None:
@@ -205,16 +305,25 @@ class AbstractObject(abc.ABC):
     This class is an abstract superclass of all of the *Object classes defined in objects.py, from DFXMLObject through to ByteRun.  It is provided for type-system convenience, particularly with parsing functions.
     """
 
+    # The abstract classes declare (possibly empty) __slots__, so the numerous leaf objects (FileObject, ByteRun, ByteRuns, TimestampObject) can be slotted and not carry per-instance dictionaries.
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs) -> None:
         # Match signature of object.__init__().
         super().__init__()
 
+    def _modified(self) -> None:
+        """Called when the object's value changes.  See FileObject.raw_dfxml."""
+        pass
+
 
 class AbstractChildObject(AbstractObject):
     """
     This abstract superclass represents Objects that can be contained in some parent layer, such as a file that can be in a file system.  It is designed to exclude the top "Document" object, DFXMLObject.
     """
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
@@ -390,8 +499,17 @@ class DFXMLObject(AbstractParentObject):
                 # Put all non-DFXML-namespace elements into the externals list.
                 self.externals.append(ce)
 
-    def print_dfxml(self, output_fh: typing.IO[str] = sys.stdout) -> None:
-        """Memory-efficient DFXML document printer.  However, it assumes the whole element tree is already constructed."""
+    def print_dfxml(
+        self,
+        output_fh: typing.IO[str] = sys.stdout,
+        workers: typing.Optional[int] = None,
+    ) -> None:
+        """
+        Memory-efficient DFXML document printer.  However, it assumes the whole element tree is already constructed.
+
+        @param output_fh: A text file handle.  Optional.  Default: sys.stdout.
+        @param workers: Optional.  If greater than 1, the number of worker processes that serialize FileObjects.  Each worker process receives the document's FileObjects once, when it starts, and serializes batches of them; their text is written in document order, so the output is the same as without workers.
+        """
         pe = self.to_partial_Element()
         dfxml_wrapper = _ET_tostring(pe)
         # _logger.debug("print_dfxml:dfxml_wrapper = %r." % dfxml_wrapper)
@@ -413,7 +531,7 @@ class DFXMLObject(AbstractParentObject):
             % len(self.disk_images)
         )
         for di in self._disk_images:
-            di.print_dfxml(output_fh)
+            di.print_dfxml(output_fh, workers)
             output_fh.write("\n")
 
         _logger.debug(
@@ -421,7 +539,7 @@ class DFXMLObject(AbstractParentObject):
             % len(self.partition_systems)
         )
         for ps in self._partition_systems:
-            ps.print_dfxml(output_fh)
+            ps.print_dfxml(output_fh, workers)
             output_fh.write("\n")
 
         _logger.debug(
@@ -429,23 +547,20 @@ class DFXMLObject(AbstractParentObject):
             % len(self.partitions)
         )
         for p in self._partitions:
-            p.print_dfxml(output_fh)
+            p.print_dfxml(output_fh, workers)
             output_fh.write("\n")
 
         _logger.debug(
             "Writing %d volume objects for the document object." % len(self.volumes)
         )
         for v in self._volumes:
-            v.print_dfxml(output_fh)
+            v.print_dfxml(output_fh, workers)
             output_fh.write("\n")
 
         _logger.debug(
             "Writing %d file objects for the document object." % len(self.files)
         )
-        for f in self._files:
-            e = f.to_Element()
-            output_fh.write(_ET_tostring(e))
-            output_fh.write("\n")
+        _print_file_objects(self._files, output_fh, workers)
 
         output_fh.write(dfxml_foot)
         output_fh.write("\n")
@@ -880,7 +995,77 @@ class RegXMLObject(AbstractParentObject):
         return _ET_tostring(self.to_Element())
 
 
-class ByteRun(AbstractObject):
+# Cache of classes to the names of the slots of the class and its superclasses.  See _class_slots.
+_class_slot_names: typing.Dict[type, typing.FrozenSet[str]] = dict()
+
+
+def _class_slots(cls: type) -> typing.FrozenSet[str]:
+    """Returns the names of the slots of cls and its superclasses."""
+    if not cls in _class_slot_names:
+        names: typing.Set[str] = set()
+        for klass in cls.__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            names.update([slots] if isinstance(slots, str) else slots)
+        _class_slot_names[cls] = frozenset(names)
+    return _class_slot_names[cls]
+
+
+def _set_slot_state(obj: object, state) -> None:
+    """Restores the state of a slotted object, as the default pickling protocol does."""
+    if isinstance(state, tuple):
+        (state, slot_state) = state
+    else:
+        slot_state = None
+    if state:
+        obj.__dict__.update(state)
+    if slot_state:
+        for name, value in slot_state.items():
+            object.__setattr__(obj, name, value)
+
+
+def _owned_object_state(obj: AbstractObject):
+    """Returns the pickling state of a slotted object that has an owner, without the owner.  Pickling or copying the owner would pickle or copy the whole owning FileObject; the owner takes ownership of its restored property values."""
+    return (
+        getattr(obj, "__dict__", None),
+        {
+            name: getattr(obj, name)
+            for name in _class_slots(type(obj))
+            if name != "_owner" and hasattr(obj, name)
+        },
+    )
+
+
+class _OwnedObject(AbstractObject):
+    """
+    An object a FileObject holds as a property value:  A ByteRuns, one of its ByteRun objects, or a TimestampObject.  Changes to the object are reported to its owner (the FileObject, or the ByteRuns holding a ByteRun), so a FileObject knows when its retained source text stops representing it.  See FileObject.raw_dfxml.
+    """
+
+    # The owner is a back-reference, not part of the object's value.
+    __slots__ = ("_owner",)
+
+    _owner: typing.Optional[AbstractObject]
+
+    def __getstate__(self):
+        return _owned_object_state(self)
+
+    def __setstate__(self, state) -> None:
+        self._owner = None
+        _set_slot_state(self, state)
+
+    def _modified(self) -> None:
+        owner = self._owner
+        if not owner is None:
+            owner._modified()
+
+    def _set_owner(self, owner: AbstractObject) -> None:
+        """Reports changes to owner from now on.  A previous, different owner is reported modified, as further changes will not reach it."""
+        previous = self._owner
+        if not previous is None and not previous is owner:
+            previous._modified()
+        self._owner = owner
+
+
+class ByteRun(_OwnedObject):
     _class_properties: typing.List[str] = [
         "img_offset",
         "fs_offset",
@@ -906,7 +1091,10 @@ class ByteRun(AbstractObject):
         "sha512",
     ]
 
+    __slots__ = ["_has_hash_property"] + ["_" + prop for prop in _class_properties]
+
     def __init__(self, *args, **kwargs) -> None:
+        self._owner = None
         self._has_hash_property = False
         for prop in ByteRun._class_properties:
             setattr(self, prop, kwargs.get(prop))
@@ -1002,11 +1190,41 @@ class ByteRun(AbstractObject):
                 parts.append("%s=%r" % (prop, val))
         return "ByteRun(" + ", ".join(parts) + ")"
 
+    def _append_dfxml(self, parts: typing.List[str], attributes: str = "") -> None:
+        """Appends the XML text of self.to_Element() to parts, without building the Element.  attributes is additional serialized attribute text for the element.  See FileObject.to_dfxml."""
+        attribute_parts = []
+        for prop in ByteRun._class_properties:
+            val = getattr(self, prop)
+            if val is None or prop in ByteRun._hash_properties:
+                continue
+            if isinstance(val, bytes):
+                val = struct.unpack("b", val)[0]
+            attribute_parts.append(' %s="%s"' % (prop, _ET_escape_attrib(str(val))))
+        attribute_parts.append(attributes)
+        attributes = "".join(attribute_parts)
+
+        if not self.has_hash_property:
+            parts.append("<byte_run%s />" % attributes)
+            return
+        hash_parts: typing.List[str] = []
+        for prop in sorted(ByteRun._hash_properties):
+            value = getattr(self, prop)
+            if not value is None:
+                _append_text_element(
+                    hash_parts, "hashdigest", value, ' type="%s"' % prop
+                )
+        if len(hash_parts) == 0:
+            parts.append("<byte_run%s />" % attributes)
+            return
+        parts.append("<byte_run%s>" % attributes)
+        parts.extend(hash_parts)
+        parts.append("</byte_run>")
+
     def populate_from_Element(self, e):
         global _warned_elements
         global _warned_hashes
 
-        _typecheck(e, (ET.Element, ET.ElementTree))
+        _typecheck(e, _element_classes)
 
         # Split into namespace and tagname.
         (ns, tn) = _qsplit(e.tag)
@@ -1087,12 +1305,16 @@ class ByteRun(AbstractObject):
 
         return outel
 
+    def to_dfxml(self) -> str:
+        return _dfxml_text(self)
+
     @property
     def file_offset(self):
         return self._file_offset
 
     @file_offset.setter
     def file_offset(self, val):
+        self._modified()
         self._file_offset = _intcast(val)
 
     @property
@@ -1106,6 +1328,7 @@ class ByteRun(AbstractObject):
 
     @fill.setter
     def fill(self, val):
+        self._modified()
         if val is None:
             self._fill = val
         elif val == "0":
@@ -1129,6 +1352,7 @@ class ByteRun(AbstractObject):
 
     @fs_offset.setter
     def fs_offset(self, val):
+        self._modified()
         self._fs_offset = _intcast(val)
 
     @property
@@ -1145,6 +1369,7 @@ class ByteRun(AbstractObject):
 
     @img_offset.setter
     def img_offset(self, val):
+        self._modified()
         self._img_offset = _intcast(val)
 
     @property
@@ -1153,6 +1378,7 @@ class ByteRun(AbstractObject):
 
     @len.setter
     def len(self, val):
+        self._modified()
         self._len = _intcast(val)
 
     @property
@@ -1161,6 +1387,7 @@ class ByteRun(AbstractObject):
 
     @md5.setter
     def md5(self, val):
+        self._modified()
         if not val is None:
             self._has_hash_property = True
         self._md5 = _strcast(val)
@@ -1171,6 +1398,7 @@ class ByteRun(AbstractObject):
 
     @sha1.setter
     def sha1(self, val):
+        self._modified()
         if not val is None:
             self._has_hash_property = True
         self._sha1 = _strcast(val)
@@ -1181,6 +1409,7 @@ class ByteRun(AbstractObject):
 
     @sha224.setter
     def sha224(self, val):
+        self._modified()
         if not val is None:
             self._has_hash_property = True
         self._sha224 = _strcast(val)
@@ -1191,6 +1420,7 @@ class ByteRun(AbstractObject):
 
     @sha256.setter
     def sha256(self, val):
+        self._modified()
         if not val is None:
             self._has_hash_property = True
         self._sha256 = _strcast(val)
@@ -1201,6 +1431,7 @@ class ByteRun(AbstractObject):
 
     @sha384.setter
     def sha384(self, val):
+        self._modified()
         if not val is None:
             self._has_hash_property = True
         self._sha384 = _strcast(val)
@@ -1211,6 +1442,7 @@ class ByteRun(AbstractObject):
 
     @sha512.setter
     def sha512(self, val):
+        self._modified()
         if not val is None:
             self._has_hash_property = True
         self._sha512 = _strcast(val)
@@ -1221,7 +1453,8 @@ class ByteRun(AbstractObject):
 
     @type.setter
     def type(self, val):
-        self._type = _strcast(val)
+        self._modified()
+        self._type = _intern(_strcast(val))
 
     @property
     def uncompressed_len(self):
@@ -1229,10 +1462,11 @@ class ByteRun(AbstractObject):
 
     @uncompressed_len.setter
     def uncompressed_len(self, val):
+        self._modified()
         self._uncompressed_len = _intcast(val)
 
 
-class ByteRuns(AbstractObject):
+class ByteRuns(_OwnedObject):
     """
     A list-like object for ByteRun objects.
     """
@@ -1251,6 +1485,8 @@ class ByteRuns(AbstractObject):
 
     _facet_values = [None, "data", "inode", "name"]
 
+    __slots__ = ("_facet", "_listdata")
+
     def __init__(
         self,
         run_list: typing.Optional[typing.List[ByteRun]] = None,
@@ -1258,6 +1494,7 @@ class ByteRuns(AbstractObject):
         facet: typing.Optional[str] = None,
         **kwargs,
     ) -> None:
+        self._owner = None
         self._facet = facet
         self._listdata: typing.List[ByteRun] = []
         self._listdata = []
@@ -1268,6 +1505,7 @@ class ByteRuns(AbstractObject):
         super().__init__(*args, **kwargs)
 
     def __delitem__(self, key):
+        self._modified()
         del self._listdata[key]
 
     def __eq__(self, other: object) -> bool:
@@ -1315,6 +1553,7 @@ class ByteRuns(AbstractObject):
 
     def __setitem__(self, key, value):
         _typecheck(value, ByteRun)
+        self._modified()
         self._listdata[key] = value
 
     def append(self, value: ByteRun) -> None:
@@ -1322,6 +1561,7 @@ class ByteRuns(AbstractObject):
         Appends a ByteRun object to this container's list.
         """
         _typecheck(value, ByteRun)
+        self._modified()
         self._listdata.append(value)
 
     def glom(self, value: ByteRun) -> None:
@@ -1337,22 +1577,65 @@ class ByteRuns(AbstractObject):
             if maybe_new_run is None:
                 self.append(value)
             else:
-                self._listdata[-1] = maybe_new_run
+                self[-1] = maybe_new_run
 
     def iter_contents(
-        self, raw_image, buffer_size=1048576, sector_size=512, errlog=None, statlog=None
+        self,
+        raw_image,
+        buffer_size=1048576,
+        sector_size=512,
+        errlog=None,
+        statlog=None,
+        use_img_cat=None,
     ):
         """
-        Generator.  Yields contents, as byte strings one block at a time, given a backing raw image path.  Relies on The SleuthKit's img_cat, so contents can be extracted from any disk image type that TSK supports.
-        @param buffer_size The maximum size of the byte strings yielded.
+        Generator.  Yields contents, one block at a time, given a backing raw image path.  Raw images, and split raw images given by the path of their first segment, are read in-process, through a RawImageReader shared by the ByteRuns read from the same image, and their blocks are yielded as memoryviews.  Other images are read with The SleuthKit's img_cat, so contents can be extracted from any disk image type that TSK supports; those blocks, and the blocks of fill runs, are yielded as byte strings.
+        @param raw_image The path of the image, or a RawImageReader.
+        @param buffer_size The maximum size of the blocks yielded.
         @param sector_size The size of a disk sector in the raw image.  Required by img_cat.
+        @param errlog, statlog Paths of files recording img_cat's standard error and exit status.
+        @param use_img_cat True to read the image with img_cat, False to read it in-process as a raw image, None (the default) to use img_cat for images that are not recognized as raw images (see RawImageReader.is_raw_image).
         """
-        if not isinstance(raw_image, str):
+        if isinstance(raw_image, RawImageReader):
+            if use_img_cat:
+                raise ValueError("img_cat cannot read from a RawImageReader.")
+            reader = raw_image
+        elif not isinstance(raw_image, str):
             raise TypeError(
                 "iter_contents needs the string path to the image file.  Received: %r."
                 % raw_image
             )
+        elif use_img_cat or (
+            use_img_cat is None and not RawImageReader.is_raw_image(raw_image)
+        ):
+            reader = None
+        else:
+            reader = _shared_raw_image_reader(raw_image)
+
+        if reader is None:
+            yield from self._iter_img_cat_contents(
+                raw_image, buffer_size, sector_size, errlog, statlog
+            )
+            return
+
+        for run in self:
+            if run.len is None:
+                raise AttributeError(
+                    "Byte runs can't be extracted if a run length is undefined."
+                )
+            if not run.fill is None and len(run.fill) > 0:
+                yield from _iter_fill(run.fill, run.len, buffer_size)
+                continue
+            if run.img_offset is None:
+                raise AttributeError(
+                    "Byte runs can't be extracted if missing a fill character and image offset."
+                )
+            yield from reader.iter_range(run.img_offset, run.len, buffer_size)
 
+    def _iter_img_cat_contents(
+        self, raw_image, buffer_size, sector_size, errlog, statlog
+    ):
+        """Generator.  iter_contents, reading the image with img_cat, one subprocess per byte run."""
         stderr_fh = None
         if not errlog is None:
             stderr_fh = open(errlog, "wb")
@@ -1375,10 +1658,7 @@ class ByteRuns(AbstractObject):
 
                 # If we have a fill character, just pump out that character.
                 if not run.fill is None and len(run.fill) > 0:
-                    while len_to_read > 0:
-                        # This multiplication and slice should handle multi-byte fill characters, in case that ever comes up.
-                        yield (run.fill * buffer_size)[: min(len_to_read, buffer_size)]
-                        len_to_read -= buffer_size
+                    yield from _iter_fill(run.fill, len_to_read, buffer_size)
                     # Next byte run.
                     continue
 
@@ -1433,8 +1713,20 @@ class ByteRuns(AbstractObject):
         if not stderr_fh is None:
             stderr_fh.close()
 
+    def _append_dfxml(self, parts: typing.List[str], attributes: str = "") -> None:
+        """Appends the XML text of self.to_Element() to parts, without building the Element.  attributes is additional serialized attribute text for the element.  See FileObject.to_dfxml."""
+        if self.facet:
+            attributes = ' facet="%s"%s' % (_ET_escape_attrib(self.facet), attributes)
+        if len(self._listdata) == 0:
+            parts.append("<byte_runs%s />" % attributes)
+            return
+        parts.append("<byte_runs%s>" % attributes)
+        for run in self._listdata:
+            run._append_dfxml(parts)
+        parts.append("</byte_runs>")
+
     def populate_from_Element(self, e):
-        _typecheck(e, (ET.Element, ET.ElementTree))
+        _typecheck(e, _element_classes)
 
         # Split into namespace and tagname.
         (ns, tn) = _qsplit(e.tag)
@@ -1460,6 +1752,9 @@ class ByteRuns(AbstractObject):
             outel.attrib["facet"] = self.facet
         return outel
 
+    def to_dfxml(self) -> str:
+        return _dfxml_text(self)
+
     @property
     def facet(self):
         """Expected to be null, "data", "inode", or "name".  See FileObject.data_brs, FileObject.inode_brs, and FileObject.name_brs."""
@@ -1467,6 +1762,7 @@ class ByteRuns(AbstractObject):
 
     @facet.setter
     def facet(self, val):
+        self._modified()
         if not val is None:
             _typecheck(val, str)
         if val not in ByteRuns._facet_values:
@@ -1482,6 +1778,8 @@ class AbstractGeometricObject(AbstractObject):
     This class is an abstract superclass of all *Object classes that have a .byte_runs property.
     """
 
+    __slots__ = ("_byte_runs",)
+
     _class_properties: typing.List[str] = ["byte_runs"]
 
     def __init__(
@@ -1496,6 +1794,7 @@ class AbstractGeometricObject(AbstractObject):
 
     @byte_runs.setter
     def byte_runs(self, val: typing.Optional[ByteRuns]) -> None:
+        self._modified()
         if not val is None:
             _typecheck(val, ByteRuns)
         self._byte_runs = val
@@ -1617,7 +1916,7 @@ class DiskImageObject(
                         % ce
                     )
 
-    def print_dfxml(self, output_fh=sys.stdout):
+    def print_dfxml(self, output_fh=sys.stdout, workers: typing.Optional[int] = None):
         pe = self.to_partial_Element()
 
         if len(pe) == 0 and len(self.child_objects) == 0:
@@ -1648,21 +1947,18 @@ class DiskImageObject(
             % len(self.partition_systems)
         )
         for ps in self.partition_systems:
-            ps.print_dfxml(output_fh)
+            ps.print_dfxml(output_fh, workers)
             output_fh.write("\n")
 
         _logger.debug(
             "Writing %d volume objects for this disk image." % len(self.volumes)
         )
         for v in self.volumes:
-            v.print_dfxml(output_fh)
+            v.print_dfxml(output_fh, workers)
             output_fh.write("\n")
 
         _logger.debug("Writing %d file objects for this disk image." % len(self.files))
-        for f in self.files:
-            e = f.to_Element()
-            output_fh.write(_ET_tostring(e))
-            output_fh.write("\n")
+        _print_file_objects(self.files, output_fh, workers)
 
         for poststream_element in poststream_elements:
             output_fh.write(_ET_tostring(poststream_element))
@@ -1869,7 +2165,7 @@ class PartitionSystemObject(
 
         return retval
 
-    def print_dfxml(self, output_fh=sys.stdout):
+    def print_dfxml(self, output_fh=sys.stdout, workers: typing.Optional[int] = None):
         pe = self.to_partial_Element()
 
         if len(pe) == 0 and len(self.child_objects) == 0:
@@ -1899,15 +2195,12 @@ class PartitionSystemObject(
             % len(self.partitions)
         )
         for p in self.partitions:
-            p.print_dfxml(output_fh)
+            p.print_dfxml(output_fh, workers)
             output_fh.write("\n")
         _logger.debug(
             "Writing %d file objects for this partition system." % len(self.files)
         )
-        for f in self.files:
-            e = f.to_Element()
-            output_fh.write(_ET_tostring(e))
-            output_fh.write("\n")
+        _print_file_objects(self.files, output_fh, workers)
 
         for poststream_element in poststream_elements:
             output_fh.write(_ET_tostring(poststream_element))
@@ -2123,7 +2416,7 @@ class PartitionObject(
                         % ce
                     )
 
-    def print_dfxml(self, output_fh=sys.stdout):
+    def print_dfxml(self, output_fh=sys.stdout, workers: typing.Optional[int] = None):
         pe = self.to_partial_Element()
         dfxml_wrapper = _ET_tostring(pe)
 
@@ -2148,28 +2441,25 @@ class PartitionObject(
             % len(self.partition_systems)
         )
         for ps in self.partition_systems:
-            ps.print_dfxml(output_fh)
+            ps.print_dfxml(output_fh, workers)
             output_fh.write("\n")
 
         _logger.debug(
             "Writing %d partition objects for this partition." % len(self.partitions)
         )
         for p in self.partitions:
-            p.print_dfxml(output_fh)
+            p.print_dfxml(output_fh, workers)
             output_fh.write("\n")
 
         _logger.debug(
             "Writing %d volume objects for this partition." % len(self.volumes)
         )
         for v in self.volumes:
-            v.print_dfxml(output_fh)
+            v.print_dfxml(output_fh, workers)
             output_fh.write("\n")
 
         _logger.debug("Writing %d file objects for this partition." % len(self.files))
-        for f in self.files:
-            e = f.to_Element()
-            output_fh.write(_ET_tostring(e))
-            output_fh.write("\n")
+        _print_file_objects(self.files, output_fh, workers)
         output_fh.write(dfxml_foot)
         output_fh.write("\n")
 
@@ -2490,7 +2780,7 @@ class VolumeObject(AbstractParentObject, AbstractChildObject, AbstractGeometricO
         # _logger.debug("len(retval) = %d.", len(retval))
         return retval
 
-    def print_dfxml(self, output_fh=sys.stdout):
+    def print_dfxml(self, output_fh=sys.stdout, workers: typing.Optional[int] = None):
         pe = self.to_partial_Element()
 
         if len(pe) == 0 and len(self.child_objects) == 0:
@@ -2517,18 +2807,15 @@ class VolumeObject(AbstractParentObject, AbstractChildObject, AbstractGeometricO
         output_fh.write("\n")
         _logger.debug("Writing %d disk images for this volume." % len(self.disk_images))
         for di in self._disk_images:
-            di.print_dfxml(output_fh)
+            di.print_dfxml(output_fh, workers)
             output_fh.write("\n")
         # (Example case where this happens: HFS file system wrapping HFS+ file system.)
         _logger.debug("Writing %d volumes for this volume [sic.]." % len(self.volumes))
         for v in self._volumes:
-            v.print_dfxml(output_fh)
+            v.print_dfxml(output_fh, workers)
             output_fh.write("\n")
         _logger.debug("Writing %d file objects for this volume." % len(self.files))
-        for f in self._files:
-            e = f.to_Element()
-            output_fh.write(_ET_tostring(e))
-            output_fh.write("\n")
+        _print_file_objects(self._files, output_fh, workers)
 
         for poststream_element in poststream_elements:
             output_fh.write(_ET_tostring(poststream_element))
@@ -2727,7 +3014,7 @@ class VolumeObject(AbstractParentObject, AbstractChildObject, AbstractGeometricO
 
     @ftype_str.setter
     def ftype_str(self, val: typing.Optional[typing.Any]) -> None:
-        self._ftype_str = _strcast(val)
+        self._ftype_str = _intern(_strcast(val))
 
     @property
     def last_block(self):
@@ -2934,7 +3221,7 @@ class HiveObject(AbstractParentObject, AbstractChildObject, AbstractGeometricObj
 re_precision = re.compile(r"(?P<num>\d+)(?P<unit>(|m|n)s|d)?")
 
 
-class TimestampObject(AbstractObject):
+class TimestampObject(_OwnedObject):
     """
     Encodes the "dftime" type.  Wraps around dfxml.dftime, closely enough that this might just get folded into that class.
 
@@ -2943,7 +3230,10 @@ class TimestampObject(AbstractObject):
 
     timestamp_name_list = ["mtime", "atime", "ctime", "crtime", "dtime", "bkup_time"]
 
+    __slots__ = ("_name", "_prec", "_time", "_timestamp")
+
     def __init__(self, *args, **kwargs):
+        self._owner = None
         self.name = kwargs.get("name")
         self.prec = kwargs.get("prec")
         # _logger.debug("type(args) = %r" % type(args))
@@ -3027,8 +3317,20 @@ class TimestampObject(AbstractObject):
         if None in (self.time, other.time):
             raise ValueError("Can't compare TimestampObjects: %r, %r." % self, other)
 
+    def _append_dfxml(self, parts: typing.List[str], attributes: str = "") -> None:
+        """Appends the XML text of self.to_Element() to parts, without building the Element.  attributes is additional serialized attribute text for the element.  See FileObject.to_dfxml."""
+        _typecheck(self.name, str)
+        if self.prec:
+            attributes = ' prec="%s"%s' % (
+                _ET_escape_attrib("%d%s" % self.prec),
+                attributes,
+            )
+        _append_text_element(
+            parts, self.name, str(self.time) if self.time else None, attributes
+        )
+
     def populate_from_Element(self, e):
-        _typecheck(e, (ET.Element, ET.ElementTree))
+        _typecheck(e, _element_classes)
         if "prec" in e.attrib:
             self.prec = e.attrib["prec"]
         self.time = e.text
@@ -3044,6 +3346,9 @@ class TimestampObject(AbstractObject):
             outel.text = str(self.time)
         return outel
 
+    def to_dfxml(self) -> str:
+        return _dfxml_text(self)
+
     @property
     def name(self):
         """The type of timestamp - modified (mtime), accessed (atime), etc."""
@@ -3051,6 +3356,7 @@ class TimestampObject(AbstractObject):
 
     @name.setter
     def name(self, value):
+        self._modified()
         if not value is None:
             if not value in TimestampObject.timestamp_name_list:
                 raise ValueError(
@@ -3068,6 +3374,7 @@ class TimestampObject(AbstractObject):
 
     @prec.setter
     def prec(self, value):
+        self._modified()
         if value is None:
             self._prec = None
             return self._prec
@@ -3077,14 +3384,14 @@ class TimestampObject(AbstractObject):
             and isinstance(value[0], int)
             and isinstance(value[1], str)
         ):
-            self._prec = value
+            self._prec = _intern(value)
             return self._prec
 
         m = re_precision.match(value)
         md = m.groupdict()
         tup = (int(md["num"]), md.get("unit") or "s")
         # _logger.debug("tup = %r" % (tup,))
-        self._prec = tup
+        self._prec = _intern(tup)
 
     @property
     def time(self):
@@ -3095,19 +3402,27 @@ class TimestampObject(AbstractObject):
 
     @time.setter
     def time(self, value):
+        self._modified()
         if value is None:
             self._time = None
         else:
             checked_value = dfxml.dftime(value)
-            # _logger.debug("checked_value.timestamp() = %r" % checked_value.timestamp())
+            checked_value.validate()
             self._time = checked_value
-            # Propagate timestamp value to other formats.
-            self._timestamp = self._time.timestamp()
+            # The timestamp is derived on first request.
+            try:
+                del self._timestamp
+            except AttributeError:
+                pass
 
     @property
     def timestamp(self):
         """A Unix floating-point timestamp, as time.mktime returns.  Currently, there is no setter for this property."""
-        return self._timestamp
+        try:
+            return self._timestamp
+        except AttributeError:
+            self._timestamp = self._time.timestamp()
+            return self._timestamp
 
 
 class FileObject(AbstractChildObject, AbstractGeometricObject):
@@ -3187,11 +3502,31 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
         "sha512",
     ]
 
+    # Properties whose setters affect one another, or that are decoded from the same child elements, form groups that are decoded together.  Properties absent from this dictionary are their own group.
+    _property_groups: typing.Dict[str, str] = {
+        "alloc": "alloc",
+        "alloc_inode": "alloc",
+        "alloc_name": "alloc",
+        "unalloc": "alloc",
+        "unused": "used",
+        "used": "used",
+        "byte_runs": "byte_runs",
+        "data_brs": "byte_runs",
+    }
+
+    # Cache of child element tags to property groups, for tags whose property does not depend on attributes.
+    _tag_groups: typing.Dict[str, str] = dict()
+
     # TODO There may be need in the future to compare the annotations as well.  It complicates make_differential_dfxml too much for now.
     _incomparable_properties = set(
         ["annos", "byte_runs", "externals", "id", "unalloc", "unused", "volume_object"]
     )
 
+    # data_brs is stored as the inherited .byte_runs.  _filename_directory is the directory of a filename assigned as a PathName; it is the directory's path as a str once unpickled.  _owner is the FileObject retaining source text (see raw_dfxml) that this one is nested in, as an original_fileobject or parent_object.
+    __slots__ = ["_diffs", "_filename_directory", "_owner", "_raw_dfxml"] + [
+        "_" + prop for prop in _class_properties if prop != "data_brs"
+    ]
+
     _diff_attr_names = {
         "new": "{%s}new_file" % dfxml.XMLNS_DELTA,
         "deleted": "{%s}deleted_file" % dfxml.XMLNS_DELTA,
@@ -3202,16 +3537,23 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
     }
 
     def __init__(self, *args, **kwargs) -> None:
+        # Containers are allocated on first access of their properties, as most files have no differential annotations or externals.
+        self._annos: typing.Optional[typing.Set[str]] = None
+        self._diffs: typing.Optional[typing.Set[str]] = None
+        self._externals: typing.Optional[OtherNSElementList] = None
+        # See raw_dfxml.  The source text, and the contents of the annos, diffs and externals containers it represents.
+        self._raw_dfxml: typing.Optional[typing.Tuple[str, typing.Any]] = None
+        self._owner: typing.Optional[FileObject] = None
+
         # Prime all the properties.
         for prop in FileObject._class_properties:
             if prop == "annos":
                 continue
             elif prop == "externals":
-                setattr(self, prop, kwargs.get(prop, OtherNSElementList()))
+                if prop in kwargs:
+                    setattr(self, prop, kwargs[prop])
             else:
                 setattr(self, prop, kwargs.get(prop))
-        self._annos: typing.Set[str] = set()
-        self._diffs: typing.Set[str] = set()
 
         super().__init__(*args, **kwargs)
 
@@ -3385,23 +3727,75 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
             ):
                 yield chunk
 
-    def is_allocated(self) -> typing.Optional[bool]:
-        """Collapse potentially-partial allocation information into a yes, no, or unknown answer."""
-        if self.alloc_inode == True and self.alloc_name == True:
+    @staticmethod
+    def _allocation_status(
+        alloc: typing.Optional[bool],
+        alloc_inode: typing.Optional[bool],
+        alloc_name: typing.Optional[bool],
+    ) -> typing.Optional[bool]:
+        """Helper function for is_allocated and FileObjectFilter.matches_Element.  alloc is the stored .alloc value, not the .alloc property."""
+        if alloc_inode == True and alloc_name == True:
             return True
-        if self.alloc_inode is None and self.alloc_name is None:
-            if self.alloc is None:
-                return None
-            else:
-                return self.alloc
+        if alloc_inode is None and alloc_name is None:
+            return alloc
         # Partial allocation information at this point is assumed False.  In some file systems, like FAT, we only need one of alloc_inode and alloc_name for allocation status.  Guidelines on which should win out haven't been set yet, though, so wait on this.
         return False
 
-    def populate_from_Element(self, e):
-        """Populates this FileObject's properties from an ElementTree Element.  The Element need not be retained."""
-        global _warned_elements
-        global _warned_hashes
-        _typecheck(e, (ET.Element, ET.ElementTree))
+    def is_allocated(self) -> typing.Optional[bool]:
+        """Collapse potentially-partial allocation information into a yes, no, or unknown answer."""
+        return FileObject._allocation_status(
+            self.alloc, self.alloc_inode, self.alloc_name
+        )
+
+    @staticmethod
+    def _child_Element_group(ce) -> str:
+        """Returns the property group decoded from a direct child element of a <fileobject>, following the branches of FileObject._populate_from_child_Element.  Returns the empty string for elements that only produce warnings."""
+        group = FileObject._tag_groups.get(ce.tag)
+        if not group is None:
+            return group
+        (cns, ctn) = _qsplit(ce.tag)
+        if ctn == "byte_runs":
+            facet = ce.get("facet")
+            if facet is None:
+                return "byte_runs"
+            prop = FileObject._br_facet_to_property.get(facet, "")
+            return FileObject._property_groups.get(prop, prop)
+        elif ctn == "hashdigest":
+            type_lower = ce.get("type", "").lower()
+            if type_lower in FileObject._hash_properties:
+                return type_lower
+            return ""
+        elif ctn in FileObject._class_properties:
+            group = FileObject._property_groups.get(ctn, ctn)
+        elif cns not in [None, dfxml.XMLNS_DFXML, ""]:
+            group = "externals"
+        else:
+            group = ""
+        FileObject._tag_groups[ce.tag] = group
+        return group
+
+    @staticmethod
+    def _field_groups(fields: typing.Iterable[str]) -> typing.Set[str]:
+        """Returns the property groups to decode for a projection onto the named properties.  Raises ValueError if a name is not in FileObject._class_properties."""
+        groups = set()
+        for field in fields:
+            if not field in FileObject._class_properties:
+                raise ValueError(
+                    "Unexpected FileObject property in field projection: %r." % field
+                )
+            groups.add(FileObject._property_groups.get(field, field))
+        return groups
+
+    def populate_from_Element(
+        self, e, *, fields: typing.Optional[typing.Iterable[str]] = None
+    ):
+        """
+        Populates this FileObject's properties from an ElementTree Element.  The Element need not be retained.
+
+        @param fields: Optional.  Names of properties to populate.  Child elements for other properties are skipped, leaving those properties unset.  Properties that affect one another, such as alloc and unalloc, are populated together.
+        """
+        _typecheck(e, _element_classes)
+        groups = None if fields is None else FileObject._field_groups(fields)
 
         # _logger.debug("FileObject.populate_from_Element(%r)" % e)
 
@@ -3411,86 +3805,144 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
         # Map "delta:" attributes of <fileobject>s into the self.annos set.
         # _logger.debug("self.annos, before: %r." % self.annos)
-        _read_differential_annotations(FileObject._diff_attr_names, e, self.annos)
+        if e.keys():
+            _read_differential_annotations(FileObject._diff_attr_names, e, self.annos)
         # _logger.debug("self.annos, after: %r." % self.annos)
 
         # Look through direct-child elements for other properties.
         for ce in e.findall("./*"):
-            (cns, ctn) = _qsplit(ce.tag)
             # _logger.debug("Populating from child element: %r." % ce.tag)
-
-            # Inherit any marked changes.
-            for attr in ce.attrib:
-                # _logger.debug("Inspecting attr for diff. annos: %r." % attr)
-                (ns, an) = _qsplit(attr)
-                if an == "changed_property" and ns == dfxml.XMLNS_DELTA:
-                    # _logger.debug("Identified changed property: %r." % ctn)
-                    # TODO There may be a more elegant way of handling the hashes and any other attribute-dependent element-to-property mapping.  Probably involving XPath.
-                    if ctn == "hashdigest":
-                        if "type" not in ce.attrib:
-                            raise AttributeError(
-                                "Attribute 'type' not found.  Every hashdigest element should have a 'type' attribute to identify the hash type."
-                            )
-                        self.diffs.add(ce.attrib["type"].lower())
-                    elif ctn == "byte_runs":
-                        facet = ce.attrib.get("facet")
-                        prop = FileObject._br_facet_to_property.get(facet, "data_brs")
-                        self.diffs.add(prop)
-                    else:
-                        self.diffs.add(ctn)
-
-            if ctn == "byte_runs":
-                # byte_runs might be for file contents, the inode/MFT entry, or the directory entry naming the file.  Use the facet attribute to determine which.  If facet is absent, assume they're data byte runs.
-                if "facet" in ce.attrib:
-                    if ce.attrib["facet"] not in FileObject._br_facet_to_property:
-                        if not ce.attrib["facet"] in _warned_byterun_facets:
-                            _warned_byterun_facets.add(ce.attrib["facet"])
-                            _logger.warning(
-                                "byte_runs facet %r was unexpected.  Will not interpret this element."
-                            )
-                    else:
-                        brs = ByteRuns()
-                        brs.populate_from_Element(ce)
-                        brs.facet = ce.attrib["facet"]
-                        setattr(self, FileObject._br_facet_to_property[brs.facet], brs)
-                else:
-                    self.byte_runs = ByteRuns()
-                    self.byte_runs.populate_from_Element(ce)
-            elif ctn == "filename":
-                # If the filename element is present, its contents should be interpreted as non-null.  ce.text being null in this case implies a 0-length string, not absence of the filename property-value.
-                self.filename = ce.text or ""
-            elif ctn == "hashdigest":
-                type_lower = ce.attrib["type"].lower()
-                if type_lower in FileObject._hash_properties:
-                    setattr(self, type_lower, ce.text)
+            if not groups is None and not FileObject._child_Element_group(ce) in groups:
+                continue
+            self._populate_diffs_from_child_Element(ce)
+            self._populate_from_child_Element(ce)
+
+    def _populate_diffs_from_child_Element(self, ce) -> None:
+        """Inherits any changes marked on a direct child element of a <fileobject> into self.diffs."""
+        (cns, ctn) = _qsplit(ce.tag)
+        for attr in ce.attrib:
+            # _logger.debug("Inspecting attr for diff. annos: %r." % attr)
+            (ns, an) = _qsplit(attr)
+            if an == "changed_property" and ns == dfxml.XMLNS_DELTA:
+                # _logger.debug("Identified changed property: %r." % ctn)
+                # TODO There may be a more elegant way of handling the hashes and any other attribute-dependent element-to-property mapping.  Probably involving XPath.
+                if ctn == "hashdigest":
+                    if "type" not in ce.attrib:
+                        raise AttributeError(
+                            "Attribute 'type' not found.  Every hashdigest element should have a 'type' attribute to identify the hash type."
+                        )
+                    self.diffs.add(ce.attrib["type"].lower())
+                elif ctn == "byte_runs":
+                    facet = ce.attrib.get("facet")
+                    prop = FileObject._br_facet_to_property.get(facet, "data_brs")
+                    self.diffs.add(prop)
                 else:
-                    if (type_lower, FileObject) not in _warned_hashes:
-                        _warned_hashes.add((type_lower, FileObject))
+                    self.diffs.add(ctn)
+
+    def _populate_from_child_Element(self, ce) -> None:
+        """Populates the property a direct child element of a <fileobject> encodes."""
+        global _warned_elements
+        global _warned_hashes
+        (cns, ctn) = _qsplit(ce.tag)
+
+        if ctn == "byte_runs":
+            # byte_runs might be for file contents, the inode/MFT entry, or the directory entry naming the file.  Use the facet attribute to determine which.  If facet is absent, assume they're data byte runs.
+            if "facet" in ce.attrib:
+                if ce.attrib["facet"] not in FileObject._br_facet_to_property:
+                    if not ce.attrib["facet"] in _warned_byterun_facets:
+                        _warned_byterun_facets.add(ce.attrib["facet"])
                         _logger.warning(
-                            "Uncertain what to do with this hash encountered in a FileObject: %r."
-                            % type_lower
+                            "byte_runs facet %r was unexpected.  Will not interpret this element."
                         )
-            elif ctn == "original_fileobject":
-                self.original_fileobject = FileObject()
-                self.original_fileobject.populate_from_Element(ce)
-            elif ctn == "parent_object":
-                self.parent_object = FileObject()
-                self.parent_object.populate_from_Element(ce)
-            elif ctn in ["atime", "bkup_time", "crtime", "ctime", "dtime", "mtime"]:
-                setattr(self, ctn, TimestampObject())
-                getattr(self, ctn).populate_from_Element(ce)
-            elif ctn in FileObject._class_properties:
-                setattr(self, ctn, ce.text)
-            elif cns not in [None, dfxml.XMLNS_DFXML, ""]:
-                # Put all non-DFXML-namespace elements into the externals list.
-                self.externals.append(ce)
+                else:
+                    brs = ByteRuns()
+                    brs.populate_from_Element(ce)
+                    brs.facet = ce.attrib["facet"]
+                    setattr(self, FileObject._br_facet_to_property[brs.facet], brs)
             else:
-                if (cns, ctn, FileObject) not in _warned_elements:
-                    _warned_elements.add((cns, ctn, FileObject))
+                self.byte_runs = ByteRuns()
+                self.byte_runs.populate_from_Element(ce)
+        elif ctn == "filename":
+            # If the filename element is present, its contents should be interpreted as non-null.  ce.text being null in this case implies a 0-length string, not absence of the filename property-value.
+            self.filename = ce.text or ""
+        elif ctn == "hashdigest":
+            type_lower = ce.attrib["type"].lower()
+            if type_lower in FileObject._hash_properties:
+                setattr(self, type_lower, ce.text)
+            else:
+                if (type_lower, FileObject) not in _warned_hashes:
+                    _warned_hashes.add((type_lower, FileObject))
                     _logger.warning(
-                        "Uncertain what to do with this element in a FileObject: %r"
-                        % ce
+                        "Uncertain what to do with this hash encountered in a FileObject: %r."
+                        % type_lower
                     )
+        elif ctn == "original_fileobject":
+            self.original_fileobject = FileObject()
+            self.original_fileobject.populate_from_Element(ce)
+        elif ctn == "parent_object":
+            self.parent_object = FileObject()
+            self.parent_object.populate_from_Element(ce)
+        elif ctn in ["atime", "bkup_time", "crtime", "ctime", "dtime", "mtime"]:
+            setattr(self, ctn, TimestampObject())
+            getattr(self, ctn).populate_from_Element(ce)
+        elif ctn in FileObject._class_properties:
+            setattr(self, ctn, ce.text)
+        elif cns not in [None, dfxml.XMLNS_DFXML, ""]:
+            # Put all non-DFXML-namespace elements into the externals list.
+            self.externals.append(_as_ET_Element(ce))
+        else:
+            if (cns, ctn, FileObject) not in _warned_elements:
+                _warned_elements.add((cns, ctn, FileObject))
+                _logger.warning(
+                    "Uncertain what to do with this element in a FileObject: %r" % ce
+                )
+
+    def _raw_dfxml_file_objects(self) -> typing.Iterator[FileObject]:
+        """Generator.  Yields this FileObject, and the FileObjects nested in it as original_fileobject or parent_object, each once.  Their property values are part of the source text."""
+        seen = {id(self)}
+        stack = [self]
+        while stack:
+            fobj = stack.pop()
+            yield fobj
+            for nested in (fobj._original_fileobject, fobj._parent_object):
+                if not nested is None and not id(nested) in seen:
+                    seen.add(id(nested))
+                    stack.append(nested)
+
+    def _raw_dfxml_containers(self) -> typing.Tuple[typing.Any, ...]:
+        """Returns the contents of the annos, diffs and externals containers of this FileObject and its nested FileObjects.  These are changed in place, without the property setters, so raw_dfxml compares their contents."""
+        return tuple(
+            (
+                frozenset(fobj._annos or ()),
+                frozenset(fobj._diffs or ()),
+                tuple(fobj._externals or ()),
+            )
+            for fobj in self._raw_dfxml_file_objects()
+        )
+
+    def _modified(self) -> None:
+        self._raw_dfxml = None
+        owner = self._owner
+        if not owner is None:
+            owner._modified()
+
+    def _set_owner(self, owner: FileObject) -> None:
+        """Reports changes to owner from now on.  See _OwnedObject._set_owner."""
+        previous = self._owner
+        if not previous is None and not previous is owner:
+            previous._modified()
+        self._owner = owner
+
+    def __getstate__(self):
+        return _owned_object_state(self)
+
+    def __setstate__(self, state) -> None:
+        self._owner = None
+        _set_slot_state(self, state)
+        # The property values were restored without their owner.  See _OwnedObject.
+        raw = self._raw_dfxml
+        if not raw is None:
+            self.raw_dfxml = raw[0]
 
     def populate_from_stat(self, s: os.stat_result, **kwargs) -> None:
         """
@@ -3554,8 +4006,10 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
         """Creates an ElementTree Element with elements in DFXML schema order."""
         outel = ET.Element("fileobject")
 
-        annos_whittle_set = copy.deepcopy(self.annos)
-        diffs_whittle_set = copy.deepcopy(self.diffs)
+        # Read the containers without allocating them.
+        diffs = self._diffs or set()
+        annos_whittle_set = set(self._annos or ())
+        diffs_whittle_set = set(diffs)
 
         for annodiff in FileObject._diff_attr_names:
             if annodiff in annos_whittle_set:
@@ -3568,12 +4022,12 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
             )
 
         def _anno_change(el):
-            if el.tag in self.diffs:
+            if el.tag in diffs:
                 el.attrib["{%s}changed_property" % dfxml.XMLNS_DELTA] = "1"
                 diffs_whittle_set.remove(el.tag)
 
         def _anno_hash(el):
-            if el.attrib["type"] in self.diffs:
+            if el.attrib["type"] in diffs:
                 el.attrib["{%s}changed_property" % dfxml.XMLNS_DELTA] = "1"
                 diffs_whittle_set.remove(el.attrib["type"])
 
@@ -3582,7 +4036,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
                 prop = FileObject._br_facet_to_property[el.attrib["facet"]]
             else:
                 prop = "data_brs"
-            if prop in self.diffs:
+            if prop in diffs:
                 el.attrib["{%s}changed_property" % dfxml.XMLNS_DELTA] = "1"
                 # _logger.debug("diffs_whittle_set = %r." % diffs_whittle_set)
                 diffs_whittle_set.remove(prop)
@@ -3642,7 +4096,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
                 outel.append(tmpel)
 
         def _append_externals():
-            for e in self.externals:
+            for e in self._externals or ():
                 outel.append(e)
 
         def _append_object(name, value, namespace_prefix=None):
@@ -3729,71 +4183,252 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
         return outel
 
-    def to_dfxml(self):
-        return _ET_tostring(self.to_Element())
-
-    @property
-    def alloc(self):
-        """Note that setting .alloc will affect the value of .unalloc, and vice versa.  The last one to set wins."""
-        # TODO alloc isn't deprecated yet.
-        # warnings.warn("The FileObject.alloc property is deprecated.  Use .alloc_inode and/or .alloc_name instead.  .alloc is proxied as True if alloc_inode and alloc_name are both True.", warnings.DeprecationWarning)
-        if self.alloc_inode and self.alloc_name:
-            return True
-        else:
-            return self._alloc
+    def _to_dfxml_direct(
+        self, tag: str = "fileobject", attributes: str = ""
+    ) -> typing.Optional[str]:
+        """Returns the XML text of self.to_Element(), written directly into a list of strings in DFXML schema order.  Returns None if the FileObject has externals or an original_fileobject, which are left to ElementTree.  See to_Element for the meaning of each step; the two methods must be kept in step."""
+        if self._externals or not self.original_fileobject is None:
+            return None
+        diffs = self._diffs or set()
+        annos = self._annos
+        if "original_fileobject" in diffs:
+            return None
 
-    @alloc.setter
-    def alloc(self, val):
-        self._alloc = _boolcast(val)
-        if not self._alloc is None:
-            self._unalloc = not self._alloc
+        delta_prefix = None
+        if diffs or annos:
+            delta_prefix = ET._namespace_map.get(dfxml.XMLNS_DELTA)  # type: ignore
+            if not delta_prefix:
+                return None
+        changed_attribute = ' %s:changed_property="1"' % delta_prefix
+        uses_delta = False
+
+        diffs_whittle_set = set(diffs)
+
+        root_attribute_parts = []
+        if annos:
+            annos_whittle_set = set(annos)
+            for annodiff in FileObject._diff_attr_names:
+                if annodiff in annos_whittle_set:
+                    (_, local_name) = _qsplit(FileObject._diff_attr_names[annodiff])
+                    root_attribute_parts.append(
+                        ' %s:%s="1"' % (delta_prefix, local_name)
+                    )
+                    uses_delta = True
+                    annos_whittle_set.remove(annodiff)
+            if len(annos_whittle_set) > 0:
+                _logger.warning(
+                    "Failed to export some differential annotations: %r."
+                    % annos_whittle_set
+                )
 
-    @property
-    def alloc_inode(self):
-        return self._alloc_inode
+        parts: typing.List[str] = []
 
-    @alloc_inode.setter
-    def alloc_inode(self, val):
-        self._alloc_inode = _boolcast(val)
+        def _changed(name) -> str:
+            nonlocal uses_delta
+            if name in diffs:
+                diffs_whittle_set.remove(name)
+                uses_delta = True
+                return changed_attribute
+            return ""
 
-    @property
-    def alloc_name(self):
-        return self._alloc_name
+        def _append_str(name, value):
+            if not value is None or name in diffs_whittle_set:
+                _append_text_element(
+                    parts,
+                    name,
+                    None if value is None else str(value),
+                    _changed(name),
+                )
 
-    @alloc_name.setter
-    def alloc_name(self, val):
-        self._alloc_name = _boolcast(val)
+        def _append_time(name, value):
+            if not value is None or name in diffs_whittle_set:
+                if not value is None and value.time:
+                    _typecheck(value.name, str)
+                    value._append_dfxml(parts, _changed(value.name))
+                else:
+                    _append_text_element(parts, name, None, _changed(name))
 
-    @property
-    def annos(self):
-        """Set of differential annotations.  Expected members are the keys of this class's _diff_attr_names dictionary."""
-        return self._annos
+        def _append_bool(name, value):
+            if not value is None or name in diffs_whittle_set:
+                _append_text_element(
+                    parts,
+                    name,
+                    None if value is None else str(1 if value else 0),
+                    _changed(name),
+                )
 
-    @annos.setter
-    def annos(self, val):
-        _typecheck(val, set)
-        self._annos = val
+        def _append_byte_runs(name, value, facet):
+            if value or name in diffs_whittle_set:
+                if value:
+                    facet = value.facet
+                if facet:
+                    prop = FileObject._br_facet_to_property[facet]
+                else:
+                    prop = "data_brs"
+                if value:
+                    value._append_dfxml(parts, _changed(prop))
+                else:
+                    parts.append('<byte_runs facet="%s"%s />' % (facet, _changed(prop)))
 
-    @property
-    def atime(self):
-        return self._atime
+        def _append_hash(name, value):
+            if not value is None or name in diffs_whittle_set:
+                _append_text_element(
+                    parts,
+                    "hashdigest",
+                    value,
+                    ' type="%s"%s' % (name, _changed(name)),
+                )
 
-    @atime.setter
-    def atime(self, val):
-        if val is None:
-            self._atime = None
-        elif isinstance(val, TimestampObject):
-            self._atime = val
-        else:
-            checked_val = TimestampObject(val, name="atime")
-            self._atime = checked_val
+        if not self.parent_object is None:
+            parent_object_shadow = FileObject()
+            parent_object_shadow.inode = self.parent_object.inode
+            parts.append(
+                typing.cast(
+                    str,
+                    parent_object_shadow._to_dfxml_direct(
+                        "parent_object", _changed("parent_object")
+                    ),
+                )
+            )
 
-    @property
-    def bkup_time(self):
+        _append_str("filename", self.filename)
+        _append_str("error", self.error)
+        _append_str("partition", self.partition)
+        _append_str("id", self.id)
+        _append_str("name_type", self.name_type)
+        _append_str("filesize", self.filesize)
+        if self.alloc_name is None and self.alloc_inode is None:
+            _append_bool("alloc", self.alloc)
+        else:
+            _append_bool("alloc_inode", self.alloc_inode)
+            _append_bool("alloc_name", self.alloc_name)
+        _append_bool("used", self.used)
+        _append_bool("orphan", self.orphan)
+        _append_bool("compressed", self.compressed)
+        _append_str("inode", self.inode)
+        _append_str("meta_type", self.meta_type)
+        _append_str("mode", self.mode)
+        _append_str("nlink", self.nlink)
+        _append_str("uid", self.uid)
+        _append_str("gid", self.gid)
+        _append_time("mtime", self.mtime)
+        _append_time("ctime", self.ctime)
+        _append_time("atime", self.atime)
+        _append_time("crtime", self.crtime)
+        _append_str("seq", self.seq)
+        _append_time("dtime", self.dtime)
+        _append_time("bkup_time", self.bkup_time)
+        _append_str("link_target", self.link_target)
+        _append_str("libmagic", self.libmagic)
+        _append_byte_runs("inode_brs", self.inode_brs, "inode")
+        _append_byte_runs("name_brs", self.name_brs, "name")
+        _append_byte_runs("data_brs", self.data_brs, "data")
+        _append_hash("md5", self.md5)
+        _append_hash("md6", self.md6)
+        _append_hash("sha1", self.sha1)
+        _append_hash("sha224", self.sha224)
+        _append_hash("sha256", self.sha256)
+        _append_hash("sha384", self.sha384)
+        _append_hash("sha512", self.sha512)
+
+        if len(diffs_whittle_set) > 0:
+            _logger.warning(
+                "Did not annotate all of the differing properties of this file.  Remaining properties:  %r."
+                % diffs_whittle_set
+            )
+
+        if uses_delta:
+            root_attribute_parts.insert(
+                0,
+                ' xmlns:%s="%s"' % (delta_prefix, _ET_escape_attrib(dfxml.XMLNS_DELTA)),
+            )
+        root_attribute_parts.append(attributes)
+        root_attributes = "".join(root_attribute_parts)
+        if len(parts) == 0:
+            return "<%s%s />" % (tag, root_attributes)
+        return "<%s%s>%s</%s>" % (tag, root_attributes, "".join(parts), tag)
+
+    def to_dfxml(self) -> str:
+        """Returns the XML text of self.to_Element().  Unless a subclass overrides to_Element, the text is written directly, without building Elements, for FileObjects without externals or an original_fileobject.  A FileObject that retains its source text (see raw_dfxml) returns that text instead."""
+        raw = self.raw_dfxml
+        if not raw is None:
+            return raw
+        if type(self).to_Element is FileObject.to_Element:
+            retval = self._to_dfxml_direct()
+            if not retval is None:
+                return retval
+        return _ET_tostring(self.to_Element())
+
+    @property
+    def alloc(self):
+        """Note that setting .alloc will affect the value of .unalloc, and vice versa.  The last one to set wins."""
+        # TODO alloc isn't deprecated yet.
+        # warnings.warn("The FileObject.alloc property is deprecated.  Use .alloc_inode and/or .alloc_name instead.  .alloc is proxied as True if alloc_inode and alloc_name are both True.", warnings.DeprecationWarning)
+        if self.alloc_inode and self.alloc_name:
+            return True
+        else:
+            return self._alloc
+
+    @alloc.setter
+    def alloc(self, val):
+        self._modified()
+        self._alloc = _boolcast(val)
+        if not self._alloc is None:
+            self._unalloc = not self._alloc
+
+    @property
+    def alloc_inode(self):
+        return self._alloc_inode
+
+    @alloc_inode.setter
+    def alloc_inode(self, val):
+        self._modified()
+        self._alloc_inode = _boolcast(val)
+
+    @property
+    def alloc_name(self):
+        return self._alloc_name
+
+    @alloc_name.setter
+    def alloc_name(self, val):
+        self._modified()
+        self._alloc_name = _boolcast(val)
+
+    @property
+    def annos(self):
+        """Set of differential annotations.  Expected members are the keys of this class's _diff_attr_names dictionary."""
+        if self._annos is None:
+            self._annos = set()
+        return self._annos
+
+    @annos.setter
+    def annos(self, val):
+        self._modified()
+        _typecheck(val, set)
+        self._annos = val
+
+    @property
+    def atime(self):
+        return self._atime
+
+    @atime.setter
+    def atime(self, val):
+        self._modified()
+        if val is None:
+            self._atime = None
+        elif isinstance(val, TimestampObject):
+            self._atime = val
+        else:
+            checked_val = TimestampObject(val, name="atime")
+            self._atime = checked_val
+
+    @property
+    def bkup_time(self):
         return self._bkup_time
 
     @bkup_time.setter
     def bkup_time(self, val):
+        self._modified()
         if val is None:
             self._bkup_time = None
         elif isinstance(val, TimestampObject):
@@ -3808,6 +4443,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @compressed.setter
     def compressed(self, val):
+        self._modified()
         self._compressed = _boolcast(val)
 
     @property
@@ -3816,6 +4452,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @ctime.setter
     def ctime(self, val):
+        self._modified()
         if val is None:
             self._ctime = None
         elif isinstance(val, TimestampObject):
@@ -3830,6 +4467,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @crtime.setter
     def crtime(self, val):
+        self._modified()
         if val is None:
             self._crtime = None
         elif isinstance(val, TimestampObject):
@@ -3853,6 +4491,8 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
     @property
     def diffs(self):
         """This property intentionally has no setter.  To populate, call compare_to_original() after assigning an original_fileobject."""
+        if self._diffs is None:
+            self._diffs = set()
         return self._diffs
 
     @property
@@ -3861,6 +4501,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @dtime.setter
     def dtime(self, val):
+        self._modified()
         if val is None:
             self._dtime = None
         elif isinstance(val, TimestampObject):
@@ -3875,15 +4516,31 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @error.setter
     def error(self, val):
+        self._modified()
         self._error = _strcast(val)
 
     @property
-    def filename(self):
-        return self._filename
+    def filename(self) -> typing.Optional[str]:
+        """The file's path.  Assigning a PathName (e.g. from a parser sharing a PathTrie) stores the path as its last component and a reference to its directory, which other FileObjects share; filename still returns a str."""
+        directory = self._filename_directory
+        if directory is None:
+            return self._filename
+        # A directory's str() is its cached path (see _PathDirectory).
+        return str(directory) + "/" + self._filename
 
     @filename.setter
-    def filename(self, val):
-        self._filename = _strcast(val)
+    def filename(self, val) -> None:
+        self._modified()
+        if type(val) is PathName:
+            directory = val._parent
+            self._filename: typing.Optional[str] = val._name
+            # The root directory of a PathTrie is the empty path.
+            self._filename_directory = (
+                None if directory is None or directory._parent is None else directory
+            )
+        else:
+            self._filename = _strcast(val)
+            self._filename_directory = None
 
     @property
     def externals(self):
@@ -3892,10 +4549,13 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
         NOTE:  Diffs are currently NOT computed for external elements.
         NOTE:  This property should be considered unstable, as the interface is in an early design phase.  Please notify the maintainers of this library (see the Git history for the Objects.py file) if you are using this interface and wish to be notified of updates.
         """
+        if self._externals is None:
+            self._externals = OtherNSElementList()
         return self._externals
 
     @externals.setter
     def externals(self, val):
+        self._modified()
         _typecheck(val, OtherNSElementList)
         self._externals = val
 
@@ -3905,6 +4565,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @filesize.setter
     def filesize(self, val):
+        self._modified()
         self._filesize = _intcast(val)
 
     @property
@@ -3913,7 +4574,8 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @gid.setter
     def gid(self, val):
-        self._gid = _strcast(val)
+        self._modified()
+        self._gid = _intern(_strcast(val))
 
     @property
     def id(self):
@@ -3921,6 +4583,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @id.setter
     def id(self, val):
+        self._modified()
         self._id = _intcast(val)
 
     @property
@@ -3929,6 +4592,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @inode.setter
     def inode(self, val):
+        self._modified()
         self._inode = _intcast(val)
 
     @property
@@ -3937,7 +4601,8 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @libmagic.setter
     def libmagic(self, val):
-        self._libmagic = _strcast(val)
+        self._modified()
+        self._libmagic = _intern(_strcast(val))
 
     @property
     def link_target(self) -> typing.Optional[str]:
@@ -3945,6 +4610,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @link_target.setter
     def link_target(self, val: typing.Optional[str]) -> None:
+        self._modified()
         if not val is None:
             _typecheck(val, str)
         self._link_target = val
@@ -3956,6 +4622,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @inode_brs.setter
     def inode_brs(self, val: typing.Optional[ByteRuns]) -> None:
+        self._modified()
         if not val is None:
             _typecheck(val, ByteRuns)
         self._inode_brs = val
@@ -3966,6 +4633,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @md5.setter
     def md5(self, val):
+        self._modified()
         self._md5 = _strcast(val)
 
     @property
@@ -3974,6 +4642,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @md6.setter
     def md6(self, val):
+        self._modified()
         self._md6 = _strcast(val)
 
     @property
@@ -3982,7 +4651,8 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @meta_type.setter
     def meta_type(self, val):
-        self._meta_type = _intcast(val)
+        self._modified()
+        self._meta_type = _intern(_intcast(val))
 
     @property
     def mode(self):
@@ -3991,7 +4661,8 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @mode.setter
     def mode(self, val):
-        self._mode = _intcast(val)
+        self._modified()
+        self._mode = _intern(_intcast(val))
 
     @property
     def mtime(self):
@@ -3999,6 +4670,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @mtime.setter
     def mtime(self, val):
+        self._modified()
         if val is None:
             self._mtime = None
         elif isinstance(val, TimestampObject):
@@ -4014,6 +4686,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @name_brs.setter
     def name_brs(self, val: typing.Optional[ByteRuns]) -> None:
+        self._modified()
         if not val is None:
             _typecheck(val, ByteRuns)
         self._name_brs = val
@@ -4024,6 +4697,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @name_type.setter
     def name_type(self, val):
+        self._modified()
         if val is None:
             self._name_type = val
         else:
@@ -4054,7 +4728,8 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @nlink.setter
     def nlink(self, val):
-        self._nlink = _intcast(val)
+        self._modified()
+        self._nlink = _intern(_intcast(val))
 
     @property
     def orphan(self):
@@ -4062,6 +4737,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @orphan.setter
     def orphan(self, val):
+        self._modified()
         self._orphan = _boolcast(val)
 
     @property
@@ -4070,6 +4746,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @original_fileobject.setter
     def original_fileobject(self, val):
+        self._modified()
         if not val is None:
             _typecheck(val, FileObject)
         self._original_fileobject = val
@@ -4080,7 +4757,8 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @partition.setter
     def partition(self, val):
-        self._partition = _intcast(val)
+        self._modified()
+        self._partition = _intern(_intcast(val))
 
     @property
     def parent_object(self):
@@ -4089,16 +4767,61 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @parent_object.setter
     def parent_object(self, val):
+        self._modified()
         if not val is None:
             _typecheck(val, FileObject)
         self._parent_object = val
 
+    @property
+    def raw_dfxml(self) -> typing.Optional[str]:
+        """
+        The source text of the <fileobject> element this FileObject was parsed from, if it was parsed with keep_raw (see iterparse), and has not been modified since.  Otherwise, None.  to_dfxml(), and so the DFXML writers, copy this text instead of serializing the FileObject.
+
+        Assigning any property (other than volume_object) marks the FileObject modified, as do changes within its ByteRuns and TimestampObjects, such as assigning a ByteRun's len, changes to its annos, diffs or externals, and changes to its original_fileobject or parent_object.
+        """
+        raw = self._raw_dfxml
+        if raw is None:
+            return None
+        if self._raw_dfxml_containers() != raw[1]:
+            self._raw_dfxml = None
+            return None
+        return raw[0]
+
+    @raw_dfxml.setter
+    def raw_dfxml(self, val: typing.Optional[str]) -> None:
+        """Retains val as the source text of the FileObject's current state."""
+        if val is None:
+            self._raw_dfxml = None
+            return
+        _typecheck(val, str)
+        # Changes within the property values, and within nested FileObjects, are reported to this FileObject from now on.  The slots are read directly, so a LazyFileObject decodes nothing; properties it decodes later are assigned, which marks it modified.
+        for fobj in self._raw_dfxml_file_objects():
+            if not fobj is self:
+                fobj._set_owner(self)
+            for brs in (fobj._byte_runs, fobj._inode_brs, fobj._name_brs):
+                if not brs is None:
+                    brs._set_owner(fobj)
+                    for run in brs:
+                        run._set_owner(brs)
+            for timestamp in (
+                fobj._atime,
+                fobj._bkup_time,
+                fobj._crtime,
+                fobj._ctime,
+                fobj._dtime,
+                fobj._mtime,
+            ):
+                if not timestamp is None:
+                    timestamp._set_owner(fobj)
+        self._raw_dfxml = (val, self._raw_dfxml_containers())
+
     @property
     def seq(self):
         return self._seq
 
     @seq.setter
     def seq(self, val):
+        self._modified()
         self._seq = _intcast(val)
 
     @property
@@ -4107,6 +4830,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @sha1.setter
     def sha1(self, val):
+        self._modified()
         self._sha1 = _strcast(val)
 
     @property
@@ -4115,6 +4839,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @sha224.setter
     def sha224(self, val):
+        self._modified()
         self._sha224 = _strcast(val)
 
     @property
@@ -4123,6 +4848,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @sha256.setter
     def sha256(self, val):
+        self._modified()
         self._sha256 = _strcast(val)
 
     @property
@@ -4131,6 +4857,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @sha384.setter
     def sha384(self, val):
+        self._modified()
         self._sha384 = _strcast(val)
 
     @property
@@ -4139,6 +4866,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @sha512.setter
     def sha512(self, val):
+        self._modified()
         self._sha512 = _strcast(val)
 
     @property
@@ -4147,7 +4875,8 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @uid.setter
     def uid(self, val):
-        self._uid = _strcast(val)
+        self._modified()
+        self._uid = _intern(_strcast(val))
 
     @property
     def unalloc(self):
@@ -4156,6 +4885,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @unalloc.setter
     def unalloc(self, val):
+        self._modified()
         self._unalloc = _boolcast(val)
         if not self._unalloc is None:
             self._alloc = not self._unalloc
@@ -4166,6 +4896,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @unused.setter
     def unused(self, val):
+        self._modified()
         self._unused = _intcast(val)
         if not self._unused is None:
             self._used = not self._unused
@@ -4176,6 +4907,7 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
 
     @used.setter
     def used(self, val):
+        self._modified()
         self._used = _intcast(val)
         if not self._used is None:
             self._unused = not self._used
@@ -4192,6 +4924,185 @@ class FileObject(AbstractChildObject, AbstractGeometricObject):
         self._volume_object = val
 
 
+class LazyFileObject(FileObject):
+    """
+    A FileObject that defers decoding its properties.  populate_from_Element retains the direct child elements of the <fileobject>, and each property is decoded from them the first time the property is read or assigned.  Consumers that only read a few properties, such as allocation status and file name, skip building the TimestampObjects, ByteRuns and hash strings they never touch.
+
+    Aside from deferred decoding (including any logged warnings), a LazyFileObject behaves like a FileObject populated from the same Element.  Call materialize() to decode every remaining property and release the retained elements.
+    """
+
+    __slots__ = ("_lazy_children",)
+
+    # Properties that are not decoded from child elements.
+    _eager_properties: typing.Set[str] = {"annos", "diffs", "volume_object"}
+
+    def __init__(self, *args, **kwargs) -> None:
+        # This must be set before FileObject.__init__ primes the properties.
+        self._lazy_children: typing.Optional[typing.Tuple[typing.Any, ...]] = None
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def _raw_child_group(tag: str, payload) -> str:
+        """Returns the property group of a retained (tag, payload) pair.  See populate_from_Element."""
+        if isinstance(payload, str) or payload is None:
+            return FileObject._tag_groups[tag]
+        return FileObject._child_Element_group(payload)
+
+    @staticmethod
+    def _raw_child_Element(tag: str, payload):
+        """Returns an Element for a retained (tag, payload) pair, recreating it if it was retained as text."""
+        if isinstance(payload, str) or payload is None:
+            ce = ET.Element(tag)
+            ce.text = payload
+            return ce
+        return payload
+
+    def _lazy_decode(self, prop: str) -> None:
+        """Decodes the retained child elements that populate the property named prop, if any remain, and releases them."""
+        children = self._lazy_children
+        if children is None:
+            return
+        group = FileObject._property_groups.get(prop, prop)
+        decoding = []
+        remaining: typing.List[typing.Any] = []
+        for i in range(0, len(children), 2):
+            tag = children[i]
+            payload = children[i + 1]
+            if LazyFileObject._raw_child_group(tag, payload) == group:
+                decoding.append(LazyFileObject._raw_child_Element(tag, payload))
+            else:
+                remaining.append(tag)
+                remaining.append(payload)
+        if len(decoding) == 0:
+            return
+        self._lazy_children = tuple(remaining) if len(remaining) > 0 else None
+        # Decoding assigns properties and fills the annos, diffs and externals, which does not modify the FileObject.
+        raw = self.raw_dfxml
+        # Note that populating re-enters this method through property accesses; the decoded elements have already been released.
+        for ce in decoding:
+            self._populate_from_child_Element(ce)
+        self.raw_dfxml = raw
+
+    def materialize(self) -> "LazyFileObject":
+        """Decodes all remaining properties, releasing the retained child elements.  Returns self."""
+        children = self._lazy_children
+        if not children is None:
+            # Decoding the remaining elements in document order matches FileObject.populate_from_Element, as property groups are decoded all at once.
+            self._lazy_children = None
+            raw = self.raw_dfxml
+            for i in range(0, len(children), 2):
+                self._populate_from_child_Element(
+                    LazyFileObject._raw_child_Element(children[i], children[i + 1])
+                )
+            self.raw_dfxml = raw
+        return self
+
+    # These methods read (nearly) every property, so they decode everything at once rather than property by property.
+
+    def __eq__(self, other: object) -> bool:
+        self.materialize()
+        return super().__eq__(other)
+
+    def __repr__(self):
+        self.materialize()
+        return super().__repr__()
+
+    def compare_to_other(
+        self,
+        other,
+        ignore_original: bool = False,
+        file_ignores: typing.Set[str] = set(),
+    ) -> typing.Set[str]:
+        self.materialize()
+        return super().compare_to_other(other, ignore_original, file_ignores)
+
+    def to_Element(self):
+        self.materialize()
+        return super().to_Element()
+
+    def to_dfxml(self) -> str:
+        # Retained source text is written without decoding any properties.
+        raw = self.raw_dfxml
+        if not raw is None:
+            return raw
+        self.materialize()
+        retval = self._to_dfxml_direct()
+        if not retval is None:
+            return retval
+        return super().to_dfxml()
+
+    def populate_from_Element(
+        self, e, *, fields: typing.Optional[typing.Iterable[str]] = None
+    ):
+        """
+        Populates this LazyFileObject's differential annotations from an ElementTree Element, and retains the Element's children for decoding properties on access.  The Element itself need not be retained.
+
+        @param fields: Optional.  See FileObject.populate_from_Element.
+        """
+        _typecheck(e, _element_classes)
+        groups = None if fields is None else FileObject._field_groups(fields)
+
+        (ns, tn) = _qsplit(e.tag)
+        assert tn in ["fileobject", "original_fileobject", "parent_object"]
+
+        # Keep any earlier population from being decoded after, and so overriding, this one.
+        self.materialize()
+
+        if e.keys():
+            _read_differential_annotations(FileObject._diff_attr_names, e, self.annos)
+
+        # The compact raw form is a flat tuple of (tag, payload) pairs.  Most children are text-only elements with no attributes, and are retained as just their text.  Other children are retained as Elements.
+        raw: typing.List[typing.Any] = []
+        for ce in e.findall("./*"):
+            group = FileObject._child_Element_group(ce)
+            if not groups is None and not group in groups:
+                continue
+            # Marked changes are few and cheap to find, so they are not deferred.  Checking keys() first avoids creating attribute dictionaries.
+            has_attributes = len(ce.keys()) > 0
+            if has_attributes:
+                self._populate_diffs_from_child_Element(ce)
+            raw.append(ce.tag)
+            if (
+                not has_attributes
+                and len(ce) == 0
+                and group != "externals"
+                and ce.tag in FileObject._tag_groups
+            ):
+                raw.append(ce.text)
+            else:
+                # Whitespace between child elements is only kept with externals.
+                if group != "externals":
+                    ce.tail = None
+                raw.append(ce)
+        if len(raw) > 0:
+            self._lazy_children = tuple(raw)
+
+
+def _lazy_file_property(name: str) -> property:
+    """Wraps a FileObject property so its value is decoded before it is read or assigned."""
+    base_property = getattr(FileObject, name)
+    base_fget = base_property.fget
+    base_fset = base_property.fset
+
+    def _fget(self):
+        if not self._lazy_children is None:
+            self._lazy_decode(name)
+        return base_fget(self)
+
+    def _fset(self, val):
+        if not self._lazy_children is None:
+            self._lazy_decode(name)
+        base_fset(self, val)
+
+    return property(_fget, _fset, doc=base_property.__doc__)
+
+
+for _prop in FileObject._class_properties + ["byte_runs"]:
+    if _prop not in LazyFileObject._eager_properties:
+        setattr(LazyFileObject, _prop, _lazy_file_property(_prop))
+del _prop
+
+
 class OtherNSElementList(list):
     # Note that super() must be called with arguments to work in Python 2.
 
@@ -4681,83 +5592,611 @@ class CellObject(AbstractChildObject, AbstractGeometricObject):
         self._root = _boolcast(val)
 
 
-class Parser(object):
-    # Set up state machine.  (Would use enum if supported in Python 2.)
-    _INPUT_START = -1
+class AbstractParserBackend(abc.ABC):
+    """
+    A parser backend turns a DFXML byte stream into the XML event stream that Parser.iterparse consumes.  The event stream follows the interface of ElementTree's iterparse with events ("start-ns", "start", "end"):  ("start-ns", (prefix, uri)) pairs, and ("start", element) and ("end", element) pairs.
 
-    _DFXML_START = 0
-    DFXML_PRESTREAM = 1
-    DFXML_POSTSTREAM = 2
-    _DFXML_END = 999
+    Backends may omit events that the Parser would not act upon, such as the events of elements within a <fileobject>.  Elements the Parser retains (e.g. metadata and other elements gathered before a child object stream) must be ElementTree Elements.  Elements of <fileobject>s only need to support the read-only subset of the ElementTree Element interface used by the populate_from_Element methods.
+    """
 
-    _DFXML_METADATA_START = 10
-    _DFXML_METADATA_END = 19
+    name: str = ""
 
-    _DISK_IMAGE_START = 100
-    DISK_IMAGE_PRESTREAM = 101
-    DISK_IMAGE_POSTSTREAM = 102
-    _DISK_IMAGE_END = 199
+    @abc.abstractmethod
+    def iterparse(
+        self, fh: typing.IO[bytes]
+    ) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        pass
 
-    _PARTITION_SYSTEM_START = 200
-    PARTITION_SYSTEM_PRESTREAM = 201
-    PARTITION_SYSTEM_POSTSTREAM = 202
-    _PARTITION_SYSTEM_END = 299
+    def filter_events(
+        self, events: typing.Iterable[typing.Tuple[str, typing.Any]]
+    ) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        """Turns the events read from pull_parser() into the event stream iterparse() returns.  Events other than "start" and "end" events are passed through."""
+        return iter(events)
 
-    _PARTITION_START = 300
-    PARTITION_PRESTREAM = 301
-    PARTITION_POSTSTREAM = 302
-    _PARTITION_END = 399
+    def pull_parser(self) -> typing.Any:
+        """
+        Returns a push-style parser, used by Parser.iterparse_push:  an object with the feed(), close() and read_events() methods of ElementTree's XMLPullParser, reporting the events iterparse() reads.  Raises NotImplementedError if the backend can only read file handles.
+        """
+        raise NotImplementedError(
+            "Parser backend %r does not support push parsing." % self.name
+        )
 
-    _VOLUME_START = 400
-    VOLUME_PRESTREAM = 401
-    VOLUME_POSTSTREAM = 402
-    _VOLUME_END = 499
 
-    _FILE_START = 500
-    _FILE_END = 599
+class ElementTreeParserBackend(AbstractParserBackend):
+    """
+    The default backend, using the Python standard library's xml.etree.ElementTree.iterparse.
+    """
 
-    transitions = {
-        _INPUT_START: {_DFXML_START},
-        _DFXML_START: {DFXML_PRESTREAM},
-        _DFXML_END: set(),
-        _DFXML_METADATA_START: {_DFXML_METADATA_END},
-        _DFXML_METADATA_END: {DFXML_PRESTREAM},
-        _DISK_IMAGE_START: {DISK_IMAGE_PRESTREAM},
-        _DISK_IMAGE_END: {
-            _DFXML_END,
-            _DISK_IMAGE_START,
-            _FILE_START,
-            _PARTITION_SYSTEM_START,
-            _PARTITION_START,  # This is only expected to happen in a DFXMLObject.
-            _VOLUME_START,
-            DFXML_POSTSTREAM,
-            VOLUME_POSTSTREAM,
-        },
-        _PARTITION_SYSTEM_START: {PARTITION_SYSTEM_PRESTREAM},
-        _PARTITION_SYSTEM_END: {
-            _DFXML_END,
-            _PARTITION_SYSTEM_START,
-            _PARTITION_START,
-            _VOLUME_START,
-            _FILE_START,
-            DFXML_POSTSTREAM,
-            DISK_IMAGE_POSTSTREAM,
-            PARTITION_POSTSTREAM,
-        },
-        _PARTITION_START: {PARTITION_PRESTREAM},
-        _PARTITION_END: {
-            _PARTITION_START,
-            _VOLUME_START,  # This is only expected to happen in a DFXMLObject.
-            _FILE_START,
-            DFXML_POSTSTREAM,
-            PARTITION_POSTSTREAM,
-            PARTITION_SYSTEM_POSTSTREAM,
-        },
-        _VOLUME_START: {VOLUME_PRESTREAM},
-        _VOLUME_END: {
-            _DFXML_END,
-            _FILE_START,
-            _VOLUME_START,
+    name = "etree"
+
+    def iterparse(
+        self, fh: typing.IO[bytes]
+    ) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        return ET.iterparse(fh, events=("start-ns", "start", "end"))
+
+    def pull_parser(self) -> ET.XMLPullParser:
+        return ET.XMLPullParser(events=("start-ns", "start", "end"))
+
+
+class LXMLParserBackend(AbstractParserBackend):
+    """
+    A backend using lxml's C-accelerated iterparse.  Raises ImportError on instantiation if lxml is not installed; see get_parser_backend for automatic fallback.
+
+    lxml is only asked for events of the element names that drive Parser state transitions (see _tags).  This spares the Python-level handling of every element inside each <fileobject>.  The events ElementTree would have reported for the other elements before or around a child object stream are replayed from the partially-built tree, in the same order, as ElementTree Elements.  <fileobject> elements are passed through as lxml Elements, and are detached from the tree after the Parser is done with them, so memory use stays flat on large files.
+    """
+
+    name = "lxml"
+
+    # Local names of elements that the Parser acts on with start or end events.
+    _tags = [
+        "dfxml",
+        "metadata",
+        "diskimageobject",
+        "partitionsystemobject",
+        "partitionobject",
+        "volume",
+        "fileobject",
+        "error",
+    ]
+
+    # Local names of elements that contain child object streams.  The Parser only clears these Elements at their end events, so they need no conversion.
+    _container_tags = {
+        "dfxml",
+        "diskimageobject",
+        "partitionsystemobject",
+        "partitionobject",
+        "volume",
+    }
+
+    def __init__(self) -> None:
+        import lxml.etree  # type: ignore
+
+        self._lxml_etree = lxml.etree
+
+    @staticmethod
+    def _iter_end_events(
+        e: ET.Element,
+    ) -> typing.Iterator[typing.Tuple[str, ET.Element]]:
+        """Yields the end events ElementTree's iterparse would have yielded for e and its descendants (i.e. in post-order)."""
+        for ce in e:
+            yield from LXMLParserBackend._iter_end_events(ce)
+        yield ("end", e)
+
+    def _flush(
+        self, parent, stop=None
+    ) -> typing.Iterator[typing.Tuple[str, ET.Element]]:
+        """Replays end events for, and detaches, the children of parent that precede stop (or all children if stop is None).  Only elements that did not match the tag filter remain in the tree to be flushed; start events are not replayed for them, as the Parser does not act on them."""
+        for ce in list(parent):
+            if ce is stop:
+                break
+            yield from self._iter_end_events(_as_ET_Element(ce))
+            parent.remove(ce)
+
+    def filter_events(
+        self, events: typing.Iterable[typing.Tuple[str, typing.Any]]
+    ) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        in_file = False
+        for event, elem in events:
+            if event != "start" and event != "end":
+                yield (event, elem)
+                continue
+
+            (ns, ln) = _qsplit(elem.tag)
+
+            # Within a file object, the Parser only needs the tag-filtered events; everything else is read by FileObject.populate_from_Element.
+            if in_file and not (ln == "fileobject" and event == "end"):
+                yield (event, elem)
+                continue
+
+            parent = elem.getparent()
+            if parent is not None:
+                yield from self._flush(parent, elem)
+
+            if event == "start":
+                in_file = ln == "fileobject"
+                yield (event, elem)
+                continue
+
+            if ln == "fileobject":
+                in_file = False
+                yield (event, elem)
+            elif ln in LXMLParserBackend._container_tags and ns == dfxml.XMLNS_DFXML:
+                yield from self._flush(elem)
+                yield (event, elem)
+            else:
+                # The Parser may retain this element with its descendants, e.g. <metadata> or a pre-stream <error>.
+                yield from self._iter_end_events(_as_ET_Element(elem))
+            if parent is not None:
+                parent.remove(elem)
+
+    def iterparse(
+        self, fh: typing.IO[bytes]
+    ) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        return self.filter_events(
+            self._lxml_etree.iterparse(
+                fh,
+                events=("start-ns", "start", "end"),
+                tag=["{*}" + tag for tag in LXMLParserBackend._tags],
+                huge_tree=True,
+                remove_comments=True,
+                remove_pis=True,
+            )
+        )
+
+    def pull_parser(self) -> typing.Any:
+        return self._lxml_etree.XMLPullParser(
+            events=("start-ns", "start", "end"),
+            tag=["{*}" + tag for tag in LXMLParserBackend._tags],
+            huge_tree=True,
+            remove_comments=True,
+            remove_pis=True,
+        )
+
+
+_parser_backends: typing.Dict[str, typing.Type[AbstractParserBackend]] = {
+    ElementTreeParserBackend.name: ElementTreeParserBackend,
+    LXMLParserBackend.name: LXMLParserBackend,
+}
+
+
+def get_parser_backend(
+    backend: typing.Union[None, str, AbstractParserBackend] = None,
+) -> AbstractParserBackend:
+    """
+    Returns a parser backend instance.
+
+    @param backend: Optional.  An AbstractParserBackend instance (returned as-is), or the name of a backend:  "etree" (the default), "lxml", or "auto" (lxml if it is installed).  If "lxml" is requested and lxml is not installed, a warning is logged and the "etree" backend is returned instead.
+    """
+    if isinstance(backend, AbstractParserBackend):
+        return backend
+    _backend = backend or ElementTreeParserBackend.name
+    if _backend == "auto":
+        _backend = LXMLParserBackend.name
+    elif not _backend in _parser_backends:
+        raise ValueError(
+            "Unexpected parser backend: %r.  Expecting one of %r, or 'auto'."
+            % (backend, sorted(_parser_backends.keys()))
+        )
+    try:
+        return _parser_backends[_backend]()
+    except ImportError:
+        if backend != "auto":
+            _logger.warning(
+                "Parser backend %r is not available.  Falling back to %r."
+                % (_backend, ElementTreeParserBackend.name)
+            )
+        return ElementTreeParserBackend()
+
+
+class FileObjectFilter(object):
+    """
+    A declarative FileObject predicate, which Parser.iterparse can evaluate on a <fileobject> Element before building a FileObject.  Rejected file objects skip all property decoding.
+
+    All given criteria must hold for a file to match.  Criteria left as None are not checked.  A FileObjectFilter is also callable on FileObjects, so it can be used anywhere a unary FileObject predicate is expected.
+
+    Filters can also be written as strings of whitespace-separated key=value terms, using the constructor's parameter names, e.g.:
+
+        name_type=r alloc=1 filesize=1024: filename_glob=*.jpg has_hash=md5,sha1
+
+    See from_string for the value syntax.
+    """
+
+    def __init__(
+        self,
+        *,
+        name_type: typing.Union[None, str, typing.Iterable[str]] = None,
+        alloc: typing.Optional[bool] = None,
+        filesize_min: typing.Optional[int] = None,
+        filesize_max: typing.Optional[int] = None,
+        filename_glob: typing.Optional[str] = None,
+        filename_regex: typing.Union[None, str, typing.Pattern[str]] = None,
+        annos: typing.Optional[typing.Iterable[str]] = None,
+        has_hash: typing.Union[None, str, typing.Iterable[str]] = None,
+    ) -> None:
+        """
+        @param name_type: A name type (e.g. "r"), or an iterable of name types any of which may match.
+        @param alloc: Matched against FileObject.is_allocated().  Files with unknown allocation status match neither True nor False.
+        @param filesize_min: Inclusive lower bound on filesize.  Files with unknown size do not match a filesize bound.
+        @param filesize_max: Inclusive upper bound on filesize.
+        @param filename_glob: A shell-style pattern matched against the whole filename, case-sensitively (see fnmatch.fnmatchcase).
+        @param filename_regex: A regular expression searched for within the filename.
+        @param annos: Differential annotations (keys of FileObject._diff_attr_names, e.g. "new"), any of which may match.
+        @param has_hash: A hash name (e.g. "sha1"), or an iterable of hash names any of which may be present.
+        """
+        self._name_types: typing.Optional[typing.Set[str]] = None
+        if not name_type is None:
+            self._name_types = (
+                {name_type} if isinstance(name_type, str) else set(name_type)
+            )
+
+        self._alloc = _boolcast(alloc)
+        self._filesize_min = _intcast(filesize_min)
+        self._filesize_max = _intcast(filesize_max)
+        self._filename_glob = filename_glob
+
+        self._filename_regex: typing.Optional[typing.Pattern[str]] = None
+        if not filename_regex is None:
+            self._filename_regex = re.compile(filename_regex)
+
+        self._annos: typing.Optional[typing.Set[str]] = None
+        if not annos is None:
+            self._annos = set(annos)
+            for anno in self._annos:
+                if not anno in FileObject._diff_attr_names:
+                    raise ValueError(
+                        "Unexpected differential annotation: %r.  Expecting one of %r."
+                        % (anno, sorted(FileObject._diff_attr_names.keys()))
+                    )
+
+        self._hashes: typing.Optional[typing.Set[str]] = None
+        if not has_hash is None:
+            self._hashes = {has_hash} if isinstance(has_hash, str) else set(has_hash)
+            for hash_name in self._hashes:
+                if not hash_name in FileObject._hash_properties:
+                    raise ValueError(
+                        "Unexpected hash name: %r.  Expecting one of %r."
+                        % (hash_name, FileObject._hash_properties)
+                    )
+
+        # Property groups (see FileObject._child_Element_group) of the child elements matches_Element needs to read.
+        self._groups: typing.Set[str] = set()
+        if not self._name_types is None:
+            self._groups.add("name_type")
+        if not self._alloc is None:
+            self._groups.add("alloc")
+        if not self._filesize_min is None or not self._filesize_max is None:
+            self._groups.add("filesize")
+        if not self._filename_glob is None or not self._filename_regex is None:
+            self._groups.add("filename")
+        if not self._hashes is None:
+            self._groups |= self._hashes
+
+    def __call__(self, fobj: FileObject) -> bool:
+        """Evaluates this filter on a FileObject."""
+        _typecheck(fobj, FileObject)
+        if not self._annos is None and self._annos.isdisjoint(fobj.annos):
+            return False
+        hashes_present = None
+        if not self._hashes is None:
+            hashes_present = {h for h in self._hashes if not getattr(fobj, h) is None}
+        return self._matches(
+            fobj.name_type,
+            fobj.is_allocated() if not self._alloc is None else None,
+            fobj.filesize,
+            fobj.filename,
+            hashes_present,
+        )
+
+    def __repr__(self) -> str:
+        return "FileObjectFilter.from_string(%r)" % self.to_string()
+
+    def _matches(
+        self,
+        name_type: typing.Optional[str],
+        allocated: typing.Optional[bool],
+        filesize: typing.Optional[int],
+        filename: typing.Optional[str],
+        hashes_present: typing.Optional[typing.Set[str]],
+    ) -> bool:
+        if not self._name_types is None and not name_type in self._name_types:
+            return False
+        if not self._alloc is None and allocated != self._alloc:
+            return False
+        if not self._filesize_min is None:
+            if filesize is None or filesize < self._filesize_min:
+                return False
+        if not self._filesize_max is None:
+            if filesize is None or filesize > self._filesize_max:
+                return False
+        if not self._filename_glob is None:
+            if filename is None or not fnmatch.fnmatchcase(
+                filename, self._filename_glob
+            ):
+                return False
+        if not self._filename_regex is None:
+            if filename is None or self._filename_regex.search(filename) is None:
+                return False
+        if not hashes_present is None and len(hashes_present) == 0:
+            return False
+        return True
+
+    @classmethod
+    def from_string(cls, expression: str) -> FileObjectFilter:
+        """
+        Returns a FileObjectFilter from whitespace-separated key=value terms.  Keys are the constructor's parameter names, plus "filesize" for a range.  Values may be shell-quoted.
+
+        * name_type, annos, has_hash:  A comma-separated list.
+        * alloc:  0, 1, false or true.
+        * filesize:  An inclusive range "min:max", with either bound optional; or one exact size.
+        * filesize_min, filesize_max:  An integer.
+        * filename_glob, filename_regex:  A pattern.
+
+        Raises ValueError on unexpected keys or malformed values.
+        """
+        kwargs: typing.Dict[str, typing.Any] = dict()
+        for term in shlex.split(expression):
+            if not "=" in term:
+                raise ValueError("Expected key=value filter term: %r." % term)
+            (key, value) = term.split("=", 1)
+            if key in ("name_type", "annos", "has_hash"):
+                kwargs[key] = [v for v in value.split(",") if v != ""]
+            elif key == "alloc":
+                if not value.lower() in ("0", "1", "false", "true"):
+                    raise ValueError("Unexpected alloc value: %r." % value)
+                kwargs[key] = value.lower() in ("1", "true")
+            elif key == "filesize":
+                (low, sep, high) = value.partition(":")
+                if sep == "":
+                    high = low
+                kwargs["filesize_min"] = _intcast(low) if low != "" else None
+                kwargs["filesize_max"] = _intcast(high) if high != "" else None
+            elif key in ("filesize_min", "filesize_max"):
+                kwargs[key] = _intcast(value)
+            elif key in ("filename_glob", "filename_regex"):
+                kwargs[key] = value
+            else:
+                raise ValueError("Unexpected filter key: %r." % key)
+        return cls(**kwargs)
+
+    def matches_Element(self, e) -> bool:
+        """Evaluates this filter on a <fileobject> Element, reading only the child elements the filter's criteria need."""
+        if not self._annos is None:
+            annos: typing.Set[str] = set()
+            _read_differential_annotations(FileObject._diff_attr_names, e, annos)
+            if self._annos.isdisjoint(annos):
+                return False
+
+        name_type = None
+        alloc = None
+        alloc_inode = None
+        alloc_name = None
+        filesize = None
+        filename = None
+        hashes_present: typing.Optional[typing.Set[str]] = (
+            None if self._hashes is None else set()
+        )
+        if len(self._groups) > 0:
+            # These decodings follow the FileObject property setters; repeated elements are handled as FileObject.populate_from_Element handles them, with the last one winning.
+            for ce in e.findall("./*"):
+                group = FileObject._child_Element_group(ce)
+                if not group in self._groups:
+                    continue
+                if group == "name_type":
+                    name_type = _strcast(ce.text)
+                elif group == "filesize":
+                    filesize = _intcast(ce.text)
+                elif group == "filename":
+                    filename = ce.text or ""
+                elif group == "alloc":
+                    (_, ctn) = _qsplit(ce.tag)
+                    if ctn == "alloc":
+                        alloc = _boolcast(ce.text)
+                    elif ctn == "unalloc":
+                        unalloc = _boolcast(ce.text)
+                        if not unalloc is None:
+                            alloc = not unalloc
+                    elif ctn == "alloc_inode":
+                        alloc_inode = _boolcast(ce.text)
+                    elif ctn == "alloc_name":
+                        alloc_name = _boolcast(ce.text)
+                elif not hashes_present is None:
+                    if ce.text is None:
+                        hashes_present.discard(group)
+                    else:
+                        hashes_present.add(group)
+
+        return self._matches(
+            name_type,
+            FileObject._allocation_status(alloc, alloc_inode, alloc_name),
+            filesize,
+            filename,
+            hashes_present,
+        )
+
+    def to_string(self) -> str:
+        """Returns this filter in the string form read by from_string."""
+        terms = []
+        if not self._name_types is None:
+            terms.append("name_type=" + ",".join(sorted(self._name_types)))
+        if not self._alloc is None:
+            terms.append("alloc=%d" % self._alloc)
+        if not self._filesize_min is None:
+            terms.append("filesize_min=%d" % self._filesize_min)
+        if not self._filesize_max is None:
+            terms.append("filesize_max=%d" % self._filesize_max)
+        if not self._filename_glob is None:
+            terms.append("filename_glob=" + shlex.quote(self._filename_glob))
+        if not self._filename_regex is None:
+            terms.append("filename_regex=" + shlex.quote(self._filename_regex.pattern))
+        if not self._annos is None:
+            terms.append("annos=" + ",".join(sorted(self._annos)))
+        if not self._hashes is None:
+            terms.append("has_hash=" + ",".join(sorted(self._hashes)))
+        return " ".join(terms)
+
+
+class PathName(object):
+    """
+    A file path, as its last component and a reference to the node of its directory in a PathTrie.  Returned by PathTrie.intern().  str() returns the path.
+
+    Assigning a PathName to FileObject.filename stores the pair, so FileObjects in the same directory share its storage.
+    """
+
+    __slots__ = ("_name", "_parent")
+
+    def __init__(self, parent: typing.Optional[_PathDirectory], name: str) -> None:
+        self._parent = parent
+        self._name = name
+
+    def __reduce__(self):
+        # Unpickled paths are strings, as a pickled PathName would carry a copy of its directories.
+        return (str, (str(self),))
+
+    def __repr__(self) -> str:
+        return "PathName(%r)" % str(self)
+
+    def __str__(self) -> str:
+        parent = self._parent
+        if parent is None or parent._parent is None:
+            return self._name
+        return parent._path + "/" + self._name
+
+    @property
+    def name(self) -> str:
+        """The last component of the path."""
+        return self._name
+
+    @property
+    def parent(self) -> typing.Optional[PathName]:
+        """The directory containing the path.  None for paths of one component."""
+        parent = self._parent
+        if parent is None or parent._parent is None:
+            return None
+        return parent
+
+
+class _PathDirectory(PathName):
+    """A directory of a PathTrie.  Its subdirectories are found by name in _children.  Its path is built once, in _path, so the paths of the files in it are one concatenation away."""
+
+    __slots__ = ("_children", "_path")
+
+    def __init__(self, parent: typing.Optional[_PathDirectory], name: str) -> None:
+        super().__init__(parent, name)
+        self._children: typing.Optional[typing.Dict[str, _PathDirectory]] = None
+        self._path: str = PathName.__str__(self)
+
+    def __str__(self) -> str:
+        return self._path
+
+
+class PathTrie(object):
+    """
+    Interns file paths, such as the filenames of a DFXML document, by their directories.  Each directory is stored once, as its last component and a reference to its parent.  Paths are split on "/", and str() of an interned path returns it exactly.
+
+    Parsers intern FileObjects' filenames in a PathTrie with the path_trie parameter of iterparse() and parse().
+    """
+
+    def __init__(self) -> None:
+        self._root = _PathDirectory(None, "")
+        self._directories = 0
+
+    def __len__(self) -> int:
+        """The number of directories stored."""
+        return self._directories
+
+    def intern(self, path: typing.Union[str, PathName]) -> PathName:
+        """Returns a PathName of path, sharing the directories of paths previously interned."""
+        components = str(path).split("/")
+        directory = self._root
+        for name in components[:-1]:
+            children = directory._children
+            if children is None:
+                children = directory._children = dict()
+            child = children.get(name)
+            if child is None:
+                child = children[name] = _PathDirectory(directory, name)
+                self._directories += 1
+            directory = child
+        return PathName(directory, components[-1])
+
+
+class Parser(object):
+    # Set up state machine.  (Would use enum if supported in Python 2.)
+    _INPUT_START = -1
+
+    _DFXML_START = 0
+    DFXML_PRESTREAM = 1
+    DFXML_POSTSTREAM = 2
+    _DFXML_END = 999
+
+    _DFXML_METADATA_START = 10
+    _DFXML_METADATA_END = 19
+
+    _DISK_IMAGE_START = 100
+    DISK_IMAGE_PRESTREAM = 101
+    DISK_IMAGE_POSTSTREAM = 102
+    _DISK_IMAGE_END = 199
+
+    _PARTITION_SYSTEM_START = 200
+    PARTITION_SYSTEM_PRESTREAM = 201
+    PARTITION_SYSTEM_POSTSTREAM = 202
+    _PARTITION_SYSTEM_END = 299
+
+    _PARTITION_START = 300
+    PARTITION_PRESTREAM = 301
+    PARTITION_POSTSTREAM = 302
+    _PARTITION_END = 399
+
+    _VOLUME_START = 400
+    VOLUME_PRESTREAM = 401
+    VOLUME_POSTSTREAM = 402
+    _VOLUME_END = 499
+
+    _FILE_START = 500
+    _FILE_END = 599
+
+    transitions = {
+        _INPUT_START: {_DFXML_START},
+        _DFXML_START: {DFXML_PRESTREAM},
+        _DFXML_END: set(),
+        _DFXML_METADATA_START: {_DFXML_METADATA_END},
+        _DFXML_METADATA_END: {DFXML_PRESTREAM},
+        _DISK_IMAGE_START: {DISK_IMAGE_PRESTREAM},
+        _DISK_IMAGE_END: {
+            _DFXML_END,
+            _DISK_IMAGE_START,
+            _FILE_START,
+            _PARTITION_SYSTEM_START,
+            _PARTITION_START,  # This is only expected to happen in a DFXMLObject.
+            _VOLUME_START,
+            DFXML_POSTSTREAM,
+            VOLUME_POSTSTREAM,
+        },
+        _PARTITION_SYSTEM_START: {PARTITION_SYSTEM_PRESTREAM},
+        _PARTITION_SYSTEM_END: {
+            _DFXML_END,
+            _PARTITION_SYSTEM_START,
+            _PARTITION_START,
+            _VOLUME_START,
+            _FILE_START,
+            DFXML_POSTSTREAM,
+            DISK_IMAGE_POSTSTREAM,
+            PARTITION_POSTSTREAM,
+        },
+        _PARTITION_START: {PARTITION_PRESTREAM},
+        _PARTITION_END: {
+            _PARTITION_START,
+            _VOLUME_START,  # This is only expected to happen in a DFXMLObject.
+            _FILE_START,
+            DFXML_POSTSTREAM,
+            PARTITION_POSTSTREAM,
+            PARTITION_SYSTEM_POSTSTREAM,
+        },
+        _VOLUME_START: {VOLUME_PRESTREAM},
+        _VOLUME_END: {
+            _DFXML_END,
+            _FILE_START,
+            _VOLUME_START,
             _VOLUME_END,
             DFXML_POSTSTREAM,
             DISK_IMAGE_POSTSTREAM,
@@ -4815,28 +6254,162 @@ class Parser(object):
         },
     }
 
+    # The event iterparse_push() yields, with None, when it needs more bytes.
+    NEED_DATA = "need-data"
+
     def __init__(self):
+        self._backend = None
         self._dobj = None
         self._iterparse_events = None
         self._object_stack = []
         self._proxy_element_stack = []
+        self._pull_closed = False
+        self._pull_parser = None
         self._state = Parser._INPUT_START
 
+    def _prepare(
+        self,
+        events: typing.Iterable[str],
+        dfxmlobject: typing.Optional[DFXMLObject],
+        backend: typing.Union[None, str, AbstractParserBackend],
+        lazy: bool,
+        fields: typing.Optional[typing.Iterable[str]],
+        file_filter: typing.Optional[FileObjectFilter],
+        path_trie: typing.Optional[PathTrie],
+    ) -> typing.Tuple[typing.Type[FileObject], typing.Optional[typing.Set[str]]]:
+        """Validates iterparse's arguments, and sets up the parser state.  Returns the class of FileObjects to build, and the set of their fields to populate."""
+        self.backend = get_parser_backend(backend)
+        if not path_trie is None:
+            _typecheck(path_trie, PathTrie)
+        if not file_filter is None:
+            _typecheck(file_filter, FileObjectFilter)
+        file_object_class = LazyFileObject if lazy else FileObject
+        file_fields: typing.Optional[typing.Set[str]] = None
+        if not fields is None:
+            file_fields = set(fields)
+            # Validate before parsing.
+            FileObject._field_groups(file_fields)
+        self.dobj = dfxmlobject or DFXMLObject()
+
+        self.iterparse_events = set()
+        for event in events:
+            self.iterparse_events.add(event)
+        return (file_object_class, file_fields)
+
+    def close(self) -> None:
+        """Marks the end of the bytes passed to feed().  See iterparse_push()."""
+        if self._pull_parser is None:
+            raise ValueError("Parser.close() called without iterparse_push().")
+        self._pull_closed = True
+        self._pull_parser.close()
+
+    def feed(self, data: bytes) -> None:
+        """Passes more of the DFXML stream to the parser.  See iterparse_push()."""
+        if self._pull_parser is None:
+            raise ValueError("Parser.feed() called without iterparse_push().")
+        if self._pull_closed:
+            raise ValueError("Parser.feed() called after close().")
+        self._pull_parser.feed(data)
+
     def iterparse(
         self,
         fh: typing.IO[bytes],
         events: typing.Iterable[str] = ("start", "end"),
         *,
         dfxmlobject: typing.Optional[DFXMLObject] = None,
+        backend: typing.Union[None, str, AbstractParserBackend] = None,
+        lazy: bool = False,
+        fields: typing.Optional[typing.Iterable[str]] = None,
+        file_filter: typing.Optional[FileObjectFilter] = None,
+        keep_raw: bool = False,
+        path_trie: typing.Optional[PathTrie] = None,
     ) -> typing.Iterator[typing.Tuple[str, AbstractObject]]:
-        self.dobj = dfxmlobject or DFXMLObject()
+        (file_object_class, file_fields) = self._prepare(
+            events, dfxmlobject, backend, lazy, fields, file_filter, path_trie
+        )
 
-        self.iterparse_events = set()
-        for event in events:
-            self.iterparse_events.add(event)
+        raw_map = None
+        raw_texts: typing.Optional[typing.Iterator[str]] = None
+        if keep_raw:
+            if not fields is None:
+                raise ValueError(
+                    "Source text is not retained for FileObjects projected to fields, as it would not represent them."
+                )
+            try:
+                raw_map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+                raise ValueError(
+                    "keep_raw requires a regular, uncompressed file to retain source text from."
+                )
+            raw_texts = _iter_raw_file_objects(raw_map)
+        try:
+            for eop in self._iterparse(
+                self.backend.iterparse(fh),
+                file_object_class,
+                file_fields,
+                file_filter,
+                raw_texts,
+                path_trie,
+            ):
+                yield eop
+        finally:
+            if not raw_map is None:
+                raw_texts = None
+                raw_map.close()
+
+    def iterparse_push(
+        self,
+        events: typing.Iterable[str] = ("start", "end"),
+        *,
+        dfxmlobject: typing.Optional[DFXMLObject] = None,
+        backend: typing.Union[None, str, AbstractParserBackend] = None,
+        lazy: bool = False,
+        fields: typing.Optional[typing.Iterable[str]] = None,
+        file_filter: typing.Optional[FileObjectFilter] = None,
+        path_trie: typing.Optional[PathTrie] = None,
+    ) -> typing.Iterator[typing.Tuple[str, typing.Optional[AbstractObject]]]:
+        """
+        Returns an iterator of the (event, object) pairs iterparse() would yield, parsed from the bytes passed to feed() rather than read from a file handle.  This lets the caller read the DFXML stream without blocking (see aiterparse()).
+
+        When the iterator has consumed all the bytes fed, it yields (Parser.NEED_DATA, None).  Call feed() with more bytes, or close() at the end of the stream, before advancing it again.  The arguments are those of iterparse().
+        """
+        (file_object_class, file_fields) = self._prepare(
+            events, dfxmlobject, backend, lazy, fields, file_filter, path_trie
+        )
+        self._pull_parser = self.backend.pull_parser()
+        self._pull_closed = False
+        return self._iterparse(
+            self.backend.filter_events(self._pull_events()),
+            file_object_class,
+            file_fields,
+            file_filter,
+            None,
+            path_trie,
+        )
+
+    def _pull_events(self) -> typing.Iterator[typing.Tuple[str, typing.Any]]:
+        """Yields the events of the pull parser, and (Parser.NEED_DATA, None) when it has none until it is fed more bytes."""
+        pull_parser = self._pull_parser
+        while True:
+            yield from pull_parser.read_events()
+            if self._pull_closed:
+                return
+            yield (Parser.NEED_DATA, None)
 
+    def _iterparse(
+        self,
+        xml_events: typing.Iterable[typing.Tuple[str, typing.Any]],
+        file_object_class: typing.Type[FileObject],
+        file_fields: typing.Optional[typing.Set[str]],
+        file_filter: typing.Optional[FileObjectFilter],
+        raw_texts: typing.Optional[typing.Iterator[str]],
+        path_trie: typing.Optional[PathTrie],
+    ) -> typing.Iterator[typing.Tuple[str, AbstractObject]]:
+        """
+        The element loop of iterparse.  @param xml_events: The event stream of the parser backend.  (Parser.NEED_DATA, None) pairs are passed through.  @param raw_texts: If not None, an iterator of the source text of each fileobject element, in document order.  @param path_trie: If not None, the PathTrie FileObjects' filenames are interned in.
+        """
         # Throughout this loop, "eop" stands for "(event, object) pair."
-        for ETevent, elem in ET.iterparse(fh, events=("start-ns", "start", "end")):
+        for ETevent, elem in xml_events:
             # View the object event stream in debug mode.
             # _logger.debug("(event, elem) = (%r, %r)" % (ETevent, elem))
             # if ETevent in ("start", "end"):
@@ -4848,6 +6421,10 @@ class Parser(object):
                 ET.register_namespace(*elem)
                 continue
 
+            if ETevent == Parser.NEED_DATA:
+                yield (ETevent, elem)
+                continue
+
             # Split tag name into namespace and local name.
             (ns, ln) = _qsplit(elem.tag)
 
@@ -4899,14 +6476,28 @@ class Parser(object):
                     if ln == "fileobject":
                         for eop in self.transition(Parser._FILE_END):
                             yield eop
+                        raw_text = None
+                        if not raw_texts is None:
+                            # Consumed for every fileobject, so the source texts stay aligned with the elements when files are filtered out.
+                            raw_text = next(raw_texts, None)
+                            if raw_text is None:
+                                raise ValueError(
+                                    "Could not locate the source text of a fileobject element."
+                                )
                         # No need to use the proxy element stack for file objects.  Handle emitting here.
-                        fobj = FileObject()
-                        fobj.populate_from_Element(elem)
-                        if isinstance(self.object_stack[-1], VolumeObject):
-                            fobj.volume_object = self.object_stack[-1]
-                        # _logger.debug("fi = %r" % fobj)
-                        if "end" in self.iterparse_events:
-                            yield ("end", fobj)
+                        if file_filter is None or file_filter.matches_Element(elem):
+                            fobj = file_object_class()
+                            fobj.populate_from_Element(elem, fields=file_fields)
+                            if not path_trie is None:
+                                # Before retaining the source text, which records the FileObject's state.
+                                _intern_filename(fobj, path_trie)
+                            if isinstance(self.object_stack[-1], VolumeObject):
+                                fobj.volume_object = self.object_stack[-1]
+                            if not raw_text is None:
+                                fobj.raw_dfxml = raw_text
+                            # _logger.debug("fi = %r" % fobj)
+                            if "end" in self.iterparse_events:
+                                yield ("end", fobj)
                         # Reset.
                         elem.clear()
                         elem_handled = True
@@ -5122,6 +6713,16 @@ class Parser(object):
 
         return retval
 
+    @property
+    def backend(self):
+        """The AbstractParserBackend supplying the XML event stream."""
+        return self._backend
+
+    @backend.setter
+    def backend(self, value):
+        _typecheck(value, AbstractParserBackend)
+        self._backend = value
+
     @property
     def dobj(self):
         """The DFXMLObject is affected at the beginning and end of the objects stream (metadata up front, rusage at end).  Maintain a dobj reference outside of the big tree-walking loop."""
@@ -5163,23 +6764,735 @@ class Parser(object):
         self._state = value
 
 
-def iterparse(
-    filename: str,
-    events: typing.Tuple[str, ...] = ("start", "end"),
-    *,
-    dfxmlobject: typing.Optional[DFXMLObject] = None,
-    fiwalk: typing.Optional[str] = None,
-) -> typing.Iterator[typing.Tuple[str, AbstractObject]]:
-    """
-    Generator.  Yields a stream of populated DFXMLObjects, VolumeObjects and FileObjects, paired with an event type ("start" or "end").  The DFXMLObject and VolumeObjects do NOT have their child lists populated with this method - that is left to the calling program.
+# Leading bytes of compressed files, and the compression formats they identify.
+_COMPRESSION_MAGIC: typing.List[typing.Tuple[bytes, str]] = [
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+]
 
-    The event type interface is meant to match the interface of ElementTree's iterparse; this is simply for familiarity's sake.  DFXMLObjects and VolumeObjects are yielded with "start" when the stream of VolumeObject or FileObjects begins - that is, they are yielded after being fully constructed up to the potentially-lengthy child object stream.  FileObjects are yielded only with "end".
+# Size of the reads from compressed files, and of the blocks of decompressed data handed from the decompression thread to the parser.
+_DECOMPRESSION_BLOCK_SIZE = 1024 * 1024
 
-    @param filename: A string
-    @param events: Events.  Optional.  A tuple of strings, containing "start" and/or "end".
-    @param dfxmlobject: A DFXMLObject document.  Optional.  A DFXMLObject is created and yielded in the object stream if this argument is not supplied.
-    @param fiwalk: Optional.  Path to a particular fiwalk build you want to run.
+# Number of decompressed blocks the decompression thread may run ahead of the parser.
+_DECOMPRESSION_QUEUE_BLOCKS = 4
+
+
+def _sniff_compression(filename: str) -> typing.Optional[str]:
+    """Returns the compression format of the file filename ("gzip", "bz2" or "xz"), identified by its leading bytes, or None if it is not compressed or cannot be read."""
+    try:
+        with open(filename, "rb") as fh:
+            leading_bytes = fh.read(6)
+    except OSError:
+        return None
+    for magic, compression in _COMPRESSION_MAGIC:
+        if leading_bytes.startswith(magic):
+            return compression
+    return None
+
+
+class _DecompressionReader(io.RawIOBase):
+    """
+    A read-only binary stream of the decompressed contents of a compressed file.  A background thread reads the file in blocks of _DECOMPRESSION_BLOCK_SIZE bytes, and decompresses up to _DECOMPRESSION_QUEUE_BLOCKS blocks ahead of the reader, so decompression overlaps with parsing.  (The zlib, bz2 and lzma decompressors release the GIL.)  Exceptions raised while decompressing, e.g. for truncated files, are raised by the read that reaches them.
+    """
+
+    def __init__(self, filename: str, compression: str) -> None:
+        self._raw = open(filename, "rb", buffering=_DECOMPRESSION_BLOCK_SIZE)
+        try:
+            self._fh = _open_decompressor(self._raw, compression)
+        except BaseException:
+            self._raw.close()
+            raise
+        self._queue: queue.Queue = queue.Queue(maxsize=_DECOMPRESSION_QUEUE_BLOCKS)
+        self._stop = threading.Event()
+        self._block = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(
+            target=self._decompress, name="dfxml-decompression", daemon=True
+        )
+        self._thread.start()
+
+    def _decompress(self) -> None:
+        try:
+            while not self._stop.is_set():
+                data = self._fh.read(_DECOMPRESSION_BLOCK_SIZE)
+                self._put(data)
+                if not data:
+                    return
+        except BaseException as e:
+            self._put(e)
+
+    def _put(self, item: typing.Union[bytes, BaseException]) -> None:
+        # Waits for room in the queue, unless the reader is closed.
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._fh.close()
+            self._raw.close()
+        super().close()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if not self._block:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._block = memoryview(item)
+        n = min(len(b), len(self._block))
+        b[:n] = self._block[:n]
+        self._block = self._block[n:]
+        return n
+
+
+def _open_decompressor(fh: typing.IO[bytes], compression: str) -> io.BufferedIOBase:
+    """Returns a file object decompressing the stream fh, compressed in format compression (see _sniff_compression)."""
+    if compression == "gzip":
+        import gzip
+
+        return gzip.GzipFile(fileobj=fh, mode="rb")
+    elif compression == "bz2":
+        try:
+            import bz2
+        except ImportError:
+            raise ValueError("This Python build cannot decompress bz2 files.")
+        return bz2.BZ2File(fh, "rb")
+    elif compression == "xz":
+        try:
+            import lzma
+        except ImportError:
+            raise ValueError("This Python build cannot decompress xz files.")
+        return lzma.LZMAFile(fh, "rb")
+    raise ValueError("Unexpected compression format: %r." % compression)
+
+
+def _open_compressor(fh: typing.IO[bytes], compression: str) -> io.BufferedIOBase:
+    """Returns a file object compressing into the stream fh in format compression ("gzip", "bz2" or "xz")."""
+    if compression == "gzip":
+        import gzip
+
+        return gzip.GzipFile(fileobj=fh, mode="wb")
+    elif compression == "bz2":
+        try:
+            import bz2
+        except ImportError:
+            raise ValueError("This Python build cannot compress bz2 files.")
+        return bz2.BZ2File(fh, "wb")
+    elif compression == "xz":
+        try:
+            import lzma
+        except ImportError:
+            raise ValueError("This Python build cannot compress xz files.")
+        return lzma.LZMAFile(fh, "wb")
+    raise ValueError("Unexpected compression format: %r." % compression)
+
+
+# Bytes of <fileobject> elements handed to each parallel parsing task.  See iterparse's workers parameter.
+_PARALLEL_CHUNK_SIZE = 4 * 1024 * 1024
+
+# A start tag, from its "<":  group 1 is the qualified name, group 2 the attributes, group 3 "/" if the element is empty.
+_re_start_tag = re.compile(rb"<([^\s/>!?]+)((?:[^>\"']|\"[^\"]*\"|'[^']*')*?)(/?)>")
+
+# A namespace declaration within a start tag's attributes:  group 1 is the prefix (empty for the default namespace), group 2 the quoted URI.
+_re_xmlns = re.compile(rb"\sxmlns(?::([^\s=]+))?\s*=\s*(\"[^\"]*\"|'[^']*')")
+
+
+def _skip_markup(m, i: int) -> int:
+    """Returns the offset after the comment, CDATA section, processing instruction or declaration starting at offset i of m, or -1 if markup at i is a tag."""
+    if m[i + 1 : i + 4] == b"!--":
+        end = m.find(b"-->", i + 4)
+        return -1 if end < 0 else end + 3
+    elif m[i + 1 : i + 9] == b"![CDATA[":
+        end = m.find(b"]]>", i + 9)
+        return -1 if end < 0 else end + 3
+    elif m[i + 1 : i + 2] == b"?":
+        end = m.find(b"?>", i + 2)
+        return -1 if end < 0 else end + 2
+    elif m[i + 1 : i + 2] == b"!":
+        end = m.find(b">", i + 2)
+        return -1 if end < 0 else end + 1
+    return i
+
+
+def _find_element_end(m, start: int, qname: bytes) -> int:
+    """Returns the offset after the end tag of the element with qualified name qname, whose content starts at offset start of m.  Raises ValueError if the element is not terminated."""
+    close_tag = b"</" + qname
+    # Fast path:  the first matching end tag closes the element, unless a same-named element, comment or CDATA section comes before it.
+    end = m.find(close_tag, start)
+    if end >= 0 and m.find(b"<!", start, end) < 0:
+        nested = m.find(b"<" + qname, start, end)
+        if nested < 0 or not m[nested + len(qname) + 1 : nested + len(qname) + 2] in (
+            b" ",
+            b"\t",
+            b"\n",
+            b"\r",
+            b">",
+            b"/",
+        ):
+            gt = m.find(b">", end)
+            if gt >= 0:
+                return gt + 1
+
+    depth = 1
+    pos = start
+    while True:
+        i = m.find(b"<", pos)
+        if i < 0:
+            break
+        after = _skip_markup(m, i)
+        if after < 0:
+            break
+        elif after > i:
+            pos = after
+        elif m[i + 1 : i + 2] == b"/":
+            gt = m.find(b">", i)
+            if gt < 0:
+                break
+            if m[i + 2 : gt].strip() == qname:
+                depth -= 1
+                if depth == 0:
+                    return gt + 1
+            pos = gt + 1
+        else:
+            match = _re_start_tag.match(m, i)
+            if match is None:
+                break
+            if match.group(1) == qname and not match.group(3):
+                depth += 1
+            pos = match.end()
+    raise ValueError("Unterminated %r element at byte offset %d." % (qname, start))
+
+
+# Kinds of markup yielded by _iter_markup.
+_MARKUP_START = 0
+_MARKUP_END = 1
+_MARKUP_EMPTY = 2
+_MARKUP_FILE = 3
+
+
+def _iter_markup(
+    m,
+) -> typing.Iterator[
+    typing.Tuple[int, int, int, bytes, typing.List[typing.Dict[bytes, bytes]]]
+]:
+    """
+    Generator.  Scans a DFXML document, given as a bytes-like object m (e.g. an mmap), for the tags outside of <fileobject> elements, and for whole <fileobject> elements in the DFXML namespace.  Yields tuples (kind, start, end, qname, ns_stack):  kind is _MARKUP_START, _MARKUP_END or _MARKUP_EMPTY for tags, or _MARKUP_FILE for <fileobject>s; start and end are the byte span of the tag or <fileobject>; qname is the qualified name; and ns_stack is the stack of namespace declarations (dicts of prefix to quoted URI) in scope, before the markup's own declarations take effect.
+
+    The scan only inspects markup outside of <fileobject>s, which is sparse, and jumps over each <fileobject> with a substring search for its end tag.  Comments, CDATA sections, processing instructions and declarations are skipped.
+    """
+    ns_stack: typing.List[typing.Dict[bytes, bytes]] = [dict()]
+    dfxml_ns = dfxml.XMLNS_DFXML.encode("utf-8")
+    pos = 0
+    size = len(m)
+
+    while pos < size:
+        i = m.find(b"<", pos)
+        if i < 0:
+            break
+        after = _skip_markup(m, i)
+        if after < 0:
+            raise ValueError("Unterminated markup at byte offset %d." % i)
+        elif after > i:
+            pos = after
+            continue
+
+        if m[i + 1 : i + 2] == b"/":
+            gt = m.find(b">", i)
+            if gt < 0:
+                raise ValueError("Unterminated end tag at byte offset %d." % i)
+            pos = gt + 1
+            yield (_MARKUP_END, i, pos, bytes(m[i + 2 : gt]).strip(), ns_stack)
+            if len(ns_stack) > 1:
+                ns_stack.pop()
+            continue
+
+        match = _re_start_tag.match(m, i)
+        if match is None:
+            raise ValueError("Malformed start tag at byte offset %d." % i)
+        qname = match.group(1)
+        (prefix, _, local_name) = qname.rpartition(b":")
+        is_file = (
+            local_name == b"fileobject"
+            and _markup_namespace(ns_stack, prefix) == dfxml_ns
+        )
+
+        if is_file:
+            if match.group(3):
+                pos = match.end()
+            else:
+                pos = _find_element_end(m, match.end(), qname)
+            yield (_MARKUP_FILE, i, pos, qname, ns_stack)
+        elif match.group(3):
+            pos = match.end()
+            yield (_MARKUP_EMPTY, i, pos, qname, ns_stack)
+        else:
+            pos = match.end()
+            yield (_MARKUP_START, i, pos, qname, ns_stack)
+            ns_stack.append(
+                {
+                    (decl.group(1) or b""): decl.group(2)
+                    for decl in _re_xmlns.finditer(match.group(2))
+                }
+            )
+
+
+def _markup_namespace(
+    ns_stack: typing.List[typing.Dict[bytes, bytes]], prefix: bytes
+) -> typing.Optional[bytes]:
+    """Returns the namespace URI bound to prefix (b"" for the default namespace) in ns_stack (see _iter_markup), or None if prefix is unbound."""
+    for scope in reversed(ns_stack):
+        if prefix in scope:
+            return scope[prefix][1:-1]
+    return None
+
+
+def _root_tags(
+    root: bytes, ns_stack: typing.List[typing.Dict[bytes, bytes]]
+) -> typing.Tuple[bytes, bytes]:
+    """Returns start and end tags of a root element named root that declares the namespaces in scope in ns_stack (see _iter_markup), for parsing a fragment of a document on its own."""
+    decls: typing.Dict[bytes, bytes] = dict()
+    for scope in ns_stack:
+        decls.update(scope)
+    nsdecls = b"".join(
+        b" xmlns:%s=%s" % (prefix, uri) if prefix else b" xmlns=%s" % uri
+        for (prefix, uri) in sorted(decls.items())
+    )
+    return (b"<%s%s>" % (root, nsdecls), b"</%s>" % root)
+
+
+# The encoding declared in an XML declaration:  group 1.
+_re_xml_encoding = re.compile(rb"\s*<\?xml[^>]*?\sencoding\s*=\s*[\"']([^\"']+)[\"']")
+
+
+@functools.lru_cache(maxsize=None)
+def _raw_prefix_regex(prefix: bytes) -> typing.Pattern[bytes]:
+    """Returns a regular expression matching the namespace prefix prefix in a tag or attribute name.  This also matches some character data, such as "p:b" after whitespace, which at worst declares a namespace needlessly."""
+    return re.compile(rb"[<\s]/?" + re.escape(prefix) + rb":")
+
+
+def _iter_raw_file_objects(m) -> typing.Iterator[str]:
+    """
+    Generator.  Yields the source text of each <fileobject> element in the DFXML namespace of a DFXML document, given as a bytes-like object m (e.g. an mmap), in document order.  These are the elements the Parser builds FileObjects from.  Namespaces the element uses, but that are declared by its ancestors, are declared on its start tag, so each text stands on its own (as _ET_tostring's output does).  See FileObject.raw_dfxml.
+
+    Raises ValueError if the document is not encoded in UTF-8.
+    """
+    if m[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        raise ValueError("Retaining source text requires a UTF-8 document.")
+    match = _re_xml_encoding.match(m, 0, 256)
+    if not match is None and not match.group(1).lower() in (
+        b"utf-8",
+        b"utf8",
+        b"us-ascii",
+        b"ascii",
+    ):
+        raise ValueError(
+            "Retaining source text requires a UTF-8 document.  Document encoding: %r."
+            % match.group(1).decode("ascii", "replace")
+        )
+
+    dfxml_ns = dfxml.XMLNS_DFXML.encode("utf-8")
+    for kind, start, end, qname, ns_stack in _iter_markup(m):
+        if kind != _MARKUP_FILE:
+            continue
+        text = bytes(m[start:end])
+        start_tag = _re_start_tag.match(text)
+        assert not start_tag is None
+        declared = {
+            (decl.group(1) or b"") for decl in _re_xmlns.finditer(start_tag.group(2))
+        }
+        # The quoted namespace URIs of the prefixes in scope.
+        bound: typing.Dict[bytes, bytes] = dict()
+        for scope in ns_stack:
+            bound.update(scope)
+        decls = []
+        for prefix in sorted(bound):
+            if prefix in declared:
+                continue
+            if prefix == b"":
+                # Documents written from FileObjects declare the DFXML namespace as the default namespace.
+                if bound[prefix][1:-1] != dfxml_ns:
+                    decls.append(b" xmlns=%s" % bound[prefix])
+            elif text.find(prefix + b":") != -1 and _raw_prefix_regex(prefix).search(
+                text
+            ):
+                decls.append(b" xmlns:%s=%s" % (prefix, bound[prefix]))
+        if decls:
+            insert = len(qname) + 1
+            text = text[:insert] + b"".join(decls) + text[insert:]
+        yield text.decode("utf-8")
+
+
+def _iter_file_object_chunks(m, chunk_size: int) -> typing.Iterator[typing.Any]:
+    """
+    Generator.  Splits a DFXML document, given as a bytes-like object m (e.g. an mmap), into the "skeleton" of the document and chunks of consecutive <fileobject> elements.  Yields bytes objects of the skeleton, and chunk descriptors in between, in document order.
+
+    Each chunk descriptor is a tuple (offset, length, run, head, tail, placeholder):  the byte span of one or more whole <fileobject>s; a run number, shared by chunks that are not separated by other markup (and thus have the same parent); the start and end tags of a root element that declares the namespaces in scope of the chunk, for parsing the chunk on its own; and an empty <fileobject/> element to stand in for the chunk in the skeleton.
+    """
+    root = b""
+    run = 0
+    in_run = False
+    skeleton_start = 0
+    chunk_start = -1
+    chunk_end = -1
+    head = tail = placeholder = b""
+
+    for kind, start, end, qname, ns_stack in _iter_markup(m):
+        if kind == _MARKUP_FILE:
+            if chunk_start < 0:
+                if skeleton_start < start:
+                    yield bytes(m[skeleton_start:start])
+                chunk_start = start
+                (head, tail) = _root_tags(root, ns_stack)
+                placeholder = b"<%s/>" % qname
+            chunk_end = end
+            in_run = True
+            if chunk_end - chunk_start >= chunk_size:
+                yield (
+                    chunk_start,
+                    chunk_end - chunk_start,
+                    run,
+                    head,
+                    tail,
+                    placeholder,
+                )
+                chunk_start = -1
+                skeleton_start = chunk_end
+            continue
+
+        if not root:
+            root = qname
+        # Other markup ends the current chunk and the current run.
+        if chunk_start >= 0:
+            yield (chunk_start, chunk_end - chunk_start, run, head, tail, placeholder)
+            chunk_start = -1
+            skeleton_start = chunk_end
+        if in_run:
+            run += 1
+            in_run = False
+
+    if chunk_start >= 0:
+        yield (chunk_start, chunk_end - chunk_start, run, head, tail, placeholder)
+        skeleton_start = chunk_end
+    if skeleton_start < len(m):
+        yield bytes(m[skeleton_start : len(m)])
+
+
+def _parse_file_object_chunk(
+    filename: str,
+    offset: int,
+    length: int,
+    head: bytes,
+    tail: bytes,
+    backend: typing.Union[None, str, AbstractParserBackend],
+    fields: typing.Optional[typing.Iterable[str]],
+    file_filter: typing.Optional[FileObjectFilter],
+) -> typing.Tuple[typing.List[typing.Tuple[str, str]], typing.List[FileObject]]:
+    """Parallel parsing task.  Parses a chunk of <fileobject> elements of filename between the head and tail root element tags (see _iter_file_object_chunks).  Returns the namespace (prefix, URI) pairs declared in the chunk and its root, and the chunk's FileObjects."""
+    with open(filename, "rb") as fh:
+        fh.seek(offset)
+        data = fh.read(length)
+    parser = Parser()
+    fobjs = [
+        obj
+        for (event, obj) in parser.iterparse(
+            io.BytesIO(head + data + tail),
+            ("end",),
+            backend=backend,
+            fields=fields,
+            file_filter=file_filter,
+        )
+        if isinstance(obj, FileObject)
+    ]
+    return (list(parser.dobj.iter_namespaces()), fobjs)
+
+
+class _FileObjectChunkReader(io.RawIOBase):
+    """
+    A read-only byte stream of a DFXML document's skeleton (see _iter_file_object_chunks), with each chunk of <fileobject>s replaced by one empty <fileobject/> placeholder.  Each chunk is submitted to an executor as a _parse_file_object_chunk task when it is scanned, up to prefetch chunks ahead of the placeholders read.  .futures holds (future, run) pairs of the submitted chunks, in document order, for the consumer to pop as it reaches their placeholders.
+
+    Reads return at most one placeholder, so a parser reading this stream reaches each placeholder before the scan goes further ahead.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        m,
+        executor: concurrent.futures.Executor,
+        prefetch: int,
+        task_args: typing.Tuple[typing.Any, ...],
+    ) -> None:
+        super().__init__()
+        self._executor = executor
+        self._filename = filename
+        self._items = _iter_file_object_chunks(m, _PARALLEL_CHUNK_SIZE)
+        self._output: typing.Deque[bytes] = collections.deque()
+        self._prefetch = prefetch
+        self._task_args = task_args
+        self._buffer = b""
+        self._buffer_offset = 0
+        self.futures: typing.Deque[typing.Tuple[concurrent.futures.Future, int]] = (
+            collections.deque()
+        )
+
+    def readable(self) -> bool:
+        return True
+
+    def _fill(self) -> bool:
+        """Scans ahead, submitting chunks, until prefetch chunks are pending and an item is available for output, or the input is exhausted.  Returns False if there is nothing left to output."""
+        while not self._output or len(self.futures) < self._prefetch:
+            item = next(self._items, None)
+            if item is None:
+                break
+            if isinstance(item, tuple):
+                (offset, length, run, head, tail, placeholder) = item
+                future = self._executor.submit(
+                    _parse_file_object_chunk,
+                    self._filename,
+                    offset,
+                    length,
+                    head,
+                    tail,
+                    *self._task_args,
+                )
+                self.futures.append((future, run))
+                item = placeholder
+            self._output.append(item)
+        return bool(self._output)
+
+    def readinto(self, b) -> int:
+        if self._buffer_offset >= len(self._buffer):
+            if not self._fill():
+                return 0
+            self._buffer = self._output.popleft()
+            self._buffer_offset = 0
+        n = min(len(b), len(self._buffer) - self._buffer_offset)
+        b[:n] = self._buffer[self._buffer_offset : self._buffer_offset + n]
+        self._buffer_offset += n
+        return n
+
+
+def _iterparse_parallel(
+    filename: str,
+    events: typing.Set[str],
+    dfxmlobject: typing.Optional[DFXMLObject],
+    backend: typing.Union[None, str, AbstractParserBackend],
+    fields: typing.Optional[typing.Iterable[str]],
+    file_filter: typing.Optional[FileObjectFilter],
+    workers: int,
+    ordered: bool,
+) -> typing.Iterator[typing.Tuple[str, AbstractObject]]:
+    """
+    Generator.  The parallel implementation of iterparse.  The document skeleton (everything but <fileobject>s) is parsed in this process, by a Parser reading a _FileObjectChunkReader, so container objects and their events are as iterparse would produce them.  Each placeholder FileObject the Parser yields is replaced by the FileObjects of its chunk, parsed by a pool of worker processes and returned pickled.
     """
+    if not fields is None:
+        fields = set(fields)
+        FileObject._field_groups(fields)
+    if not file_filter is None:
+        _typecheck(file_filter, FileObjectFilter)
+
+    def _chunk_eops(chunk_future, volume_object):
+        (namespaces, fobjs) = chunk_future.result()
+        # Namespaces declared within <fileobject>s are registered as the Parser would have at their start-ns events.
+        for prefix, url in namespaces:
+            parser.dobj.add_namespace(prefix, url)
+            ET.register_namespace(prefix, url)
+        for fobj in fobjs:
+            fobj.volume_object = volume_object
+            if "end" in events:
+                yield ("end", fobj)
+
+    with open(filename, "rb") as fh:
+        m = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    try:
+        reader = _FileObjectChunkReader(
+            filename, m, executor, 2 * workers, (backend, fields, file_filter)
+        )
+        # Futures of chunks whose FileObjects were yielded before their placeholders were reached.
+        yielded_early: typing.Set[concurrent.futures.Future] = set()
+        parser = Parser()
+        for event, obj in parser.iterparse(
+            typing.cast(typing.IO[bytes], reader),
+            ("start", "end"),
+            dfxmlobject=dfxmlobject,
+            backend=backend,
+        ):
+            if not isinstance(obj, FileObject):
+                if event in events:
+                    yield (event, obj)
+                continue
+
+            (future, run) = reader.futures.popleft()
+            if ordered:
+                for eop in _chunk_eops(future, obj.volume_object):
+                    yield eop
+            elif future in yielded_early:
+                yielded_early.remove(future)
+            else:
+                # Yield chunks of the same run (and thus in the same container) as they complete, until this placeholder's chunk has been yielded.
+                waiting = {future} | {
+                    other
+                    for (other, other_run) in reader.futures
+                    if other_run == run and not other in yielded_early
+                }
+                while future in waiting:
+                    (completed, _) = concurrent.futures.wait(
+                        waiting, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for other in completed:
+                        waiting.remove(other)
+                        if not other is future:
+                            yielded_early.add(other)
+                        for eop in _chunk_eops(other, obj.volume_object):
+                            yield eop
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        m.close()
+
+
+def _intern_filename(fobj: FileObject, path_trie: PathTrie) -> None:
+    filename = fobj.filename
+    if not filename is None:
+        fobj.filename = path_trie.intern(filename)
+
+
+def _intern_filenames(
+    eops: typing.Iterable[typing.Tuple[str, AbstractObject]],
+    path_trie: typing.Optional[PathTrie],
+) -> typing.Generator[typing.Tuple[str, AbstractObject], None, None]:
+    """Passes through an (event, object) stream, interning FileObjects' filenames in path_trie, if not None."""
+    if path_trie is None:
+        yield from eops
+        return
+    _typecheck(path_trie, PathTrie)
+    for event, obj in eops:
+        if isinstance(obj, FileObject):
+            _intern_filename(obj, path_trie)
+        yield (event, obj)
+
+
+def _check_events(events: typing.Iterable[str]) -> typing.Set[str]:
+    """Returns the set of iterparse events, raising ValueError on unexpected events."""
+    _events = set()
+    for e in events:
+        if not e in ("start", "end"):
+            raise ValueError(
+                "Unexpected event type: %r.  Expecting 'start', 'end'." % e
+            )
+        _events.add(e)
+    return _events
+
+
+def iterparse(
+    filename: str,
+    events: typing.Tuple[str, ...] = ("start", "end"),
+    *,
+    dfxmlobject: typing.Optional[DFXMLObject] = None,
+    fiwalk: typing.Optional[str] = None,
+    backend: typing.Union[None, str, AbstractParserBackend] = None,
+    lazy: bool = False,
+    fields: typing.Optional[typing.Iterable[str]] = None,
+    file_filter: typing.Optional[FileObjectFilter] = None,
+    workers: typing.Optional[int] = None,
+    ordered: bool = True,
+    keep_raw: bool = False,
+    path_trie: typing.Optional[PathTrie] = None,
+) -> typing.Iterator[typing.Tuple[str, AbstractObject]]:
+    """
+    Generator.  Yields a stream of populated DFXMLObjects, VolumeObjects and FileObjects, paired with an event type ("start" or "end").  The DFXMLObject and VolumeObjects do NOT have their child lists populated with this method - that is left to the calling program.
+
+    The event type interface is meant to match the interface of ElementTree's iterparse; this is simply for familiarity's sake.  DFXMLObjects and VolumeObjects are yielded with "start" when the stream of VolumeObject or FileObjects begins - that is, they are yielded after being fully constructed up to the potentially-lengthy child object stream.  FileObjects are yielded only with "end".
+
+    @param filename: A string.  The path to a DFXML file, or to a disk image to run fiwalk on.  DFXML files compressed with gzip, bzip2 or xz are identified by their leading bytes, whatever their name, and are decompressed while they are parsed, by a separate thread.  Binary DFXML files (see BinaryDFXMLWriter) are also identified by their leading bytes, and read with iterparse_binary().
+    @param events: Events.  Optional.  A tuple of strings, containing "start" and/or "end".
+    @param dfxmlobject: A DFXMLObject document.  Optional.  A DFXMLObject is created and yielded in the object stream if this argument is not supplied.
+    @param fiwalk: Optional.  Path to a particular fiwalk build you want to run.
+    @param backend: Optional.  The XML parser backend:  "etree" (default), "lxml", "auto", or an AbstractParserBackend instance.  See get_parser_backend.
+    @param lazy: Optional.  If True, FileObjects are yielded as LazyFileObjects, which decode each property from the <fileobject> element on first access.
+    @param fields: Optional.  Names of FileObject properties (from FileObject._class_properties) to populate.  Other properties of yielded FileObjects are left unset, and their elements are not decoded.  Raises ValueError on unknown names.
+    @param file_filter: Optional.  A FileObjectFilter.  FileObjects it rejects are not built or yielded.
+    @param workers: Optional.  If greater than 1, the number of worker processes that build FileObjects.  The DFXML file is split into chunks of consecutive <fileobject> elements, which are parsed in parallel; the rest of the document is parsed in this process.  FileObjects are returned from workers pickled, so this pays off for large files.  Requires an uncompressed DFXML file (not a disk image), and is incompatible with lazy.
+    @param ordered: Optional.  Only used with workers.  If False, FileObjects of a container (e.g. a volume) may be yielded out of document order, as their chunks finish parsing.  Container events still bracket their FileObjects.
+    @param keep_raw: Optional.  If True, each FileObject retains the source text of its <fileobject> element, and to_dfxml() copies that text instead of re-serializing the FileObject while the FileObject is unmodified.  See FileObject.raw_dfxml.  Requires an uncompressed, UTF-8 DFXML file (not a disk image), and is incompatible with workers and fields.
+    @param path_trie: Optional.  A PathTrie.  FileObjects' filenames are interned in it, so filenames sharing directories share their storage.  filename still returns a str.  Share a PathTrie across parses to share directories across documents.
+    """
+
+    # dfxml.objects_binary imports this module, so it is imported on use.
+    from dfxml.objects_binary import _is_binary_dfxml, _iterparse_binary_filtered
+
+    _events = _check_events(events)
+
+    if _is_binary_dfxml(filename):
+        if (
+            lazy
+            or keep_raw
+            or not dfxmlobject is None
+            or (not workers is None and workers > 1)
+        ):
+            raise ValueError(
+                "Binary DFXML files are read without the lazy, keep_raw, dfxmlobject and workers parameters.  Received: %r."
+                % filename
+            )
+        yield from _intern_filenames(
+            _iterparse_binary_filtered(filename, _events, fields, file_filter),
+            path_trie,
+        )
+        return
+
+    compression = _sniff_compression(filename)
+
+    if keep_raw:
+        if not filename.endswith("xml") or not compression is None:
+            raise ValueError(
+                "Retaining source text (keep_raw) requires an uncompressed DFXML file.  Received: %r."
+                % filename
+            )
+        if not workers is None and workers > 1:
+            raise ValueError(
+                "Source text is not retained by parallel parsing (workers=%d)."
+                % workers
+            )
+
+    if not workers is None and workers > 1:
+        if not filename.endswith("xml") or not compression is None:
+            raise ValueError(
+                "Parallel parsing (workers=%d) requires an uncompressed DFXML file.  Received: %r."
+                % (workers, filename)
+            )
+        if lazy:
+            raise ValueError(
+                "Lazy FileObjects cannot be built by parallel parsing (workers=%d)."
+                % workers
+            )
+        yield from _intern_filenames(
+            _iterparse_parallel(
+                filename,
+                _events,
+                dfxmlobject,
+                backend,
+                fields,
+                file_filter,
+                workers,
+                ordered,
+            ),
+            path_trie,
+        )
+        return
 
     # The DFXML stream file handle.
     fh: typing.IO[bytes]
@@ -5188,7 +7501,10 @@ def iterparse(
     fiwalk_path = fiwalk or "fiwalk"
     subp_command = [fiwalk_path, "-x", filename]
     need_cleanup = False
-    if filename.endswith("xml"):
+    if not compression is None:
+        fh = typing.cast(typing.IO[bytes], _DecompressionReader(filename, compression))
+        need_cleanup = True
+    elif filename.endswith("xml"):
         fh = open(filename, "rb")
         need_cleanup = True
     else:
@@ -5197,43 +7513,71 @@ def iterparse(
             raise ValueError("Failed to open subprocess stdout.")
         fh = subp.stdout
 
-    _events = set()
-    for e in events:
-        if not e in ("start", "end"):
-            raise ValueError(
-                "Unexpected event type: %r.  Expecting 'start', 'end'." % e
-            )
-        _events.add(e)
-
-    parser = Parser()
-    for event, obj in parser.iterparse(fh, _events, dfxmlobject=dfxmlobject):
-        yield (event, obj)
-
-    # If we called Fiwalk, double-check that it exited successfully.
-    if not subp is None:
-        _logger.debug(
-            "Calling wait() to let the Fiwalk subprocess terminate..."
-        )  # Just reading from subp.stdout doesn't let the process terminate; it only finishes working.
-        subp.wait()
-        if subp.returncode != 0:
-            error_object = subprocess.CalledProcessError(
-                subp.returncode, subp_command, "There was an error running Fiwalk."
-            )
-            raise error_object
-        _logger.debug("...Done.")
-
-    if need_cleanup:
-        fh.close()
+    try:
+        parser = Parser()
+        for event, obj in parser.iterparse(
+            fh,
+            _events,
+            dfxmlobject=dfxmlobject,
+            backend=backend,
+            lazy=lazy,
+            fields=fields,
+            file_filter=file_filter,
+            keep_raw=keep_raw,
+            path_trie=path_trie,
+        ):
+            yield (event, obj)
+
+        # If we called Fiwalk, double-check that it exited successfully.
+        if not subp is None:
+            _logger.debug(
+                "Calling wait() to let the Fiwalk subprocess terminate..."
+            )  # Just reading from subp.stdout doesn't let the process terminate; it only finishes working.
+            subp.wait()
+            if subp.returncode != 0:
+                error_object = subprocess.CalledProcessError(
+                    subp.returncode, subp_command, "There was an error running Fiwalk."
+                )
+                raise error_object
+            _logger.debug("...Done.")
+    finally:
+        # Also stops the decompression thread if the caller stops iterating early.
+        if need_cleanup:
+            fh.close()
 
 
-def parse(filename: str) -> DFXMLObject:
+def parse(
+    filename: str,
+    *,
+    backend: typing.Union[None, str, AbstractParserBackend] = None,
+    fields: typing.Optional[typing.Iterable[str]] = None,
+    file_filter: typing.Optional[FileObjectFilter] = None,
+    workers: typing.Optional[int] = None,
+    keep_raw: bool = False,
+    path_trie: typing.Optional[PathTrie] = None,
+) -> DFXMLObject:
     """
     Returns a DFXMLObject populated from the contents of the (string) filename argument.
     Internally, this function uses iterparse().  One key operational difference is this function also appends child objects emitted by iterparse() to parent objects; iterparse() does not handle parent-child relationships.
+
+    @param backend: Optional.  The XML parser backend.  See iterparse().
+    @param fields: Optional.  Names of FileObject properties to populate.  See iterparse().
+    @param file_filter: Optional.  A FileObjectFilter.  FileObjects it rejects are not built or appended.
+    @param workers: Optional.  The number of worker processes that build FileObjects.  See iterparse().
+    @param keep_raw: Optional.  If True, FileObjects retain the source text of their elements.  See iterparse().
+    @param path_trie: Optional.  A PathTrie to intern FileObjects' filenames in.  See iterparse().
     """
     object_stack: typing.List[AbstractParentObject] = []
 
-    for event, obj in iterparse(filename):
+    for event, obj in iterparse(
+        filename,
+        backend=backend,
+        fields=fields,
+        file_filter=file_filter,
+        workers=workers,
+        keep_raw=keep_raw,
+        path_trie=path_trie,
+    ):
         # _logger.debug("(event, type(obj)) = %r." % ((event, type(obj)),))
         if event == "start":
             if isinstance(obj, DFXMLObject):
@@ -5279,3 +7623,527 @@ def parse(filename: str) -> DFXMLObject:
         )
 
     return bottom_object
+
+
+# Size of the reads of aiterparse().
+_AITERPARSE_READ_SIZE = 64 * 1024
+
+# (event, object) pairs aiterparse() reads from binary DFXML files per executor call.
+_AITERPARSE_BINARY_BATCH_SIZE = 256
+
+
+async def aiterparse(
+    filename: str,
+    events: typing.Tuple[str, ...] = ("start", "end"),
+    *,
+    dfxmlobject: typing.Optional[DFXMLObject] = None,
+    fiwalk: typing.Optional[str] = None,
+    backend: typing.Union[None, str, AbstractParserBackend] = None,
+    lazy: bool = False,
+    fields: typing.Optional[typing.Iterable[str]] = None,
+    file_filter: typing.Optional[FileObjectFilter] = None,
+    path_trie: typing.Optional[PathTrie] = None,
+    executor: typing.Optional[concurrent.futures.Executor] = None,
+) -> typing.AsyncIterator[typing.Tuple[str, AbstractObject]]:
+    """
+    Asynchronous generator.  Yields the same (event, object) stream as iterparse(), without blocking the event loop on reading the DFXML file or the Fiwalk subprocess.
+
+    Files are read in the event loop's default executor, and Fiwalk is run with asyncio.create_subprocess_exec.  The bytes read are fed to the parser backend's push parser (see Parser.iterparse_push).  Binary DFXML files are read with iterparse_binary() in executor.
+
+    The arguments are those of iterparse(), with:
+    @param executor: Optional.  A concurrent.futures.Executor running in this process (e.g. a ThreadPoolExecutor), to parse the bytes read and build the objects in.  Default: the event loop's thread.  Objects are built by one executor call at a time, so the stream stays in order.
+    """
+    from dfxml.objects_binary import _is_binary_dfxml, _iterparse_binary_filtered
+
+    _events = _check_events(events)
+    loop = asyncio.get_running_loop()
+
+    if await loop.run_in_executor(None, _is_binary_dfxml, filename):
+        if lazy or not dfxmlobject is None:
+            raise ValueError(
+                "Binary DFXML files are read without the lazy and dfxmlobject parameters.  Received: %r."
+                % filename
+            )
+        binary_eops = _intern_filenames(
+            _iterparse_binary_filtered(filename, _events, fields, file_filter),
+            path_trie,
+        )
+        try:
+            while True:
+                batch = await loop.run_in_executor(
+                    executor,
+                    list,
+                    itertools.islice(binary_eops, _AITERPARSE_BINARY_BATCH_SIZE),
+                )
+                for eop in batch:
+                    yield eop
+                if len(batch) < _AITERPARSE_BINARY_BATCH_SIZE:
+                    break
+        finally:
+            binary_eops.close()
+        return
+
+    parser = Parser()
+    eops = parser.iterparse_push(
+        _events,
+        dfxmlobject=dfxmlobject,
+        backend=backend,
+        lazy=lazy,
+        fields=fields,
+        file_filter=file_filter,
+        path_trie=path_trie,
+    )
+
+    def _parse(data: bytes) -> typing.List[typing.Tuple[str, AbstractObject]]:
+        """Feeds data to the parser, or ends the stream if data is empty.  Returns the (event, object) pairs completed."""
+        if data:
+            parser.feed(data)
+        else:
+            parser.close()
+        batch = []
+        for event, obj in eops:
+            if event == Parser.NEED_DATA:
+                break
+            # Only the NEED_DATA pairs have no object.
+            assert not obj is None
+            batch.append((event, obj))
+        return batch
+
+    compression = await loop.run_in_executor(None, _sniff_compression, filename)
+
+    fh: typing.Optional[typing.IO[bytes]] = None
+    subp = None
+    subp_command = [fiwalk or "fiwalk", "-x", filename]
+    try:
+        if not compression is None:
+            fh = typing.cast(
+                typing.IO[bytes], _DecompressionReader(filename, compression)
+            )
+        elif filename.endswith("xml"):
+            fh = await loop.run_in_executor(None, open, filename, "rb")
+        else:
+            subp = await asyncio.create_subprocess_exec(
+                *subp_command, stdout=asyncio.subprocess.PIPE
+            )
+            if subp.stdout is None:
+                raise ValueError("Failed to open subprocess stdout.")
+
+        while True:
+            if subp is None:
+                assert not fh is None
+                data = await loop.run_in_executor(None, fh.read, _AITERPARSE_READ_SIZE)
+            else:
+                assert not subp.stdout is None
+                data = await subp.stdout.read(_AITERPARSE_READ_SIZE)
+            if executor is None:
+                batch = _parse(data)
+            else:
+                batch = await loop.run_in_executor(executor, _parse, data)
+            for eop in batch:
+                yield eop
+            if not data:
+                break
+
+        # If we called Fiwalk, double-check that it exited successfully.
+        if not subp is None:
+            returncode = await subp.wait()
+            if returncode != 0:
+                raise subprocess.CalledProcessError(
+                    returncode, subp_command, "There was an error running Fiwalk."
+                )
+    finally:
+        # Also stops the decompression thread, or Fiwalk, if the caller stops iterating early.
+        if not fh is None:
+            fh.close()
+        if not subp is None and subp.returncode is None:
+            subp.kill()
+            await subp.wait()
+
+
+# FileObjects handed to each parallel serialization task.  See DFXMLObject.print_dfxml's workers parameter.
+_PARALLEL_PRINT_BATCH_SIZE = 2048
+
+
+# FileObjects of the print_dfxml call that started a parallel serialization worker.  See _init_serialization_worker.
+_serialization_worker_files: typing.Sequence[FileObject] = []
+
+
+def _init_serialization_worker(files: typing.Sequence[FileObject]) -> None:
+    """Parallel serialization worker initializer.  files is passed in the pool's initializer arguments:  forked workers inherit the printing process's list, and spawned workers unpickle it once."""
+    global _serialization_worker_files
+    _serialization_worker_files = files
+
+
+def _serialize_file_object_batch(start: int, stop: int) -> str:
+    """Parallel serialization task.  Returns the DFXML text of the worker's files[start:stop], each followed by a newline, as print_dfxml writes them."""
+    return "".join(
+        [fobj.to_dfxml() + "\n" for fobj in _serialization_worker_files[start:stop]]
+    )
+
+
+def _print_file_objects(
+    files: typing.Sequence[FileObject],
+    output_fh: typing.IO[str],
+    workers: typing.Optional[int],
+) -> None:
+    """
+    Writes the DFXML text of each of files to output_fh, followed by a newline.
+
+    If workers is greater than 1, batches of files are serialized by a pool of that many worker processes, and their text is written in order, holding at most 2 * workers batches pending.  files is handed to each worker once, by the pool's initializer, and tasks only name a batch's indices:  pickling FileObjects per task costs more than serializing them.  Workers started with the "fork" method inherit files without pickling it.
+    """
+    if workers is None or workers <= 1 or len(files) <= _PARALLEL_PRINT_BATCH_SIZE:
+        for f in files:
+            output_fh.write(f.to_dfxml())
+            output_fh.write("\n")
+        return
+
+    pending: typing.Deque[concurrent.futures.Future] = collections.deque()
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_serialization_worker,
+        initargs=(files,),
+    )
+    try:
+        for start in range(0, len(files), _PARALLEL_PRINT_BATCH_SIZE):
+            if len(pending) >= 2 * workers:
+                output_fh.write(pending.popleft().result())
+            pending.append(
+                executor.submit(
+                    _serialize_file_object_batch,
+                    start,
+                    start + _PARALLEL_PRINT_BATCH_SIZE,
+                )
+            )
+        while pending:
+            output_fh.write(pending.popleft().result())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Size of the output buffer of a DFXMLStreamWriter writing to a path or binary file handle.
+_STREAM_WRITER_BUFFER_SIZE = 1024 * 1024
+
+
+def _partial_Element_head(pe: ET.Element) -> typing.Tuple[str, str]:
+    """Returns the start tag of a partial element, followed by its properties' child elements; and its end tag.  These are written around the element's child objects, as in the print_dfxml methods."""
+    wrapper = _ET_tostring(pe).strip()
+    foot = "</%s>" % _qsplit(pe.tag)[1]
+    if wrapper.endswith(" />"):
+        head = wrapper[:-3] + ">"
+    elif wrapper.endswith("/>"):
+        head = wrapper[:-2] + ">"
+    else:
+        head = wrapper[: -len(foot)]
+    return (head, foot)
+
+
+class DFXMLStreamWriter(object):
+    """
+    Writes a DFXML document as its objects are produced, without building the document's object tree.
+
+    The document header (the DFXMLObject's metadata and creator information, and the namespace declarations of its registered namespaces) is written on first output.  Container objects (DiskImageObjects, PartitionSystemObjects, PartitionObjects and VolumeObjects) are opened as scopes with open_scope() or scope(), and FileObjects and complete container objects are written into the innermost open scope with write().  A container's "poststream" properties, such as its error, are written when its scope closes.  The output matches DFXMLObject.print_dfxml's output for the same document.
+
+    Use as a context manager:  leaving the context closes any open scopes and the document.  If the context is left with an exception, the output is closed without closing the document, so it is not mistaken for a complete document.
+
+    write_event() consumes (event, object) pairs as iterparse yields them, so a stream of objects can be filtered or transformed and written back out in constant memory.
+    """
+
+    def __init__(
+        self,
+        output: typing.Union[None, str, typing.IO[str], typing.IO[bytes]] = None,
+        dfxmlobject: typing.Optional[DFXMLObject] = None,
+        *,
+        compression: typing.Optional[str] = None,
+        buffer_size: typing.Optional[int] = None,
+    ) -> None:
+        """
+        @param output: Optional.  A path to write to (overwriting any file), or a text or binary file handle.  Default: sys.stdout.  File handles are flushed, but not closed, by close().
+        @param dfxmlobject: Optional.  The DFXMLObject whose properties and namespaces are written in the document header.  Default: a new DFXMLObject.  Namespaces must be added before the first write; elements of namespaces added later are written with their own declarations.
+        @param compression: Optional.  "gzip", "bz2" or "xz", to compress the output.  Requires a path or a binary file handle.
+        @param buffer_size: Optional.  Size of the output buffer, for paths and binary file handles.  Default: 1 MiB.
+        """
+        self._dobj = DFXMLObject() if dfxmlobject is None else dfxmlobject
+        _typecheck(self._dobj, DFXMLObject)
+        self._started = False
+        self._closed = False
+        # Open scopes, as [object, start tag written] lists.
+        self._scopes: typing.List[typing.List[typing.Any]] = []
+
+        # File objects opened here, to be closed (or, for the caller's file handles, detached) by close().
+        self._owned_fh: typing.Optional[typing.IO[bytes]] = None
+        self._compressed_fh: typing.Optional[io.BufferedIOBase] = None
+        self._buffered_fh: typing.Optional[io.BufferedWriter] = None
+        self._text_fh: typing.Optional[io.TextIOWrapper] = None
+
+        buffer_size = buffer_size or _STREAM_WRITER_BUFFER_SIZE
+        binary_fh: typing.Any = None
+        if output is None:
+            output = sys.stdout
+        self._caller_fh: typing.Any = output
+        if isinstance(output, str):
+            self._owned_fh = open(output, "wb", buffering=buffer_size)
+            binary_fh = self._owned_fh
+        elif isinstance(output, io.TextIOBase):
+            if not compression is None:
+                raise ValueError(
+                    "Compressed output requires a path or a binary file handle."
+                )
+            self._output_fh = typing.cast(typing.IO[str], output)
+        else:
+            binary_fh = output
+            if not isinstance(binary_fh, io.BufferedIOBase):
+                self._buffered_fh = io.BufferedWriter(binary_fh, buffer_size)
+                binary_fh = self._buffered_fh
+
+        if not binary_fh is None:
+            if not compression is None:
+                self._compressed_fh = _open_compressor(binary_fh, compression)
+                binary_fh = self._compressed_fh
+            self._text_fh = io.TextIOWrapper(binary_fh, encoding="utf-8")
+            self._output_fh = self._text_fh
+
+    def __enter__(self) -> DFXMLStreamWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._close_output()
+
+    def _close_output(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        # Detach the layers added over the output, so closing them does not close the caller's file handle.
+        if not self._text_fh is None:
+            self._text_fh.flush()
+            self._text_fh.detach()
+        if not self._compressed_fh is None:
+            # Writes the end of the compressed stream.
+            self._compressed_fh.close()
+        if not self._buffered_fh is None:
+            self._buffered_fh.flush()
+            self._buffered_fh.detach()
+        if not self._owned_fh is None:
+            self._owned_fh.close()
+        else:
+            self._caller_fh.flush()
+
+    def _start(self) -> None:
+        """Writes the document header, if it has not been written."""
+        if self._closed:
+            raise ValueError("DFXMLStreamWriter is closed.")
+        if self._started:
+            return
+        self._started = True
+        (head, _) = _partial_Element_head(self._dobj.to_partial_Element())
+        self._output_fh.write("""<?xml version="1.0"?>\n""")
+        self._output_fh.write(head)
+        self._output_fh.write("\n")
+
+    def _start_scope(self) -> None:
+        """Writes the start tags of open scopes that have not been written, as they are about to receive a child."""
+        self._start()
+        for scope in self._scopes:
+            if not scope[1]:
+                scope[1] = True
+                pe = scope[0].to_partial_Element()
+                # Poststream properties are written when the scope closes.
+                if hasattr(scope[0], "pop_poststream_elements"):
+                    scope[0].pop_poststream_elements(pe)
+                (head, _) = _partial_Element_head(pe)
+                self._output_fh.write(head)
+                self._output_fh.write("\n")
+
+    def _start_scope_parents(self) -> None:
+        """Writes the start tags of the open scopes enclosing the innermost scope."""
+        innermost = self._scopes.pop()
+        try:
+            self._start_scope()
+        finally:
+            self._scopes.append(innermost)
+
+    def _write_text(self, text: str) -> None:
+        """Writes the DFXML text of a FileObject into the innermost open scope."""
+        self._start_scope()
+        self._output_fh.write(text)
+        self._output_fh.write("\n")
+
+    def close(self) -> None:
+        """Closes any open scopes, writes the end of the document, and closes (or, if the writer did not open it, flushes) the output."""
+        if self._closed:
+            return
+        while self._scopes:
+            self.close_scope()
+        self._start()
+        self._output_fh.write("</dfxml>\n")
+        self._close_output()
+
+    def close_scope(self, obj: typing.Optional[AbstractParentObject] = None) -> None:
+        """
+        Closes the innermost open scope, writing its container's poststream properties and end tag.  The container's properties are read again on closing, so properties set after open_scope(), such as errors, are written.
+
+        @param obj: Optional.  The container that opened the scope.  Raises ValueError if it is not the innermost open scope's container.
+        """
+        if not self._scopes:
+            raise ValueError("No DFXMLStreamWriter scope is open.")
+        (container, head_written) = self._scopes[-1]
+        if not obj is None and not obj is container:
+            raise ValueError(
+                "The innermost open scope is of another object: %r." % container
+            )
+        pe = container.to_partial_Element()
+        if not head_written and len(pe) == 0:
+            # An empty container, written as an empty element, as in print_dfxml.
+            self._start_scope_parents()
+            self._output_fh.write(_ET_tostring(pe))
+            self._output_fh.write("\n")
+            self._scopes.pop()
+            return
+        poststream_elements = []
+        if hasattr(container, "pop_poststream_elements"):
+            poststream_elements = container.pop_poststream_elements(pe)
+        self._start_scope()
+        self._scopes.pop()
+        (_, foot) = _partial_Element_head(pe)
+        for poststream_element in poststream_elements:
+            self._output_fh.write(_ET_tostring(poststream_element))
+        self._output_fh.write(foot)
+        self._output_fh.write("\n\n")
+
+    @property
+    def dfxmlobject(self) -> DFXMLObject:
+        """The DFXMLObject written in the document header."""
+        return self._dobj
+
+    def open_scope(self, obj: AbstractObject) -> None:
+        """
+        Opens a scope for a container object, within the innermost open scope.  Objects written until the matching close_scope() are the container's children.  The container's start tag and properties are written with its first child, or when the scope is closed.
+
+        @param obj: A DiskImageObject, PartitionSystemObject, PartitionObject or VolumeObject.  Child objects already appended to it are not written.  Raises TypeError for other objects.
+        """
+        _typecheck(
+            obj, (DiskImageObject, PartitionSystemObject, PartitionObject, VolumeObject)
+        )
+        if self._closed:
+            raise ValueError("DFXMLStreamWriter is closed.")
+        self._scopes.append([obj, False])
+
+    @contextlib.contextmanager
+    def scope(self, obj: AbstractParentObject) -> typing.Iterator[AbstractParentObject]:
+        """Context manager.  Opens a scope for obj (see open_scope()), and closes it on leaving the context."""
+        self.open_scope(obj)
+        yield obj
+        self.close_scope(obj)
+
+    def write(self, obj: AbstractObject) -> None:
+        """
+        Writes an object into the innermost open scope.
+
+        @param obj: A FileObject, or a container object, written with all of its child objects (as by its print_dfxml method).
+        """
+        _typecheck(
+            obj,
+            (
+                FileObject,
+                DiskImageObject,
+                PartitionSystemObject,
+                PartitionObject,
+                VolumeObject,
+            ),
+        )
+        if isinstance(obj, FileObject):
+            self._write_text(obj.to_dfxml())
+            return
+        self._start_scope()
+        typing.cast(
+            typing.Union[
+                DiskImageObject,
+                PartitionSystemObject,
+                PartitionObject,
+                VolumeObject,
+            ],
+            obj,
+        ).print_dfxml(self._output_fh)
+        self._output_fh.write("\n")
+
+    def write_event(self, event: str, obj: AbstractObject) -> None:
+        """
+        Writes an (event, object) pair, as yielded by iterparse (with the default events).  The DFXMLObject "start" event sets the document header's DFXMLObject, unless output has begun.  Container "start" and "end" events open and close scopes, and FileObjects are written.
+        """
+        if isinstance(obj, DFXMLObject):
+            if event == "start" and not self._started:
+                self._dobj = obj
+            return
+        if isinstance(obj, FileObject):
+            if event == "end":
+                self.write(obj)
+            return
+        if event == "start":
+            self.open_scope(typing.cast(AbstractParentObject, obj))
+        elif event == "end":
+            self.close_scope(typing.cast(AbstractParentObject, obj))
+        else:
+            raise ValueError(
+                "Unexpected event type: %r.  Expecting 'start', 'end'." % event
+            )
+
+
+# Names dfxml.objects re-exports from the modules split out of it, by the module defining them.  The modules import dfxml.objects, so they are imported on first use of one of their names.  See __getattr__.
+_SUBMODULE_EXPORTS: typing.Dict[str, typing.Tuple[str, ...]] = {
+    "dfxml.columns": ("FileObjectColumns", "FileObjectTable", "dfxml_to_columns"),
+    "dfxml.indexes": (
+        "ByteRunIndex",
+        "FileObjectIndex",
+        "open_byte_run_index",
+        "open_indexed",
+    ),
+    "dfxml.objects_binary": (
+        "BINARY_DFXML_MAGIC",
+        "BINARY_DFXML_VERSION",
+        "BinaryDFXMLReader",
+        "BinaryDFXMLWriter",
+        "binary_to_dfxml",
+        "dfxml_to_binary",
+        "iterparse_binary",
+    ),
+    "dfxml.store": ("FileObjectStore",),
+}
+
+if typing.TYPE_CHECKING:
+    from dfxml.columns import FileObjectColumns, FileObjectTable, dfxml_to_columns
+    from dfxml.indexes import (
+        ByteRunIndex,
+        FileObjectIndex,
+        open_byte_run_index,
+        open_indexed,
+    )
+    from dfxml.objects_binary import (
+        BINARY_DFXML_MAGIC,
+        BINARY_DFXML_VERSION,
+        BinaryDFXMLReader,
+        BinaryDFXMLWriter,
+        binary_to_dfxml,
+        dfxml_to_binary,
+        iterparse_binary,
+    )
+    from dfxml.store import FileObjectStore
+
+
+def __getattr__(name: str) -> typing.Any:
+    """Imports the names listed in _SUBMODULE_EXPORTS on first use (PEP 562)."""
+    for module_name, names in _SUBMODULE_EXPORTS.items():
+        if name in names:
+            value = getattr(importlib.import_module(module_name), name)
+            globals()[name] = value
+            return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__() -> typing.List[str]:
+    """Lists the module's names, including the names of _SUBMODULE_EXPORTS."""
+    names = set(globals())
+    for module_names in _SUBMODULE_EXPORTS.values():
+        names.update(module_names)
+    return sorted(names)
@@ -0,0 +1,842 @@
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This file reads and writes binary DFXML, a compact serialization of the (event, object) pairs of iterparse(), that iterparse() and parse() read like DFXML files.
+
+BinaryDFXMLWriter, BinaryDFXMLReader, iterparse_binary, dfxml_to_binary, binary_to_dfxml and the BINARY_DFXML_* constants are re-exported by dfxml.objects.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import typing
+import xml.etree.ElementTree as ET
+
+sys.path.append(os.path.dirname(__file__) + "/..")
+import dfxml  # type: ignore
+from dfxml.objects import (
+    AbstractObject,
+    AbstractParentObject,
+    AbstractParserBackend,
+    ByteRun,
+    ByteRuns,
+    DFXMLObject,
+    DiskImageObject,
+    FileObject,
+    FileObjectFilter,
+    LibraryObject,
+    OtherNSElementList,
+    PartitionObject,
+    PartitionSystemObject,
+    TimestampObject,
+    VolumeObject,
+    _typecheck,
+    iterparse,
+    parse,
+)
+
+# Binary DFXML.  A binary DFXML file is the magic bytes, a format version (varint), and a sequence of length-prefixed records, one per iterparse (event, object) pair.  A record is an event byte (see _BINARY_EVENTS) and a tagged value (see the _BT_* tags).  Objects are encoded as their public DFXML properties (see _binary_properties), not as their implementation attributes, so the format does not change with how the classes store their state.
+#
+# Integers are zigzag varints.  Strings are UTF-8, and names and short strings are entered in a string table on first use and referred to by index afterwards; lowercase hexadecimal strings (e.g. hashes) are stored as bytes.  Timestamps are stored as their ISO 8601 text.  Objects refer to a shape table entry, listing their class and property names, which is likewise defined on first use.  Container objects (DFXMLObject, VolumeObject, etc.) are entered in an object table, so FileObjects can refer to their volume, and "end" records update the object yielded with "start".
+BINARY_DFXML_MAGIC = b"DFXMLBIN"
+BINARY_DFXML_VERSION = 3
+
+_BINARY_EVENTS = ("start", "end")
+
+_BT_NONE = 0
+_BT_FALSE = 1
+_BT_TRUE = 2
+_BT_INT = 3
+_BT_FLOAT = 4
+_BT_STR = 5
+_BT_STR_LITERAL = 6
+_BT_HEX = 7
+_BT_BYTES = 8
+_BT_LIST = 9
+_BT_TUPLE = 10
+_BT_SET = 11
+_BT_DICT = 12
+_BT_NSLIST = 13
+_BT_ELEMENT = 14
+_BT_OBJECT = 15
+_BT_CONTAINER = 16
+_BT_REF = 17
+_BT_UPDATE = 18
+
+_BINARY_CONSTANTS = (None, False, True)
+
+# String values up to this length are entered in the string table.
+_BINARY_SHORT_STRING = 16
+_BINARY_STRING_TABLE_MAX = 65536
+
+# Properties of container objects listing child objects.  Children are stored in their own records, so these are not stored.
+_BINARY_CHILD_LISTS = frozenset(
+    [
+        "child_objects",
+        "disk_images",
+        "files",
+        "partition_systems",
+        "partitions",
+        "volumes",
+    ]
+)
+
+# The classes binary DFXML stores, by name.
+_BINARY_CLASSES: typing.Dict[str, type] = {
+    cls.__name__: cls
+    for cls in [
+        ByteRun,
+        ByteRuns,
+        DFXMLObject,
+        DiskImageObject,
+        FileObject,
+        LibraryObject,
+        PartitionObject,
+        PartitionSystemObject,
+        TimestampObject,
+        VolumeObject,
+    ]
+}
+
+# Stored properties not listed in the classes' _class_properties.  "run_list" is the list of a ByteRuns' ByteRun objects, as passed to its constructor.
+_BINARY_EXTRA_PROPERTIES: typing.Dict[str, typing.Tuple[str, ...]] = {
+    "ByteRuns": ("facet", "run_list"),
+    "DFXMLObject": (
+        "version",
+        "program",
+        "program_version",
+        "command_line",
+        "sources",
+        "dc",
+        "externals",
+        "diff_file_ignores",
+        "namespaces",
+        "build_libraries",
+        "creator_libraries",
+    ),
+    "DiskImageObject": ("byte_runs",),
+    "FileObject": ("diffs",),
+    "LibraryObject": ("name", "version"),
+    "PartitionObject": ("byte_runs",),
+    "PartitionSystemObject": ("byte_runs",),
+    "TimestampObject": ("name", "prec", "time"),
+    "VolumeObject": ("byte_runs", "diffs"),
+}
+
+
+def _binary_namespaces(obj: DFXMLObject) -> typing.List[typing.Tuple[str, str]]:
+    return list(obj.iter_namespaces())
+
+
+def _binary_set_namespaces(
+    obj: DFXMLObject, value: typing.List[typing.Tuple[str, str]]
+) -> None:
+    for prefix, url in value:
+        obj.add_namespace(prefix, url)
+
+
+def _binary_set_build_libraries(
+    obj: DFXMLObject, value: typing.List[LibraryObject]
+) -> None:
+    del obj.build_libraries[:]
+    for library in value:
+        obj.add_build_library(library)
+
+
+def _binary_set_creator_libraries(
+    obj: DFXMLObject, value: typing.List[LibraryObject]
+) -> None:
+    del obj.creator_libraries[:]
+    for library in value:
+        obj.add_creator_library(library)
+
+
+def _binary_set_diffs(
+    obj: typing.Union[FileObject, VolumeObject], value: typing.Set[str]
+) -> None:
+    obj.diffs.clear()
+    obj.diffs.update(value)
+
+
+def _binary_set_run_list(obj: ByteRuns, value: typing.List[ByteRun]) -> None:
+    for run in value:
+        obj.append(run)
+
+
+# Stored properties read or assigned other than with getattr and setattr.
+_BINARY_GETTERS: typing.Dict[str, typing.Callable[[typing.Any], typing.Any]] = {
+    "namespaces": _binary_namespaces,
+    "run_list": list,
+}
+_BINARY_SETTERS: typing.Dict[str, typing.Callable[[typing.Any, typing.Any], None]] = {
+    "build_libraries": _binary_set_build_libraries,
+    "creator_libraries": _binary_set_creator_libraries,
+    "diffs": _binary_set_diffs,
+    "namespaces": _binary_set_namespaces,
+    "run_list": _binary_set_run_list,
+}
+
+_binary_properties_cache: typing.Dict[
+    type, typing.Tuple[typing.Tuple[str, ...], typing.FrozenSet[str]]
+] = dict()
+
+
+def _binary_class(name: str) -> type:
+    """Returns the class a binary DFXML file names.  Only the DFXML object classes in _BINARY_CLASSES can be decoded."""
+    try:
+        return _BINARY_CLASSES[name]
+    except KeyError:
+        raise ValueError("Unexpected class in binary DFXML: %r." % name)
+
+
+def _binary_properties(
+    cls: type,
+) -> typing.Tuple[typing.Tuple[str, ...], typing.FrozenSet[str]]:
+    """Returns the names of the properties binary DFXML stores for objects of cls, as a tuple and as a set.  These are the public DFXML properties of cls, other than its lists of child objects."""
+    if not cls in _binary_properties_cache:
+        names: typing.List[str] = []
+        for name in list(getattr(cls, "_class_properties", [])) + list(
+            _BINARY_EXTRA_PROPERTIES.get(cls.__name__, ())
+        ):
+            if not name in _BINARY_CHILD_LISTS and not name in names:
+                names.append(name)
+        _binary_properties_cache[cls] = (tuple(names), frozenset(names))
+    return _binary_properties_cache[cls]
+
+
+class BinaryDFXMLWriter(object):
+    """
+    Writes (event, object) pairs, as yielded by iterparse, to a binary DFXML file.  BinaryDFXMLReader reads them back as equal objects, paired with the same events.  Write all of an iterparse stream (e.g. with dfxml_to_binary) for a lossless copy of a DFXML document.
+
+    Objects are stored with their state when written.  A container object written with "start" and then with "end" is stored once, then updated.
+    """
+
+    def __init__(self, fh: typing.IO[bytes]) -> None:
+        """
+        Writes the file header.
+
+        @param fh: A binary file handle, open for writing.
+        """
+        self._fh = fh
+        self._strings: typing.Dict[str, int] = dict()
+        self._shapes: typing.Dict[typing.Tuple[type, typing.Tuple[str, ...]], int] = (
+            dict()
+        )
+        # Container objects, by id().  The objects are retained, so their ids are not reused.
+        self._containers: typing.Dict[int, typing.Tuple[int, AbstractObject]] = dict()
+        self._buffer = bytearray()
+        self._encoders: typing.Dict[type, typing.Callable[[typing.Any], None]] = {
+            type(None): self._encode_none,
+            bool: self._encode_bool,
+            int: self._encode_int,
+            float: self._encode_float,
+            str: self._encode_str,
+            bytes: self._encode_bytes,
+            list: self._encode_list,
+            tuple: self._encode_tuple,
+            set: self._encode_set,
+            dict: self._encode_dict,
+            OtherNSElementList: self._encode_nslist,
+            ET.Element: self._encode_element,
+            # Timestamps are stored as their ISO 8601 text, which TimestampObject.time parses.
+            dfxml.dftime: lambda value: self._encode_str(str(value)),
+        }
+        self._fh.write(BINARY_DFXML_MAGIC)
+        self._varint(BINARY_DFXML_VERSION)
+        self._flush()
+
+    def __enter__(self) -> BinaryDFXMLWriter:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _encode(self, value: typing.Any) -> None:
+        encoder = self._encoders.get(type(value))
+        if not encoder is None:
+            encoder(value)
+        elif isinstance(value, AbstractParentObject):
+            self._encode_container(value)
+        elif isinstance(value, AbstractObject):
+            self._encode_object(value)
+        else:
+            raise TypeError(
+                "Cannot store a value of type %r in binary DFXML." % type(value)
+            )
+
+    def _encode_bool(self, value: bool) -> None:
+        self._buffer.append(_BT_TRUE if value else _BT_FALSE)
+
+    def _encode_bytes(self, value: bytes) -> None:
+        self._buffer.append(_BT_BYTES)
+        self._varint(len(value))
+        self._buffer += value
+
+    def _encode_container(self, value: AbstractParentObject) -> None:
+        entry = self._containers.get(id(value))
+        if entry is None:
+            self._containers[id(value)] = (len(self._containers), value)
+            self._buffer.append(_BT_CONTAINER)
+            self._encode_state(value)
+        else:
+            self._buffer.append(_BT_REF)
+            self._varint(entry[0])
+
+    def _encode_dict(self, value: dict) -> None:
+        self._buffer.append(_BT_DICT)
+        self._varint(len(value))
+        for key, item in value.items():
+            self._encode(key)
+            self._encode(item)
+
+    def _encode_element(self, value: ET.Element) -> None:
+        self._buffer.append(_BT_ELEMENT)
+        self._element(value)
+
+    def _element(self, value: ET.Element) -> None:
+        """Encodes an element, without a tag."""
+        if not isinstance(value.tag, str):
+            raise TypeError(
+                "Cannot store an element of type %r in binary DFXML." % value.tag
+            )
+        self._name(value.tag)
+        self._varint(len(value.attrib))
+        for key, item in value.attrib.items():
+            self._name(key)
+            self._encode(item)
+        self._encode(value.text)
+        self._encode(value.tail)
+        self._varint(len(value))
+        for child in value:
+            self._element(child)
+
+    def _encode_float(self, value: float) -> None:
+        self._buffer.append(_BT_FLOAT)
+        self._buffer += struct.pack("<d", value)
+
+    def _encode_int(self, value: int) -> None:
+        self._buffer.append(_BT_INT)
+        self._varint(_zigzag(value))
+
+    def _encode_items(self, tag: int, value: typing.Collection[typing.Any]) -> None:
+        self._buffer.append(tag)
+        self._varint(len(value))
+        for item in value:
+            self._encode(item)
+
+    def _encode_list(self, value: list) -> None:
+        self._encode_items(_BT_LIST, value)
+
+    def _encode_none(self, value: None) -> None:
+        self._buffer.append(_BT_NONE)
+
+    def _encode_nslist(self, value: OtherNSElementList) -> None:
+        self._encode_items(_BT_NSLIST, value)
+
+    def _encode_object(self, value: typing.Any) -> None:
+        self._buffer.append(_BT_OBJECT)
+        self._encode_state(value)
+
+    def _encode_set(self, value: set) -> None:
+        # Sorted, where possible, so equal sets are stored identically.
+        try:
+            items: typing.Collection[typing.Any] = sorted(value)
+        except TypeError:
+            items = value
+        self._encode_items(_BT_SET, items)
+
+    def _encode_state(self, value: typing.Any, update: bool = False) -> None:
+        """Encodes the shape and the property values of an object.  Unset properties (None, or empty collections) are not stored, unless update is True, when all of the properties are stored."""
+        try:
+            known = _binary_class(type(value).__name__) is type(value)
+        except ValueError:
+            known = False
+        if not known:
+            raise TypeError(
+                "Cannot store an object of type %r in binary DFXML." % type(value)
+            )
+        names = []
+        values = []
+        for name in _binary_properties(type(value))[0]:
+            getter = _BINARY_GETTERS.get(name)
+            item = getattr(value, name) if getter is None else getter(value)
+            if not update:
+                if item is None:
+                    continue
+                if type(item) in (list, set, dict, OtherNSElementList) and not item:
+                    continue
+            names.append(name)
+            values.append(item)
+
+        key = (type(value), tuple(names))
+        shape = self._shapes.get(key)
+        # Shape references are written as index + 1; 0 introduces a new shape.
+        if shape is None:
+            self._shapes[key] = len(self._shapes)
+            self._buffer.append(0)
+            self._name(type(value).__name__)
+            self._varint(len(names))
+            for name in names:
+                self._name(name)
+        else:
+            self._varint(shape + 1)
+        for item in values:
+            self._encode(item)
+
+    def _encode_str(self, value: str) -> None:
+        if len(value) > _BINARY_SHORT_STRING:
+            if len(value) % 2 == 0:
+                try:
+                    data = bytes.fromhex(value)
+                except ValueError:
+                    data = b""
+                if data.hex() == value:
+                    self._buffer.append(_BT_HEX)
+                    self._varint(len(data))
+                    self._buffer += data
+                    return
+            data = value.encode("utf-8")
+            self._buffer.append(_BT_STR_LITERAL)
+            self._varint(len(data))
+            self._buffer += data
+            return
+        self._buffer.append(_BT_STR)
+        self._string(value)
+
+    def _encode_tuple(self, value: tuple) -> None:
+        self._encode_items(_BT_TUPLE, value)
+
+    def _flush(self) -> None:
+        self._fh.write(self._buffer)
+        self._buffer.clear()
+
+    def _name(self, value: str) -> None:
+        """Encodes a string that is always entered in the string table, without a tag."""
+        self._string(value)
+
+    def _string(self, value: str) -> None:
+        # Table references are written as index + 1; 0 introduces a new string.
+        index = self._strings.get(value)
+        if not index is None:
+            self._varint(index + 1)
+            return
+        data = value.encode("utf-8")
+        self._buffer.append(0)
+        self._varint(len(data))
+        self._buffer += data
+        if len(self._strings) < _BINARY_STRING_TABLE_MAX:
+            self._strings[value] = len(self._strings)
+
+    def _varint(self, value: int) -> None:
+        buffer = self._buffer
+        while value > 0x7F:
+            buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buffer.append(value)
+
+    def close(self) -> None:
+        """Flushes the file handle.  Does not close it."""
+        self._fh.flush()
+
+    def write(self, event: str, obj: AbstractObject) -> None:
+        """
+        Writes one (event, object) pair.
+
+        @param event: "start" or "end".
+        @param obj: A DFXML object.  FileObjects' volume_object properties are stored as references to VolumeObjects written earlier, or as new VolumeObjects.
+        """
+        if not event in _BINARY_EVENTS:
+            raise ValueError(
+                "Unexpected event type: %r.  Expecting 'start', 'end'." % event
+            )
+        _typecheck(obj, AbstractObject)
+        record = self._buffer
+        record.append(_BINARY_EVENTS.index(event))
+        entry = self._containers.get(id(obj))
+        if entry is None:
+            self._encode(obj)
+        else:
+            # Update a container stored with an earlier event.
+            record.append(_BT_UPDATE)
+            self._varint(entry[0])
+            self._encode_state(obj, update=True)
+        # Prefix the record with its length.
+        self._buffer = bytearray()
+        self._varint(len(record))
+        self._buffer += record
+        self._flush()
+
+
+class BinaryDFXMLReader(object):
+    """
+    Reads a binary DFXML file written by BinaryDFXMLWriter.  Iterating yields the (event, object) pairs that were written.
+    """
+
+    _read_size = 1024 * 1024
+
+    def __init__(self, fh: typing.IO[bytes]) -> None:
+        """
+        Reads the file header.  Raises ValueError if fh is not a binary DFXML file of a supported version.
+
+        @param fh: A binary file handle, open for reading.
+        """
+        self._fh = fh
+        self._data = b""
+        self._pos = 0
+        self._strings: typing.List[str] = []
+        self._shapes: typing.List[
+            typing.Tuple[type, typing.Tuple[typing.Tuple[str, typing.Any], ...]]
+        ] = []
+        self._containers: typing.List[AbstractObject] = []
+
+        magic = fh.read(len(BINARY_DFXML_MAGIC))
+        if magic != BINARY_DFXML_MAGIC:
+            raise ValueError("Not a binary DFXML file.")
+        self._fill(1)
+        version = self._varint()
+        if version != BINARY_DFXML_VERSION:
+            raise ValueError("Unsupported binary DFXML version: %r." % version)
+
+        self._decoders: typing.List[typing.Callable[[], typing.Any]] = [
+            lambda: None,
+            lambda: False,
+            lambda: True,
+            self._decode_int,
+            self._decode_float,
+            self._decode_str,
+            self._decode_str_literal,
+            self._decode_hex,
+            self._decode_bytes,
+            self._decode_list,
+            self._decode_tuple,
+            self._decode_set,
+            self._decode_dict,
+            self._decode_nslist,
+            self._decode_element,
+            self._decode_object,
+            self._decode_container,
+            self._decode_ref,
+            self._decode_update,
+        ]
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[str, AbstractObject]]:
+        while True:
+            if not self._fill(1):
+                return
+            length = self._varint()
+            if not self._fill(length):
+                raise ValueError("Truncated binary DFXML record.")
+            end = self._pos + length
+            event = _BINARY_EVENTS[self._data[self._pos]]
+            self._pos += 1
+            obj = self._decode()
+            if self._pos != end:
+                raise ValueError("Malformed binary DFXML record.")
+            yield (event, obj)
+
+    def _decode(self) -> typing.Any:
+        data = self._data
+        pos = self._pos
+        tag = data[pos]
+        # Inline the most frequent values:  constants, one-byte integers, and string table references.
+        if tag <= _BT_TRUE:
+            self._pos = pos + 1
+            return _BINARY_CONSTANTS[tag]
+        if tag == _BT_INT and data[pos + 1] < 0x80:
+            self._pos = pos + 2
+            return _unzigzag(data[pos + 1])
+        if tag == _BT_STR and 0 < data[pos + 1] < 0x80:
+            self._pos = pos + 2
+            return self._strings[data[pos + 1] - 1]
+        self._pos = pos + 1
+        try:
+            decoder = self._decoders[tag]
+        except IndexError:
+            raise ValueError("Unexpected binary DFXML value tag: %r." % tag)
+        return decoder()
+
+    def _decode_bytes(self) -> bytes:
+        length = self._varint()
+        start = self._pos
+        self._pos += length
+        return self._data[start : self._pos]
+
+    def _decode_container(self) -> AbstractObject:
+        (cls, setters) = self._shape()
+        obj = cls()
+        self._containers.append(obj)
+        self._set_state(obj, setters)
+        self._register_namespaces(obj)
+        return obj
+
+    def _decode_dict(self) -> dict:
+        decode = self._decode
+        retval = dict()
+        for _ in range(self._varint()):
+            key = decode()
+            retval[key] = decode()
+        return retval
+
+    def _decode_element(self) -> ET.Element:
+        return self._element()
+
+    def _element(self) -> ET.Element:
+        string = self._string
+        decode = self._decode
+        tag = string()
+        attrib = dict()
+        for _ in range(self._varint()):
+            key = string()
+            attrib[key] = decode()
+        retval = ET.Element(tag, attrib)
+        retval.text = decode()
+        retval.tail = decode()
+        for _ in range(self._varint()):
+            retval.append(self._element())
+        return retval
+
+    def _decode_float(self) -> float:
+        start = self._pos
+        self._pos += 8
+        return struct.unpack_from("<d", self._data, start)[0]
+
+    def _decode_hex(self) -> str:
+        return self._decode_bytes().hex()
+
+    def _decode_int(self) -> int:
+        return _unzigzag(self._varint())
+
+    def _decode_list(self) -> list:
+        decode = self._decode
+        return [decode() for _ in range(self._varint())]
+
+    def _decode_nslist(self) -> OtherNSElementList:
+        retval = OtherNSElementList()
+        retval.extend(self._decode_list())
+        return retval
+
+    def _decode_object(self) -> typing.Any:
+        (cls, setters) = self._shape()
+        obj = cls()
+        self._set_state(obj, setters)
+        return obj
+
+    def _decode_ref(self) -> AbstractObject:
+        return self._containers[self._varint()]
+
+    def _decode_set(self) -> set:
+        decode = self._decode
+        return {decode() for _ in range(self._varint())}
+
+    def _decode_str(self) -> str:
+        return self._string()
+
+    def _decode_str_literal(self) -> str:
+        return self._decode_bytes().decode("utf-8")
+
+    def _decode_tuple(self) -> tuple:
+        decode = self._decode
+        return tuple([decode() for _ in range(self._varint())])
+
+    def _decode_update(self) -> AbstractObject:
+        obj = self._containers[self._varint()]
+        (cls, setters) = self._shape()
+        if not type(obj) is cls:
+            raise ValueError("Malformed binary DFXML update record.")
+        self._set_state(obj, setters)
+        self._register_namespaces(obj)
+        return obj
+
+    def _fill(self, length: int) -> bool:
+        """Ensures length bytes (or 10, to read a varint) are buffered past the read position.  Returns False at the end of the file."""
+        available = len(self._data) - self._pos
+        if available >= max(length, 10):
+            return True
+        chunk = self._fh.read(max(length, self._read_size))
+        self._data = self._data[self._pos :] + chunk
+        self._pos = 0
+        if len(self._data) < length or (length == 1 and not self._data):
+            return False
+        return True
+
+    def _register_namespaces(self, obj: AbstractObject) -> None:
+        # As the Parser does for namespaces declared in DFXML files.
+        if isinstance(obj, DFXMLObject):
+            for prefix, url in obj.iter_namespaces():
+                ET.register_namespace(prefix, url)
+
+    def _set_state(
+        self, obj: typing.Any, setters: typing.Tuple[typing.Tuple[str, typing.Any], ...]
+    ) -> None:
+        """Assigns the property values of an object, through its properties' setters.  Raises ValueError if a setter rejects a value."""
+        decode = self._decode
+        for name, setter in setters:
+            value = decode()
+            try:
+                if setter is None:
+                    setattr(obj, name, value)
+                else:
+                    setter(obj, value)
+            except (AttributeError, TypeError) as e:
+                raise ValueError(
+                    "Unexpected value of %s.%s in binary DFXML: %r."
+                    % (type(obj).__name__, name, value)
+                ) from e
+
+    def _shape(
+        self,
+    ) -> typing.Tuple[type, typing.Tuple[typing.Tuple[str, typing.Any], ...]]:
+        """Returns the class, and the (property name, setter) pairs, of a shape.  Raises ValueError if a new shape names a property that is not stored for its class."""
+        index = self._varint()
+        if index > 0:
+            return self._shapes[index - 1]
+        cls = _binary_class(self._string())
+        properties = _binary_properties(cls)[1]
+        setters = []
+        for _ in range(self._varint()):
+            name = self._string()
+            if not name in properties:
+                raise ValueError(
+                    "Unexpected property of %s in binary DFXML: %r."
+                    % (cls.__name__, name)
+                )
+            setters.append((name, _BINARY_SETTERS.get(name)))
+        shape = (cls, tuple(setters))
+        self._shapes.append(shape)
+        return shape
+
+    def _string(self) -> str:
+        index = self._varint()
+        if index > 0:
+            return self._strings[index - 1]
+        retval = self._decode_str_literal()
+        if len(self._strings) < _BINARY_STRING_TABLE_MAX:
+            self._strings.append(retval)
+        return retval
+
+    def _varint(self) -> int:
+        data = self._data
+        pos = self._pos
+        byte = data[pos]
+        pos += 1
+        retval = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            retval |= (byte & 0x7F) << shift
+            shift += 7
+        self._pos = pos
+        return retval
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _is_binary_dfxml(filename: str) -> bool:
+    """Returns True if the file filename starts with the binary DFXML magic bytes."""
+    try:
+        with open(filename, "rb") as fh:
+            return fh.read(len(BINARY_DFXML_MAGIC)) == BINARY_DFXML_MAGIC
+    except OSError:
+        return False
+
+
+def iterparse_binary(
+    filename: str,
+    events: typing.Tuple[str, ...] = ("start", "end"),
+) -> typing.Iterator[typing.Tuple[str, AbstractObject]]:
+    """
+    Generator.  Yields the (event, object) pairs stored in the binary DFXML file filename.  iterparse() calls this for binary DFXML files.
+
+    @param events: Events.  Optional.  A tuple of strings, containing "start" and/or "end".
+    """
+    for e in events:
+        if not e in _BINARY_EVENTS:
+            raise ValueError(
+                "Unexpected event type: %r.  Expecting 'start', 'end'." % e
+            )
+    with open(filename, "rb") as fh:
+        for event, obj in BinaryDFXMLReader(fh):
+            if event in events:
+                yield (event, obj)
+
+
+def _iterparse_binary_filtered(
+    filename: str,
+    events: typing.Set[str],
+    fields: typing.Optional[typing.Iterable[str]],
+    file_filter: typing.Optional[FileObjectFilter],
+) -> typing.Iterator[typing.Tuple[str, AbstractObject]]:
+    """Generator.  iterparse_binary, with iterparse's field projection and file filter applied to the stored FileObjects."""
+    projected: typing.Optional[typing.List[str]] = None
+    if not fields is None:
+        groups = FileObject._field_groups(fields)
+        projected = [
+            prop
+            for prop in FileObject._class_properties
+            if FileObject._property_groups.get(prop, prop) in groups
+        ]
+    if not file_filter is None:
+        _typecheck(file_filter, FileObjectFilter)
+
+    for event, obj in iterparse_binary(filename, tuple(events)):
+        if isinstance(obj, FileObject):
+            if not file_filter is None and not file_filter(obj):
+                continue
+            if not projected is None:
+                # As FileObject.populate_from_Element does, keep the annotations, and the differences of the projected properties.
+                fobj = FileObject()
+                for prop in projected:
+                    setattr(fobj, prop, getattr(obj, prop))
+                if obj._annos:
+                    fobj.annos.update(obj._annos)
+                if obj._diffs:
+                    fobj.diffs.update(obj._diffs.intersection(projected))
+                fobj.volume_object = obj.volume_object
+                obj = fobj
+        yield (event, obj)
+
+
+def dfxml_to_binary(
+    filename: str,
+    binary_filename: str,
+    *,
+    backend: typing.Union[None, str, AbstractParserBackend] = None,
+) -> None:
+    """
+    Converts the DFXML file filename (or a disk image, or another file iterparse() reads) to the binary DFXML file binary_filename.
+
+    @param backend: Optional.  The XML parser backend.  See iterparse().
+    """
+    with open(binary_filename, "wb") as fh:
+        with BinaryDFXMLWriter(fh) as writer:
+            for event, obj in iterparse(filename, backend=backend):
+                writer.write(event, obj)
+
+
+def binary_to_dfxml(binary_filename: str, filename: str) -> None:
+    """
+    Converts the binary DFXML file binary_filename to the DFXML file filename.
+    """
+    dobj = parse(binary_filename)
+    with open(filename, "w") as fh:
+        dobj.print_dfxml(fh)
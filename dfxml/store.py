@@ -0,0 +1,590 @@
+# This software was developed at the National Institute of Standards
+# and Technology in whole or in part by employees of the Federal
+# Government in the course of their official duties. Pursuant to
+# title 17 Section 105 of the United States Code portions of this
+# software authored by NIST employees are not subject to copyright
+# protection and are in the public domain. For portions not authored
+# by NIST employees, NIST has been granted unlimited rights. NIST
+# assumes no responsibility whatsoever for its use by other parties,
+# and makes no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+This file stores the FileObjects of DFXML files in SQLite databases, with FileObjectStore, for queries by property.
+
+FileObjectStore is re-exported by dfxml.objects.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import math
+import os
+import sys
+import typing
+
+sys.path.append(os.path.dirname(__file__) + "/..")
+from dfxml.objects import (
+    AbstractParserBackend,
+    DFXMLObject,
+    DFXMLStreamWriter,
+    FileObject,
+    Parser,
+    TimestampObject,
+    VolumeObject,
+    _epoch_seconds,
+    _ET_escape_attrib,
+    _ET_tostring,
+    _sniff_compression,
+    _typecheck,
+    iterparse,
+)
+from dfxml.objects_binary import _is_binary_dfxml
+
+# FileObjects inserted into a FileObjectStore per executemany() batch.
+_STORE_BATCH_SIZE = 10000
+
+
+class FileObjectStore(object):
+    """
+    A persistent SQLite database of the FileObjects of a DFXML document, for repeated querying without parsing the document again.
+
+    The store holds each FileObject's DFXML text, from which query results are parsed, and tables of its properties for selecting FileObjects:
+
+    * files:  One row per FileObject, numbered (record) in the order FileObjects were added.  Columns:  record, volume, filename, partition, inode, id, filesize, alloc (1 if allocated, 0 if unallocated, NULL if unknown), name_type, meta_type, mode, and dfxml (the FileObject's text).
+    * volumes:  The VolumeObjects of the FileObjects, with their properties (not their children) as DFXML text.  Columns:  volume, position (the number of FileObjects added before the volume), partition_offset, ftype_str, dfxml.
+    * byte_runs:  One row per byte run.  Columns:  record, facet ("data", "inode" or "name"), img_offset, fs_offset, file_offset, len, fill, type.
+    * hashes:  One row per hash.  Columns:  record, type (e.g. "sha1"), value.
+    * timestamps:  One row per timestamp.  Columns:  record, name (e.g. "mtime"), time (seconds since the Unix epoch, treating times without a time zone as UTC).
+    * annotations:  Differential annotations.  Columns:  record, kind ("anno" for the annos property, "diff" for diffs), name.
+    * externals:  Elements of other namespaces.  Columns:  record, position, dfxml.
+
+    Indexes cover files (inode, partition), filename and filesize, hashes by value, timestamps by (name, time), and annotations by (kind, name).  query() selects FileObjects with an SQL condition on these tables; the by_*() methods wrap common queries.  Returned FileObjects retain their text (see FileObject.raw_dfxml), and have volume_object set to a VolumeObject shared by the FileObjects of the volume.
+
+    FileObjects are added with append() or extend(), and are written to the database in batches with executemany(), within a transaction committed by commit() or close().  build() loads a DFXML file.  export() writes the store back to DFXML.  The document's disk image, partition system and partition containers are not stored:  exported volumes and FileObjects are children of the document.
+    """
+
+    VERSION = 1
+
+    _schema = [
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS volumes (volume INTEGER PRIMARY KEY, position INTEGER, partition_offset INTEGER, ftype_str TEXT, dfxml TEXT)",
+        "CREATE TABLE IF NOT EXISTS files (record INTEGER PRIMARY KEY, volume INTEGER, filename TEXT, partition INTEGER, inode INTEGER, id INTEGER, filesize INTEGER, alloc INTEGER, name_type TEXT, meta_type INTEGER, mode INTEGER, dfxml TEXT)",
+        "CREATE TABLE IF NOT EXISTS byte_runs (record INTEGER, facet TEXT, img_offset INTEGER, fs_offset INTEGER, file_offset INTEGER, len INTEGER, fill INTEGER, type TEXT)",
+        "CREATE TABLE IF NOT EXISTS hashes (record INTEGER, type TEXT, value TEXT)",
+        "CREATE TABLE IF NOT EXISTS timestamps (record INTEGER, name TEXT, time REAL)",
+        "CREATE TABLE IF NOT EXISTS annotations (record INTEGER, kind TEXT, name TEXT)",
+        "CREATE TABLE IF NOT EXISTS externals (record INTEGER, position INTEGER, dfxml TEXT)",
+    ]
+
+    _indexes = [
+        "CREATE INDEX IF NOT EXISTS files_inode_partition ON files (inode, partition)",
+        "CREATE INDEX IF NOT EXISTS files_filename ON files (filename)",
+        "CREATE INDEX IF NOT EXISTS files_filesize ON files (filesize)",
+        "CREATE INDEX IF NOT EXISTS byte_runs_record ON byte_runs (record)",
+        "CREATE INDEX IF NOT EXISTS hashes_value ON hashes (value, type)",
+        "CREATE INDEX IF NOT EXISTS timestamps_name_time ON timestamps (name, time)",
+        "CREATE INDEX IF NOT EXISTS annotations_kind_name ON annotations (kind, name)",
+        "CREATE INDEX IF NOT EXISTS externals_record ON externals (record, position)",
+    ]
+
+    _inserts = {
+        "files": "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        "byte_runs": "INSERT INTO byte_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        "hashes": "INSERT INTO hashes VALUES (?, ?, ?)",
+        "timestamps": "INSERT INTO timestamps VALUES (?, ?, ?)",
+        "annotations": "INSERT INTO annotations VALUES (?, ?, ?)",
+        "externals": "INSERT INTO externals VALUES (?, ?, ?)",
+    }
+
+    # FileObjects parsed per Parser run by query().
+    _parse_batch_size = 1000
+
+    def __init__(
+        self, path: str, dfxmlobject: typing.Optional[DFXMLObject] = None
+    ) -> None:
+        """
+        Opens the store at path, creating it if it does not exist.
+
+        @param dfxmlobject: Optional.  The DFXMLObject of the document, for the header of exported DFXML, and for the namespaces of the stored FileObjects' text.  Default: the DFXMLObject the store was created with, or a new DFXMLObject.  See the dfxmlobject property.
+        """
+        import sqlite3
+
+        self._path = path
+        self._connection = sqlite3.connect(path)
+        self._pending: typing.Dict[str, typing.List[tuple]] = {
+            table: [] for table in FileObjectStore._inserts
+        }
+        self._pending_files = 0
+        # Keys:  id() of VolumeObjects added in this session.  Values:  (VolumeObject, volume number) pairs.
+        self._added_volumes: typing.Dict[int, typing.Tuple[VolumeObject, int]] = dict()
+        # VolumeObjects parsed from the volumes table, by volume number.
+        self._volumes: typing.Dict[int, VolumeObject] = dict()
+        self._dobj: typing.Optional[DFXMLObject] = None
+        self._head = ""
+
+        cursor = self._connection.cursor()
+        for statement in FileObjectStore._schema + FileObjectStore._indexes:
+            cursor.execute(statement)
+        version = self._meta("version")
+        if version is None:
+            cursor.execute(
+                "INSERT INTO meta VALUES ('version', ?)",
+                (str(FileObjectStore.VERSION),),
+            )
+        elif version != str(FileObjectStore.VERSION):
+            self._connection.close()
+            raise ValueError(
+                "Unsupported FileObjectStore version %s in %r." % (version, path)
+            )
+        self._next_record: int = cursor.execute(
+            "SELECT COALESCE(MAX(record) + 1, 0) FROM files"
+        ).fetchone()[0]
+
+        if not dfxmlobject is None:
+            self.dfxmlobject = dfxmlobject
+        elif self._meta("dfxml") is None:
+            self.dfxmlobject = DFXMLObject()
+        self._connection.commit()
+
+    def __enter__(self) -> FileObjectStore:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __iter__(self) -> typing.Iterator[FileObject]:
+        """Yields all FileObjects, in the order they were added."""
+        return self.query()
+
+    def __len__(self) -> int:
+        self._flush()
+        return self._connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def _add_volume(self, vobj: VolumeObject) -> int:
+        """Returns the volume number of vobj, storing it if it was not added before."""
+        key = id(vobj)
+        if key in self._added_volumes:
+            return self._added_volumes[key][1]
+        cursor = self._connection.execute(
+            "INSERT INTO volumes (position, partition_offset, ftype_str, dfxml) VALUES (?, ?, ?, ?)",
+            (
+                self._next_record,
+                vobj.partition_offset,
+                vobj.ftype_str,
+                _ET_tostring(vobj.to_partial_Element()),
+            ),
+        )
+        volume = typing.cast(int, cursor.lastrowid)
+        self._added_volumes[key] = (vobj, volume)
+        return volume
+
+    def _flush(self) -> None:
+        """Inserts the rows of the added FileObjects."""
+        if self._pending_files == 0:
+            return
+        cursor = self._connection.cursor()
+        for table, rows in self._pending.items():
+            if rows:
+                cursor.executemany(FileObjectStore._inserts[table], rows)
+                rows.clear()
+        self._pending_files = 0
+
+    def _meta(self, key: str) -> typing.Optional[str]:
+        row = self._connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _parse_rows(
+        self, rows: typing.Iterable[typing.Tuple[typing.Optional[int], str]]
+    ) -> typing.Iterator[FileObject]:
+        """Yields the FileObjects of (volume number, DFXML text) rows, parsing batches of them together."""
+        dobj = self.dfxmlobject
+        batch: typing.List[typing.Tuple[typing.Optional[int], str]] = []
+        for row in itertools.chain(rows, [None]):
+            if not row is None:
+                batch.append(row)
+                if len(batch) < FileObjectStore._parse_batch_size:
+                    continue
+            if not batch:
+                break
+            data = "%s%s</dfxml>" % (self._head, "".join([text for (_, text) in batch]))
+            fobjs = [
+                obj
+                for (event, obj) in Parser().iterparse(
+                    io.BytesIO(data.encode("utf-8")), ("end",)
+                )
+                if isinstance(obj, FileObject)
+            ]
+            if len(fobjs) != len(batch):
+                raise ValueError(
+                    "Expected %d FileObjects in %r, parsed %d."
+                    % (len(batch), self._path, len(fobjs))
+                )
+            for fobj, (volume, text) in zip(fobjs, batch):
+                if not volume is None:
+                    fobj.volume_object = self.volume(volume)
+                fobj.raw_dfxml = text
+                yield fobj
+            batch = []
+
+    def append(self, fobj: FileObject) -> None:
+        """Adds a FileObject.  Its volume_object, if set, is stored with it (once per VolumeObject)."""
+        _typecheck(fobj, FileObject)
+        record = self._next_record
+        self._next_record += 1
+        volume = None
+        if not fobj.volume_object is None:
+            volume = self._add_volume(fobj.volume_object)
+        alloc = fobj.is_allocated()
+        pending = self._pending
+        pending["files"].append(
+            (
+                record,
+                volume,
+                fobj.filename,
+                fobj.partition,
+                fobj.inode,
+                fobj.id,
+                fobj.filesize,
+                None if alloc is None else int(alloc),
+                fobj.name_type,
+                fobj.meta_type,
+                fobj.mode,
+                fobj.to_dfxml(),
+            )
+        )
+        for prop in ("data_brs", "inode_brs", "name_brs"):
+            brs = getattr(fobj, prop)
+            if not brs:
+                continue
+            facet = brs.facet or prop[: -len("_brs")]
+            for br in brs:
+                pending["byte_runs"].append(
+                    (
+                        record,
+                        facet,
+                        br.img_offset,
+                        br.fs_offset,
+                        br.file_offset,
+                        br.len,
+                        br.fill,
+                        br.type,
+                    )
+                )
+        for name in FileObject._hash_properties:
+            value = getattr(fobj, name)
+            if not value is None:
+                pending["hashes"].append((record, name, value.lower()))
+        for name in TimestampObject.timestamp_name_list:
+            tobj = getattr(fobj, name)
+            if not tobj is None and not tobj.time is None:
+                pending["timestamps"].append((record, name, _epoch_seconds(tobj)))
+        if fobj._annos:
+            for anno in fobj._annos:
+                pending["annotations"].append((record, "anno", anno))
+        if fobj._diffs:
+            for diff in fobj._diffs:
+                pending["annotations"].append((record, "diff", diff))
+        if fobj._externals:
+            for position, e in enumerate(fobj._externals):
+                pending["externals"].append((record, position, _ET_tostring(e)))
+        self._pending_files += 1
+        if self._pending_files >= _STORE_BATCH_SIZE:
+            self._flush()
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        store_path: typing.Optional[str] = None,
+        *,
+        backend: typing.Union[None, str, AbstractParserBackend] = None,
+    ) -> FileObjectStore:
+        """
+        Creates a store of the DFXML file at path (or of another file iterparse() reads, such as compressed or binary DFXML, or a disk image), replacing any existing store, and returns it opened.  FileObjects' text is copied from an uncompressed DFXML file (see iterparse's keep_raw), and is serialized from the FileObjects otherwise.  The indexes are created after loading.
+
+        @param store_path: Optional.  Path of the store.  Default: path with ".sqlite" appended.
+        @param backend: Optional.  The XML parser backend.  See iterparse().
+        """
+        store_path = store_path or path + ".sqlite"
+        if os.path.exists(store_path):
+            os.unlink(store_path)
+        store = cls(store_path)
+        try:
+            store._connection.execute("PRAGMA synchronous = OFF")
+            for statement in FileObjectStore._indexes:
+                store._connection.execute(
+                    "DROP INDEX %s" % statement.split(" ON ")[0].split()[-1]
+                )
+            # Source text can only be retained from uncompressed DFXML files.
+            keep_raw = (
+                path.endswith("xml")
+                and _sniff_compression(path) is None
+                and not _is_binary_dfxml(path)
+            )
+            for event, obj in iterparse(path, backend=backend, keep_raw=keep_raw):
+                if isinstance(obj, DFXMLObject):
+                    if event == "start":
+                        store.dfxmlobject = obj
+                elif isinstance(obj, VolumeObject):
+                    volume = store._add_volume(obj)
+                    if event == "end":
+                        # Poststream properties, such as errors, are read at the volume's end.
+                        store._connection.execute(
+                            "UPDATE volumes SET dfxml = ? WHERE volume = ?",
+                            (_ET_tostring(obj.to_partial_Element()), volume),
+                        )
+                elif isinstance(obj, FileObject):
+                    store.append(obj)
+            store._flush()
+            for statement in FileObjectStore._indexes:
+                store._connection.execute(statement)
+            store.commit()
+            store._connection.execute("PRAGMA synchronous = FULL")
+        except BaseException:
+            store.close()
+            raise
+        return store
+
+    def by_anno(self, anno: str) -> typing.List[FileObject]:
+        """Returns the FileObjects with the differential annotation anno (e.g. "new"; see FileObject.annos)."""
+        return list(
+            self.query(
+                "record IN (SELECT record FROM annotations WHERE kind = 'anno' AND name = ?)",
+                (anno,),
+            )
+        )
+
+    def by_filename(self, filename: str) -> typing.List[FileObject]:
+        """Returns the FileObjects with filename filename."""
+        return list(self.query("filename = ?", (filename,)))
+
+    def by_filesize(
+        self, minimum: typing.Optional[int] = None, maximum: typing.Optional[int] = None
+    ) -> typing.List[FileObject]:
+        """Returns the FileObjects with filesizes within minimum and maximum, inclusive.  None bounds are unlimited."""
+        return list(
+            self.query(
+                "filesize BETWEEN ? AND ?",
+                (
+                    -(1 << 63) if minimum is None else minimum,
+                    (1 << 63) - 1 if maximum is None else maximum,
+                ),
+            )
+        )
+
+    def by_hash(
+        self, value: str, hash_type: typing.Optional[str] = None
+    ) -> typing.List[FileObject]:
+        """Returns the FileObjects with a hash of value value, of type hash_type (e.g. "sha1") if it is not None.  Hashes are lowercase hexadecimal."""
+        if hash_type is None:
+            return list(
+                self.query(
+                    "record IN (SELECT record FROM hashes WHERE value = ?)",
+                    (value.lower(),),
+                )
+            )
+        return list(
+            self.query(
+                "record IN (SELECT record FROM hashes WHERE value = ? AND type = ?)",
+                (value.lower(), hash_type),
+            )
+        )
+
+    def by_inode(
+        self, inode: int, partition: typing.Optional[int] = None
+    ) -> typing.List[FileObject]:
+        """Returns the FileObjects with inode number inode, and with partition number partition if it is not None."""
+        if partition is None:
+            return list(self.query("inode = ?", (inode,)))
+        return list(self.query("partition = ? AND inode = ?", (partition, inode)))
+
+    def by_time(
+        self,
+        name: str,
+        start: typing.Any = None,
+        end: typing.Any = None,
+    ) -> typing.List[FileObject]:
+        """
+        Returns the FileObjects whose timestamp named name (e.g. "mtime") is within start and end, inclusive.
+
+        @param start: Optional.  A time TimestampObject accepts (e.g. an ISO 8601 string or a datetime), or a number of seconds since the Unix epoch.  Default: unlimited.
+        @param end: Optional.  As start.
+        """
+        if not name in TimestampObject.timestamp_name_list:
+            raise ValueError("Unexpected timestamp name: %r." % name)
+
+        def _bound(value: typing.Any, default: float) -> float:
+            if value is None:
+                return default
+            if isinstance(value, (int, float)):
+                return float(value)
+            return _epoch_seconds(TimestampObject(value, name=name))
+
+        return list(
+            self.query(
+                "record IN (SELECT record FROM timestamps WHERE name = ? AND time BETWEEN ? AND ?)",
+                (name, _bound(start, -math.inf), _bound(end, math.inf)),
+            )
+        )
+
+    def close(self) -> None:
+        """Commits the added FileObjects, and closes the store."""
+        self.commit()
+        self._connection.close()
+
+    def commit(self) -> None:
+        """Writes the added FileObjects, and commits them."""
+        self._flush()
+        self._connection.commit()
+
+    @property
+    def connection(self):
+        """The store's sqlite3.Connection, for queries of its tables."""
+        return self._connection
+
+    @property
+    def dfxmlobject(self) -> DFXMLObject:
+        """The DFXMLObject of the document, without its child objects.  Assigning a DFXMLObject stores its properties and namespaces.  Namespaces of FileObjects' text must be declared in the text, or be the DFXMLObject's namespaces."""
+        if self._dobj is None:
+            text = self._meta("dfxml")
+            assert not text is None
+            for event, obj in Parser().iterparse(
+                io.BytesIO(text.encode("utf-8")), ("start",)
+            ):
+                if isinstance(obj, DFXMLObject):
+                    self.dfxmlobject = obj
+                    break
+        assert not self._dobj is None
+        return self._dobj
+
+    @dfxmlobject.setter
+    def dfxmlobject(self, val: DFXMLObject) -> None:
+        _typecheck(val, DFXMLObject)
+        self._dobj = val
+        self._connection.execute(
+            "INSERT OR REPLACE INTO meta VALUES ('dfxml', ?)",
+            (_ET_tostring(val.to_partial_Element()),),
+        )
+        self._head = "<dfxml%s>" % "".join(
+            [
+                ' xmlns%s="%s"'
+                % (":" + prefix if prefix else "", _ET_escape_attrib(url))
+                for (prefix, url) in val.iter_namespaces()
+            ]
+        )
+
+    def export(
+        self,
+        output: typing.Union[None, str, typing.IO[str], typing.IO[bytes]] = None,
+        *,
+        compression: typing.Optional[str] = None,
+    ) -> None:
+        """
+        Writes the store as a DFXML document, with DFXMLStreamWriter.  FileObjects are written in the order they were added, with their stored text, within their volumes.
+
+        @param output: Optional.  A path or file handle.  See DFXMLStreamWriter.
+        @param compression: Optional.  See DFXMLStreamWriter.
+        """
+        self._flush()
+        # (position, volume number) pairs, in the order the volumes were added.
+        positions = self._connection.execute(
+            "SELECT position, volume FROM volumes ORDER BY volume"
+        ).fetchall()
+        next_position = 0
+        with DFXMLStreamWriter(
+            output, self.dfxmlobject, compression=compression
+        ) as writer:
+
+            def _open_scope(volume: int) -> None:
+                vobj = self.volume(volume)
+                assert not vobj is None
+                writer.open_scope(vobj)
+
+            current = None
+            for record, volume, text in self._connection.execute(
+                "SELECT record, volume, dfxml FROM files ORDER BY record"
+            ):
+                # Open the volumes added before this FileObject, writing those without FileObjects here as empty volumes.
+                while (
+                    next_position < len(positions)
+                    and positions[next_position][0] <= record
+                    and (volume is None or positions[next_position][1] <= volume)
+                ):
+                    other = positions[next_position][1]
+                    next_position += 1
+                    if other == current:
+                        continue
+                    if not current is None:
+                        writer.close_scope()
+                    _open_scope(other)
+                    current = other
+                if volume != current:
+                    if not current is None:
+                        writer.close_scope()
+                    if not volume is None:
+                        _open_scope(volume)
+                    current = volume
+                writer._write_text(text)
+            if not current is None:
+                writer.close_scope()
+            for _, other in positions[next_position:]:
+                _open_scope(other)
+                writer.close_scope()
+
+    def extend(self, fobjs: typing.Iterable[FileObject]) -> None:
+        """Adds FileObjects.  See append()."""
+        for fobj in fobjs:
+            self.append(fobj)
+
+    @property
+    def path(self) -> str:
+        """Path to the store."""
+        return self._path
+
+    def query(
+        self,
+        where: typing.Optional[str] = None,
+        parameters: typing.Sequence[typing.Any] = (),
+        *,
+        order_by: str = "record",
+        limit: typing.Optional[int] = None,
+    ) -> typing.Iterator[FileObject]:
+        """
+        Generator.  Yields the FileObjects of the files table rows that satisfy an SQL condition.
+
+        @param where: Optional.  An SQL expression on the columns of the files table, with "?" placeholders.  E.g. "filesize > ? AND record IN (SELECT record FROM hashes WHERE type = 'md5')".  Default: all rows.
+        @param parameters: Optional.  Values of the placeholders of where.
+        @param order_by: Optional.  An SQL ordering of the files table rows.  Default: "record", the order FileObjects were added.
+        @param limit: Optional.  The maximum number of FileObjects to yield.
+        """
+        self._flush()
+        sql = "SELECT volume, dfxml FROM files"
+        if not where is None:
+            sql += " WHERE " + where
+        sql += " ORDER BY " + order_by
+        if not limit is None:
+            sql += " LIMIT %d" % limit
+        yield from self._parse_rows(self._connection.execute(sql, parameters))
+
+    def volume(self, volume: int) -> typing.Optional[VolumeObject]:
+        """Returns a VolumeObject with the properties of the stored volume numbered volume, or None if there is none.  The VolumeObject is parsed on first request and cached."""
+        if not volume in self._volumes:
+            row = self._connection.execute(
+                "SELECT dfxml FROM volumes WHERE volume = ?", (volume,)
+            ).fetchone()
+            if row is None:
+                return None
+            data = "%s%s</dfxml>" % (self._head, row[0])
+            for event, obj in Parser().iterparse(
+                io.BytesIO(data.encode("utf-8")), ("end",)
+            ):
+                if isinstance(obj, VolumeObject):
+                    self._volumes[volume] = obj
+                    break
+        return self._volumes.get(volume)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import random
+
+import pytest
+
+
+@pytest.fixture
+def image_size() -> int:
+    """
+    The size of the image_bytes fixture.  Test modules override this fixture for other sizes.
+    """
+    return 64 * 1024
+
+
+@pytest.fixture
+def image_bytes(image_size: int) -> bytes:
+    """
+    Random, reproducible disk image contents.
+    """
+    return random.Random(0).randbytes(image_size)
+
+
+@pytest.fixture
+def raw_image(tmp_path, image_bytes: bytes) -> str:
+    """
+    The path of a raw disk image file holding image_bytes.
+    """
+    path = str(tmp_path / "image.raw")
+    with open(path, "wb") as fh:
+        fh.write(image_bytes)
+    return path
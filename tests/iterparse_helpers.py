@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+"""
+Documents and helpers shared by the tests of Objects.iterparse and its variants.
+"""
+
+import os
+import typing
+
+import dfxml
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+SAMPLE = os.path.join(samples_dir, "difference_test_2.xml")
+
+# This document exercises elements the Parser retains from before and after child object streams, and externals within file objects.
+TRICKY_DFXML = """<?xml version='1.0' encoding='UTF-8'?>
+<dfxml xmlns='http://www.forensicswiki.org/wiki/Category:Digital_Forensics_XML' xmlns:dc='http://purl.org/dc/elements/1.1/' xmlns:delta='http://www.forensicswiki.org/wiki/Forensic_Disk_Differencing' version='2.0.0'>
+  <!-- A comment. -->
+  <metadata><dc:type>Test</dc:type></metadata>
+  <creator><program>tricky</program><version>1.0</version><execution_environment><command_line>tricky --x</command_line></execution_environment></creator>
+  <source><image_filename>a.raw</image_filename></source>
+  <diskimageobject>
+    <partitionsystemobject>
+      <pstype_str>dos</pstype_str>
+      <partitionobject>
+        <ptype_str>x</ptype_str>
+        <fileobject><filename>in partition</filename></fileobject>
+      </partitionobject>
+    </partitionsystemobject>
+  </diskimageobject>
+  <volume offset='512'>
+    <partition_offset>512</partition_offset>
+    <ftype_str>fat16</ftype_str>
+    <ext:note xmlns:ext='urn:example:ext'>volume note<ext:sub/></ext:note>
+    <fileobject delta:new_file='1'>
+      <filename>a.txt</filename>
+      <error>file error</error>
+      <mtime prec='100ns'>2013-01-01T00:00:00.5Z</mtime>
+      <ext2:tag xmlns:ext2='urn:example:ext2' k='v'>x<ext2:inner>y</ext2:inner></ext2:tag>
+      <byte_runs facet='data'><byte_run img_offset='1024' len='10'><hashdigest type='md5'>abc</hashdigest></byte_run></byte_runs>
+      <hashdigest type='sha1' delta:changed_property='1'>def</hashdigest>
+    </fileobject>
+    <fileobject><filename/></fileobject>
+    <error>volume error</error>
+  </volume>
+  <volume offset='4096'>
+    <ftype_str>ntfs</ftype_str>
+  </volume>
+  <fileobject><filename>top</filename><inode>7</inode></fileobject>
+  <rusage><utime>1</utime></rusage>
+</dfxml>
+"""
+
+# Exercises prefixed and self-closing <fileobject>s, and <fileobject> text in comments and CDATA.
+TRICKY_XML = """<?xml version='1.0' encoding='UTF-8'?>
+<dfxml xmlns='%s' xmlns:dc='http://purl.org/dc/elements/1.1/' version='2.0.0'>
+  <!-- <fileobject><filename>commented</filename></fileobject> -->
+  <metadata><dc:type>Test</dc:type></metadata>
+  <creator><program>test</program></creator>
+  <diskimageobject>
+    <partitionsystemobject>
+      <pstype_str>dos</pstype_str>
+      <partitionobject>
+        <ptype_str>x</ptype_str>
+        <fileobject><filename>in partition</filename></fileobject>
+      </partitionobject>
+    </partitionsystemobject>
+  </diskimageobject>
+  <volume offset='512' xmlns:d='%s'>
+    <ftype_str>fat16</ftype_str>
+    <d:fileobject><d:filename>prefixed</d:filename></d:fileobject>
+    <fileobject>
+      <filename>a.txt</filename>
+      <!-- </fileobject> -->
+      <ext2:tag xmlns:ext2='urn:example:ext2'><![CDATA[</fileobject>]]></ext2:tag>
+    </fileobject>
+    <fileobject/>
+    <fileobject><filename>b.txt</filename><filesize>3</filesize></fileobject>
+    <error>volume error</error>
+  </volume>
+  <volume offset='4096'>
+    <ftype_str>ntfs</ftype_str>
+  </volume>
+  <fileobject><filename>top</filename><inode>7</inode></fileobject>
+</dfxml>
+""" % (
+    dfxml.XMLNS_DFXML,
+    dfxml.XMLNS_DFXML,
+)
+
+
+def fileobjects(path: str, **kwargs) -> typing.List[Objects.FileObject]:
+    """
+    Returns the FileObjects iterparse yields from path.  Keyword arguments are passed to iterparse.
+    """
+    return [
+        obj
+        for (event, obj) in Objects.iterparse(path, **kwargs)
+        if isinstance(obj, Objects.FileObject)
+    ]
+
+
+def serialization(obj: typing.Optional[Objects.AbstractObject]) -> str:
+    """
+    Serializes an object iterparse yields: a FileObject in full, and a container object without its children.
+    """
+    if isinstance(obj, Objects.FileObject):
+        return obj.to_dfxml()
+    if isinstance(
+        obj,
+        (
+            Objects.DFXMLObject,
+            Objects.DiskImageObject,
+            Objects.PartitionSystemObject,
+            Objects.PartitionObject,
+            Objects.VolumeObject,
+        ),
+    ):
+        return Objects._ET_tostring(obj.to_partial_Element())
+    raise TypeError("Unexpected iterparse object: %r." % obj)
+
+
+def summarize(
+    eops: typing.Iterable[typing.Tuple[str, typing.Optional[Objects.AbstractObject]]],
+) -> typing.List[typing.Tuple[str, str, str]]:
+    """
+    Summarizes (event, object) pairs of iterparse for comparison.
+    """
+    return [(event, type(obj).__name__, serialization(obj)) for (event, obj) in eops]
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import asyncio
+import concurrent.futures
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import typing
+
+import pytest
+
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+SAMPLES = ["difference_test_0.xml", "difference_test_2.xml", "difference_test_3.xml"]
+
+
+def _summary(
+    eops: typing.Iterable[typing.Tuple[str, typing.Optional[Objects.AbstractObject]]],
+) -> typing.List[typing.Tuple[str, str, typing.Any]]:
+    """Returns the events, object types and FileObjects of an (event, object) stream, for comparison."""
+    return [
+        (
+            event,
+            type(obj).__name__,
+            obj if isinstance(obj, Objects.FileObject) else None,
+        )
+        for (event, obj) in eops
+    ]
+
+
+def _aiterparse(path: str, **kwargs) -> typing.List[typing.Tuple[str, typing.Any]]:
+    async def _collect():
+        return [eop async for eop in Objects.aiterparse(path, **kwargs)]
+
+    return asyncio.run(_collect())
+
+
+@pytest.mark.parametrize("sample", SAMPLES)
+@pytest.mark.parametrize("backend", ["etree", "lxml"])
+@pytest.mark.parametrize("use_executor", [False, True])
+def test_aiterparse_matches_iterparse(
+    sample: str, backend: str, use_executor: bool
+) -> None:
+    if backend == "lxml":
+        pytest.importorskip("lxml")
+    path = os.path.join(samples_dir, sample)
+    expected = _summary(Objects.iterparse(path, backend=backend))
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        eops = _aiterparse(
+            path, backend=backend, executor=executor if use_executor else None
+        )
+    assert _summary(eops) == expected
+
+
+def test_aiterparse_arguments() -> None:
+    path = os.path.join(samples_dir, "difference_test_2.xml")
+    file_filter = Objects.FileObjectFilter(alloc=True)
+    assert _summary(
+        _aiterparse(path, events=("end",), fields=["filename"], file_filter=file_filter)
+    ) == _summary(
+        Objects.iterparse(
+            path, events=("end",), fields=["filename"], file_filter=file_filter
+        )
+    )
+    lazy = [obj for (event, obj) in _aiterparse(path, lazy=True)]
+    assert any(isinstance(obj, Objects.LazyFileObject) for obj in lazy)
+    with pytest.raises(ValueError):
+        _aiterparse(path, events=("middle",))
+
+
+def test_aiterparse_compressed_and_binary(tmp_path) -> None:
+    path = os.path.join(samples_dir, "difference_test_2.xml")
+    expected = _summary(Objects.iterparse(path))
+    gzip_path = str(tmp_path / "compressed.xml.gz")
+    with open(path, "rb") as in_fh, gzip.open(gzip_path, "wb") as out_fh:
+        shutil.copyfileobj(in_fh, out_fh)
+    assert _summary(_aiterparse(gzip_path)) == expected
+
+    binary_path = str(tmp_path / "binary.bdfxml")
+    Objects.dfxml_to_binary(path, binary_path)
+    assert _summary(_aiterparse(binary_path)) == _summary(
+        Objects.iterparse(binary_path)
+    )
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a shell script.")
+def test_aiterparse_fiwalk(tmp_path) -> None:
+    path = os.path.join(samples_dir, "difference_test_2.xml")
+    fiwalk = tmp_path / "fiwalk"
+    fiwalk.write_text('#!/bin/sh\ncat "%s"\nexit "${FAKE_FIWALK_STATUS:-0}"\n' % path)
+    fiwalk.chmod(0o755)
+    image_path = str(tmp_path / "image.raw")
+
+    assert _summary(_aiterparse(image_path, fiwalk=str(fiwalk))) == _summary(
+        Objects.iterparse(path)
+    )
+
+    os.environ["FAKE_FIWALK_STATUS"] = "1"
+    try:
+        with pytest.raises(subprocess.CalledProcessError):
+            _aiterparse(image_path, fiwalk=str(fiwalk))
+    finally:
+        del os.environ["FAKE_FIWALK_STATUS"]
+
+
+def test_aiterparse_early_exit() -> None:
+    path = os.path.join(samples_dir, "difference_test_2.xml")
+
+    async def _first_file():
+        agen = Objects.aiterparse(path)
+        async for event, obj in agen:
+            if isinstance(obj, Objects.FileObject):
+                await agen.aclose()
+                return obj
+
+    assert isinstance(asyncio.run(_first_file()), Objects.FileObject)
+
+
+def test_parser_iterparse_push() -> None:
+    path = os.path.join(samples_dir, "difference_test_2.xml")
+    with open(path, "rb") as fh:
+        data = fh.read()
+    parser = Objects.Parser()
+    eops = parser.iterparse_push()
+    received = []
+    needed = 0
+    for start in range(0, len(data), 100):
+        parser.feed(data[start : start + 100])
+        for eop in eops:
+            if eop[0] == Objects.Parser.NEED_DATA:
+                needed += 1
+                break
+            received.append(eop)
+    parser.close()
+    received.extend(eops)
+    assert needed == len(range(0, len(data), 100))
+    assert _summary(received) == _summary(Objects.iterparse(path))
+    with pytest.raises(ValueError):
+        parser.feed(b"")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import datetime
+import io
+import os
+import typing
+
+import pytest
+from iterparse_helpers import summarize
+
+import dfxml
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+# Exercises externals, delta annotations, timestamps with time zones, and hashes.
+DIFFERENTIAL_XML = """<?xml version='1.0' encoding='UTF-8'?>
+<dfxml xmlns='%s' xmlns:delta='http://www.forensicswiki.org/wiki/Forensic_Disk_Differencing' version='2.0.0'>
+  <creator><program>test</program></creator>
+  <volume offset='512'>
+    <ftype_str>fat16</ftype_str>
+    <ext:note xmlns:ext='urn:example:ext'>volume note</ext:note>
+    <fileobject delta:modified_file='1'>
+      <delta:original_fileobject><filename>a.txt</filename><filesize>2</filesize></delta:original_fileobject>
+      <filename>a.txt</filename>
+      <filesize delta:changed_property='1'>3</filesize>
+      <mtime prec='100ns'>2013-01-01T00:00:00.5+02:00</mtime>
+      <ext2:tag xmlns:ext2='urn:example:ext2' k='v'>x<ext2:inner>y</ext2:inner>tail</ext2:tag>
+      <byte_runs><byte_run file_offset='0' img_offset='1024' len='3'/></byte_runs>
+      <hashdigest type='md5'>0123456789abcdef0123456789abcdef</hashdigest>
+      <hashdigest type='sha1'>0123456789ABCDEF0123456789ABCDEF01234567</hashdigest>
+    </fileobject>
+    <error>volume error</error>
+  </volume>
+  <fileobject><filename>%s</filename><inode>-7</inode></fileobject>
+</dfxml>
+""" % (
+    dfxml.XMLNS_DFXML,
+    "a long name, über sixteen characters",
+)
+
+
+@pytest.fixture
+def differential_path(tmp_path) -> str:
+    path = tmp_path / "differential.xml"
+    path.write_text(DIFFERENTIAL_XML, encoding="utf-8")
+    return str(path)
+
+
+def _eops(path: str, **kwargs) -> typing.List[typing.Tuple[str, str, str]]:
+    """Summarizes the (event, object) pairs of iterparse for comparison."""
+    return summarize(Objects.iterparse(path, **kwargs))
+
+
+@pytest.mark.parametrize(
+    "sample",
+    ["difference_test_0.xml", "difference_test_2.xml", "difference_test_3.xml"],
+)
+def test_binary_dfxml_samples(tmp_path, sample: str) -> None:
+    path = os.path.join(samples_dir, sample)
+    binary_path = str(tmp_path / "sample.dfxmlb")
+    Objects.dfxml_to_binary(path, binary_path)
+    assert _eops(binary_path) == _eops(path)
+
+
+def test_binary_dfxml_lossless(tmp_path, differential_path: str) -> None:
+    binary_path = str(tmp_path / "differential.dfxmlb")
+    Objects.dfxml_to_binary(differential_path, binary_path)
+    assert _eops(binary_path) == _eops(differential_path)
+
+    fobjs = [
+        obj
+        for (event, obj) in Objects.iterparse(differential_path)
+        if isinstance(obj, Objects.FileObject)
+    ]
+    binary_fobjs = [
+        obj
+        for (event, obj) in Objects.iterparse(binary_path)
+        if isinstance(obj, Objects.FileObject)
+    ]
+    assert binary_fobjs == fobjs
+    assert binary_fobjs[0].annos == {"modified"}
+    assert binary_fobjs[0].diffs == {"filesize"}
+    assert binary_fobjs[0].original_fileobject.filesize == 2
+    assert binary_fobjs[0].mtime.time == fobjs[0].mtime.time
+    assert len(binary_fobjs[0].externals) == len(fobjs[0].externals) > 0
+
+    # Converting back to XML matches printing the parsed XML.
+    xml_path = str(tmp_path / "round_trip.xml")
+    Objects.binary_to_dfxml(binary_path, xml_path)
+    expected = io.StringIO()
+    Objects.parse(differential_path).print_dfxml(expected)
+    with open(xml_path, "r") as fh:
+        assert fh.read() == expected.getvalue()
+
+
+def test_binary_dfxml_containers(differential_path: str) -> None:
+    buffer = io.BytesIO()
+    with Objects.BinaryDFXMLWriter(buffer) as writer:
+        for event, obj in Objects.iterparse(differential_path):
+            writer.write(event, obj)
+    buffer.seek(0)
+    eops = list(Objects.BinaryDFXMLReader(buffer))
+
+    # A container is one object, updated by its end event.
+    volume_eops = [
+        (event, obj) for (event, obj) in eops if isinstance(obj, Objects.VolumeObject)
+    ]
+    assert [event for (event, obj) in volume_eops] == ["start", "end"]
+    assert volume_eops[0][1] is volume_eops[1][1]
+    assert volume_eops[1][1].error == "volume error"
+    fobjs = [obj for (event, obj) in eops if isinstance(obj, Objects.FileObject)]
+    assert fobjs[0].volume_object is volume_eops[0][1]
+    assert fobjs[1].volume_object is None
+
+
+def test_binary_dfxml_iterparse_parameters(tmp_path, differential_path: str) -> None:
+    binary_path = str(tmp_path / "differential.dfxmlb")
+    Objects.dfxml_to_binary(differential_path, binary_path)
+    assert _eops(binary_path, events=("end",)) == _eops(
+        differential_path, events=("end",)
+    )
+    file_filter = Objects.FileObjectFilter(filename_glob="*.txt")
+    assert _eops(binary_path, fields=["filename"], file_filter=file_filter) == _eops(
+        differential_path, fields=["filename"], file_filter=file_filter
+    )
+    with pytest.raises(ValueError):
+        list(Objects.iterparse(binary_path, lazy=True))
+    with pytest.raises(ValueError):
+        list(Objects.iterparse(binary_path, workers=2))
+
+
+def test_binary_dfxml_errors(tmp_path, differential_path: str) -> None:
+    with pytest.raises(ValueError):
+        Objects.BinaryDFXMLReader(io.BytesIO(b"<dfxml/>"))
+
+    binary_path = str(tmp_path / "differential.dfxmlb")
+    Objects.dfxml_to_binary(differential_path, binary_path)
+    with open(binary_path, "rb") as fh:
+        data = fh.read()
+    with pytest.raises(ValueError):
+        list(Objects.BinaryDFXMLReader(io.BytesIO(data[:-3])))
+
+    writer = Objects.BinaryDFXMLWriter(io.BytesIO())
+    with pytest.raises(ValueError):
+        writer.write("middle", Objects.FileObject())
+
+    # Objects are stored by their public properties.  Shapes naming other attributes are rejected.
+    buffer = io.BytesIO()
+    with Objects.BinaryDFXMLWriter(buffer) as writer:
+        writer.write("end", Objects.FileObject(filename="a", filesize=1))
+    data = buffer.getvalue()
+    assert b"filesize" in data and not b"_filesize" in data
+    for malformed in [
+        data.replace(b"filesize", b"_filesiz"),
+        data.replace(b"filesize", b"__dict__"),
+        data.replace(b"FileObject", b"HiveObject"),
+    ]:
+        with pytest.raises(ValueError):
+            list(Objects.BinaryDFXMLReader(io.BytesIO(malformed)))
+
+
+def test_binary_dfxml_timestamps() -> None:
+    class _TZ(datetime.tzinfo):
+        def utcoffset(self, dt):
+            return datetime.timedelta(hours=1)
+
+        def dst(self, dt):
+            return datetime.timedelta(0)
+
+        def tzname(self, dt):
+            return "+01:00"
+
+    fobj = Objects.FileObject(
+        mtime=datetime.datetime(2020, 1, 1, tzinfo=_TZ()),
+        atime="2020-01-01T00:00:00.1234567Z",
+    )
+    buffer = io.BytesIO()
+    with Objects.BinaryDFXMLWriter(buffer) as writer:
+        writer.write("end", fobj)
+    buffer.seek(0)
+    [(event, binary_fobj)] = list(Objects.BinaryDFXMLReader(buffer))
+    assert isinstance(binary_fobj, Objects.FileObject)
+    assert binary_fobj == fobj
+    assert str(binary_fobj.atime) == "2020-01-01T00:00:00.1234567Z"
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import concurrent.futures
+import random
+import typing
+
+import pytest
+
+import dfxml
+import dfxml.objects as Objects
+
+IMAGE_SIZE = 10000
+
+
+@pytest.fixture
+def image_size() -> int:
+    return IMAGE_SIZE
+
+
+@pytest.fixture
+def block_cache() -> typing.Iterator[dfxml.BlockCache]:
+    cache = dfxml.BlockCache(block_size=512, capacity=4096)
+    previous = dfxml.set_block_cache(cache)
+    try:
+        yield cache
+    finally:
+        dfxml.set_block_cache(previous)
+
+
+class _CountingImage(object):
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.reads: typing.List[typing.Tuple[int, int]] = []
+
+    def read_at(self, offset: int, length: int) -> bytes:
+        self.reads.append((offset, length))
+        return self.data[offset : offset + length]
+
+
+def test_block_cache_reads(image_bytes: bytes) -> None:
+    cache = dfxml.BlockCache(block_size=512, capacity=2048, max_read=1024)
+    image = _CountingImage(image_bytes)
+    for offset, length in [(0, 10), (100, 412), (500, 30), (9990, 100), (9000, 0)]:
+        assert (
+            cache.read("image", image.read_at, offset, length)
+            == image_bytes[offset : offset + length]
+        )
+    # A read missing any of its blocks reads all of them at once.  9728 is the short, last block.
+    assert image.reads == [(0, 512), (0, 1024), (9728, 512)]
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 3, 0)
+    assert (len(cache), cache.size) == (3, 512 + 512 + 272)
+
+    # Reads longer than max_read bypass the cache.
+    assert cache.read("image", image.read_at, 0, 2000) == image_bytes[:2000]
+    assert image.reads[-1] == (0, 2000)
+    assert cache.misses == 3
+
+    # Least recently used blocks are evicted beyond the capacity.
+    cache.read("image", image.read_at, 0, 1)
+    cache.read("image", image.read_at, 2048, 1024)
+    assert cache.evictions == 1
+    image.reads.clear()
+    cache.read("image", image.read_at, 0, 1)
+    cache.read("image", image.read_at, 512, 1)
+    assert image.reads == [(512, 512)]
+    assert cache.size <= cache.capacity
+
+    # Blocks are keyed by image.
+    cache.read("other", _CountingImage(b"x" * 600).read_at, 0, 1)
+    assert cache.read("image", image.read_at, 0, 1) == image_bytes[:1]
+
+    with pytest.raises(ValueError):
+        dfxml.BlockCache(block_size=0)
+
+
+def test_block_cache_invalidate(image_bytes: bytes) -> None:
+    cache = dfxml.BlockCache(block_size=512)
+    image = _CountingImage(image_bytes)
+    cache.read("image", image.read_at, 0, 2048)
+    cache.read("other", image.read_at, 0, 512)
+    # A write to the second block.
+    image.data = image_bytes[:512] + bytes(512) + image_bytes[1024:]
+    cache.invalidate("image", 600, 10)
+    assert cache.read("image", image.read_at, 0, 2048) == (
+        image_bytes[:512] + bytes(512) + image_bytes[1024:2048]
+    )
+    image.data = bytes(IMAGE_SIZE)
+    cache.invalidate("image")
+    assert cache.read("image", image.read_at, 0, 2048) == bytes(2048)
+    assert cache.read("other", image.read_at, 0, 512) == image_bytes[:512]
+    cache.clear()
+    assert (len(cache), cache.size) == (0, 0)
+
+
+def test_block_cache_threads(image_bytes: bytes) -> None:
+    cache = dfxml.BlockCache(block_size=256, capacity=4096)
+    image = _CountingImage(image_bytes)
+    rng = random.Random(23)
+    requests = [(rng.randrange(IMAGE_SIZE), rng.randint(0, 1000)) for _ in range(2000)]
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        results = list(
+            executor.map(
+                lambda request: cache.read("image", image.read_at, *request), requests
+            )
+        )
+    assert results == [
+        image_bytes[offset : offset + length] for (offset, length) in requests
+    ]
+    assert cache.size <= cache.capacity
+    assert cache.hits + cache.misses >= len(requests)
+
+
+def test_image_reads_use_block_cache(
+    raw_image: str, image_bytes: bytes, block_cache: dfxml.BlockCache
+) -> None:
+    with open(raw_image, "rb") as fh:
+        assert dfxml.read_image_range(fh, 1000, 100) == image_bytes[1000:1100]
+        fi = dfxml.fileobject(imagefile=fh)
+        assert fi.content_for_run(dfxml.byte_run(1010, 20)) == image_bytes[1010:1030]
+    assert (block_cache.hits, block_cache.misses) == (2, 2)
+
+    # Reads of dfxml.objects share the cache, by image path.
+    with Objects.RawImageReader(raw_image) as reader:
+        assert bytes(reader.pread(1024, 10)) == image_bytes[1024:1034]
+    assert (block_cache.hits, block_cache.misses) == (3, 2)
+
+    # Streamed contents bypass the cache.
+    brs = Objects.ByteRuns()
+    brs.append(Objects.ByteRun(img_offset=1100, len=300))
+    assert b"".join(brs.iter_contents(raw_image)) == image_bytes[1100:1400]
+    assert (block_cache.hits, block_cache.misses) == (3, 2)
+
+    # So do the small coalesced reads of ImageReadScheduler.
+    scheduler = Objects.ImageReadScheduler(raw_image)
+    for expected_misses in [4, 4]:
+        chunks: typing.List[bytes] = []
+        brs = Objects.ByteRuns()
+        brs.append(Objects.ByteRun(img_offset=2048, len=600))
+        jobs = [(None, brs, lambda chunk: chunks.append(bytes(chunk)))]
+        assert list(scheduler.run(jobs)) == [(None, None)]
+        assert b"".join(chunks) == image_bytes[2048:2648]
+        assert block_cache.misses == expected_misses
+    assert block_cache.hits == 5
+
+    # Disabling the cache.
+    dfxml.set_block_cache(None)
+    with open(raw_image, "rb") as fh:
+        assert dfxml.read_image_range(fh, 0, 10) == image_bytes[:10]
+    assert block_cache.misses == 4
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import os
+import random
+import typing
+
+import pytest
+
+import dfxml.objects as Objects
+from dfxml.bin import igrep
+
+IMAGE_SIZE = 100000
+
+
+def _random_file_objects(count: int) -> typing.List[Objects.FileObject]:
+    """Returns FileObjects with random, often overlapping data and inode byte runs, including empty, fill and offset-less runs."""
+    rng = random.Random(24)
+    fobjs = []
+    for n in range(count):
+        fobj = Objects.FileObject(filename=None if n == 7 else "dir/file%d" % n)
+        brs = Objects.ByteRuns()
+        for _ in range(rng.randint(0, 4)):
+            length = rng.choice([0, 1, 512, rng.randint(1, 20000)])
+            if rng.random() < 0.1:
+                brs.append(Objects.ByteRun(len=length, fill="0"))
+            else:
+                brs.append(
+                    Objects.ByteRun(img_offset=rng.randrange(IMAGE_SIZE), len=length)
+                )
+        fobj.data_brs = brs
+        if n % 3 == 0:
+            inode_brs = Objects.ByteRuns(facet="inode")
+            inode_brs.append(
+                Objects.ByteRun(img_offset=rng.randrange(IMAGE_SIZE), len=1024)
+            )
+            fobj.inode_brs = inode_brs
+        fobjs.append(fobj)
+    return fobjs
+
+
+def _write_dfxml(path: str, fobjs: typing.List[Objects.FileObject]) -> None:
+    dobj = Objects.DFXMLObject()
+    vobj = Objects.VolumeObject()
+    dobj.append(vobj)
+    for fobj in fobjs:
+        vobj.append(fobj)
+    with open(path, "w") as fh:
+        dobj.print_dfxml(fh)
+
+
+def _overlapping(
+    fobjs: typing.List[Objects.FileObject], offset: int, length: int
+) -> typing.List[typing.Tuple[int, str, int, int, int]]:
+    """Returns the hits ByteRunIndex.overlapping should return, by scanning every byte run."""
+    hits: typing.List[typing.Tuple[int, str, int, int, int]] = []
+    if length <= 0:
+        return hits
+    for record, fobj in enumerate(fobjs):
+        for facet, brs in [("data", fobj.data_brs), ("inode", fobj.inode_brs)]:
+            if brs is None:
+                continue
+            file_offset = 0
+            for run in brs:
+                if (
+                    run.fill is None
+                    and run.len
+                    and run.img_offset < offset + length
+                    and offset < run.img_offset + run.len
+                ):
+                    hits.append((record, facet, run.img_offset, run.len, file_offset))
+                file_offset += run.len
+    return sorted(hits, key=lambda hit: (hit[2], hit[0], hit[1]))
+
+
+@pytest.fixture
+def fobjs() -> typing.List[Objects.FileObject]:
+    return _random_file_objects(300)
+
+
+@pytest.fixture
+def dfxml_path(tmp_path, fobjs: typing.List[Objects.FileObject]) -> str:
+    path = str(tmp_path / "files.xml")
+    _write_dfxml(path, fobjs)
+    return path
+
+
+def test_byte_run_index_queries(
+    dfxml_path: str, fobjs: typing.List[Objects.FileObject]
+) -> None:
+    rng = random.Random(2024)
+    with Objects.ByteRunIndex.build(dfxml_path) as index:
+        assert index.record_count == 300
+        assert len(index) == len(_overlapping(fobjs, 0, 2 * IMAGE_SIZE))
+        assert index.filename(1) == "dir/file1"
+        assert index.filename(7) is None
+        with pytest.raises(IndexError):
+            index.filename(300)
+
+        for _ in range(1000):
+            offset = rng.randrange(-100, IMAGE_SIZE + 20000)
+            length = rng.choice([0, 1, 512, rng.randrange(30000)])
+            expected = _overlapping(fobjs, offset, length)
+            assert sorted(index.overlapping(offset, length)) == sorted(expected)
+            assert sorted(index.overlapping(offset, length, "inode")) == sorted(
+                hit for hit in expected if hit[1] == "inode"
+            )
+        assert sorted(index.at(5000)) == sorted(_overlapping(fobjs, 5000, 1))
+        assert sorted(index.sector(10)) == sorted(_overlapping(fobjs, 5120, 512))
+
+        runs = list(index.runs())
+        assert len(runs) == len(index)
+        assert [hit[2] for hit in runs] == sorted(hit[2] for hit in runs)
+        assert all(hit[1] == "data" for hit in index.runs(["data"]))
+
+        with pytest.raises(ValueError):
+            index.at(0, "content")
+
+
+def test_byte_run_index_persistence(dfxml_path: str) -> None:
+    assert not Objects.ByteRunIndex.is_current(dfxml_path)
+    with Objects.open_byte_run_index(dfxml_path) as index:
+        hits = index.overlapping(0, IMAGE_SIZE)
+    assert os.path.exists(dfxml_path + ".runs")
+    assert Objects.ByteRunIndex.is_current(dfxml_path)
+    with Objects.ByteRunIndex(dfxml_path) as index:
+        assert index.overlapping(0, IMAGE_SIZE) == hits
+
+    # A changed DFXML file makes the index stale.
+    fobj = Objects.FileObject(filename="new")
+    brs = Objects.ByteRuns()
+    brs.append(Objects.ByteRun(img_offset=0, len=10))
+    fobj.data_brs = brs
+    _write_dfxml(dfxml_path, [fobj])
+    with pytest.raises(ValueError):
+        Objects.ByteRunIndex(dfxml_path)
+    with Objects.open_byte_run_index(dfxml_path) as index:
+        assert index.at(5) == [(0, "data", 0, 10, 0)]
+        assert index.filename(0) == "new"
+
+    # Documents without byte runs.
+    _write_dfxml(dfxml_path, [Objects.FileObject(filename="empty")])
+    with Objects.open_byte_run_index(dfxml_path) as index:
+        assert (len(index), index.record_count) == (0, 1)
+        assert index.at(0) == []
+        assert list(index.runs()) == []
+
+
+def test_igrep_file_matches(tmp_path) -> None:
+    image = bytearray(random.Random(24).randbytes(3 * 1024 * 1024))
+    needle = b"needle"
+    # In the second run of file a; across igrep's search blocks, in file b; across the adjacent runs of file c; and across the distant runs of file d, the second of which is shorter than the needle.
+    image[2 * 1024 * 1024 + 100 : 2 * 1024 * 1024 + 106] = needle
+    image[1024 * 1024 - 3 : 1024 * 1024 + 3] = needle
+    image[20000 - 3 : 20000 + 3] = needle
+    image[40000 - 2 : 40000] = b"ne"
+    image[50000 : 50000 + 2] = b"ed"
+    image[60000 : 60000 + 2] = b"le"
+    image_path = str(tmp_path / "image.raw")
+    with open(image_path, "wb") as fh:
+        fh.write(image)
+
+    fobjs = []
+    for name, runs in [
+        ("a", [(0, 4096), (2 * 1024 * 1024, 4096)]),
+        ("b", [(1024 * 1024 - 8192, 16384)]),
+        ("c", [(16384, 3616), (20000, 512)]),
+        ("d", [(30000, 10000), (50000, 2), (60000, 100)]),
+    ]:
+        fobj = Objects.FileObject(filename=name)
+        brs = Objects.ByteRuns()
+        for offset, length in runs:
+            brs.append(Objects.ByteRun(img_offset=offset, len=length))
+        fobj.data_brs = brs
+        fobjs.append(fobj)
+    dfxml_path = str(tmp_path / "files.xml")
+    _write_dfxml(dfxml_path, fobjs)
+
+    with Objects.open_byte_run_index(dfxml_path) as index, Objects.RawImageReader(
+        image_path
+    ) as reader:
+        assert igrep.file_matches(index, reader, needle) == {
+            0: 4196,
+            1: 8189,
+            2: 3613,
+            3: 9998,
+        }
+    # Searching each file's contents finds the same matches.
+    assert igrep.contents_matches(dfxml_path, image_path, needle) == [
+        ("a", 4196),
+        ("b", 8189),
+        ("c", 3613),
+        ("d", 9998),
+    ]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import copy
+import os
+import pickle
+
+import pytest
+
+import dfxml
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+
+@pytest.mark.parametrize(
+    "obj",
+    [
+        Objects.FileObject(),
+        Objects.LazyFileObject(),
+        Objects.ByteRun(),
+        Objects.ByteRuns(),
+        Objects.TimestampObject(),
+        dfxml.dftime("2009-01-01T00:00:00Z"),
+    ],
+)
+def test_compact_objects_have_no_dict(obj) -> None:
+    assert not hasattr(obj, "__dict__")
+
+
+def test_fileobject_containers_allocated_lazily() -> None:
+    fobj = Objects.FileObject(filename="a.txt")
+    assert fobj._annos is None
+    assert fobj._diffs is None
+    assert fobj._externals is None
+
+    # Serializing does not allocate the containers.
+    Objects._ET_tostring(fobj.to_Element())
+    assert fobj._annos is None
+    assert fobj._diffs is None
+    assert fobj._externals is None
+
+    fobj.annos.add("new")
+    assert fobj.annos == {"new"}
+    assert isinstance(fobj.externals, Objects.OtherNSElementList)
+    assert fobj.diffs == set()
+
+
+def test_fileobject_parsed_containers_allocated_lazily() -> None:
+    dobj = Objects.parse(os.path.join(samples_dir, "difference_test_0.xml"))
+    fobjs = [obj for obj in dobj if isinstance(obj, Objects.FileObject)]
+    assert len(fobjs) > 0
+    for fobj in fobjs:
+        assert fobj._annos is None
+        assert fobj._diffs is None
+
+
+def test_small_values_interned() -> None:
+    fobj0 = Objects.FileObject(uid="1000", mode=33188)
+    fobj1 = Objects.FileObject(uid="".join(["10", "00"]), mode=int("33188"))
+    assert fobj0.uid is fobj1.uid
+    assert fobj0.mode is fobj1.mode
+
+    ts0 = Objects.TimestampObject(prec="100ns")
+    ts1 = Objects.TimestampObject(prec="100ns")
+    assert ts0.prec == (100, "ns")
+    assert ts0.prec is ts1.prec
+
+
+def test_compact_objects_copy_and_pickle() -> None:
+    dobj = Objects.parse(os.path.join(samples_dir, "difference_test_1.xml"))
+    fobjs = [obj for obj in dobj if isinstance(obj, Objects.FileObject)]
+    assert len(fobjs) > 0
+    for fobj in fobjs:
+        assert copy.deepcopy(fobj) == fobj
+        assert pickle.loads(pickle.dumps(fobj)) == fobj
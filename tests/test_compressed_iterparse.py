@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import bz2
+import gzip
+import lzma
+import threading
+import typing
+
+import pytest
+from iterparse_helpers import SAMPLE, summarize
+
+import dfxml.objects as Objects
+
+COMPRESSORS: typing.Dict[str, typing.Callable[[bytes], bytes]] = {
+    "gzip": gzip.compress,
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+}
+
+
+def _decompression_threads() -> int:
+    return len(
+        [
+            thread
+            for thread in threading.enumerate()
+            if thread.name == "dfxml-decompression"
+        ]
+    )
+
+
+def _compressed_sample(tmp_path, compression: str, name: str) -> str:
+    with open(SAMPLE, "rb") as fh:
+        data = fh.read()
+    path = tmp_path / name
+    path.write_bytes(COMPRESSORS[compression](data))
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "compression,name",
+    [
+        ("gzip", "manifest.xml.gz"),
+        ("bz2", "manifest.xml.bz2"),
+        ("xz", "manifest.xml.xz"),
+        # Compression is identified by leading bytes, not by name.
+        ("gzip", "manifest.xml"),
+        ("xz", "manifest.dat"),
+    ],
+)
+def test_compressed_iterparse(
+    tmp_path, monkeypatch, compression: str, name: str
+) -> None:
+    # Several blocks per file.
+    monkeypatch.setattr(Objects, "_DECOMPRESSION_BLOCK_SIZE", 512)
+    path = _compressed_sample(tmp_path, compression, name)
+    assert Objects._sniff_compression(path) == compression
+    assert summarize(Objects.iterparse(path)) == summarize(Objects.iterparse(SAMPLE))
+    assert len(list(Objects.parse(path))) == len(list(Objects.parse(SAMPLE)))
+
+
+def test_compressed_iterparse_errors(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(Objects, "_DECOMPRESSION_BLOCK_SIZE", 512)
+    path = _compressed_sample(tmp_path, "gzip", "manifest.xml.gz")
+    with pytest.raises(ValueError):
+        list(Objects.iterparse(path, workers=2))
+    with pytest.raises(ValueError):
+        Objects.FileObjectIndex.build(path)
+
+    # Truncated files raise the decompressor's error.
+    with open(path, "rb") as fh:
+        data = fh.read()
+    with open(path, "wb") as fh:
+        fh.write(data[: len(data) // 2])
+    with pytest.raises(EOFError):
+        list(Objects.iterparse(path))
+
+
+def test_compressed_iterparse_early_exit(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(Objects, "_DECOMPRESSION_BLOCK_SIZE", 512)
+    monkeypatch.setattr(Objects, "_DECOMPRESSION_QUEUE_BLOCKS", 1)
+    path = _compressed_sample(tmp_path, "bz2", "manifest.xml.bz2")
+    # iterparse returns a generator.
+    iterator = typing.cast(
+        typing.Generator[typing.Tuple[str, Objects.AbstractObject], None, None],
+        Objects.iterparse(path),
+    )
+    next(iterator)
+    assert _decompression_threads() == 1
+    # Closing the generator stops the decompression thread.
+    iterator.close()
+    assert _decompression_threads() == 0
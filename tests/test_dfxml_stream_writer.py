@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import io
+import os
+
+import pytest
+
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+
+@pytest.mark.parametrize(
+    "sample",
+    [
+        "difference_test_0.xml",
+        "difference_test_1.xml",
+        "difference_test_2.xml",
+        "difference_test_3.xml",
+        "tcpflow_zip_generic_header.xml",
+    ],
+)
+def test_stream_writer_matches_print_dfxml(sample: str) -> None:
+    path = os.path.join(samples_dir, sample)
+    expected = io.StringIO()
+    Objects.parse(path).print_dfxml(expected)
+
+    output = io.StringIO()
+    with Objects.DFXMLStreamWriter(output) as writer:
+        for event, obj in Objects.iterparse(path):
+            writer.write_event(event, obj)
+    assert output.getvalue() == expected.getvalue()
+
+
+def test_stream_writer_scopes(tmp_path) -> None:
+    dobj = Objects.DFXMLObject(version="1.2.0")
+    dobj.program = "test_stream_writer"
+    output = io.StringIO()
+    with Objects.DFXMLStreamWriter(output, dobj) as writer:
+        vobj = Objects.VolumeObject(ftype_str="fat16")
+        with writer.scope(vobj):
+            writer.write(Objects.FileObject(filename="a.txt", filesize=1))
+            vobj.error = "volume error"
+        writer.open_scope(Objects.VolumeObject(ftype_str="ntfs"))
+        writer.write(Objects.FileObject(filename="b.txt"))
+        # The volume scope left open is closed with the document.
+
+    expected_dobj = Objects.DFXMLObject(version="1.2.0")
+    expected_dobj.program = "test_stream_writer"
+    vobj0 = Objects.VolumeObject(ftype_str="fat16")
+    vobj0.append(Objects.FileObject(filename="a.txt", filesize=1))
+    vobj0.error = "volume error"
+    vobj1 = Objects.VolumeObject(ftype_str="ntfs")
+    vobj1.append(Objects.FileObject(filename="b.txt"))
+    expected_dobj.append(vobj0)
+    expected_dobj.append(vobj1)
+    expected = io.StringIO()
+    expected_dobj.print_dfxml(expected)
+    assert output.getvalue() == expected.getvalue()
+
+    path = tmp_path / "scopes.xml"
+    path.write_text(output.getvalue())
+    reparsed = Objects.parse(str(path))
+    vobjs = list(reparsed.volumes)
+    assert vobjs[0].error == "volume error"
+    assert [fobj.filename for fobj in vobjs[1].files] == ["b.txt"]
+
+    with pytest.raises(ValueError):
+        writer.write(Objects.FileObject())
+
+
+def test_stream_writer_scope_errors() -> None:
+    writer = Objects.DFXMLStreamWriter(io.StringIO())
+    with pytest.raises(ValueError):
+        writer.close_scope()
+    vobj = Objects.VolumeObject()
+    writer.open_scope(vobj)
+    with pytest.raises(ValueError):
+        writer.close_scope(Objects.VolumeObject())
+    with pytest.raises(TypeError):
+        writer.open_scope(Objects.FileObject())
+    writer.close_scope(vobj)
+    writer.close()
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "bz2", "xz"])
+def test_stream_writer_path(tmp_path, compression) -> None:
+    path = str(tmp_path / "out.xml")
+    with Objects.DFXMLStreamWriter(path, compression=compression) as writer:
+        for index in range(100):
+            writer.write(Objects.FileObject(filename="%d.txt" % index))
+    with open(path, "rb") as fh:
+        magic = fh.read(6)
+    if compression is None:
+        assert magic.startswith(b"<?xml")
+    else:
+        assert Objects._sniff_compression(path) == compression
+    filenames = [
+        obj.filename
+        for (event, obj) in Objects.iterparse(path)
+        if isinstance(obj, Objects.FileObject)
+    ]
+    assert filenames == ["%d.txt" % index for index in range(100)]
+
+
+def test_stream_writer_binary_handle() -> None:
+    output = io.BytesIO()
+    with Objects.DFXMLStreamWriter(output, compression="gzip") as writer:
+        writer.write(Objects.FileObject(filename="é.txt"))
+    # The caller's file handle is not closed.
+    assert not output.closed
+    import gzip
+
+    text = gzip.decompress(output.getvalue()).decode("utf-8")
+    assert "<filename>é.txt</filename>" in text
+    assert text.endswith("</dfxml>\n")
+
+    with pytest.raises(ValueError):
+        Objects.DFXMLStreamWriter(io.StringIO(), compression="gzip")
+
+
+def test_stream_writer_exception_leaves_document_open() -> None:
+    output = io.StringIO()
+    with pytest.raises(RuntimeError):
+        with Objects.DFXMLStreamWriter(output) as writer:
+            writer.write(Objects.FileObject(filename="a.txt"))
+            raise RuntimeError("interrupted")
+    assert "<filename>a.txt</filename>" in output.getvalue()
+    assert not "</dfxml>" in output.getvalue()
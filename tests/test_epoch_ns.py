@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import datetime
+import random
+import typing
+
+import pytest
+
+import dfxml
+import dfxml.objects as Objects
+
+# The NumPy modes are skipped where NumPy is not installed.
+NUMPY_MODES = [False, True]
+
+# (value, nanoseconds, precision) triples.
+EPOCH_NS_CASES: typing.List[typing.Tuple[typing.Any, int, int]] = [
+    ("2007-08-09T12:34:56", 1186662896000000000, 1000000000),
+    ("2007-08-09T12:34:56Z", 1186662896000000000, 1000000000),
+    ("2007-08-09 12:34:56.5Z", 1186662896500000000, 100000000),
+    ("2007-08-09T12:34:56.000003Z", 1186662896000003000, 1000),
+    ("2007-08-09T12:34:56.123456789123", 1186662896123456789, 1),
+    ("2007-08-09T12:34:56+05:30", 1186643096000000000, 1000000000),
+    ("2007-08-09T12:34:56-0800", 1186691696000000000, 1000000000),
+    ("2007-08-09T12:34:56-05:30", 1186682696000000000, 1000000000),
+    ("1969-12-31T23:59:59.75Z", -250000000, 10000000),
+    ("9 Aug 2007 12:34:56 -0400", 1186677296000000000, 1000000000),
+    ("1186662896", 1186662896000000000, 1000000000),
+    ("1186662896.25", 1186662896250000000, 10000000),
+    (1186662896, 1186662896000000000, 1000000000),
+    (1.5, 1500000000, 100000000),
+    (
+        datetime.datetime(2007, 8, 9, 12, 34, 56, 7),
+        1186662896000007000,
+        1000,
+    ),
+    (
+        datetime.datetime(
+            2007,
+            8,
+            9,
+            12,
+            34,
+            56,
+            tzinfo=datetime.timezone(datetime.timedelta(hours=2)),
+        ),
+        1186655696000000000,
+        1000,
+    ),
+    (dfxml.dftime("2007-08-09T12:34:56Z"), 1186662896000000000, 1000000000),
+    (dfxml.dftime(1186662896), 1186662896000000000, 1000000000),
+    (None, dfxml.EPOCH_NS_NULL, 0),
+]
+
+INVALID_VALUES = [
+    "2007-02-29T00:00:00Z",
+    "2007-08-09T24:00:00Z",
+    "2007-08-09T12:34:5Z",
+    "junk",
+    "nan",
+    "0001-01-01T00:00:00Z",
+    10**12,
+    [],
+]
+
+
+@pytest.mark.parametrize("use_numpy", NUMPY_MODES)
+def test_dftimes_to_epoch_ns(use_numpy: bool) -> None:
+    if use_numpy:
+        pytest.importorskip("numpy")
+    (ns, precision) = dfxml.dftimes_to_epoch_ns(
+        [case[0] for case in EPOCH_NS_CASES], use_numpy=use_numpy
+    )
+    assert list(zip(ns.tolist(), precision.tolist())) == [
+        (case[1], case[2]) for case in EPOCH_NS_CASES
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", NUMPY_MODES)
+def test_dftimes_to_epoch_ns_errors(use_numpy: bool) -> None:
+    if use_numpy:
+        pytest.importorskip("numpy")
+    for value in INVALID_VALUES:
+        with pytest.raises(ValueError):
+            dfxml.dftimes_to_epoch_ns([value], use_numpy=use_numpy)
+    (ns, precision) = dfxml.dftimes_to_epoch_ns(
+        ["2007-08-09T12:34:56Z"] + INVALID_VALUES, use_numpy=use_numpy, errors="null"
+    )
+    assert ns.tolist() == [1186662896000000000] + [dfxml.EPOCH_NS_NULL] * len(
+        INVALID_VALUES
+    )
+    assert precision.tolist() == [1000000000] + [0] * len(INVALID_VALUES)
+    with pytest.raises(ValueError):
+        dfxml.dftimes_to_epoch_ns([], errors="ignore")
+
+
+def test_dftimes_to_epoch_ns_matches_dftime() -> None:
+    """Times without the offsets dftime converts differently agree with dftime's UTC datetimes."""
+    for value, expected, _ in EPOCH_NS_CASES[:5]:
+        dt = dfxml.dftime(value).datetime().replace(tzinfo=datetime.timezone.utc)
+        assert expected // 1000 == int(dt.timestamp() * 1e6)
+
+
+def test_dftimes_to_epoch_ns_fuzz() -> None:
+    pytest.importorskip("numpy")
+    rng = random.Random(1970)
+    texts = []
+    for _ in range(5000):
+        texts.append(
+            "%04d-%02d-%02d%s%02d:%02d:%02d%s%s"
+            % (
+                rng.randint(0, 9999),
+                rng.randint(0, 13),
+                rng.randint(0, 32),
+                rng.choice("T t"),
+                rng.randint(0, 25),
+                rng.randint(0, 60),
+                rng.randint(0, 60),
+                rng.choice(["", "", ".", ".%d" % rng.randint(0, 10**12)]),
+                rng.choice(
+                    [
+                        "",
+                        "Z",
+                        "+%02d:%02d" % (rng.randint(0, 14), rng.randint(0, 59)),
+                        "-%02d%02d" % (rng.randint(0, 14), rng.randint(0, 59)),
+                        "+%02d:%d" % (rng.randint(0, 14), rng.randint(0, 9)),
+                        "Z ",
+                    ]
+                ),
+            )
+        )
+    vectorized = dfxml.dftimes_to_epoch_ns(texts, use_numpy=True, errors="null")
+    scalar = dfxml.dftimes_to_epoch_ns(texts, use_numpy=False, errors="null")
+    assert vectorized[0].tolist() == scalar[0].tolist()
+    assert vectorized[1].tolist() == scalar[1].tolist()
+
+
+def test_epoch_ns_null() -> None:
+    # Converted columns can be stored alongside FileObjectTable's integer columns.
+    assert dfxml.EPOCH_NS_NULL == Objects.FileObjectTable.NULL_INT
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import io
+import random
+import typing
+
+import pytest
+
+import dfxml
+
+
+def _overlaps(extents: typing.List[dfxml.byte_run], start: int, stop: int) -> bool:
+    return any(d.img_offset < stop and start < d.img_offset + d.len for d in extents)
+
+
+def test_extentdb_random() -> None:
+    """Checks extentdb against scans of its extents, across block splits."""
+    rng = random.Random(25)
+    db = dfxml.extentdb(sectorsize=512)
+    added: typing.List[dfxml.byte_run] = []
+    for _ in range(3000):
+        run = dfxml.byte_run(
+            img_offset=rng.randrange(20000000), len=rng.choice([1, 512, 4096, 10000])
+        )
+        stop = run.img_offset + run.len
+        if _overlaps(added, run.img_offset, stop):
+            with pytest.raises(ValueError):
+                db.add(run)
+        else:
+            db.add(run)
+            added.append(run)
+    assert db.db == added
+    assert len(db._extents.blocks) > 1
+
+    for _ in range(300):
+        start = rng.randrange(-1000, 20010000)
+        length = rng.randrange(1, 30000)
+        hit = db.intersects(dfxml.byte_run(img_offset=start, len=length))
+        expected = [
+            d
+            for d in added
+            if d.img_offset < start + length and start < d.img_offset + d.len
+        ]
+        if expected:
+            assert hit is expected[0]
+        else:
+            assert hit is None
+
+        run = dfxml.byte_run(img_offset=max(start, 0), len=length)
+        sectors = db.sectors_for_run(run)
+        assert db.sectors_not_in_db(run) == [
+            s for s in sectors if not _overlaps(added, s * 512, (s + 1) * 512)
+        ]
+        gaps = db.runs_not_in_db(run)
+        stop = run.img_offset + run.len
+        assert not any(
+            _overlaps(added, gap.img_offset, gap.img_offset + gap.len) for gap in gaps
+        )
+        covered = sum(
+            max(0, min(stop, d.img_offset + d.len) - max(run.img_offset, d.img_offset))
+            for d in added
+        )
+        assert sum(gap.len for gap in gaps) + covered == run.len
+
+
+def _ranges(db: dfxml.extentdb) -> typing.List[typing.List[int]]:
+    return [covered for block in db._ranges.blocks for covered in block]
+
+
+def test_extentdb_coalescing() -> None:
+    """Checks that adjacent extents, added in random order, are coalesced into the ranges they cover."""
+    rng = random.Random(2025)
+    sectors = list(range(0, 20000, 2)) + list(range(30000, 31000))
+    rng.shuffle(sectors)
+    db = dfxml.extentdb()
+    for sector in sectors:
+        db.add(db.run_for_sector(sector))
+    assert len(db.db) == len(sectors)
+    assert _ranges(db) == [[s * 512, (s + 1) * 512] for s in range(0, 20000, 2)] + [
+        [30000 * 512, 31000 * 512]
+    ]
+    for block in db._ranges.blocks:
+        assert len(block) <= 2 * dfxml._EXTENTDB_LOAD
+    assert db._ranges.firsts == [keys[0] for keys in db._ranges.keys]
+
+    # Filling the gaps leaves one range, though the extents are kept.
+    gaps = [sector for sector in range(1, 20000, 2)] + list(range(20000, 30000))
+    rng.shuffle(gaps)
+    for sector in gaps:
+        db.add(db.run_for_sector(sector))
+    assert _ranges(db) == [[0, 31000 * 512]]
+    assert db.runs_not_in_db(dfxml.byte_run(img_offset=0, len=31001 * 512)) == [
+        dfxml.byte_run(img_offset=31000 * 512, len=512)
+    ]
+    # The first extent added that intersects is returned.
+    assert db.intersects(dfxml.byte_run(img_offset=0, len=31000 * 512)) is db.db[0]
+
+
+def test_extentdb_behavior() -> None:
+    db = dfxml.extentdb(sectorsize=1024)
+    assert db.sectorsize == 1024
+    db.add_sectors([2, 3, 4, 9])
+    assert [(d.img_offset, d.len) for d in db.db] == [(2048, 3072), (9216, 1024)]
+    assert db.intersects(dfxml.byte_run(img_offset=0, len=0)) is True
+    with pytest.raises(ValueError):
+        db.intersects(dfxml.byte_run(img_offset=0, len=-1))
+    with pytest.raises(ValueError):
+        db.add(dfxml.byte_run(img_offset=5000, len=10))
+    assert db.intersects_sector(4) is db.db[0]
+    assert db.intersects_sector(5) is None
+    assert (
+        db.intersects_runs(
+            [
+                dfxml.byte_run(img_offset=0, len=10),
+                dfxml.byte_run(img_offset=9300, len=10),
+            ]
+        )
+        is db.db[1]
+    )
+    assert db.sectors_not_in_db(dfxml.byte_run(img_offset=1024, len=9 * 1024)) == [
+        1,
+        5,
+        6,
+        7,
+        8,
+    ]
+    assert [
+        (gap.img_offset, gap.len)
+        for gap in db.runs_not_in_db(dfxml.byte_run(img_offset=1000, len=9000))
+    ] == [(1000, 1048), (5120, 4096)]
+    report = io.StringIO()
+    db.report(report)
+    assert "total entries in database: 2" in report.getvalue()
+
+    # Adjacent extents are coalesced, but intersects returns the extents added, the first added first.
+    db.add(dfxml.byte_run(img_offset=5120, len=1024))
+    db.add(dfxml.byte_run(img_offset=1024, len=1024))
+    assert _ranges(db) == [[1024, 6144], [9216, 10240]]
+    assert db.intersects(dfxml.byte_run(img_offset=0, len=9000)) is db.db[0]
+    assert db.intersects(dfxml.byte_run(img_offset=1500, len=100)) is db.db[3]
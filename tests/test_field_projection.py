@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import pytest
+from iterparse_helpers import SAMPLE, fileobjects
+
+import dfxml.objects as Objects
+
+TIMELINE_FIELDS = ["atime", "crtime", "ctime", "filename", "mtime"]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_iterparse_fields(lazy: bool) -> None:
+    full_fobjs = fileobjects(SAMPLE)
+    projected_fobjs = fileobjects(SAMPLE, fields=TIMELINE_FIELDS, lazy=lazy)
+    assert len(full_fobjs) == len(projected_fobjs)
+    assert any(fobj.mtime is not None for fobj in full_fobjs)
+    for full_fobj, projected_fobj in zip(full_fobjs, projected_fobjs):
+        for prop in TIMELINE_FIELDS:
+            assert getattr(full_fobj, prop) == getattr(projected_fobj, prop)
+        assert projected_fobj.filesize is None
+        assert projected_fobj.data_brs is None
+        assert projected_fobj.md5 is None
+        # The parser still records the containing volume.
+        assert projected_fobj.volume_object is not None
+
+
+def test_iterparse_fields_grouped() -> None:
+    full_fobjs = fileobjects(SAMPLE)
+    alloc_fobjs = fileobjects(SAMPLE, fields=["alloc"])
+    for full_fobj, alloc_fobj in zip(full_fobjs, alloc_fobjs):
+        assert full_fobj.alloc == alloc_fobj.alloc
+        assert full_fobj.unalloc == alloc_fobj.unalloc
+        assert full_fobj.is_allocated() == alloc_fobj.is_allocated()
+        assert alloc_fobj.filename is None
+
+
+def test_parse_fields() -> None:
+    dobj = Objects.parse(SAMPLE, fields=["filename"])
+    fobjs = [obj for obj in dobj if isinstance(obj, Objects.FileObject)]
+    assert len(fobjs) > 0
+    for fobj in fobjs:
+        assert fobj.filename is not None
+        assert fobj.inode is None
+
+
+def test_fields_validation() -> None:
+    with pytest.raises(ValueError):
+        fileobjects(SAMPLE, fields=["filename", "nonexistent_property"])
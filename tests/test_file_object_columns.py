@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import json
+import math
+import os
+
+import pytest
+from iterparse_helpers import SAMPLE
+
+import dfxml
+import dfxml.columns as Columns
+import dfxml.objects as Objects
+
+
+def _values(column) -> list:
+    """Returns the values of a column as a list, with NaN replaced by None for comparison."""
+    return [
+        None if isinstance(value, float) and math.isnan(value) else value
+        for value in list(column)
+    ]
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_file_object_columns_round_trip(
+    tmp_path, monkeypatch: pytest.MonkeyPatch, use_numpy: bool
+) -> None:
+    if use_numpy:
+        pytest.importorskip("numpy")
+    # Several batches, so string offsets continue across writes.
+    monkeypatch.setattr(Columns, "_COLUMNS_BATCH_SIZE", 4)
+    directory = str(tmp_path / "columns")
+    table = Objects.FileObjectTable.from_iterparse(SAMPLE, use_numpy=False)
+    assert Objects.dfxml_to_columns(SAMPLE, directory) == len(table)
+
+    with Objects.FileObjectColumns(directory, use_numpy=use_numpy) as columns:
+        assert len(columns) == len(table)
+        for name in Objects.FileObjectTable.int_columns + ["alloc", "unalloc"]:
+            assert _values(columns[name]) == _values(table[name]), name
+        for name in Objects.FileObjectTable.string_columns:
+            assert list(columns[name]) == table[name], name
+        assert columns["filename"][-1] == table["filename"][-1]
+
+        for index in range(len(table)):
+            fobj0 = table.to_FileObject(index)
+            fobj1 = columns.to_FileObject(index)
+            assert fobj0 == fobj1
+            for name in Objects.TimestampObject.timestamp_name_list:
+                if getattr(fobj0, name) is None:
+                    assert getattr(fobj1, name) is None
+                else:
+                    assert getattr(fobj1, name).time == getattr(fobj0, name).time
+        with pytest.raises(IndexError):
+            columns.to_FileObject(len(table))
+        with pytest.raises(KeyError):
+            columns.column("byte_runs")
+
+        copied = columns.to_table()
+        for name in Objects.FileObjectTable.columns():
+            assert _values(copied[name]) == _values(table[name]), name
+
+
+def test_file_object_columns_views(tmp_path) -> None:
+    directory = str(tmp_path / "columns")
+    fobjs = [
+        Objects.FileObject(
+            filename="a.txt", filesize=3, mtime="2010-01-01T00:00:00.25Z"
+        ),
+        Objects.FileObject(filename="é.txt"),
+        Objects.FileObject(),
+    ]
+    Objects.FileObjectTable(fobjs, use_numpy=False).save_columns(directory)
+
+    columns = Objects.FileObjectColumns(directory, use_numpy=False)
+    filesizes = columns["filesize"]
+    assert isinstance(filesizes, memoryview)
+    assert filesizes.readonly
+    assert filesizes.format == "q"
+    assert list(filesizes) == [
+        3,
+        Objects.FileObjectTable.NULL_INT,
+        Objects.FileObjectTable.NULL_INT,
+    ]
+    # Timestamps are nanoseconds since the epoch.
+    assert list(columns["mtime"]) == [
+        1262304000250000000,
+        Objects.FileObjectTable.NULL_INT,
+        Objects.FileObjectTable.NULL_INT,
+    ]
+    assert list(columns["filename"]) == ["a.txt", "é.txt", None]
+    data, offsets, valid = columns.string_buffers("filename")
+    assert bytes(data) == "a.txté.txt".encode("utf-8")
+    assert list(offsets) == [0, 5, 11, 11]
+    assert list(valid) == [1, 1, 0]
+    with pytest.raises(KeyError):
+        columns.string_buffers("filesize")
+    columns.close()
+    # Views outlive the store.
+    assert filesizes[0] == 3
+
+    numpy = pytest.importorskip("numpy")
+    with Objects.FileObjectColumns(directory, use_numpy=True) as columns:
+        assert columns["filesize"].dtype == numpy.int64
+        assert columns["alloc"].dtype == numpy.int8
+        assert columns["mtime"][0] == 1262304000250000000
+        assert not columns["filesize"].flags.writeable
+
+
+def test_file_object_columns_nanoseconds(tmp_path) -> None:
+    # Timestamps keep the 100-nanosecond precision of their DFXML text.
+    path = tmp_path / "times.xml"
+    path.write_text(
+        """<?xml version='1.0' encoding='UTF-8'?>
+<dfxml xmlns='%s' version='1.0'>
+  <fileobject><filename>a</filename><mtime prec='100ns'>2020-01-01T00:00:00.1234567Z</mtime></fileobject>
+  <fileobject><filename>b</filename><mtime>2020-01-01T02:00:00.0000001+02:00</mtime></fileobject>
+  <fileobject><filename>c</filename></fileobject>
+</dfxml>
+"""
+        % dfxml.XMLNS_DFXML,
+        encoding="utf-8",
+    )
+    expected = [
+        1577836800123456700,
+        1577836800000000100,
+        Objects.FileObjectTable.NULL_INT,
+    ]
+    directory = str(tmp_path / "columns")
+    Objects.dfxml_to_columns(str(path), directory)
+    with Objects.FileObjectColumns(directory, use_numpy=False) as columns:
+        assert list(columns["mtime"]) == expected
+        assert str(columns.to_FileObject(0).mtime) == "2020-01-01T00:00:00.1234567Z"
+        copied = columns.to_table()
+
+    # Tables carry the timestamps' text through take() and to_table().
+    table = Objects.FileObjectTable.from_iterparse(str(path), use_numpy=False)
+    for source in [table.take([2, 1, 0]).take([2, 1, 0]), copied]:
+        source.save_columns(directory)
+        with Objects.FileObjectColumns(directory, use_numpy=False) as columns:
+            assert list(columns["mtime"]) == expected
+
+
+def test_file_object_columns_schema(tmp_path) -> None:
+    directory = str(tmp_path / "columns")
+    Objects.FileObjectTable(use_numpy=False).save_columns(directory)
+    with Objects.FileObjectColumns(directory, use_numpy=False) as columns:
+        assert len(columns) == 0
+        assert list(columns["filesize"]) == []
+        assert list(columns["filename"]) == []
+        schema = columns.schema
+    assert schema["rows"] == 0
+    assert [column["name"] for column in schema["columns"]] == (
+        Objects.FileObjectTable.columns()
+    )
+    for column in schema["columns"]:
+        for file_name in column["files"].values():
+            assert os.path.exists(os.path.join(directory, file_name))
+    kinds = {column["name"]: column for column in schema["columns"]}
+    assert kinds["filesize"]["dtype"] == "<i8"
+    assert kinds["mtime"]["kind"] == "time"
+    assert kinds["mtime"]["unit"] == "ns"
+    assert kinds["alloc"]["null"] == -1
+    assert kinds["filename"]["kind"] == "string"
+
+    schema_path = os.path.join(directory, Objects.FileObjectColumns.SCHEMA_FILENAME)
+    schema["version"] = 0
+    with open(schema_path, "w") as fh:
+        json.dump(schema, fh)
+    with pytest.raises(ValueError):
+        Objects.FileObjectColumns(directory)
+    os.unlink(schema_path)
+    with pytest.raises(FileNotFoundError):
+        Objects.FileObjectColumns(directory)
+
+
+def test_file_object_columns_failed_export(tmp_path, monkeypatch) -> None:
+    directory = str(tmp_path / "columns")
+    monkeypatch.setattr(Columns, "_COLUMNS_BATCH_SIZE", 2)
+    iterparse = Objects.iterparse
+
+    def _failing_iterparse(*args, **kwargs):
+        for index, eop in enumerate(iterparse(*args, **kwargs)):
+            if index == 5:
+                raise OSError("Read error.")
+            yield eop
+
+    monkeypatch.setattr(Columns, "iterparse", _failing_iterparse)
+    with pytest.raises(OSError):
+        Objects.dfxml_to_columns(SAMPLE, directory)
+    # An incomplete export leaves nothing loadable.
+    assert os.listdir(directory) == []
+    with pytest.raises(FileNotFoundError):
+        Objects.FileObjectColumns(directory)
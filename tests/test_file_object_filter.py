@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import typing
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import dfxml
+import dfxml.objects as Objects
+
+FILEOBJECTS_XML = [
+    "<fileobject><filename>a/b.jpg</filename><name_type>r</name_type><filesize>100</filesize><alloc>1</alloc><hashdigest type='sha1'>0</hashdigest></fileobject>",
+    "<fileobject><filename>a/c.JPG</filename><name_type>r</name_type><filesize>5000</filesize><alloc>1</alloc><unalloc>1</unalloc></fileobject>",
+    "<fileobject><filename>a</filename><name_type>d</name_type><alloc_inode>1</alloc_inode><alloc_name>1</alloc_name><hashdigest type='MD5'>1</hashdigest></fileobject>",
+    "<fileobject><filename>x.txt</filename><alloc_inode>1</alloc_inode><alloc_name>0</alloc_name><hashdigest type='md5'/></fileobject>",
+    "<fileobject delta:new_file='1'><filename/><filesize>0</filesize></fileobject>",
+    "<fileobject delta:modified_file='1' delta:changed_file='1'><name_type>r</name_type></fileobject>",
+]
+
+FILTER_EXPRESSIONS = [
+    "",
+    "name_type=r",
+    "name_type=r,d",
+    "alloc=1",
+    "alloc=false",
+    "filesize=100",
+    "filesize=1:",
+    "filesize=:4999",
+    "filename_glob=*.jpg",
+    "filename_glob=a*",
+    "filename_regex='^a/.*\\.jpg$'",
+    "filename_regex=(?i)jpg",
+    "annos=new",
+    "annos=modified,deleted",
+    "has_hash=md5",
+    "has_hash=md5,sha1",
+    "name_type=r alloc=1 filesize=0:1000",
+]
+
+
+def _elements() -> typing.List[ET.Element]:
+    return [
+        ET.fromstring(
+            xml.replace(
+                "<fileobject", "<fileobject xmlns:delta='%s'" % dfxml.XMLNS_DELTA, 1
+            )
+        )
+        for xml in FILEOBJECTS_XML
+    ]
+
+
+def _matching_indices(
+    fobj_filter: Objects.FileObjectFilter,
+) -> typing.Tuple[typing.List[int], typing.List[int]]:
+    """Returns the indices of matching files, evaluated on Elements and on FileObjects."""
+    element_matches = []
+    fobj_matches = []
+    for i, e in enumerate(_elements()):
+        if fobj_filter.matches_Element(e):
+            element_matches.append(i)
+        fobj = Objects.FileObject()
+        fobj.populate_from_Element(e)
+        if fobj_filter(fobj):
+            fobj_matches.append(i)
+    return (element_matches, fobj_matches)
+
+
+@pytest.mark.parametrize("expression", FILTER_EXPRESSIONS)
+def test_element_and_fileobject_evaluation_agree(expression: str) -> None:
+    fobj_filter = Objects.FileObjectFilter.from_string(expression)
+    (element_matches, fobj_matches) = _matching_indices(fobj_filter)
+    assert element_matches == fobj_matches
+    # The string form round-trips.
+    assert (
+        Objects.FileObjectFilter.from_string(fobj_filter.to_string()).to_string()
+        == fobj_filter.to_string()
+    )
+
+
+def test_filter_results() -> None:
+    def _indices(expression: str) -> typing.List[int]:
+        return _matching_indices(Objects.FileObjectFilter.from_string(expression))[0]
+
+    assert _indices("") == [0, 1, 2, 3, 4, 5]
+    assert _indices("name_type=r") == [0, 1, 5]
+    # <unalloc> follows <alloc> in the second file; partial allocation information is treated as unallocated.
+    assert _indices("alloc=1") == [0, 2]
+    assert _indices("alloc=0") == [1, 3]
+    assert _indices("filesize=1:") == [0, 1]
+    assert _indices("filename_glob=*.jpg") == [0]
+    assert _indices("filename_regex=(?i)jpg") == [0, 1]
+    assert _indices("annos=new,modified") == [4, 5]
+    # An empty hashdigest element does not make a hash present.
+    assert _indices("has_hash=md5") == [2]
+
+
+def test_filter_validation() -> None:
+    with pytest.raises(ValueError):
+        Objects.FileObjectFilter(has_hash="crc32")
+    with pytest.raises(ValueError):
+        Objects.FileObjectFilter(annos=["touched"])
+    with pytest.raises(ValueError):
+        Objects.FileObjectFilter.from_string("inode=5")
+    with pytest.raises(ValueError):
+        Objects.FileObjectFilter.from_string("alloc=maybe")
+    with pytest.raises(ValueError):
+        Objects.FileObjectFilter.from_string("filesize=small:")
+
+
+def test_iterparse_file_filter(tmp_path) -> None:
+    path = tmp_path / "filter.dfxml"
+    path.write_text(
+        "<dfxml xmlns='%s' xmlns:delta='%s' version='1.0'><volume><ftype_str>fat</ftype_str>%s</volume></dfxml>"
+        % (dfxml.XMLNS_DFXML, dfxml.XMLNS_DELTA, "".join(FILEOBJECTS_XML))
+    )
+    fobj_filter = Objects.FileObjectFilter(name_type="r", alloc=True)
+    fobjs = [
+        obj
+        for (_, obj) in Objects.iterparse(str(path), file_filter=fobj_filter)
+        if isinstance(obj, Objects.FileObject)
+    ]
+    assert [fobj.filename for fobj in fobjs] == ["a/b.jpg"]
+    assert isinstance(fobjs[0].volume_object, Objects.VolumeObject)
+
+    dobj = Objects.parse(str(path), file_filter=fobj_filter)
+    assert [obj.filename for obj in dobj if isinstance(obj, Objects.FileObject)] == [
+        "a/b.jpg"
+    ]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import os
+import shutil
+
+import pytest
+from iterparse_helpers import fileobjects
+
+import dfxml
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+VOLUMES_XML = """<?xml version='1.0' encoding='UTF-8'?>
+<dfxml xmlns='%s' version='2.0.0'>
+  <creator><program>test</program></creator>
+  <volume offset='512'>
+    <partition_offset>512</partition_offset>
+    <ftype_str>fat16</ftype_str>
+    <fileobject><filename>a.txt</filename><partition>1</partition><inode>5</inode><id>1</id></fileobject>
+    <fileobject><filename>b.txt</filename><partition>1</partition><inode>6</inode><id>2</id></fileobject>
+  </volume>
+  <volume offset='4096'>
+    <partition_offset>4096</partition_offset>
+    <fileobject><filename>a.txt</filename><partition>2</partition><inode>5</inode><id>3</id></fileobject>
+  </volume>
+  <fileobject><filename>top</filename></fileobject>
+</dfxml>
+""" % (
+    dfxml.XMLNS_DFXML,
+)
+
+
+@pytest.fixture
+def volumes_path(tmp_path) -> str:
+    path = tmp_path / "volumes.xml"
+    path.write_text(VOLUMES_XML)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "sample",
+    ["difference_test_0.xml", "difference_test_2.xml", "difference_test_3.xml"],
+)
+def test_file_object_index_samples(tmp_path, sample: str) -> None:
+    path = str(tmp_path / sample)
+    shutil.copy(os.path.join(samples_dir, sample), path)
+    fobjs = fileobjects(path)
+    with Objects.open_indexed(path) as index:
+        assert os.path.exists(path + ".idx")
+        assert len(index) == len(fobjs)
+        assert [fobj.to_dfxml() for fobj in index] == [
+            fobj.to_dfxml() for fobj in fobjs
+        ]
+        assert index[-1].to_dfxml() == fobjs[-1].to_dfxml()
+        with pytest.raises(IndexError):
+            index[len(fobjs)]
+
+
+def test_file_object_index_lookups(volumes_path: str) -> None:
+    with Objects.open_indexed(volumes_path, workers=2) as index:
+        assert [fobj.id for fobj in index.by_filename("a.txt")] == [1, 3]
+        assert index.by_filename("c.txt") == []
+        assert [fobj.id for fobj in index.by_inode(5)] == [1, 3]
+        assert [fobj.id for fobj in index.by_inode(5, 2)] == [3]
+        assert index.by_inode(6, 2) == []
+        assert [fobj.filename for fobj in index.by_id(2)] == ["b.txt"]
+
+        # FileObjects of a volume share a VolumeObject.
+        assert index[0].volume_object.partition_offset == 512
+        assert index[0].volume_object is index[1].volume_object
+        assert index[2].volume_object.partition_offset == 4096
+        assert index[3].volume_object is None
+
+
+def test_file_object_index_invalidation(volumes_path: str) -> None:
+    Objects.FileObjectIndex.build(volumes_path).close()
+    assert Objects.FileObjectIndex.is_current(volumes_path)
+
+    stat = os.stat(volumes_path)
+    os.utime(volumes_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert not Objects.FileObjectIndex.is_current(volumes_path)
+    with pytest.raises(ValueError):
+        Objects.FileObjectIndex(volumes_path)
+
+    with open(volumes_path, "w") as fh:
+        fh.write(VOLUMES_XML.replace("b.txt", "bb.txt"))
+    with Objects.open_indexed(volumes_path) as index:
+        assert Objects.FileObjectIndex.is_current(volumes_path)
+        assert [fobj.id for fobj in index.by_filename("bb.txt")] == [2]
+        assert index[2].filename == "a.txt"
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import gzip
+import os
+import shutil
+import sqlite3
+import typing
+
+import pytest
+from iterparse_helpers import SAMPLE, fileobjects
+
+import dfxml.bin.make_differential_dfxml
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+
+@pytest.fixture
+def store(tmp_path) -> typing.Iterator[Objects.FileObjectStore]:
+    with Objects.FileObjectStore.build(
+        SAMPLE, str(tmp_path / "sample.sqlite")
+    ) as store:
+        yield store
+
+
+@pytest.mark.parametrize(
+    "sample",
+    ["difference_test_0.xml", "difference_test_2.xml", "difference_test_3.xml"],
+)
+def test_file_object_store_round_trip(
+    sample: str, tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(Objects.FileObjectStore, "_parse_batch_size", 2)
+    path = os.path.join(samples_dir, sample)
+    expected = fileobjects(path)
+    with Objects.FileObjectStore.build(path, str(tmp_path / "store")) as store:
+        assert len(store) == len(expected)
+        fobjs = list(store)
+        assert fobjs == expected
+        for fobj0, fobj1 in zip(expected, fobjs):
+            # Texts are copied from the source document.
+            assert not fobj1.raw_dfxml is None
+            assert (fobj0.volume_object is None) == (fobj1.volume_object is None)
+        out_path = str(tmp_path / "out.xml")
+        store.export(out_path)
+    assert fileobjects(out_path) == expected
+    assert len(
+        [
+            obj
+            for obj in Objects.parse(out_path)
+            if isinstance(obj, Objects.VolumeObject)
+        ]
+    ) == len(
+        [obj for obj in Objects.parse(path) if isinstance(obj, Objects.VolumeObject)]
+    )
+
+
+def test_file_object_store_compressed(tmp_path) -> None:
+    # Source text is not retained from compressed files; FileObjects are stored serialized.
+    path = str(tmp_path / "sample.xml.gz")
+    with open(SAMPLE, "rb") as fh, gzip.open(path, "wb") as gz_fh:
+        shutil.copyfileobj(fh, gz_fh)
+    expected = fileobjects(SAMPLE)
+    with Objects.FileObjectStore.build(path) as store:
+        assert list(store) == expected
+        assert [fobj.filename for fobj in store.by_inode(3, partition=2)] == [
+            "NO_CHANGE"
+        ]
+    assert os.path.exists(path + ".sqlite")
+
+
+def test_file_object_store_lookups(store: Objects.FileObjectStore) -> None:
+    assert [fobj.filename for fobj in store.by_inode(3, partition=2)] == ["NO_CHANGE"]
+    assert [fobj.partition for fobj in store.by_inode(4)] == [1, 2, 3]
+    assert [fobj.filename for fobj in store.by_inode(9, partition=2)] == [
+        "CHANGE___erased___replaced_by_other_partition_file",
+        "CHANGE___renamed",
+    ]
+
+    fobj = store.by_hash("1" + "0" * 39)[0]
+    assert fobj.sha1 == "1" + "0" * 39
+    assert store.by_hash("1" + "0" * 39, "sha1") == [fobj]
+    assert store.by_hash("1" + "0" * 39, "md5") == []
+
+    filename = fobj.filename
+    assert not filename is None
+    assert [fobj.filename for fobj in store.by_filename(filename)] == [filename]
+    assert store.by_filename("nonexistent") == []
+
+    sizes = [fobj.filesize for fobj in store if not fobj.filesize is None]
+    assert len(store.by_filesize()) == len(sizes)
+    assert all(
+        fobj.filesize >= sizes[0] for fobj in store.by_filesize(minimum=sizes[0])
+    )
+
+    mtimes = store.by_time("mtime", "2007-08-09T12:34:56Z", "2007-08-09T12:34:56Z")
+    assert mtimes
+    assert all(str(fobj.mtime.time) == "2007-08-09T12:34:56Z" for fobj in mtimes)
+    assert store.by_time("mtime", end=0) == []
+    with pytest.raises(ValueError):
+        store.by_time("nonexistent")
+
+    assert [
+        fobj.inode
+        for fobj in store.query("inode > ?", (4,), order_by="inode DESC", limit=2)
+    ] == sorted([fobj.inode for fobj in store if fobj.inode > 4], reverse=True)[:2]
+
+
+def test_file_object_store_volumes(store: Objects.FileObjectStore) -> None:
+    fobjs = list(store)
+    vobjs = {id(fobj.volume_object): fobj.volume_object for fobj in fobjs}
+    assert len(vobjs) == 3
+    for vobj in vobjs.values():
+        assert isinstance(vobj, Objects.VolumeObject)
+    assert store.volume(1000) is None
+
+
+def test_file_object_store_differential(tmp_path) -> None:
+    dobj = dfxml.bin.make_differential_dfxml.make_differential_dfxml(
+        os.path.join(samples_dir, "difference_test_0.xml"),
+        os.path.join(samples_dir, "difference_test_1.xml"),
+    )
+    fobjs = [obj for obj in dobj if isinstance(obj, Objects.FileObject)]
+    with Objects.FileObjectStore(str(tmp_path / "diff.sqlite"), dobj) as store:
+        store.extend(fobjs)
+        for anno in ["new", "deleted", "renamed", "changed", "modified"]:
+            assert [fobj.filename for fobj in store.by_anno(anno)] == [
+                fobj.filename for fobj in fobjs if anno in fobj.annos
+            ]
+        stored = list(store)
+        assert [fobj.annos for fobj in stored] == [fobj.annos for fobj in fobjs]
+        assert [fobj.diffs for fobj in stored] == [fobj.diffs for fobj in fobjs]
+        assert [fobj.original_fileobject for fobj in stored] == [
+            fobj.original_fileobject for fobj in fobjs
+        ]
+
+
+def test_file_object_store_persistence(tmp_path) -> None:
+    path = str(tmp_path / "store.sqlite")
+    dobj = Objects.DFXMLObject()
+    dobj.add_namespace("ext", "urn:example:ext")
+    vobj = Objects.VolumeObject()
+    vobj.ftype_str = "ntfs"
+    empty_vobj = Objects.VolumeObject()
+    empty_vobj.ftype_str = "fat16"
+    fobj0 = Objects.FileObject(filename="a.txt", filesize=3, md5="A" * 32)
+    fobj0.volume_object = vobj
+    fobj1 = Objects.FileObject(filename="b.txt", mtime="2010-01-01T00:00:00Z")
+    with Objects.FileObjectStore(path, dobj) as store:
+        store.append(fobj0)
+        store._add_volume(empty_vobj)
+        store.append(fobj1)
+
+    with Objects.FileObjectStore(path) as store:
+        assert ("ext", "urn:example:ext") in list(store.dfxmlobject.iter_namespaces())
+        assert list(store) == [fobj0, fobj1]
+        assert store.by_hash("a" * 32)[0].volume_object.ftype_str == "ntfs"
+        assert store.by_time("mtime", "2010-01-01T00:00:00Z")[0] == fobj1
+        store.append(Objects.FileObject(filename="c.txt"))
+        assert len(store) == 3
+        out_path = str(tmp_path / "out.xml")
+        store.export(out_path)
+
+    dobj = Objects.parse(out_path)
+    assert [vobj.ftype_str for vobj in dobj.volumes] == ["ntfs", "fat16"]
+    assert [fobj.filename for fobj in dobj.volumes[0].files] == ["a.txt"]
+    assert [fobj.filename for fobj in dobj.files] == ["b.txt", "c.txt"]
+
+    # The store's tables are available for SQL.
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT COUNT(*) FROM hashes").fetchone()[0] == 1
+    connection.execute("UPDATE meta SET value = '0' WHERE key = 'version'")
+    connection.commit()
+    connection.close()
+    with pytest.raises(ValueError):
+        Objects.FileObjectStore(path)
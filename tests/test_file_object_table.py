@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import array
+import math
+
+import pytest
+from iterparse_helpers import SAMPLE, fileobjects
+
+import dfxml.objects as Objects
+
+try:
+    import numpy  # type: ignore
+
+    use_numpy_values = [False, True]
+except ImportError:
+    use_numpy_values = [False]
+
+
+@pytest.mark.parametrize("use_numpy", use_numpy_values)
+def test_file_object_table_round_trip(use_numpy: bool) -> None:
+    fobjs = fileobjects(SAMPLE)
+    table = Objects.FileObjectTable.from_iterparse(SAMPLE, use_numpy=use_numpy)
+    assert len(table) == len(fobjs)
+    for index, fobj in enumerate(fobjs):
+        row = table.to_FileObject(index)
+        for name in [
+            "filename",
+            "filesize",
+            "inode",
+            "partition",
+            "alloc_inode",
+            "alloc_name",
+            "unalloc",
+            "md5",
+            "sha1",
+            "name_type",
+        ]:
+            assert getattr(row, name) == getattr(fobj, name), name
+        assert row.is_allocated() == fobj.is_allocated()
+        for name in Objects.TimestampObject.timestamp_name_list:
+            if getattr(fobj, name) is None:
+                assert getattr(row, name) is None
+            else:
+                assert getattr(row, name).time == getattr(fobj, name).time, name
+    assert table.to_FileObject(-1).filename == fobjs[-1].filename
+    with pytest.raises(IndexError):
+        table.to_FileObject(len(fobjs))
+
+
+@pytest.mark.parametrize("use_numpy", use_numpy_values)
+def test_file_object_table_columns(use_numpy: bool) -> None:
+    table = Objects.FileObjectTable.from_iterparse(SAMPLE, use_numpy=use_numpy)
+    filesizes = table["filesize"]
+    filenames = table["filename"]
+    if use_numpy:
+        assert filesizes.dtype == numpy.int64
+        assert table["alloc"].dtype == numpy.int8
+        assert table["mtime"].dtype == numpy.float64
+    else:
+        assert isinstance(filesizes, array.array)
+        assert isinstance(filenames, list)
+    assert len(filesizes) == len(filenames) == len(table)
+    assert list(filenames) == [fobj.filename for fobj in fileobjects(SAMPLE)]
+    with pytest.raises(KeyError):
+        table.column("byte_runs")
+
+
+def test_file_object_table_nulls() -> None:
+    fobj = Objects.FileObject(filename="a.txt", uid="S-1-5-18")
+    table = Objects.FileObjectTable([fobj], use_numpy=False)
+    assert table["filesize"][0] == Objects.FileObjectTable.NULL_INT
+    assert table["uid"][0] == Objects.FileObjectTable.NULL_INT
+    assert table["alloc_inode"][0] == -1
+    assert math.isnan(table["mtime"][0])
+    assert table["md5"] == [None]
+
+    row = table.to_FileObject(0)
+    assert row.filename == "a.txt"
+    assert row.filesize is None
+    assert row.uid is None
+    assert row.alloc_inode is None
+    assert row.mtime is None
+    assert row.md5 is None
+
+
+@pytest.mark.parametrize("use_numpy", use_numpy_values)
+def test_file_object_table_filter_sort(use_numpy: bool) -> None:
+    fobjs = [
+        Objects.FileObject(filename="c", filesize=30, mtime="2010-01-01T00:00:00Z"),
+        Objects.FileObject(filename="a", filesize=10),
+        Objects.FileObject(filename="b", filesize=30, mtime="2009-01-01T00:00:00Z"),
+        Objects.FileObject(filename=None, filesize=20),
+    ]
+    table = Objects.FileObjectTable(fobjs, use_numpy=use_numpy)
+
+    filesizes = table["filesize"]
+    big = table.filter([filesize >= 20 for filesize in filesizes])
+    assert list(big["filename"]) == ["c", "b", None]
+    if use_numpy:
+        assert list(table.filter(filesizes > 20)["filename"]) == ["c", "b"]
+    with pytest.raises(ValueError):
+        table.filter([True])
+
+    assert list(table.sort("filename")["filename"]) == [None, "a", "b", "c"]
+    assert table.argsort("mtime") == [2, 0, 1, 3]
+    assert table.argsort(["filesize", "filename"]) == [1, 3, 2, 0]
+    assert table.argsort("filesize", reverse=True) == [2, 0, 3, 1]
+
+    subset = table.take([2, 1])
+    assert len(subset) == 2
+    assert subset.to_FileObject(0).filename == "b"
+    assert subset.to_FileObject(0).mtime.time == fobjs[2].mtime.time
+    assert [fobj.filename for fobj in subset] == ["b", "a"]
+
+
+def test_file_object_table_file_filter() -> None:
+    file_filter = Objects.FileObjectFilter(filename_glob="*___renamed")
+    table = Objects.FileObjectTable.from_iterparse(SAMPLE, file_filter=file_filter)
+    assert list(table["filename"]) == ["CHANGE___renamed"]
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import os
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import dfxml
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+
+def _element_tree_dfxml(obj) -> str:
+    return Objects._ET_tostring(obj.to_Element())
+
+
+@pytest.mark.parametrize(
+    "sample",
+    [
+        "difference_test_0.xml",
+        "difference_test_1.xml",
+        "difference_test_2.xml",
+        "difference_test_3.xml",
+        "fileobjectexample.xml",
+        "piecewise.xml",
+        "simple.xml",
+        "tcpflow_zip_generic_header.xml",
+    ],
+)
+def test_direct_serialization_samples(sample: str) -> None:
+    tally = 0
+    for e in ET.parse(os.path.join(samples_dir, sample)).iter():
+        if Objects._qsplit(e.tag)[1] != "fileobject":
+            continue
+        fobj = Objects.FileObject()
+        fobj.populate_from_Element(e)
+        expected = _element_tree_dfxml(fobj)
+        if fobj.externals or not fobj.original_fileobject is None:
+            assert fobj._to_dfxml_direct() is None
+        else:
+            assert fobj._to_dfxml_direct() == expected
+        assert fobj.to_dfxml() == expected
+
+        lazy_fobj = Objects.LazyFileObject()
+        lazy_fobj.populate_from_Element(e)
+        assert lazy_fobj.to_dfxml() == expected
+        tally += 1
+    assert tally > 0
+
+
+def test_direct_serialization_escaping() -> None:
+    fobj = Objects.FileObject(
+        filename='a&b <c> "d"\n',
+        filesize=0,
+        alloc_inode=True,
+        alloc_name=False,
+        md5="",
+        mtime="2009-01-01T00:00:00Z",
+    )
+    fobj.mtime.prec = "100ns"
+    fobj.atime = Objects.TimestampObject(name="atime", prec="2s")
+    fobj.error = ""
+    parent_object = Objects.FileObject(inode=5)
+    fobj.parent_object = parent_object
+
+    br = Objects.ByteRun(img_offset=512, len=3, fill="0", type="resident")
+    br.sha1 = "a&b"
+    brs = Objects.ByteRuns()
+    brs.facet = "data"
+    brs.append(br)
+    brs.append(Objects.ByteRun(file_offset=3, fs_offset=0, len=1))
+    fobj.data_brs = brs
+    fobj.inode_brs = Objects.ByteRuns()
+
+    expected = _element_tree_dfxml(fobj)
+    assert "<error />" in expected
+    assert fobj._to_dfxml_direct() == expected
+
+    assert br.to_dfxml() == _element_tree_dfxml(br)
+    assert brs.to_dfxml() == _element_tree_dfxml(brs)
+    assert fobj.mtime.to_dfxml() == _element_tree_dfxml(fobj.mtime)
+
+
+def test_direct_serialization_differential_annotations() -> None:
+    fobj = Objects.FileObject(filename="a.txt", filesize=2, md5="00")
+    fobj.annos.add("modified")
+    fobj.annos.add("renamed")
+    fobj.diffs.update(
+        ["filesize", "md5", "mtime", "data_brs", "name_brs", "parent_object"]
+    )
+    fobj.parent_object = Objects.FileObject()
+    # Differential DFXML documents register the delta namespace's prefix.  Without a registered prefix, ElementTree generates one, and the direct serializer defers to ElementTree.
+    Objects.DFXMLObject().add_namespace("delta", dfxml.XMLNS_DELTA)
+    expected = _element_tree_dfxml(fobj)
+    assert ' xmlns:delta="%s"' % dfxml.XMLNS_DELTA in expected
+    assert fobj._to_dfxml_direct() == expected
+
+    # A FileObject with only unrecognized differences declares no namespace.
+    fobj = Objects.FileObject(filename="a.txt")
+    fobj.diffs.add("unused")
+    assert fobj._to_dfxml_direct() == _element_tree_dfxml(fobj)
+    assert not "xmlns" in fobj.to_dfxml()
+
+
+def test_direct_serialization_fallbacks() -> None:
+    fobj = Objects.FileObject(filename="a.txt")
+    fobj.original_fileobject = Objects.FileObject(filename="b.txt")
+    assert fobj._to_dfxml_direct() is None
+    assert fobj.to_dfxml() == _element_tree_dfxml(fobj)
+
+    fobj = Objects.FileObject(filename="a.txt")
+    e = ET.Element("{urn:example:ext}note")
+    e.text = "x"
+    fobj.externals.append(e)
+    assert fobj._to_dfxml_direct() is None
+    assert fobj.to_dfxml() == _element_tree_dfxml(fobj)
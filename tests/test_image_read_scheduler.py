@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import hashlib
+import os
+import random
+import sqlite3
+import typing
+
+import pytest
+
+import dfxml.objects as Objects
+from dfxml.bin import Extractor, hash_sectors
+
+IMAGE_SIZE = 256 * 1024
+
+
+@pytest.fixture
+def image_size() -> int:
+    return IMAGE_SIZE
+
+
+def _random_byte_runs(rng: random.Random) -> Objects.ByteRuns:
+    """Returns byte runs of up to 6 runs, in no order, possibly overlapping, with fill and empty runs."""
+    brs = Objects.ByteRuns()
+    for _ in range(rng.randint(0, 6)):
+        length = rng.choice([0, 1, 511, 512, 4096, rng.randint(1, 40000)])
+        if rng.random() < 0.1:
+            brs.append(Objects.ByteRun(len=length, fill="0"))
+        else:
+            brs.append(
+                Objects.ByteRun(
+                    img_offset=rng.randrange(IMAGE_SIZE - length), len=length
+                )
+            )
+    return brs
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(),
+        dict(buffer_size=512, read_size=16384, max_gap=0, batch_size=7),
+        dict(buffer_size=1000, read_size=4096, batch_bytes=50000),
+    ],
+)
+def test_image_read_scheduler(
+    raw_image: str, kwargs: typing.Dict[str, typing.Any]
+) -> None:
+    rng = random.Random(len(kwargs))
+    jobs = [(index, _random_byte_runs(rng)) for index in range(200)]
+    received: typing.Dict[int, typing.List[bytes]] = {index: [] for index, _ in jobs}
+
+    def _consumer(index: int) -> typing.Callable[[memoryview], None]:
+        chunks = received[index]
+        return lambda chunk: chunks.append(bytes(chunk))
+
+    scheduler = Objects.ImageReadScheduler(raw_image, **kwargs)
+    completed = list(
+        scheduler.run((index, brs, _consumer(index)) for (index, brs) in jobs)
+    )
+    assert sorted(completed) == [(index, None) for index, _ in jobs]
+    buffer_size = kwargs.get("buffer_size", 1048576)
+    for index, brs in jobs:
+        expected = [bytes(chunk) for chunk in brs.iter_contents(raw_image, buffer_size)]
+        assert received[index] == expected
+
+
+def test_image_read_scheduler_errors(raw_image: str, image_bytes: bytes) -> None:
+    received: typing.Dict[str, typing.List[bytes]] = dict()
+
+    def _job(name: str, runs: typing.List[typing.Dict[str, typing.Any]]):
+        received[name] = []
+        brs = Objects.ByteRuns()
+        for run in runs:
+            brs.append(Objects.ByteRun(**run))
+        return (name, brs, received[name].append)
+
+    jobs = [
+        _job("no length", [dict(img_offset=0, len=10), dict(img_offset=10)]),
+        _job("no offset", [dict(len=10)]),
+        _job("past end", [dict(img_offset=IMAGE_SIZE - 10, len=20)]),
+        _job("long past end", [dict(img_offset=IMAGE_SIZE - 10, len=20000)]),
+        _job(
+            "long past end, out of order",
+            [
+                dict(img_offset=IMAGE_SIZE - 20, len=10),
+                dict(img_offset=IMAGE_SIZE - 20000, len=30000),
+            ],
+        ),
+        _job("good", [dict(img_offset=100, len=10)]),
+        ("none", None, received.setdefault("none", []).append),
+    ]
+    results = dict(Objects.ImageReadScheduler(raw_image, read_size=4096).run(jobs))
+    assert isinstance(results["no length"], AttributeError)
+    assert isinstance(results["no offset"], AttributeError)
+    assert isinstance(results["past end"], ValueError)
+    assert isinstance(results["long past end"], ValueError)
+    assert isinstance(results["long past end, out of order"], ValueError)
+    assert received["long past end, out of order"][0] == image_bytes[-20:-10]
+    assert results["good"] is None and received["good"] == [image_bytes[100:110]]
+    assert results["none"] is None and received["none"] == []
+    assert received["no length"] == []
+
+    with pytest.raises(ValueError):
+        Objects.ImageReadScheduler(raw_image, read_size=0)
+    with pytest.raises(TypeError):
+        Objects.ImageReadScheduler(typing.cast(typing.Any, None))
+
+
+def test_image_read_scheduler_large_runs(raw_image: str, image_bytes: bytes) -> None:
+    # The first run is read last, so the large second run is read when its turn comes rather than held.
+    brs = Objects.ByteRuns()
+    brs.append(Objects.ByteRun(img_offset=200000, len=100))
+    brs.append(Objects.ByteRun(img_offset=1000, len=50000))
+    received: typing.List[bytes] = []
+    scheduler = Objects.ImageReadScheduler(raw_image, buffer_size=4096, read_size=4096)
+    results = list(
+        scheduler.run([("job", brs, lambda chunk: received.append(bytes(chunk)))])
+    )
+    assert results == [("job", None)]
+    assert received == [
+        bytes(chunk) for chunk in brs.iter_contents(raw_image, buffer_size=4096)
+    ]
+
+    # Exceptions raised by consumers are not caught, including while a run is streamed.
+    def _failing_consumer(chunk: memoryview) -> None:
+        raise ValueError("Consumer failure.")
+
+    for runs in [brs, Objects.ByteRuns([Objects.ByteRun(img_offset=0, len=10)])]:
+        with pytest.raises(ValueError, match="Consumer failure"):
+            list(scheduler.run([("job", runs, _failing_consumer)]))
+
+
+def test_image_read_scheduler_img_cat(tmp_path) -> None:
+    ewf_image = str(tmp_path / "image.E01")
+    with open(ewf_image, "wb") as fh:
+        fh.write(b"EVF\x09\x0d\x0a\xff\x00" + bytes(1000))
+    fake_bin = tmp_path / "bin"
+    fake_bin.mkdir()
+    img_cat = fake_bin / "img_cat"
+    img_cat.write_text("#!/bin/sh\nprintf 'img_cat output'\n")
+    img_cat.chmod(0o755)
+    old_path = os.environ["PATH"]
+    os.environ["PATH"] = "%s%s%s" % (fake_bin, os.pathsep, old_path)
+    try:
+        brs = Objects.ByteRuns()
+        brs.append(Objects.ByteRun(img_offset=0, len=14))
+        received: typing.List[bytes] = []
+        scheduler = Objects.ImageReadScheduler(ewf_image)
+        assert list(scheduler.run([("job", brs, received.append)])) == [("job", None)]
+        assert received == [b"img_cat output"]
+    finally:
+        os.environ["PATH"] = old_path
+
+
+def _files(image_bytes: bytes) -> Objects.DFXMLObject:
+    """Returns a DFXMLObject of fragmented, allocated regular files in the image."""
+    rng = random.Random(2022)
+    dobj = Objects.DFXMLObject()
+    vobj = Objects.VolumeObject()
+    dobj.append(vobj)
+    for index in range(20):
+        brs = Objects.ByteRuns()
+        contents = b""
+        for _ in range(rng.randint(1, 4)):
+            offset = rng.randrange(IMAGE_SIZE // 512 - 8) * 512
+            length = rng.randint(1, 8) * 512
+            brs.append(Objects.ByteRun(img_offset=offset, len=length))
+            contents += image_bytes[offset : offset + length]
+        fobj = Objects.FileObject(
+            filename="dir/file%d" % index,
+            alloc=True,
+            name_type="r",
+            filesize=len(contents),
+            sha1=hashlib.sha1(contents).hexdigest(),
+            id=index + 1,
+        )
+        fobj.data_brs = brs
+        vobj.append(fobj)
+    return dobj
+
+
+def test_extract_files(tmp_path, raw_image: str, image_bytes: bytes) -> None:
+    dobj = _files(image_bytes)
+    dfxml_path = str(tmp_path / "files.xml")
+    with open(dfxml_path, "w") as fh:
+        dobj.print_dfxml(fh)
+    outdir = tmp_path / "extracted"
+    manifest_path = str(tmp_path / "manifest.xml")
+    Extractor.extract_files(
+        raw_image, str(outdir), dfxml_path, out_manifest_path=manifest_path
+    )
+    manifest = [
+        obj
+        for (event, obj) in Objects.iterparse(manifest_path)
+        if isinstance(obj, Objects.FileObject)
+    ]
+    assert len(manifest) == 20
+    assert all(obj.error is None and len(obj.diffs) == 0 for obj in manifest)
+    for fobj in dobj.volumes[0].files:
+        with open(str(outdir / "no_partition" / fobj.filename), "rb") as fh:
+            assert hashlib.sha1(fh.read()).hexdigest() == fobj.sha1
+
+
+def test_write_sector_hashes_to_db(
+    tmp_path, raw_image: str, image_bytes: bytes
+) -> None:
+    dobj = _files(image_bytes)
+    db_path = str(tmp_path / "hashes.db")
+    hash_sectors.write_sector_hashes_to_db(raw_image, dobj, lambda obj: True, db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        for fobj in dobj.volumes[0].files:
+            rows = conn.execute(
+                "SELECT file_offset, len, md5 FROM block_hashes WHERE obj_id = ? ORDER BY file_offset;",
+                (fobj.id,),
+            ).fetchall()
+            contents = b"".join(fobj.data_brs.iter_contents(raw_image))
+            assert rows == [
+                (offset, 512, hashlib.md5(contents[offset : offset + 512]).hexdigest())
+                for offset in range(0, len(contents), 512)
+            ]
+    finally:
+        conn.close()
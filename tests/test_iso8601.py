@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import copy
+import pickle
+import random
+import time
+import typing
+
+import pytest
+
+import dfxml
+import dfxml.objects as Objects
+
+ISO8601_TEXTS = [
+    "2007-08-09T12:34:56",
+    "2007-08-09T12:34:56Z",
+    "2007-08-09 12:34:56Z",
+    "2007-08-09T12:34:56.5Z",
+    "2007-08-09T12:34:56.000003Z",
+    "2007-08-09T12:34:56.123456789",
+    "2007-08-09T12:34:56+05:30",
+    "2007-08-09T12:34:56-0800",
+    "2007-08-09T12:34:56-05:30",
+    "2007-08-09T12:34:56+00:00",
+    "2007-08-09T12:34:56.25-04:00",
+    "2007-08-09T12:34:56+05:3",
+    "2007-08-09T12:34:56Zjunk",
+    "when: 2007-08-09T12:34:56Z",
+    "2007-08-09t12:34:56Z",
+    "2007-08-09T24:00:00Z",
+    "2007-13-09T12:34:56Z",
+    "2007-08-09T12:34:5Z",
+    "2007-08-09T12:34:56.Z",
+    "2007-08-09T12:34:56.9999999999999999Z",
+]
+
+
+def _summary(function: typing.Callable[[str], typing.Any], text: str) -> typing.Any:
+    """Returns the fields and time zone offset of the datetime function returns for text, or the type and message of the exception it raises."""
+    try:
+        dt = function(text)
+    except Exception as e:
+        return (type(e), str(e))
+    return (dt, dt.tzinfo is None, dt.utcoffset(), dt.tzname(), dt.timetuple())
+
+
+@pytest.mark.parametrize("text", ISO8601_TEXTS)
+def test_iso8601_matches_regex(text: str) -> None:
+    expected = _summary(dfxml._iso8601Tdatetime_regex, text)
+    assert _summary(dfxml.iso8601Tdatetime, text) == expected
+    # Memoized.
+    assert _summary(dfxml.iso8601Tdatetime, text) == expected
+    assert _summary(dfxml._iso8601Tdatetime_cached.__wrapped__, text) == expected
+
+
+def test_iso8601_fixed_width() -> None:
+    assert not dfxml._iso8601Tdatetime_fixed("2007-08-09T12:34:56Z") is None
+    assert not dfxml._iso8601Tdatetime_fixed("2007-08-09T12:34:56.5+05:30") is None
+    # Other forms are left to the regular expression.
+    assert dfxml._iso8601Tdatetime_fixed("2007-08-09T12:34:56Zjunk") is None
+    assert dfxml._iso8601Tdatetime_fixed("2007-08-09T24:00:00Z") is None
+
+
+def test_iso8601_fuzz() -> None:
+    rng = random.Random(8601)
+    for _ in range(5000):
+        text = "%04d-%02d-%02d%s%02d:%02d:%02d%s" % (
+            rng.randint(0, 9999),
+            rng.randint(0, 13),
+            rng.randint(0, 32),
+            rng.choice("T t"),
+            rng.randint(0, 25),
+            rng.randint(0, 60),
+            rng.randint(0, 60),
+            rng.choice(
+                [
+                    "",
+                    "Z",
+                    ".%d" % rng.randint(0, 10 ** rng.randint(1, 9)),
+                    "+%02d:%02d" % (rng.randint(0, 14), rng.randint(0, 59)),
+                    "-%02d%02d" % (rng.randint(0, 14), rng.randint(0, 59)),
+                    "Z ",
+                ]
+            ),
+        )
+        assert _summary(dfxml._iso8601Tdatetime_cached.__wrapped__, text) == (
+            _summary(dfxml._iso8601Tdatetime_regex, text)
+        ), text
+
+
+@pytest.mark.parametrize("text", ISO8601_TEXTS[:11])
+def test_dftime_timestamp(text: str) -> None:
+    expected = time.mktime(dfxml._iso8601Tdatetime_regex(text).timetuple())
+    assert dfxml.dftime(text).timestamp() == expected
+    assert dfxml.dftime(text).timestamp() == expected
+
+
+@pytest.mark.skipif(not hasattr(time, "tzset"), reason="Requires time.tzset.")
+def test_dftime_timestamp_time_zone(monkeypatch: pytest.MonkeyPatch) -> None:
+    text = "2007-08-09T12:34:56Z"
+    try:
+        timestamps = []
+        for zone in ["UTC0", "EST5EDT,M3.2.0,M11.1.0"]:
+            monkeypatch.setenv("TZ", zone)
+            time.tzset()
+            timestamps.append(dfxml.dftime(text).timestamp())
+        assert timestamps[1] - timestamps[0] == 4 * 60 * 60
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_timestamp_object_lazy_timestamp() -> None:
+    # As before timestamps were computed lazily, constructed TimestampObjects report no timestamp.
+    tobj = Objects.TimestampObject("2007-08-09T12:34:56Z", name="mtime")
+    assert tobj.timestamp is None
+
+    tobj.time = "2008-08-09T12:34:56Z"
+    assert tobj.timestamp == dfxml.dftime("2008-08-09T12:34:56Z").timestamp()
+    assert copy.deepcopy(tobj).timestamp == tobj.timestamp
+    assert pickle.loads(pickle.dumps(tobj)).timestamp == tobj.timestamp
+
+    tobj.time = "2009-08-09T12:34:56Z"
+    copied = pickle.loads(pickle.dumps(tobj))
+    assert copied.timestamp == dfxml.dftime("2009-08-09T12:34:56Z").timestamp()
+
+    # Malformed text is still rejected when assigned.
+    with pytest.raises(ValueError):
+        tobj.time = "2009-xx"
+    with pytest.raises(ValueError):
+        Objects.TimestampObject("2009-08-09T12:34:5Z", name="mtime")
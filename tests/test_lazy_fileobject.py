@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import os
+import typing
+import xml.etree.ElementTree as ET
+
+import pytest
+
+import dfxml
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+FILEOBJECT_XML = """<fileobject xmlns='%s' xmlns:delta='%s' xmlns:ext='urn:example:ext' delta:changed_file='1'>
+  <filename>a.txt</filename>
+  <alloc>1</alloc>
+  <unalloc>1</unalloc>
+  <used>1</used>
+  <filesize delta:changed_property='1'>10</filesize>
+  <mtime prec='100ns'>2013-01-01T00:00:00.5Z</mtime>
+  <ext:note k='v'>x</ext:note>
+  <byte_runs><byte_run img_offset='1024' len='10'/></byte_runs>
+  <byte_runs facet='inode'><byte_run img_offset='512' len='4'/></byte_runs>
+  <hashdigest type='MD5'>abc</hashdigest>
+  <delta:original_fileobject><filename>b.txt</filename></delta:original_fileobject>
+</fileobject>
+""" % (
+    dfxml.XMLNS_DFXML,
+    dfxml.XMLNS_DELTA,
+)
+
+
+def _populated(
+    file_object_class: typing.Type[Objects.FileObject],
+) -> Objects.FileObject:
+    fobj = file_object_class()
+    fobj.populate_from_Element(ET.fromstring(FILEOBJECT_XML))
+    return fobj
+
+
+def test_lazy_fileobject_properties() -> None:
+    eager = _populated(Objects.FileObject)
+    lazy = _populated(Objects.LazyFileObject)
+    assert isinstance(lazy, Objects.LazyFileObject)
+
+    # Annotations are not deferred.
+    assert lazy.annos == {"changed"}
+    assert lazy.diffs == {"filesize"}
+
+    for prop in Objects.FileObject._class_properties + ["byte_runs"]:
+        if prop == "externals":
+            continue
+        assert getattr(eager, prop) == getattr(lazy, prop), prop
+    assert lazy.externals[0].attrib["k"] == "v"
+    assert lazy._lazy_children is None
+
+    assert eager.to_dfxml() == _populated(Objects.LazyFileObject).to_dfxml()
+
+
+def test_lazy_fileobject_partial_decoding() -> None:
+    lazy = _populated(Objects.LazyFileObject)
+    assert isinstance(lazy, Objects.LazyFileObject)
+    assert lazy.filename == "a.txt"
+    # <unalloc> follows <alloc>, so it wins, as in FileObject.
+    assert lazy.alloc is False
+    # Other properties remain undecoded.
+    assert lazy._lazy_children is not None
+    assert lazy._mtime is None
+
+    # Assigning a property before reading it overrides the decoded value.
+    lazy.filesize = 20
+    assert lazy.filesize == 20
+    assert lazy.to_Element().find("filesize").text == "20"
+
+    assert lazy.materialize() is lazy
+    assert lazy._lazy_children is None
+    assert lazy.mtime == _populated(Objects.FileObject).mtime
+    assert lazy.original_fileobject.filename == "b.txt"
+
+
+@pytest.mark.parametrize(
+    "sample_name",
+    [
+        "difference_test_2.xml",
+        "difference_test_3.xml",
+        "tcpflow_zip_generic_header.xml",
+    ],
+)
+def test_iterparse_lazy(sample_name: str) -> None:
+    path = os.path.join(samples_dir, sample_name)
+    eager_fobjs = [
+        obj
+        for (_, obj) in Objects.iterparse(path)
+        if isinstance(obj, Objects.FileObject)
+    ]
+    lazy_fobjs = [
+        obj
+        for (_, obj) in Objects.iterparse(path, lazy=True)
+        if isinstance(obj, Objects.FileObject)
+    ]
+    assert len(eager_fobjs) == len(lazy_fobjs)
+    for eager_fobj, lazy_fobj in zip(eager_fobjs, lazy_fobjs):
+        assert isinstance(lazy_fobj, Objects.LazyFileObject)
+        assert eager_fobj.filename == lazy_fobj.filename
+        assert eager_fobj.is_allocated() == lazy_fobj.is_allocated()
+        assert eager_fobj.to_dfxml() == lazy_fobj.to_dfxml()
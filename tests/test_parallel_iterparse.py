@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import os
+import typing
+
+import pytest
+from iterparse_helpers import TRICKY_XML, serialization
+
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+
+@pytest.fixture
+def tricky_path(tmp_path) -> str:
+    path = tmp_path / "tricky.xml"
+    path.write_text(TRICKY_XML)
+    return str(path)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch) -> None:
+    # One <fileobject> per chunk.
+    monkeypatch.setattr(Objects, "_PARALLEL_CHUNK_SIZE", 1)
+
+
+def _eops(path: str, **kwargs) -> typing.List[typing.Tuple[str, str, str, bool]]:
+    """Summarizes the (event, object) pairs of iterparse, and whether FileObjects lack a volume, for comparison."""
+    return [
+        (
+            event,
+            type(obj).__name__,
+            serialization(obj),
+            not isinstance(obj, Objects.FileObject) or obj.volume_object is None,
+        )
+        for (event, obj) in Objects.iterparse(path, **kwargs)
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1 << 20])
+@pytest.mark.parametrize(
+    "sample",
+    ["difference_test_0.xml", "difference_test_2.xml", "difference_test_3.xml"],
+)
+def test_parallel_iterparse_samples(monkeypatch, chunk_size: int, sample: str) -> None:
+    monkeypatch.setattr(Objects, "_PARALLEL_CHUNK_SIZE", chunk_size)
+    path = os.path.join(samples_dir, sample)
+    assert _eops(path, workers=2) == _eops(path)
+
+
+def test_parallel_iterparse_tricky(tricky_path: str, small_chunks: None) -> None:
+    expected = _eops(tricky_path)
+    assert [
+        filename
+        for (event, obj) in Objects.iterparse(tricky_path)
+        if isinstance(obj, Objects.FileObject)
+        for filename in [obj.filename]
+    ] == ["in partition", "prefixed", "a.txt", None, "b.txt", "top"]
+    assert _eops(tricky_path, workers=2) == expected
+    assert _eops(tricky_path, workers=2, events=("end",)) == [
+        eop for eop in expected if eop[0] == "end"
+    ]
+
+    # Namespaces declared within <fileobject>s are registered on the DFXMLObject.
+    dobj = Objects.parse(tricky_path, workers=2)
+    assert ("ext2", "urn:example:ext2") in list(dobj.iter_namespaces())
+
+
+def test_parallel_iterparse_unordered(tricky_path: str, small_chunks: None) -> None:
+    def _grouped(eops):
+        """Replaces runs of FileObject events with the sorted run."""
+        retval: typing.List[typing.Any] = []
+        run: typing.List[typing.Any] = []
+        for eop in eops:
+            if eop[1] == "FileObject":
+                run.append(eop)
+                continue
+            if run:
+                retval.append(sorted(run))
+                run = []
+            retval.append(eop)
+        return retval
+
+    expected = _eops(tricky_path)
+    unordered = _eops(tricky_path, workers=3, ordered=False)
+    assert _grouped(unordered) == _grouped(expected)
+
+
+def test_parallel_iterparse_fields_filter(tricky_path: str, small_chunks: None) -> None:
+    file_filter = Objects.FileObjectFilter(filename_glob="*.txt")
+    fobjs = [
+        obj
+        for (event, obj) in Objects.iterparse(
+            tricky_path, workers=2, fields=["filename"], file_filter=file_filter
+        )
+        if isinstance(obj, Objects.FileObject)
+    ]
+    assert [fobj.filename for fobj in fobjs] == ["a.txt", "b.txt"]
+    assert fobjs[1].filesize is None
+    assert not fobjs[0].volume_object is None
+
+
+def test_parallel_iterparse_errors(tricky_path: str) -> None:
+    with pytest.raises(ValueError):
+        list(Objects.iterparse(tricky_path, workers=2, lazy=True))
+    with pytest.raises(ValueError):
+        list(Objects.iterparse("image.raw", workers=2))
+    with pytest.raises(ValueError):
+        list(Objects.iterparse(tricky_path, workers=2, fields=["nonexistent"]))
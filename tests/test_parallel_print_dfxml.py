@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import concurrent.futures
+import functools
+import io
+import multiprocessing
+import os
+
+import pytest
+
+import dfxml.bin.make_differential_dfxml
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+
+@pytest.fixture
+def small_batches(monkeypatch) -> None:
+    monkeypatch.setattr(Objects, "_PARALLEL_PRINT_BATCH_SIZE", 2)
+
+
+def _print_dfxml(dobj: Objects.DFXMLObject, **kwargs) -> str:
+    output_fh = io.StringIO()
+    dobj.print_dfxml(output_fh, **kwargs)
+    return output_fh.getvalue()
+
+
+@pytest.mark.parametrize(
+    "sample",
+    ["difference_test_0.xml", "difference_test_2.xml", "difference_test_3.xml"],
+)
+def test_parallel_print_dfxml_samples(sample: str, small_batches: None) -> None:
+    dobj = Objects.parse(os.path.join(samples_dir, sample))
+    expected = _print_dfxml(dobj)
+    assert _print_dfxml(dobj, workers=2) == expected
+    assert _print_dfxml(dobj, workers=1) == expected
+
+
+def test_parallel_print_dfxml_differential(small_batches: None) -> None:
+    # Differential FileObjects carry delta annotations and original FileObjects.
+    dobj = dfxml.bin.make_differential_dfxml.make_differential_dfxml(
+        os.path.join(samples_dir, "difference_test_0.xml"),
+        os.path.join(samples_dir, "difference_test_1.xml"),
+        retain_unchanged=True,
+    )
+    assert _print_dfxml(dobj, workers=3) == _print_dfxml(dobj)
+
+
+def test_parallel_print_dfxml_containers(small_batches: None) -> None:
+    dobj = Objects.DFXMLObject()
+    diobj = Objects.DiskImageObject()
+    psobj = Objects.PartitionSystemObject()
+    pobj = Objects.PartitionObject()
+    vobj = Objects.VolumeObject()
+    dobj.append(diobj)
+    diobj.append(psobj)
+    psobj.append(pobj)
+    pobj.append(vobj)
+    for parent in [dobj, diobj, psobj, pobj, vobj]:
+        for i in range(5):
+            parent.append(Objects.FileObject(filename="%s_%d" % (type(parent), i)))
+    assert _print_dfxml(dobj, workers=2) == _print_dfxml(dobj)
+
+
+def test_parallel_print_dfxml_volume_objects(small_batches: None) -> None:
+    # FileObjects referring to their volume, as parsed FileObjects do.
+    dobj = Objects.DFXMLObject()
+    vobj = Objects.VolumeObject()
+    dobj.append(vobj)
+    for i in range(9):
+        fobj = Objects.FileObject(filename="%d" % i, filesize=i)
+        vobj.append(fobj)
+        fobj.volume_object = vobj
+    expected = _print_dfxml(dobj)
+    assert _print_dfxml(dobj, workers=2) == expected
+    assert expected.count("<fileobject>") == 9
+
+
+def test_parallel_print_dfxml_spawn(monkeypatch, small_batches: None) -> None:
+    # Workers receive FileObjects through the pool's initializer, so they need not be forked.
+    monkeypatch.setattr(
+        concurrent.futures,
+        "ProcessPoolExecutor",
+        functools.partial(
+            concurrent.futures.ProcessPoolExecutor,
+            mp_context=multiprocessing.get_context("spawn"),
+        ),
+    )
+    dobj = Objects.parse(os.path.join(samples_dir, "difference_test_2.xml"))
+    assert _print_dfxml(dobj, workers=2) == _print_dfxml(dobj)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import os
+import sys
+import typing
+
+import pytest
+from iterparse_helpers import TRICKY_DFXML, serialization
+
+import dfxml.objects as Objects
+
+srcdir = os.path.dirname(__file__)
+samples_dir = os.path.join(srcdir, "..", "samples")
+
+
+class _RecordingParser(Objects.Parser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.states: typing.List[int] = []
+
+    def transition(self, to_state):
+        retval = super().transition(to_state)
+        self.states.append(to_state)
+        return retval
+
+
+def _event_stream(
+    path: str, backend: str
+) -> typing.Tuple[typing.List[typing.Tuple[str, str, str]], typing.List[int]]:
+    parser = _RecordingParser()
+    stream = []
+    with open(path, "rb") as fh:
+        for event, obj in parser.iterparse(fh, backend=backend):
+            stream.append((event, type(obj).__name__, serialization(obj)))
+    return (stream, parser.states)
+
+
+@pytest.fixture
+def tricky_dfxml_path(tmp_path) -> str:
+    path = tmp_path / "tricky.dfxml"
+    path.write_text(TRICKY_DFXML)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "sample_name",
+    [
+        "difference_test_0.xml",
+        "difference_test_1.xml",
+        "difference_test_2.xml",
+        "difference_test_3.xml",
+        "tcpflow_zip_generic_header.xml",
+        None,
+    ],
+)
+def test_lxml_backend_matches_etree(
+    sample_name: typing.Optional[str], tricky_dfxml_path: str
+) -> None:
+    pytest.importorskip("lxml")
+    if sample_name is None:
+        path = tricky_dfxml_path
+    else:
+        path = os.path.join(samples_dir, sample_name)
+    (etree_stream, etree_states) = _event_stream(path, "etree")
+    (lxml_stream, lxml_states) = _event_stream(path, "lxml")
+    assert etree_stream == lxml_stream
+    assert etree_states == lxml_states
+
+
+def test_lxml_backend_parse(tricky_dfxml_path: str) -> None:
+    pytest.importorskip("lxml")
+    element_classes = Objects._element_classes
+    etree_dobj = Objects.parse(tricky_dfxml_path, backend="etree")
+    lxml_dobj = Objects.parse(tricky_dfxml_path, backend="lxml")
+    # The backend does not change module state.
+    assert Objects._element_classes is element_classes
+    assert etree_dobj.to_dfxml() == lxml_dobj.to_dfxml()
+    # Externals are retained as ElementTree Elements regardless of backend.
+    fobj = lxml_dobj.volumes[0].files[0]
+    assert len(fobj.externals) == 1
+    assert fobj.externals[0].attrib["k"] == "v"
+
+
+def test_get_parser_backend() -> None:
+    assert isinstance(Objects.get_parser_backend(), Objects.ElementTreeParserBackend)
+    assert isinstance(
+        Objects.get_parser_backend("etree"), Objects.ElementTreeParserBackend
+    )
+    backend = Objects.ElementTreeParserBackend()
+    assert Objects.get_parser_backend(backend) is backend
+    with pytest.raises(ValueError):
+        Objects.get_parser_backend("expat")
+
+
+def test_lxml_backend_fallback(monkeypatch, tricky_dfxml_path: str) -> None:
+    # Make lxml unimportable, whether or not it is installed.
+    monkeypatch.setitem(sys.modules, "lxml", None)
+    monkeypatch.setitem(sys.modules, "lxml.etree", None)
+    assert isinstance(
+        Objects.get_parser_backend("lxml"), Objects.ElementTreeParserBackend
+    )
+    assert isinstance(
+        Objects.get_parser_backend("auto"), Objects.ElementTreeParserBackend
+    )
+    (etree_stream, _) = _event_stream(tricky_dfxml_path, "etree")
+    (fallback_stream, _) = _event_stream(tricky_dfxml_path, "lxml")
+    assert etree_stream == fallback_stream
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import copy
+import pickle
+import typing
+
+import pytest
+
+import dfxml.objects as Objects
+
+FILENAMES = [
+    "Windows",
+    "Windows/System32",
+    "Windows/System32/drivers/etc/hosts",
+    "Windows/System32/drivers/etc/services",
+    "Users/Administrator/NTUSER.DAT",
+    "/absolute/path",
+    None,
+]
+
+
+@pytest.fixture
+def nested_path(tmp_path) -> str:
+    dobj = Objects.DFXMLObject()
+    vobj = Objects.VolumeObject()
+    vobj.ftype_str = "ntfs"
+    dobj.append(vobj)
+    for index, filename in enumerate(FILENAMES):
+        vobj.append(Objects.FileObject(filename=filename, inode=index + 1))
+    path = str(tmp_path / "nested.xml")
+    with open(path, "w") as fh:
+        dobj.print_dfxml(fh)
+    return path
+
+
+def _file_objects(path: str, **kwargs) -> typing.List[Objects.FileObject]:
+    return [
+        obj
+        for (event, obj) in Objects.iterparse(path, **kwargs)
+        if isinstance(obj, Objects.FileObject)
+    ]
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["", "/", "a", "/a/b", "a//b/", "Windows/System32/..", "C:\\Windows\\x.dll"],
+)
+def test_path_trie_round_trip(path: str) -> None:
+    trie = Objects.PathTrie()
+    name = trie.intern(path)
+    assert str(name) == path
+    fobj = Objects.FileObject(filename=name)
+    assert fobj.filename == path
+    assert type(fobj.filename) is str
+
+
+def test_path_trie_shares_directories() -> None:
+    trie = Objects.PathTrie()
+    hosts = trie.intern("Windows/System32/drivers/etc/hosts")
+    services = trie.intern("Windows/System32/drivers/etc/services")
+    assert len(trie) == 4
+    assert hosts.parent is services.parent
+    assert str(hosts.parent) == "Windows/System32/drivers/etc"
+    # Directories' paths are built once, not on each access.
+    assert str(hosts.parent) is str(services.parent)
+    assert hosts.name == "hosts"
+    assert trie.intern("hosts").parent is None
+
+    fobj0 = Objects.FileObject(filename=hosts)
+    fobj1 = Objects.FileObject(filename=services)
+    assert fobj0._filename_directory is fobj1._filename_directory
+
+    # Assigning a str replaces the interned path.
+    fobj0.filename = "hosts"
+    assert fobj0.filename == "hosts"
+    assert fobj0 != Objects.FileObject(filename=hosts)
+
+
+def test_path_trie_copies() -> None:
+    trie = Objects.PathTrie()
+    fobj = Objects.FileObject(filename=trie.intern("a/b/c"))
+    assert pickle.loads(pickle.dumps(trie.intern("a/b/c"))) == "a/b/c"
+    for copied in [pickle.loads(pickle.dumps(fobj)), copy.deepcopy(fobj)]:
+        assert copied.filename == "a/b/c"
+        assert copied == fobj
+
+
+@pytest.mark.parametrize(
+    "kwargs", [dict(), dict(lazy=True), dict(keep_raw=True), dict(workers=2)]
+)
+def test_iterparse_path_trie(
+    nested_path: str, kwargs: typing.Dict[str, typing.Any]
+) -> None:
+    expected = _file_objects(nested_path)
+    trie = Objects.PathTrie()
+    fobjs = _file_objects(nested_path, path_trie=trie, **kwargs)
+    assert len(trie) == 8
+    assert [fobj.filename for fobj in fobjs] == FILENAMES
+    assert fobjs[2]._filename_directory is fobjs[3]._filename_directory
+    if not kwargs.get("lazy"):
+        assert fobjs == expected
+    if kwargs.get("keep_raw"):
+        assert all(not fobj.raw_dfxml is None for fobj in fobjs)
+
+
+def test_parse_path_trie(nested_path: str) -> None:
+    trie = Objects.PathTrie()
+    dobj = Objects.parse(nested_path, path_trie=trie)
+    assert [fobj.filename for fobj in dobj.volumes[0].files] == FILENAMES
+    assert len(trie) == 8
+
+
+def test_binary_dfxml_path_trie(nested_path: str, tmp_path) -> None:
+    path = nested_path
+    binary_path = str(tmp_path / "interned.bdfxml")
+    trie = Objects.PathTrie()
+    with open(binary_path, "wb") as fh:
+        with Objects.BinaryDFXMLWriter(fh) as writer:
+            for event, obj in Objects.iterparse(path, path_trie=trie):
+                writer.write(event, obj)
+    expected = _file_objects(path)
+    assert _file_objects(binary_path) == expected
+    assert _file_objects(binary_path, path_trie=trie) == expected
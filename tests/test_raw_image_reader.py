@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import os
+import typing
+
+import pytest
+
+import dfxml.image_io as ImageIO
+import dfxml.objects as Objects
+
+IMAGE_SIZE = 64 * 1024
+
+
+@pytest.fixture
+def image_size() -> int:
+    return IMAGE_SIZE
+
+
+def _write_segments(
+    tmp_path, image_bytes: bytes, names: typing.List[str], sizes: typing.List[int]
+) -> str:
+    offset = 0
+    for name, size in zip(names, sizes):
+        with open(str(tmp_path / name), "wb") as fh:
+            fh.write(image_bytes[offset : offset + size])
+        offset += size
+    assert offset == len(image_bytes)
+    return str(tmp_path / names[0])
+
+
+def _byte_runs(runs: typing.List[typing.Tuple[typing.Optional[int], int, typing.Any]]):
+    brs = Objects.ByteRuns()
+    for img_offset, length, fill in runs:
+        brs.append(Objects.ByteRun(img_offset=img_offset, len=length, fill=fill))
+    return brs
+
+
+RUNS = [(4096, 1000, None), (None, 700, "0"), (513, 3000, None), (60000, 5536, None)]
+
+
+def _expected(image_bytes: bytes) -> bytes:
+    parts = []
+    for offset, length, fill in RUNS:
+        if offset is None:
+            parts.append(b"\x00" * length)
+        else:
+            parts.append(image_bytes[offset : offset + length])
+    return b"".join(parts)
+
+
+@pytest.mark.parametrize("buffer_size", [1, 512, 1000, 1048576])
+def test_iter_contents_raw_image(
+    raw_image: str, image_bytes: bytes, buffer_size: int
+) -> None:
+    chunks = list(_byte_runs(RUNS).iter_contents(raw_image, buffer_size=buffer_size))
+    assert all(len(chunk) <= buffer_size for chunk in chunks)
+    assert any(isinstance(chunk, memoryview) for chunk in chunks)
+    assert b"".join(chunks) == _expected(image_bytes)
+    # Each run is chunked on its own, as img_cat yields it.
+    if buffer_size == 512:
+        assert [len(chunk) for chunk in chunks[:2]] == [512, 488]
+
+
+@pytest.mark.parametrize(
+    "names, sizes",
+    [
+        (["image.001", "image.002", "image.003"], [10000, 30000, 25536]),
+        (["image.000", "image.001"], [4096, 61440]),
+        (["image.aa", "image.ab", "image.ac"], [513, 0, 65023]),
+    ],
+)
+def test_iter_contents_split_raw_image(
+    tmp_path, image_bytes: bytes, names: typing.List[str], sizes: typing.List[int]
+) -> None:
+    path = _write_segments(tmp_path, image_bytes, names, sizes)
+    with Objects.RawImageReader(path) as reader:
+        assert reader.paths == tuple(str(tmp_path / name) for name in names)
+        assert reader.size == IMAGE_SIZE
+        assert bytes(reader.pread(9000, 2000)) == image_bytes[9000:11000]
+    assert b"".join(
+        _byte_runs(RUNS).iter_contents(path, buffer_size=4096)
+    ) == _expected(image_bytes)
+
+
+def test_raw_image_reader_bounds(raw_image: str, image_bytes: bytes) -> None:
+    reader = Objects.RawImageReader([raw_image])
+    assert bytes(reader.pread(IMAGE_SIZE - 10, 100)) == image_bytes[-10:]
+    assert len(reader.pread(IMAGE_SIZE + 10, 100)) == 0
+    with pytest.raises(ValueError):
+        reader.pread(-1, 1)
+    chunks = []
+    with pytest.raises(ValueError):
+        for chunk in reader.iter_range(IMAGE_SIZE - 1000, 2000, 512):
+            chunks.append(bytes(chunk))
+    assert b"".join(chunks) == image_bytes[-1000:]
+    reader.close()
+    with pytest.raises(ValueError):
+        Objects.RawImageReader([])
+
+
+def test_iter_contents_shares_readers(raw_image: str) -> None:
+    brs = _byte_runs(RUNS[:1])
+    list(brs.iter_contents(raw_image))
+    reader = ImageIO._shared_raw_image_reader(raw_image)
+    assert ImageIO._shared_raw_image_reader(raw_image) is reader
+    with open(raw_image, "ab") as fh:
+        fh.write(b"\x00")
+    assert ImageIO._shared_raw_image_reader(raw_image) is not reader
+
+
+def test_iter_contents_img_cat_fallback(tmp_path, raw_image: str) -> None:
+    ewf_image = str(tmp_path / "image.E01")
+    with open(ewf_image, "wb") as fh:
+        fh.write(b"EVF\x09\x0d\x0a\xff\x00" + bytes(1000))
+    assert Objects.RawImageReader.is_raw_image(raw_image)
+    assert not Objects.RawImageReader.is_raw_image(ewf_image)
+    assert not Objects.RawImageReader.is_raw_image(str(tmp_path / "missing.raw"))
+    # Raw images are recognized by name, as they have no signature.  Images of other names, and raw-named images with another format's signature, are read with img_cat.
+    for name, leading_bytes, expected in [
+        ("image.001", b"", True),
+        ("image.aa", b"", True),
+        ("IMAGE.DD", b"", True),
+        ("image.dat", b"", False),
+        ("image", b"", False),
+        ("image.raw", b"QFI\xfb", False),
+    ]:
+        path = tmp_path / "named" / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_bytes(leading_bytes + bytes(1000))
+        assert Objects.RawImageReader.is_raw_image(str(path)) == expected, name
+
+    # img_cat is called for images that are not raw images, or when requested.
+    fake_bin = tmp_path / "bin"
+    fake_bin.mkdir()
+    img_cat = fake_bin / "img_cat"
+    img_cat.write_text("#!/bin/sh\nprintf 'img_cat output'\n")
+    img_cat.chmod(0o755)
+    old_path = os.environ["PATH"]
+    os.environ["PATH"] = "%s%s%s" % (fake_bin, os.pathsep, old_path)
+    try:
+        brs = _byte_runs([(0, 14, None)])
+        assert list(brs.iter_contents(ewf_image)) == [b"img_cat output"]
+        assert list(brs.iter_contents(raw_image, use_img_cat=True)) == [
+            b"img_cat output"
+        ]
+    finally:
+        os.environ["PATH"] = old_path
+
+    with Objects.RawImageReader(raw_image) as reader:
+        assert len(b"".join(_byte_runs(RUNS).iter_contents(reader))) == 10236
+        with pytest.raises(ValueError):
+            list(_byte_runs(RUNS).iter_contents(reader, use_img_cat=True))
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+
+# This software was developed at the National Institute of Standards
+# and Technology by employees of the Federal Government in the course
+# of their official duties. Pursuant to title 17 Section 105 of the
+# United States Code this software is not subject to copyright
+# protection and is in the public domain. NIST assumes no
+# responsibility whatsoever for its use by other parties, and makes
+# no guarantees, expressed or implied, about its quality,
+# reliability, or any other characteristic.
+#
+# We would appreciate acknowledgement if the software is used.
+
+import copy
+import gzip
+import pickle
+import typing
+import xml.etree.ElementTree as ET
+
+import pytest
+from iterparse_helpers import SAMPLE, fileobjects
+
+import dfxml
+import dfxml.objects as Objects
+
+# Exercises prefixed <fileobject>s, namespaces declared by ancestors, and <fileobject> text in comments and CDATA.
+RAW_XML = """<?xml version='1.0' encoding='UTF-8'?>
+<dfxml xmlns='%s' xmlns:delta='%s' xmlns:ext='urn:example:ext' version='2.0.0'>
+  <creator><program>test</program></creator>
+  <volume offset='512' xmlns:d='%s'>
+    <ftype_str>fat16</ftype_str>
+    <d:fileobject><d:filename>prefixed</d:filename></d:fileobject>
+    <fileobject delta:new_file='1'>
+      <filename>a.txt</filename>
+      <!-- </fileobject> -->
+      <ext:tag><![CDATA[</fileobject> ext:x]]></ext:tag>
+      <filesize  >3</filesize>
+    </fileobject>
+    <fileobject/>
+  </volume>
+  <fileobject><filename>b.txt</filename><filesize>5</filesize></fileobject>
+</dfxml>
+""" % (
+    dfxml.XMLNS_DFXML,
+    dfxml.XMLNS_DELTA,
+    dfxml.XMLNS_DFXML,
+)
+
+RAW_TEXTS = [
+    "<d:fileobject xmlns:d='%s'><d:filename>prefixed</d:filename></d:fileobject>"
+    % dfxml.XMLNS_DFXML,
+    """<fileobject xmlns:delta='%s' xmlns:ext='urn:example:ext' delta:new_file='1'>
+      <filename>a.txt</filename>
+      <!-- </fileobject> -->
+      <ext:tag><![CDATA[</fileobject> ext:x]]></ext:tag>
+      <filesize  >3</filesize>
+    </fileobject>"""
+    % dfxml.XMLNS_DELTA,
+    "<fileobject/>",
+    "<fileobject><filename>b.txt</filename><filesize>5</filesize></fileobject>",
+]
+
+RUNS_TEXT = """<fileobject>
+      <filename>runs.bin</filename>
+      <md5>d41d8cd98f00b204e9800998ecf8427e</md5>
+      <mtime prec="1s">2000-01-01T00:00:00Z</mtime>
+      <byte_runs facet="inode"><byte_run img_offset="512" len="512"/></byte_runs>
+      <byte_runs><byte_run img_offset="4096" len="4096"/><byte_run img_offset="16384" len="512"/></byte_runs>
+    </fileobject>"""
+
+RUNS_XML = """<?xml version='1.0' encoding='UTF-8'?>
+<dfxml xmlns='%s' version='2.0.0'>
+  <volume>
+    %s
+    %s
+  </volume>
+</dfxml>
+""" % (
+    dfxml.XMLNS_DFXML,
+    RUNS_TEXT,
+    RUNS_TEXT,
+)
+
+NESTED_TEXT = """<fileobject xmlns:delta='%s' delta:modified_file="1">
+      <delta:original_fileobject>
+        <filename>a.txt</filename>
+        <filesize>2</filesize>
+        <mtime prec="1s">2000-01-01T00:00:00Z</mtime>
+        <byte_runs><byte_run img_offset="4096" len="2"/></byte_runs>
+      </delta:original_fileobject>
+      <filename>a.txt</filename>
+      <filesize delta:changed_property="1">3</filesize>
+    </fileobject>""" % (
+    dfxml.XMLNS_DELTA
+)
+
+NESTED_XML = """<?xml version='1.0' encoding='UTF-8'?>
+<dfxml xmlns='%s' version='2.0.0'>
+  <volume>
+    %s
+  </volume>
+</dfxml>
+""" % (
+    dfxml.XMLNS_DFXML,
+    NESTED_TEXT,
+)
+
+
+@pytest.fixture
+def raw_path(tmp_path) -> str:
+    path = tmp_path / "raw.xml"
+    path.write_text(RAW_XML)
+    return str(path)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_raw_passthrough_texts(raw_path: str, lazy: bool) -> None:
+    fobjs = fileobjects(raw_path, keep_raw=True, lazy=lazy)
+    assert [fobj.raw_dfxml for fobj in fobjs] == RAW_TEXTS
+    assert [fobj.to_dfxml() for fobj in fobjs] == RAW_TEXTS
+    # Reading properties does not mark a FileObject modified.
+    assert fobjs[1].filesize == 3
+    assert fobjs[1].annos == {"new"}
+    assert fobjs[1].raw_dfxml == RAW_TEXTS[1]
+    if lazy:
+        assert isinstance(fobjs[1], Objects.LazyFileObject)
+        fobjs[1].materialize()
+        assert fobjs[1].raw_dfxml == RAW_TEXTS[1]
+
+    # Without keep_raw, nothing is retained.
+    assert [fobj.raw_dfxml for fobj in fileobjects(raw_path, lazy=lazy)] == [
+        None
+    ] * len(RAW_TEXTS)
+
+
+def test_raw_passthrough_round_trip(raw_path: str, tmp_path) -> None:
+    dobj = Objects.parse(raw_path, keep_raw=True)
+    out_path = tmp_path / "out.xml"
+    with open(out_path, "w") as fh:
+        dobj.print_dfxml(output_fh=fh)
+    expected = fileobjects(raw_path)
+    reparsed = fileobjects(str(out_path))
+    assert len(reparsed) == len(expected)
+    for fobj0, fobj1 in zip(expected, reparsed):
+        assert fobj0 == fobj1
+        assert fobj0.annos == fobj1.annos
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_raw_passthrough_modification(raw_path: str, lazy: bool) -> None:
+    fobjs = fileobjects(raw_path, keep_raw=True, lazy=lazy)
+    fobjs[3].filesize = 6
+    assert fobjs[3].raw_dfxml is None
+    assert "<filesize>6</filesize>" in fobjs[3].to_dfxml()
+
+    fobjs[2].annos.add("deleted")
+    assert fobjs[2].raw_dfxml is None
+
+    fobjs[1].diffs.add("filesize")
+    assert fobjs[1].raw_dfxml is None
+
+    # Setting volume_object does not modify the element.
+    fobjs[0].volume_object = None
+    assert fobjs[0].raw_dfxml == RAW_TEXTS[0]
+    fobjs[0].raw_dfxml = None
+    assert fobjs[0].to_dfxml() != RAW_TEXTS[0]
+
+    with pytest.raises(TypeError):
+        setattr(fobjs[0], "raw_dfxml", b"<fileobject/>")
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_raw_passthrough_in_place_modification(tmp_path, lazy: bool) -> None:
+    path = tmp_path / "runs.xml"
+    path.write_text(RUNS_XML)
+
+    def _parsed() -> typing.List[Objects.FileObject]:
+        fobjs = fileobjects(str(path), keep_raw=True, lazy=lazy)
+        assert [fobj.raw_dfxml for fobj in fobjs] == [RUNS_TEXT, RUNS_TEXT]
+        return fobjs
+
+    def _changes(fobj: Objects.FileObject) -> typing.List[typing.Callable[[], None]]:
+        mtime = fobj.mtime
+        data_brs = fobj.data_brs
+        assert not mtime is None
+        assert not data_brs is None
+        return [
+            lambda: setattr(mtime, "time", "1999-01-01T00:00:00Z"),
+            lambda: setattr(mtime, "prec", "2s"),
+            lambda: setattr(data_brs[0], "len", 999999),
+            lambda: setattr(data_brs[1], "sha1", "0" * 40),
+            lambda: data_brs.append(Objects.ByteRun(img_offset=0, len=1)),
+            lambda: data_brs.glom(Objects.ByteRun(img_offset=8192, len=1)),
+            lambda: data_brs.__delitem__(0),
+            lambda: setattr(data_brs, "facet", "data"),
+            lambda: setattr(fobj, "md5", None),
+        ]
+
+    for index in range(len(_changes(_parsed()[0]))):
+        (fobj, other) = _parsed()
+        _changes(fobj)[index]()
+        assert fobj.raw_dfxml is None
+        assert other.raw_dfxml == RUNS_TEXT
+        # The serialization reflects the change.
+        reparsed = Objects.FileObject()
+        reparsed.populate_from_Element(ET.fromstring(fobj.to_dfxml()))
+        assert reparsed == fobj
+
+    # Copies track their own changes.
+    (fobj, other) = _parsed()
+    fobj_copy = pickle.loads(pickle.dumps(fobj))
+    assert fobj_copy.raw_dfxml == RUNS_TEXT
+    fobj_copy.data_brs[0].len = 999999
+    assert fobj_copy.raw_dfxml is None
+    assert fobj.raw_dfxml == RUNS_TEXT
+    assert not fobj.data_brs is None
+    run_copy = copy.deepcopy(fobj.data_brs[0])
+    run_copy.len = 999999
+    assert fobj.raw_dfxml == RUNS_TEXT
+
+    # Byte runs moved to another FileObject are no longer tracked by their first owner, so it is marked modified.
+    other.data_brs = fobj.data_brs
+    other.raw_dfxml = RUNS_TEXT
+    assert fobj.raw_dfxml is None
+    other.data_brs[0].len = 999999
+    assert other.raw_dfxml is None
+
+
+def test_raw_passthrough_copies(raw_path: str) -> None:
+    for fobj in fileobjects(raw_path, keep_raw=True):
+        assert copy.deepcopy(fobj).raw_dfxml == fobj.raw_dfxml
+        assert pickle.loads(pickle.dumps(fobj)).raw_dfxml == fobj.raw_dfxml
+
+
+def test_raw_passthrough_filter(raw_path: str) -> None:
+    file_filter = Objects.FileObjectFilter(filename_glob="*.txt")
+    fobjs = fileobjects(raw_path, keep_raw=True, file_filter=file_filter)
+    assert [fobj.filename for fobj in fobjs] == ["a.txt", "b.txt"]
+    assert [fobj.raw_dfxml for fobj in fobjs] == [RAW_TEXTS[1], RAW_TEXTS[3]]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_raw_passthrough_nested_modification(tmp_path, lazy: bool) -> None:
+    path = tmp_path / "nested.xml"
+    path.write_text(NESTED_XML)
+
+    def _parsed() -> Objects.FileObject:
+        (fobj,) = fileobjects(str(path), keep_raw=True, lazy=lazy)
+        assert fobj.raw_dfxml == NESTED_TEXT
+        return fobj
+
+    def _changes(fobj: Objects.FileObject) -> typing.List[typing.Callable[[], None]]:
+        original = fobj.original_fileobject
+        assert not original is None
+        mtime = original.mtime
+        data_brs = original.data_brs
+        assert not mtime is None
+        assert not data_brs is None
+        return [
+            lambda: setattr(original, "filesize", 999),
+            lambda: setattr(mtime, "time", "1999-01-01T00:00:00Z"),
+            lambda: setattr(data_brs[0], "len", 999999),
+            lambda: original.annos.add("deleted"),
+        ]
+
+    for index in range(len(_changes(_parsed()))):
+        fobj = _parsed()
+        _changes(fobj)[index]()
+        assert fobj.raw_dfxml is None
+        assert fobj.to_dfxml() != NESTED_TEXT
+
+    fobj = _parsed()
+    assert not fobj.original_fileobject is None
+    fobj.original_fileobject.filesize = 999
+    assert "<filesize>999</filesize>" in fobj.to_dfxml()
+
+    # Copies track their own nested changes.
+    fobj = _parsed()
+    fobj_copy = pickle.loads(pickle.dumps(fobj))
+    assert fobj_copy.raw_dfxml == NESTED_TEXT
+    assert not fobj_copy.original_fileobject is None
+    fobj_copy.original_fileobject.filesize = 999
+    assert fobj_copy.raw_dfxml is None
+    assert fobj.raw_dfxml == NESTED_TEXT
+
+
+def test_raw_passthrough_fields(raw_path: str) -> None:
+    # The source text would not represent projected FileObjects.
+    with pytest.raises(ValueError):
+        fileobjects(raw_path, keep_raw=True, fields=["filename"])
+    with pytest.raises(ValueError):
+        Objects.parse(raw_path, keep_raw=True, fields=["filename"])
+
+
+def test_raw_passthrough_stream_writer(tmp_path) -> None:
+    out_path = str(tmp_path / "out.xml")
+    with Objects.DFXMLStreamWriter(out_path) as writer:
+        for event, obj in Objects.iterparse(SAMPLE, keep_raw=True):
+            if isinstance(obj, Objects.FileObject):
+                writer.write(obj)
+    assert fileobjects(out_path) == fileobjects(SAMPLE)
+
+
+def test_raw_passthrough_binary(raw_path: str, tmp_path) -> None:
+    bin_path = str(tmp_path / "raw.dfxml.bin")
+    Objects.dfxml_to_binary(raw_path, bin_path)
+    for fobj in fileobjects(bin_path):
+        assert fobj.raw_dfxml is None
+    with pytest.raises(ValueError):
+        fileobjects(bin_path, keep_raw=True)
+
+
+def test_raw_passthrough_errors(raw_path: str, tmp_path) -> None:
+    with pytest.raises(ValueError):
+        fileobjects(raw_path, keep_raw=True, workers=2)
+    with pytest.raises(ValueError):
+        fileobjects("image.raw", keep_raw=True)
+
+    gz_path = str(tmp_path / "raw.xml.gz")
+    with gzip.open(gz_path, "wt") as fh:
+        fh.write(RAW_XML)
+    with pytest.raises(ValueError):
+        fileobjects(gz_path, keep_raw=True)
+
+    latin1_path = tmp_path / "latin1.xml"
+    latin1_path.write_bytes(RAW_XML.replace("UTF-8", "ISO-8859-1").encode("iso-8859-1"))
+    with pytest.raises(ValueError):
+        fileobjects(str(latin1_path), keep_raw=True)